@@ -0,0 +1,651 @@
+#!/usr/bin/env python3
+##############################################################################################################
+#
+# Copyright (c) 2022 Sebastian Obele  /  obele.eu
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# This software uses the following software-parts:
+# Reticulum, LXMF, NomadNet  /  Copyright (c) 2016-2022 Mark Qvist  /  unsigned.io  /  MIT License
+#
+##############################################################################################################
+
+
+##############################################################################################################
+# Include
+
+
+#### System ####
+import sys
+import os
+import time
+import argparse
+import tempfile
+import shutil
+import threading
+import inspect
+import importlib.util
+
+#### Config ####
+import configparser
+
+#### JSON ####
+import json
+
+#### Other ####
+import gc
+import tracemalloc
+
+#### Reticulum, LXMF ####
+# Install: pip3 install rns lxmf
+# Source: https://markqvist.github.io
+import RNS
+import LXMF
+
+
+##############################################################################################################
+# Globals
+
+
+#### Global Variables - Configuration ####
+NAME = "LXMF Benchmark"
+DESCRIPTION = "In-process throughput benchmark for the LXMF tools"
+VERSION = "0.0.1 (2026-10-17)"
+COPYRIGHT = "(c) 2022 Sebastian Obele  /  obele.eu"
+PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+#### Global Variables - System (Not changeable) ####
+SCENARIOS = {}
+MEMBERS_DEFAULT = "10,100,1000,10000"
+SETUP_TIMEOUT = 60
+
+
+#### User configuration file of the tools (config.cfg.owr) ####
+# There is no network to announce to or to sync from.
+CONFIG_OVERRIDE = '''[lxmf]
+announce_startup = No
+announce_periodic = No
+sync_startup = No
+sync_periodic = No
+'''
+
+
+##############################################################################################################
+# Loopback
+
+
+#### Loopback - Reticulum ####
+# Stand-in for the Reticulum instance. No interfaces are started.
+class loopback_reticulum:
+    is_connected_to_shared_instance = False
+
+
+    def is_blackholed(self, identity):
+        return False
+
+
+    def _used_destination_data(self, destination_hash):
+        return RNS.Identity._used_destination_data(destination_hash)
+
+#### Loopback - Router ####
+# Stand-in for LXMF.LXMRouter without Reticulum links. Received messages are handed to the
+# delivery callback like LXMRouter.lxmf_delivery() does. Sent messages are captured and
+# answered with simulated delivery receipts when receipts() is called.
+class loopback_router(LXMF.LXMRouter):
+    def __init__(self, identity=None, storagepath=None, **kwargs):
+        self.identity = identity
+        self.storagepath = storagepath
+        self.delivery_destinations = {}
+        self.delivery_callback = None
+        self.pending_outbound = []
+        self.outbound_propagation_node = None
+        self.outbound_propagation_link = None
+        self.propagation_transfer_state = LXMF.LXMRouter.PR_IDLE
+        self.propagation_transfer_last_result = None
+        self.condition = threading.Condition()
+        self.failed_every = 0
+        self.sent = 0
+        self.delivered = 0
+        self.failed = 0
+
+
+    def register_delivery_identity(self, identity, display_name=None, stamp_cost=None):
+        destination = RNS.Destination(identity, RNS.Destination.IN, RNS.Destination.SINGLE, "lxmf", "delivery")
+        destination.display_name = display_name
+        self.delivery_destinations[destination.hash] = destination
+        return destination
+
+
+    def register_delivery_callback(self, callback):
+        self.delivery_callback = callback
+
+
+    def request_messages_from_propagation_node(self, identity, max_messages=None):
+        pass
+
+
+    def handle_outbound(self, message):
+        message.state = LXMF.LXMessage.OUTBOUND
+        with self.condition:
+            self.pending_outbound.append(message)
+            self.sent += 1
+            self.condition.notify()
+
+
+    def deliver(self, lxmf_bytes):
+        message = LXMF.LXMessage.unpack_from_bytes(lxmf_bytes)
+        if self.delivery_callback != None:
+            self.delivery_callback(message)
+
+
+    # All messages are handed over when the fan-out is empty and the router got every message of the send queue.
+    def idle(self, connection, fanout):
+        if fanout != None and fanout.stat()["queued"] > 0:
+            return False
+        return self.sent >= connection.send_queue_stat()["enqueued"]
+
+
+    def receipts(self, connection, fanout=None):
+        with self.condition:
+            while not self.idle(connection, fanout):
+                self.condition.wait(0.001)
+            pending = self.pending_outbound
+            self.pending_outbound = []
+
+        for message in pending:
+            if self.failed_every > 0 and (self.delivered + self.failed + 1) % self.failed_every == 0:
+                self.failed += 1
+                self.fail_message(message)
+            else:
+                self.delivered += 1
+                # Same as the delivery proof of the packet receipt.
+                message._LXMessage__mark_delivered()
+
+
+#### Loopback - Sink ####
+# Stand-in for third party clients (MQTT, Matrix, ...). Every method call is counted.
+class loopback_sink:
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls += 1
+            return self
+        return call
+
+
+#### Loopback - Install ####
+# Only the transport is replaced, the tools run their own setup() and lxmf_connection on top of it.
+def loopback_install():
+    reticulum = loopback_reticulum()
+    RNS.Reticulum.get_instance = staticmethod(lambda: reticulum)
+    RNS.Transport.owner = reticulum
+    RNS.Transport.has_path = staticmethod(lambda destination_hash: True)
+    RNS.Transport.hops_to = staticmethod(lambda destination_hash: 1)
+    RNS.Transport.request_path = staticmethod(lambda destination_hash, *args, **kwargs: None)
+    LXMF.LXMRouter = loopback_router
+
+
+##############################################################################################################
+# Tools
+
+
+#### Tool - Load ####
+def tool_load(name):
+    file = os.path.join(PATH, name, name + ".py")
+    spec = importlib.util.spec_from_file_location("lxmf_benchmark_" + name, file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+#### Tool - Config ####
+# Default config of the tool, the settings of the benchmark and the scenario as user configuration file.
+def tool_config(module, path, config=""):
+    with open(path + "/config.cfg", "w") as fh:
+        fh.write(module.DEFAULT_CONFIG)
+    with open(path + "/config.cfg.owr", "w") as fh:
+        fh.write(CONFIG_OVERRIDE + config)
+
+
+#### Tool - Data ####
+# Default data of the tool with additional entries ({section: {key: value}}).
+def tool_data(module, path, entries):
+    data = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+    data.read_string(module.DEFAULT_DATA)
+    for section in entries:
+        for (key, val) in entries[section].items():
+            data[section][key] = val
+    with open(path + "/data.cfg", "w") as fh:
+        data.write(fh)
+
+
+#### Tool - Setup ####
+# setup() of the tool does not return, it is ready when it reaches its main loop.
+def tool_setup(module, path, failed_every=0):
+    lines, start = inspect.getsourcelines(module.setup)
+    loop = start + max(i for i, line in enumerate(lines) if line.strip() == "time.sleep(1)")
+
+    thread = threading.Thread(target=module.setup, kwargs={"path": path, "loglevel": -2}, daemon=True)
+    thread.start()
+
+    timeout = time.time() + SETUP_TIMEOUT
+    while True:
+        if not thread.is_alive():
+            raise RuntimeError("Setup of the tool failed")
+        frame = sys._current_frames().get(thread.ident)
+        if frame != None and frame.f_code is module.setup.__code__ and frame.f_lineno == loop:
+            break
+        if time.time() > timeout:
+            raise RuntimeError("Setup of the tool timed out")
+        time.sleep(0.01)
+
+    router = module.LXMF_CONNECTION.message_router
+    router.failed_every = int(failed_every)
+    return router
+
+
+#### Tool - Members ####
+# Identities of the senders, known to Reticulum so the signatures of their messages are validated.
+def members(count):
+    sources = []
+    for i in range(count):
+        identity = RNS.Identity()
+        source = RNS.Destination(identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "lxmf", "delivery")
+        RNS.Identity.remember(packet_hash=None, destination_hash=source.hash, public_key=identity.get_public_key(), app_data=None)
+        sources.append(source)
+    return sources
+
+
+#### Tool - Message ####
+def message_pack(destination, source, content):
+    message = LXMF.LXMessage(destination, source, content, title="", desired_method=LXMF.LXMessage.DIRECT)
+    message.pack()
+    return message.packed
+
+
+#### Tool - Cleanup ####
+# The threads of the tool keep running (daemon), only its destination is removed from the transport.
+def tool_cleanup(connection):
+    if connection != None:
+        RNS.Transport.deregister_destination(connection.destination)
+
+
+##############################################################################################################
+# Scenarios
+
+
+def scenario(name, tool, config=""):
+    def register(function):
+        SCENARIOS[name] = (tool, config, function)
+        return function
+    return register
+
+
+@scenario("echo", "lxmf_echo")
+def scenario_echo(module, path, sources):
+    return lambda i: "Benchmark message #" + str(i)
+
+
+@scenario("chatbot", "lxmf_chatbot")
+def scenario_chatbot(module, path, sources):
+    os.makedirs(path + "/rivescript")
+    with open(path + "/rivescript/benchmark.rive", "w") as fh:
+        fh.write("+ *\n- Benchmark reply\n")
+    return lambda i: "Hello bot " + str(i)
+
+
+@scenario("cmd", "lxmf_cmd", "[allowed]\nany\n")
+def scenario_cmd(module, path, sources):
+    return lambda i: "echo benchmark " + str(i)
+
+
+@scenario("distribution_group", "lxmf_distribution_group")
+def scenario_distribution_group(module, path, sources):
+    tool_data(module, path, {"user": {RNS.hexrep(source.hash, False): "Member " + str(i) for i, source in enumerate(sources)}})
+    return lambda i: "Benchmark message #" + str(i)
+
+
+@scenario("distribution_group_minimal", "lxmf_distribution_group_minimal")
+def scenario_distribution_group_minimal(module, path, sources):
+    tool_data(module, path, {"receive_send": {RNS.hexrep(source.hash, False): "Member " + str(i) for i, source in enumerate(sources)}})
+    return lambda i: "Benchmark message #" + str(i)
+
+
+@scenario("bridge_mqtt", "lxmf_bridge_mqtt", "[main]\npower = True\n[router]\nlxmf_to_mqtt = True\n")
+def scenario_bridge_mqtt(module, path, sources):
+    module.mqtt = loopback_sink()
+    return lambda i: "Benchmark message #" + str(i)
+
+
+@scenario("bridge_matrix", "lxmf_bridge_matrix")
+def scenario_bridge_matrix(module, path, sources):
+    module.matrix_connection = loopback_sink
+    return lambda i: "Benchmark message #" + str(i)
+
+
+##############################################################################################################
+# Benchmark
+
+
+#### Benchmark - Percentile ####
+def percentile(values, p):
+    if len(values) == 0:
+        return 0
+    values = sorted(values)
+    return values[min(int(len(values) * p / 100), len(values) - 1)]
+
+
+#### Benchmark - Run ####
+# Every message is received through the router, the sent messages of the tool are answered
+# with delivery receipts before the next message (duration/rate include the whole processing).
+def run(name, size=1, count=1000, warmup=50, allocations=200, failed_every=0):
+    tool, config, function = SCENARIOS[name]
+
+    try:
+        module = tool_load(tool)
+    except ImportError as e:
+        return {"scenario": name, "size": size, "skipped": "missing dependency: " + str(e)}
+
+    loopback_install()
+
+    path = tempfile.mkdtemp(prefix="lxmf_benchmark_")
+    connection = None
+    try:
+        sources = members(size)
+        tool_config(module, path, config)
+        content = function(module, path, sources)
+        router = tool_setup(module, path, failed_every)
+        connection = module.LXMF_CONNECTION
+        fanout = getattr(module, "FANOUT", None)
+        destination = RNS.Destination(connection.identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "lxmf", "delivery")
+
+        offset = 0
+        def generate(count):
+            nonlocal offset
+            messages = [message_pack(destination, sources[i % len(sources)], content(i)) for i in range(offset, offset + count)]
+            offset += count
+            return messages
+
+        for message in generate(warmup):
+            router.deliver(message)
+            router.receipts(connection, fanout)
+
+        messages = generate(count)
+        sent = router.sent
+        latencies = []
+        gc.collect()
+        start = time.perf_counter()
+        for message in messages:
+            begin = time.perf_counter()
+            router.deliver(message)
+            latencies.append(time.perf_counter() - begin)
+            router.receipts(connection, fanout)
+        duration = time.perf_counter() - start
+        sent = router.sent - sent
+
+        alloc_peak = 0
+        alloc_retained = 0
+        if allocations > 0:
+            messages = generate(allocations)
+            gc.collect()
+            tracemalloc.start()
+            before, peak = tracemalloc.get_traced_memory()
+            for message in messages:
+                router.deliver(message)
+                router.receipts(connection, fanout)
+            after, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            alloc_peak = peak - before
+            alloc_retained = after - before
+
+        return {
+            "scenario": name,
+            "size": size,
+            "messages": count,
+            "sent": sent,
+            "duration": round(duration, 4),
+            "rate": round(count / duration, 1) if duration > 0 else 0,
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+            "alloc_peak_kb": round(alloc_peak / 1024, 1),
+            "alloc_retained_per_msg_b": round(alloc_retained / allocations, 1) if allocations > 0 else 0,
+        }
+    except Exception as e:
+        return {"scenario": name, "size": size, "skipped": "error: " + str(e)}
+    finally:
+        tool_cleanup(connection)
+        shutil.rmtree(path, ignore_errors=True)
+
+
+#### Benchmark - Config access ####
+# Config lookups of one local message in the distribution group: config_get() & co. against the config snapshot.
+def run_config_access(count=100000):
+    try:
+        module = tool_load("lxmf_distribution_group")
+    except ImportError as e:
+        return {"skipped": "missing dependency: " + str(e)}
+
+    if not hasattr(module, "CONFIG_SNAPSHOT"):
+        return {"skipped": "no config snapshot"}
+
+    loopback_install()
+
+    path = tempfile.mkdtemp(prefix="lxmf_benchmark_")
+    try:
+        tool_config(module, path)
+        tool_setup(module, path)
+
+        def config_parser():
+            config = module.CONFIG
+            lng_key = "-" + config["main"]["lng"]
+            config["lxmf"].getboolean("signature_validated")
+            module.config_getarray(config, "message", "deny_title")
+            module.config_getarray(config, "message", "deny_content")
+            config["message"].getboolean("title")
+            config["message"].getboolean("fields")
+            config["lxmf"].getboolean("signature_validated_known")
+            module.config_getint(config, "message", "receive_length_min", 0, lng_key)
+            module.config_getint(config, "message", "receive_length_max", 0, lng_key)
+            module.config_get(config, "message", "receive_title_prefix", "", lng_key)
+            module.config_get(config, "message", "receive_prefix", "", lng_key)
+            module.config_get(config, "message", "receive_suffix", "", lng_key)
+            module.config_get(config, "message", "receive_search")
+            module.config_get(config, "message", "receive_regex_search")
+            config["interface"]["delimiter_input"]
+            config["cluster"]["delimiter_input"]
+            module.config_getint(config, "message", "send_length_min", 0, lng_key)
+            module.config_getint(config, "message", "send_length_max", 0, lng_key)
+            module.config_get(config, "message", "send_title_prefix", "", lng_key)
+            module.config_get(config, "message", "send_prefix", "", lng_key)
+            module.config_get(config, "message", "send_suffix", "", lng_key)
+            config["main"].getboolean("fields_message")
+            config["lxmf"]["destination_type_conv"]
+            module.config_get(config, "message", "timestamp", "", lng_key)
+            config["statistic"].getboolean("enabled")
+            config["statistic"].getboolean("local")
+            config["statistic"].getboolean("user")
+
+        def config_snapshot():
+            config = module.CONFIG_SNAPSHOT
+            config_lng = config.lng("-" + config.main.lng)
+            config.lxmf.signature_validated
+            config.message.getarray("deny_title")
+            config.message.getarray("deny_content")
+            config.message.title
+            config.message.fields
+            config.lxmf.signature_validated_known
+            config_lng.message.receive_length_min
+            config_lng.message.receive_length_max
+            config_lng.message.receive_title_prefix
+            config_lng.message.receive_prefix
+            config_lng.message.receive_suffix
+            config.message.receive_search
+            config.message.receive_regex_search
+            config.interface.delimiter_input
+            config.cluster.delimiter_input
+            config_lng.message.send_length_min
+            config_lng.message.send_length_max
+            config_lng.message.send_title_prefix
+            config_lng.message.send_prefix
+            config_lng.message.send_suffix
+            config.main.fields_message
+            config.lxmf.destination_type_conv
+            config_lng.message.timestamp
+            config.statistic.enabled
+            config.statistic.local
+            config.statistic.user
+
+        result = {"messages": count, "lookups": 27}
+        for (name, function) in (("config_parser", config_parser), ("config_snapshot", config_snapshot)):
+            gc.collect()
+            start = time.perf_counter()
+            for i in range(count):
+                function()
+            result[name + "_us"] = round((time.perf_counter() - start) / count * 1000000, 3)
+        result["speedup"] = round(result["config_parser_us"] / result["config_snapshot_us"], 1) if result["config_snapshot_us"] > 0 else 0
+        return result
+    except Exception as e:
+        return {"skipped": "error: " + str(e)}
+    finally:
+        tool_cleanup(getattr(module, "LXMF_CONNECTION", None))
+        shutil.rmtree(path, ignore_errors=True)
+
+
+#### Benchmark - Print ####
+def print_results(results):
+    print("%-28s %6s %7s %9s %10s %9s %9s %10s %10s" % ("Scenario", "Size", "Msgs", "Sent", "Msgs/s", "p50 ms", "p99 ms", "Peak KB", "Ret. B/msg"))
+    for result in results:
+        if "skipped" in result:
+            print("%-28s %6s  skipped (%s)" % (result["scenario"], result["size"], result["skipped"]))
+            continue
+        print("%-28s %6d %7d %9d %10.1f %9.3f %9.3f %10.1f %10.1f" % (result["scenario"], result["size"], result["messages"], result["sent"], result["rate"], result["p50_ms"], result["p99_ms"], result["alloc_peak_kb"], result["alloc_retained_per_msg_b"]))
+
+
+#### Benchmark - Print ####
+def print_config_access(result):
+    if "skipped" in result:
+        print("Config access  skipped (" + result["skipped"] + ")")
+        return
+    print("Config access (" + str(result["lookups"]) + " lookups per message, " + str(result["messages"]) + " messages)")
+    print("  configparser: %9.3f us/msg" % result["config_parser_us"])
+    print("  snapshot:     %9.3f us/msg (%.1fx)" % (result["config_snapshot_us"], result["speedup"]))
+
+
+#### Benchmark - Compare ####
+def compare(results, file, threshold=10):
+    with open(file, "r") as fh:
+        baseline = {(result["scenario"], result["size"]): result for result in json.load(fh)}
+
+    regressions = 0
+    for result in results:
+        base = baseline.get((result["scenario"], result["size"]))
+        if base == None or "skipped" in result or "skipped" in base or base["rate"] <= 0:
+            continue
+        change = (result["rate"] - base["rate"]) / base["rate"] * 100
+        if change < -threshold:
+            regressions += 1
+            print("Regression: " + result["scenario"] + " (" + str(result["size"]) + ") " + str(round(change, 1)) + "% msgs/s (" + str(base["rate"]) + " -> " + str(result["rate"]) + ")")
+    return regressions
+
+
+##############################################################################################################
+# Setup/Start
+
+
+#### Setup #####
+def setup(scenarios=None, members_sizes=MEMBERS_DEFAULT, count=1000, warmup=50, allocations=200, failed_every=0, output=None, baseline=None, threshold=10, config_access=0):
+    if scenarios:
+        scenarios = [scenario.strip() for scenario in scenarios.split(",")]
+    else:
+        scenarios = list(SCENARIOS.keys())
+
+    sizes = [int(size) for size in members_sizes.split(",")]
+
+    print("...............................................................................")
+    print("        Name: " + NAME + " - " + DESCRIPTION)
+    print("Program File: " + __file__)
+    print("     Version: " + VERSION)
+    print("   Copyright: " + COPYRIGHT)
+    print("...............................................................................")
+
+    if config_access > 0:
+        print_config_access(run_config_access(config_access))
+        print("...............................................................................")
+
+    results = []
+    for name in scenarios:
+        if name not in SCENARIOS:
+            print("Unknown scenario: " + name)
+            continue
+        for size in (sizes if name.startswith("distribution_group") else [1]):
+            results.append(run(name, size, count, warmup, allocations, failed_every))
+            print_results(results[-1:])
+
+    print("...............................................................................")
+    print_results(results)
+
+    if output:
+        with open(output, "w") as fh:
+            json.dump(results, fh, indent=2)
+        print("Results written to " + output)
+
+    if baseline:
+        regressions = compare(results, baseline, threshold)
+        if regressions > 0:
+            print(str(regressions) + " regression(s) above " + str(threshold) + "%")
+            sys.exit(1)
+        print("No regressions above " + str(threshold) + "%")
+
+
+#### Start ####
+def main():
+    try:
+        description = NAME + " - " + DESCRIPTION
+        parser = argparse.ArgumentParser(description=description)
+
+        parser.add_argument("-s", "--scenarios", action="store", type=str, default=None, help=",-separated list of scenarios (" + ", ".join(SCENARIOS.keys()) + "), default all")
+        parser.add_argument("-m", "--members", action="store", type=str, default=MEMBERS_DEFAULT, help=",-separated list of group sizes for the distribution group scenarios")
+        parser.add_argument("-c", "--count", action="store", type=int, default=1000, help="Measured messages per scenario")
+        parser.add_argument("-w", "--warmup", action="store", type=int, default=50, help="Warmup messages per scenario")
+        parser.add_argument("-a", "--allocations", action="store", type=int, default=200, help="Messages measured with tracemalloc (0=Disabled)")
+        parser.add_argument("-f", "--failed", action="store", type=int, default=0, help="Simulate a failed delivery receipt for every x-th message (0=All delivered)")
+        parser.add_argument("-o", "--output", action="store", type=str, default=None, help="Write the results to this JSON file")
+        parser.add_argument("-b", "--baseline", action="store", type=str, default=None, help="Compare with the results of an earlier run (JSON file), exit code 1 on regressions")
+        parser.add_argument("-t", "--threshold", action="store", type=float, default=10, help="Allowed msgs/s drop against the baseline in percent")
+        parser.add_argument("-ca", "--config_access", action="store", type=int, default=0, help="Measure the config lookups of x messages (configparser against the config snapshot, 0=Disabled)")
+
+        params = parser.parse_args()
+
+        setup(scenarios=params.scenarios, members_sizes=params.members, count=params.count, warmup=params.warmup, allocations=params.allocations, failed_every=params.failed, output=params.output, baseline=params.baseline, threshold=params.threshold, config_access=params.config_access)
+
+    except KeyboardInterrupt:
+        print("Terminated by CTRL-C")
+        exit()
+
+
+##############################################################################################################
+# Init
+
+
+if __name__ == "__main__":
+    main()
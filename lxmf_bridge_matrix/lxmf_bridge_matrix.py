@@ -37,13 +37,16 @@ import os
 import time
 import datetime
 import argparse
+import tempfile
+import shutil
+from collections import deque, OrderedDict
+import heapq
 
 #### Config ####
 import configparser
 
 #### JSON ####
 import json
-import pickle
 
 #### String ####
 import string
@@ -54,6 +57,18 @@ import re
 #### Process ####
 import signal
 import threading
+import atexit
+
+#### Other ####
+import random
+import hashlib
+import mmap
+import weakref
+import http.server
+import cProfile
+import pstats
+import tracemalloc
+import traceback
 
 #### Reticulum, LXMF ####
 # Install: pip3 install rns lxmf
@@ -106,8 +121,19 @@ class lxmf_connection:
     message_notification_failed_callback = None
     config_set_callback = None
 
+    PATH_REQUEST_QUEUE_SIZE = 10000
+    PATH_REQUEST_TIMEOUT = 300
+    PATH_REQUEST_WAIT = 10
+    SYNC_TIMEOUT = 300
 
-    def __init__(self, storage_path=None, identity_file="identity", identity=None, destination_name="lxmf", destination_type="delivery", display_name="", announce_data=None, announce_hidden=False, send_delay=0, desired_method="direct", propagation_node=None, propagation_node_auto=False, propagation_node_active=None, try_propagation_on_fail=False, announce_startup=False, announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, sync_startup=False, sync_startup_delay=0, sync_limit=8, sync_periodic=False, sync_periodic_interval=360):
+    # Set by a host process (lxmf_host) which runs several tools in one process.
+    SCHEDULER = None
+    SCHEDULER_PREFIX = ""
+    RECEIVE_WORKERS_MIN = 0
+    MAIN_THREAD_CALL = None
+
+
+    def __init__(self, storage_path=None, identity_file="identity", identity=None, destination_name="lxmf", destination_type="delivery", display_name="", announce_data=None, announce_hidden=False, send_delay=0, send_rate=0, send_burst=1, send_queue_size=0, destination_cache_size=1000, destination_cache_unknown_ttl=30, reachability_size=1000, reachability_fails=2, reachability_retry=60, path_request_rate=2, path_request_interval=30, duplicate_cache_size=10000, duplicate_cache_ttl=1440, receive_workers=0, receive_concurrent=False, receive_queue_size=1000, receive_overflow="drop_oldest", receive_overflow_reply="", spool_threshold=262144, spool_path=None, delivery_size=10000, metrics_port=0, metrics_host="127.0.0.1", profile_signals=False, profile_duration=30, desired_method="direct", propagation_node=None, propagation_node_auto=False, propagation_node_active=None, try_propagation_on_fail=False, announce_startup=False, announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, announce_periodic_jitter=0, sync_startup=False, sync_startup_delay=0, sync_limit=8, sync_periodic=False, sync_periodic_interval=360, sync_periodic_jitter=0, sync_adaptive=False, sync_adaptive_backoff=8, scheduler=None):
         self.storage_path = storage_path
 
         self.identity_file = identity_file
@@ -123,6 +149,68 @@ class lxmf_connection:
         self.announce_hidden = announce_hidden
 
         self.send_delay = int(send_delay)
+        self.send_rate = float(send_rate)
+        if self.send_rate <= 0 and self.send_delay > 0:
+            self.send_rate = 1/self.send_delay
+        self.send_burst = max(int(send_burst), 1)
+        self.send_queue_size = int(send_queue_size)
+
+        self.destination_cache_size = int(destination_cache_size)
+        self.destination_cache_unknown_ttl = int(destination_cache_unknown_ttl)
+        self.destination_cache = OrderedDict()
+        self.destination_cache_unknown = {}
+        self.destination_cache_lock = threading.Lock()
+
+        self.reachability_size = int(reachability_size)
+        self.reachability_fails = int(reachability_fails)
+        self.reachability_retry = int(reachability_retry)
+        self.reachability = OrderedDict()
+        self.reachability_lock = threading.Lock()
+        self.reachability_unsaved = False
+        self.reachability_propagated = 0
+
+        self.path_request_rate = int(path_request_rate)
+        self.path_request_interval = int(path_request_interval)
+        self.path_request_queue = deque()
+        self.path_request_queued = set()
+        self.path_request_last = OrderedDict()
+        self.path_request_lock = threading.Lock()
+        self.path_requested = 0
+        self.path_warm = 0
+        self.path_cold = 0
+        self.path_deferred = OrderedDict()
+        self.path_deferred_count = 0
+
+        self.duplicate_cache_size = int(duplicate_cache_size)
+        self.duplicate_cache_ttl = int(duplicate_cache_ttl)
+        self.duplicate_cache = OrderedDict()
+        self.duplicate_cache_lock = threading.Lock()
+        self.duplicate_cache_unsaved = False
+        self.duplicate_hits = 0
+
+        self.receive_workers = max(int(receive_workers), self.RECEIVE_WORKERS_MIN)
+        self.receive_lock = None if receive_concurrent else threading.Lock()
+        self.receive_queue_size = int(receive_queue_size)
+        self.receive_overflow = receive_overflow
+        self.receive_overflow_reply = receive_overflow_reply
+        self.receive_dispatcher = None
+
+        self.spool_threshold = int(spool_threshold)
+        self.spool_path = spool_path
+        self.spooled = 0
+        self.spooled_bytes = 0
+
+        self.delivery_size = int(delivery_size)
+        self.deliveries = OrderedDict()
+        self.deliveries_lock = threading.Lock()
+        self.deliveries_expired = 0
+
+        self.metrics_port = int(metrics_port)
+        self.metrics_host = metrics_host
+        self.metrics = lxmf_metrics()
+
+        self.profile_signals = profile_signals
+        self.profile_duration = int(profile_duration)
 
         if desired_method == "propagated" or desired_method == "PROPAGATED":
             self.desired_method_direct = False
@@ -138,17 +226,47 @@ class lxmf_connection:
 
         self.announce_periodic = announce_periodic
         self.announce_periodic_interval = int(announce_periodic_interval)
+        self.announce_periodic_jitter = int(announce_periodic_jitter)
+        self.announce_job = None
 
         self.sync_startup = sync_startup
         self.sync_startup_delay = int(sync_startup_delay)
         self.sync_limit = int(sync_limit)
         self.sync_periodic = sync_periodic
         self.sync_periodic_interval = int(sync_periodic_interval)
+        self.sync_periodic_jitter = int(sync_periodic_jitter)
+        self.sync_adaptive = sync_adaptive
+        self.sync_adaptive_backoff = max(int(sync_adaptive_backoff), 1)
+        self.sync_job = None
+        self.sync_job_monitor = None
+        self.sync_backoff = 1
+        self.sync_drain_time = None
+        self.sync_count = 0
+        self.sync_failed = 0
+        self.sync_messages_last = 0
+        self.sync_messages_sum = 0
+        self.sync_duration_last = 0
+        self.sync_drain_last = 0
+
+        if scheduler is None:
+            if self.SCHEDULER is None:
+                scheduler = lxmf_scheduler()
+            elif self.SCHEDULER_PREFIX:
+                scheduler = lxmf_scheduler_prefix(self.SCHEDULER, self.SCHEDULER_PREFIX)
+            else:
+                scheduler = self.SCHEDULER
+        self.scheduler = scheduler
 
         if not self.storage_path:
             log("LXMF - No storage_path parameter", LOG_ERROR)
             return
 
+        self.profiler = lxmf_profiler(self.storage_path)
+        if self.scheduler.profiler is None:
+            self.scheduler.profiler = self.profiler
+        if self.profile_signals:
+            self.profiler.signals(self.profile_duration)
+
         if not os.path.isdir(self.storage_path):
             os.makedirs(self.storage_path)
             log("LXMF - Storage path was created", LOG_NOTICE)
@@ -180,7 +298,58 @@ class lxmf_connection:
                     log("LXMF - Could not create and save a new Primary Identity", LOG_ERROR)
                     log("LXMF - The contained exception was: %s" % (str(e)), LOG_ERROR)
 
-        self.message_router = LXMF.LXMRouter(identity=self.identity, storagepath=self.storage_path)
+        # The LXMF router installs signal handlers, which is only possible in the main thread.
+        if self.MAIN_THREAD_CALL is not None and threading.current_thread() is not threading.main_thread():
+            self.message_router = self.MAIN_THREAD_CALL(LXMF.LXMRouter, identity=self.identity, storagepath=self.storage_path)
+        else:
+            self.message_router = LXMF.LXMRouter(identity=self.identity, storagepath=self.storage_path)
+
+        # RNS and the LXMF router have installed their signal handlers, which end the program without atexit.
+        exit_signals()
+
+        self.send_queue = deque()
+        self.send_queue_condition = threading.Condition()
+        self.send_queue_enqueued = 0
+        self.send_queue_sent = 0
+        self.send_queue_failed = 0
+        self.send_queue_dropped = 0
+        self.send_queue_latency_last = 0
+        self.send_queue_latency_max = 0
+        self.send_queue_latency_sum = 0
+        self.send_tokens = self.send_burst
+        self.send_tokens_time = time.time()
+        self.send_queue_thread = threading.Thread(target=self.send_queue_process, daemon=True)
+        self.send_queue_thread.start()
+
+        self.reachability_callback = lxmf_connection_reachability(self, self.aspect_filter)
+        RNS.Transport.register_announce_handler(self.reachability_callback)
+
+        if self.reachability_size > 0:
+            self.reachability_path = self.storage_path + "/reachability.data"
+            self.reachability_load()
+            self.scheduler.add("LXMF - Reachability save", self.reachability_save, interval=300)
+            exit_register(self.reachability_save)
+
+        if self.spool_threshold > 0:
+            if not self.spool_path:
+                self.spool_path = tempfile.mkdtemp(prefix="lxmf_spool_")
+                exit_register(shutil.rmtree, self.spool_path, True)
+            elif not os.path.isdir(self.spool_path):
+                os.makedirs(self.spool_path)
+
+        if self.receive_workers > 0:
+            self.receive_dispatcher = lxmf_connection_dispatcher(self, self.receive_workers, self.receive_queue_size, self.receive_overflow)
+
+        if self.duplicate_cache_size > 0:
+            self.duplicate_cache_path = self.storage_path + "/duplicate.data"
+            self.duplicate_cache_load()
+            self.scheduler.add("LXMF - Duplicate save", self.duplicate_cache_save, interval=60)
+            exit_register(self.duplicate_cache_save)
+
+        if self.path_request_rate > 0:
+            self.scheduler.add("LXMF - Path request", self.path_request_process, interval=1)
+            if self.path_request_interval > 0:
+                self.scheduler.add("LXMF - Path warm", self.path_warm_all, interval=self.path_request_interval*60, jitter=60)
 
         if self.destination_name == "lxmf" and self.destination_type == "delivery":
             self.destination = self.message_router.register_delivery_identity(self.identity, display_name=self.display_name)
@@ -219,6 +388,21 @@ class lxmf_connection:
         if self.sync_startup or self.sync_periodic:
             self.sync(True)
 
+        self.metrics.gauge("send_queue", self.send_queue_stat)
+        self.metrics.gauge("path", self.path_stat)
+        self.metrics.gauge("reachability", self.reachability_stat)
+        self.metrics.gauge("duplicate", self.duplicate_stat)
+        self.metrics.gauge("receive_queue", self.receive_stat)
+        self.metrics.gauge("sync", self.sync_stat)
+        self.metrics.gauge("spool", self.spool_stat)
+        self.metrics.gauge("delivery", self.delivery_stat)
+        self.metrics.gauge("scheduler", self.scheduler.stat, "job")
+        if self.propagation_node_auto:
+            self.metrics.gauge("propagation", self.propagation_callback.stat)
+
+        if self.metrics_port > 0:
+            self.metrics.start(self.metrics_host, self.metrics_port)
+
 
     def register_announce_callback(self, handler_function):
         self.announce_callback = handler_function(self.aspect_filter)
@@ -308,29 +492,273 @@ class lxmf_connection:
         if destination_type == None:
             destination_type = self.destination_type
 
-        destination_identity = RNS.Identity.recall(destination)
-        destination = RNS.Destination(destination_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, destination_name, destination_type)
+        destination = self.destination_get(destination, destination_name, destination_type)
+        if destination == None:
+            return None
+
         return self.send_message(destination, self.destination, content, title, fields, timestamp, app_data)
 
 
-    def send_message(self, destination, source, content="", title="", fields=None, timestamp=None, app_data=""):
-        if self.desired_method_direct:
-            desired_method = LXMF.LXMessage.DIRECT
+    def send_many(self, destinations, content="", title="", fields=None, timestamp=None, app_data="", destination_name=None, destination_type=None):
+        batch = lxmf_connection_batch(app_data)
+
+        if fields is not None and not isinstance(fields, dict):
+            log("LXMF - Fields are invalid", LOG_ERROR)
+            return batch
+
+        if fields is not None:
+            fields = lxmf_attachment.unspool(fields)
+
+        if destination_name == None:
+            destination_name = self.destination_name
+        if destination_type == None:
+            destination_type = self.destination_type
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if isinstance(title, str):
+            title = title.encode("utf-8")
+
+        if self.message_router.get_outbound_propagation_node() != None:
+            try_propagation_on_fail = self.try_propagation_on_fail
+        else:
+            try_propagation_on_fail = None
+
+        messages = []
+        for destination in destinations:
+            batch.total += 1
+
+            destination_hash = self.destination_bytes(destination)
+            if destination_hash == None:
+                batch.invalid += 1
+                continue
+
+            destination = self.destination_get(destination_hash, destination_name, destination_type)
+            if destination == None:
+                batch.invalid += 1
+                continue
+
+            desired_method = self.reachability_method(destination_hash)
+
+            message = LXMF.LXMessage(destination, self.destination, content, title=title, desired_method=desired_method)
+
+            if fields is not None:
+                message.fields = fields
+
+            if timestamp is not None:
+                message.timestamp = timestamp
+
+            message.app_data = app_data
+            message.batch = batch
+
+            self.message_method(message)
+
+            message.register_delivery_callback(self.message_notification)
+            message.register_failed_callback(self.message_notification)
+
+            if try_propagation_on_fail != None:
+                message.try_propagation_on_fail = try_propagation_on_fail
+
+            try:
+                message.pack()
+            except Exception as e:
+                batch.invalid += 1
+                log("LXMF - Could not pack message " + str(message), LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+                continue
+
+            messages.append(message)
+
+        if self.path_request_rate > 0:
+            self.path_request_many([message.destination_hash for message in messages if message.desired_method == LXMF.LXMessage.DIRECT])
+
+        if len(messages) > 0:
+            self.log_message(messages[0], "LXMF - Message send (" + str(len(messages)) + " recipients)")
+            send_time = time.time()
+            for message in messages:
+                message.send_time = send_time
+            batch.queued = self.send_queue_put_many(messages)
+            batch.dropped = len(messages) - batch.queued
+
+        log("LXMF - Batch " + str(batch), LOG_DEBUG)
+
+        return batch
+
+
+    def destination_bytes(self, destination):
+        if type(destination) is bytes:
+            return destination
+
+        if len(destination) == ((RNS.Reticulum.TRUNCATED_HASHLENGTH//8)*2)+2:
+            destination = destination[1:-1]
+
+        if len(destination) != ((RNS.Reticulum.TRUNCATED_HASHLENGTH//8)*2):
+            return None
+
+        try:
+            return bytes.fromhex(destination)
+        except Exception as e:
+            return None
+
+
+    def destination_get(self, destination_hash, destination_name, destination_type):
+        key = (destination_hash, destination_name + "." + destination_type)
+
+        with self.destination_cache_lock:
+            if key in self.destination_cache:
+                self.destination_cache.move_to_end(key)
+                return self.destination_cache[key]
+
+            if destination_hash in self.destination_cache_unknown:
+                if self.destination_cache_unknown[destination_hash] > time.time():
+                    return None
+                del self.destination_cache_unknown[destination_hash]
+
+        destination_identity = RNS.Identity.recall(destination_hash)
+        if destination_identity == None:
+            log("LXMF - Destination identity " + RNS.prettyhexrep(destination_hash) + " not known", LOG_DEBUG)
+            if self.destination_cache_size > 0 and self.destination_cache_unknown_ttl > 0:
+                with self.destination_cache_lock:
+                    if len(self.destination_cache_unknown) >= self.destination_cache_size:
+                        now = time.time()
+                        for key_unknown in [key_unknown for key_unknown, expire in self.destination_cache_unknown.items() if expire <= now]:
+                            del self.destination_cache_unknown[key_unknown]
+                        if len(self.destination_cache_unknown) >= self.destination_cache_size:
+                            del self.destination_cache_unknown[next(iter(self.destination_cache_unknown))]
+                    self.destination_cache_unknown[destination_hash] = time.time() + self.destination_cache_unknown_ttl
+            return None
+
+        destination = RNS.Destination(destination_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, destination_name, destination_type)
+
+        if self.destination_cache_size > 0:
+            with self.destination_cache_lock:
+                self.destination_cache[key] = destination
+                if len(self.destination_cache) > self.destination_cache_size:
+                    self.destination_cache.popitem(last=False)
+
+        return destination
+
+
+    def destination_cache_invalidate(self, destination_hash=None):
+        with self.destination_cache_lock:
+            if destination_hash == None:
+                self.destination_cache.clear()
+                self.destination_cache_unknown.clear()
+                return
+
+            for key in [key for key in self.destination_cache if key[0] == destination_hash]:
+                del self.destination_cache[key]
+            self.destination_cache_unknown.pop(destination_hash, None)
+
+
+    def reachability_method(self, destination_hash):
+        if not self.desired_method_direct:
+            return LXMF.LXMessage.PROPAGATED
+
+        if self.reachability_size > 0 and self.try_propagation_on_fail and self.message_router.get_outbound_propagation_node() != None:
+            with self.reachability_lock:
+                entry = self.reachability.get(destination_hash)
+                if entry != None and entry[2] >= self.reachability_fails and time.time() - entry[1] < self.reachability_retry*60:
+                    self.reachability_propagated += 1
+                    return LXMF.LXMessage.PROPAGATED
+
+        return LXMF.LXMessage.DIRECT
+
+
+    def reachability_entry(self, destination_hash):
+        entry = self.reachability.get(destination_hash)
+        if entry == None:
+            entry = [0, 0, 0, None, False]
+            self.reachability[destination_hash] = entry
+            if len(self.reachability) > self.reachability_size:
+                self.reachability.popitem(last=False)
         else:
-            desired_method = LXMF.LXMessage.PROPAGATED
+            self.reachability.move_to_end(destination_hash)
+        return entry
+
+
+    def reachability_update(self, destination_hash, success):
+        path = RNS.Transport.has_path(destination_hash)
+        with self.reachability_lock:
+            entry = self.reachability_entry(destination_hash)
+            if success:
+                entry[0] = time.time()
+                entry[2] = 0
+            else:
+                entry[1] = time.time()
+                entry[2] += 1
+            entry[3] = RNS.Transport.hops_to(destination_hash) if path else None
+            entry[4] = path
+            self.reachability_unsaved = True
+
+
+    def reachability_announce(self, destination_hash):
+        with self.reachability_lock:
+            entry = self.reachability.get(destination_hash)
+            if entry == None:
+                return
+            entry[2] = 0
+            entry[3] = RNS.Transport.hops_to(destination_hash)
+            entry[4] = True
+            self.reachability_unsaved = True
+
+
+    def reachability_load(self):
+        if not os.path.isfile(self.reachability_path):
+            return
+        try:
+            with open(self.reachability_path, "rb") as fh:
+                data = umsgpack.unpackb(fh.read())
+            with self.reachability_lock:
+                for destination_hash, entry in data.items():
+                    self.reachability[destination_hash] = list(entry)
+                while len(self.reachability) > self.reachability_size:
+                    self.reachability.popitem(last=False)
+            log("LXMF - Reachability loaded (" + str(len(self.reachability)) + " destinations)", LOG_DEBUG)
+        except Exception as e:
+            log("LXMF - Could not load the reachability from " + self.reachability_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def reachability_save(self):
+        if not self.reachability_unsaved:
+            return
+        try:
+            with self.reachability_lock:
+                data = umsgpack.packb(dict(self.reachability))
+                self.reachability_unsaved = False
+            with open(self.reachability_path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(self.reachability_path + ".tmp", self.reachability_path)
+        except Exception as e:
+            log("LXMF - Could not save the reachability to " + self.reachability_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def reachability_stat(self):
+        with self.reachability_lock:
+            return {
+                "destinations": len(self.reachability),
+                "unreachable": sum(1 for entry in self.reachability.values() if entry[2] >= self.reachability_fails),
+                "propagated": self.reachability_propagated,
+            }
+
+
+    def send_message(self, destination, source, content="", title="", fields=None, timestamp=None, app_data=""):
+        desired_method = self.reachability_method(destination.hash)
 
         message = LXMF.LXMessage(destination, source, content, title=title, desired_method=desired_method)
 
         if fields is not None:
-            message.fields = fields
+            message.fields = lxmf_attachment.unspool(fields)
 
         if timestamp is not None:
             message.timestamp = timestamp
 
         message.app_data = app_data
+        message.send_time = time.time()
 
         self.message_method(message)
-        self.log_message(message, "LXMF - Message send")
 
         message.register_delivery_callback(self.message_notification)
         message.register_failed_callback(self.message_notification)
@@ -339,18 +767,280 @@ class lxmf_connection:
             message.try_propagation_on_fail = self.try_propagation_on_fail
 
         try:
-            self.message_router.handle_outbound(message)
-            time.sleep(self.send_delay)
-            return message.hash
+            message.pack()
         except Exception as e:
-            log("LXMF - Could not send message " + str(message), LOG_ERROR)
+            log("LXMF - Could not pack message " + str(message), LOG_ERROR)
             log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
             return None
 
+        self.log_message(message, "LXMF - Message send")
+
+        delivery = self.delivery_register(message)
+
+        if not self.send_queue_put(message):
+            self.delivery_complete(message, lxmf_delivery.FAILED)
+            return None
+
+        return delivery
+
+
+    def send_queue_put(self, message):
+        with self.send_queue_condition:
+            if self.send_queue_size > 0 and len(self.send_queue) >= self.send_queue_size:
+                self.send_queue_dropped += 1
+                log("LXMF - Send queue full (" + str(len(self.send_queue)) + "), message " + str(message) + " dropped", LOG_WARNING)
+                return False
+            self.send_queue.append((message, time.time()))
+            self.send_queue_enqueued += 1
+            self.send_queue_condition.notify()
+        return True
+
+
+    def send_queue_put_many(self, messages):
+        with self.send_queue_condition:
+            count = len(messages)
+            if self.send_queue_size > 0:
+                count = max(min(count, self.send_queue_size - len(self.send_queue)), 0)
+                if count < len(messages):
+                    self.send_queue_dropped += len(messages) - count
+                    log("LXMF - Send queue full (" + str(len(self.send_queue)) + "), " + str(len(messages) - count) + " messages dropped", LOG_WARNING)
+            now = time.time()
+            self.send_queue.extend([(message, now) for message in messages[:count]])
+            self.send_queue_enqueued += count
+            self.send_queue_condition.notify()
+        return count
+
+
+    def send_queue_process(self):
+        while True:
+            with self.send_queue_condition:
+                while len(self.send_queue) == 0:
+                    self.send_queue_condition.wait()
+                message, enqueued = self.send_queue.popleft()
+
+            if self.path_defer(message, enqueued):
+                continue
+
+            self.send_queue_pace()
+
+            latency = time.time() - enqueued
+            self.send_queue_latency_last = latency
+            self.send_queue_latency_sum += latency
+            if latency > self.send_queue_latency_max:
+                self.send_queue_latency_max = latency
+
+            if message.desired_method == LXMF.LXMessage.DIRECT:
+                if RNS.Transport.has_path(message.destination_hash):
+                    self.path_warm += 1
+                else:
+                    self.path_cold += 1
+
+            try:
+                self.profiler.call(self.message_router.handle_outbound, message)
+                self.send_queue_sent += 1
+                self.metrics.inc("messages_sent", method=message.desired_method_str)
+            except Exception as e:
+                self.send_queue_failed += 1
+                self.metrics.inc("messages_failed", method=message.desired_method_str)
+                self.delivery_complete(message, lxmf_delivery.FAILED)
+                log("LXMF - Could not send message " + str(message), LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def delivery_register(self, message):
+        delivery = lxmf_delivery(message)
+        if self.delivery_size <= 0:
+            return delivery
+        expired = None
+        with self.deliveries_lock:
+            self.deliveries[message.hash] = delivery
+            if len(self.deliveries) > self.delivery_size:
+                expired = self.deliveries.popitem(last=False)[1]
+                self.deliveries_expired += 1
+        if expired != None:
+            expired.complete(lxmf_delivery.EXPIRED)
+        return delivery
+
+
+    def delivery_complete(self, message, state):
+        with self.deliveries_lock:
+            delivery = self.deliveries.pop(message.hash, None)
+        if delivery != None:
+            delivery.complete(state)
+
+
+    def delivery_get(self, message_hash):
+        with self.deliveries_lock:
+            return self.deliveries.get(message_hash)
+
+
+    def delivery_stat(self):
+        with self.deliveries_lock:
+            return {
+                "pending": len(self.deliveries),
+                "expired": self.deliveries_expired,
+            }
+
+
+    def send_queue_pace(self):
+        if self.send_rate <= 0:
+            return
+
+        now = time.time()
+        self.send_tokens = min(self.send_burst, self.send_tokens + (now - self.send_tokens_time) * self.send_rate)
+        self.send_tokens_time = now
+
+        if self.send_tokens < 1:
+            time.sleep((1 - self.send_tokens) / self.send_rate)
+            self.send_tokens = 1
+            self.send_tokens_time = time.time()
+
+        self.send_tokens -= 1
+
+
+    def send_queue_stat(self):
+        with self.send_queue_condition:
+            depth = len(self.send_queue)
+        handoff = self.send_queue_sent + self.send_queue_failed
+        return {
+            "depth": depth,
+            "enqueued": self.send_queue_enqueued,
+            "sent": self.send_queue_sent,
+            "failed": self.send_queue_failed,
+            "dropped": self.send_queue_dropped,
+            "latency_last": round(self.send_queue_latency_last, 3),
+            "latency_max": round(self.send_queue_latency_max, 3),
+            "latency_avg": round(self.send_queue_latency_sum/handoff, 3) if handoff > 0 else 0,
+        }
+
+
+    def path_request_many(self, destination_hashes):
+        count = 0
+        now = time.time()
+        with self.path_request_lock:
+            for destination_hash in destination_hashes:
+                if destination_hash in self.path_request_queued:
+                    continue
+                if len(self.path_request_queue) >= self.PATH_REQUEST_QUEUE_SIZE:
+                    break
+                if now - self.path_request_last.get(destination_hash, 0) < self.PATH_REQUEST_TIMEOUT:
+                    continue
+                if RNS.Transport.has_path(destination_hash):
+                    continue
+                self.path_request_queue.append(destination_hash)
+                self.path_request_queued.add(destination_hash)
+                count += 1
+        return count
+
+
+    def path_request_process(self):
+        with self.path_request_lock:
+            destination_hashes = []
+            while len(self.path_request_queue) > 0 and len(destination_hashes) < self.path_request_rate:
+                destination_hash = self.path_request_queue.popleft()
+                self.path_request_queued.discard(destination_hash)
+                self.path_request_last[destination_hash] = time.time()
+                self.path_request_last.move_to_end(destination_hash)
+                destination_hashes.append(destination_hash)
+            while len(self.path_request_last) > self.PATH_REQUEST_QUEUE_SIZE:
+                self.path_request_last.popitem(last=False)
+
+        for destination_hash in destination_hashes:
+            if RNS.Transport.has_path(destination_hash):
+                continue
+            try:
+                RNS.Transport.request_path(destination_hash)
+                self.path_requested += 1
+            except Exception as e:
+                log("LXMF - Could not request path to " + RNS.prettyhexrep(destination_hash) + ": " + str(e), LOG_ERROR)
+
+        self.path_deferred_release()
+
+
+    # Direct messages to a destination with a pending path request (path_request_many) wait for the path in the send queue.
+    # Otherwise the LXMF router would request the path itself, bypassing the rate of the path requests.
+    # Later messages to the same destination wait too, so the order is kept.
+    def path_defer(self, message, enqueued):
+        if message.desired_method != LXMF.LXMessage.DIRECT or hasattr(message, "path_deferred"):
+            return False
+
+        destination_hash = message.destination_hash
+        with self.path_request_lock:
+            if destination_hash in self.path_deferred:
+                self.path_deferred[destination_hash][1].append((message, enqueued))
+                self.path_deferred_count += 1
+                return True
+            if destination_hash not in self.path_request_queued and time.time() - self.path_request_last.get(destination_hash, 0) >= self.PATH_REQUEST_WAIT:
+                return False
+            if RNS.Transport.has_path(destination_hash):
+                return False
+            self.path_deferred[destination_hash] = (time.time(), [(message, enqueued)])
+            self.path_deferred_count += 1
+            return True
+
+
+    # The messages are sent when the path is known, PATH_REQUEST_WAIT seconds after the path request
+    # or at the latest after PATH_REQUEST_TIMEOUT seconds.
+    def path_deferred_release(self):
+        released = []
+        now = time.time()
+        with self.path_request_lock:
+            for destination_hash, (deferred, messages) in list(self.path_deferred.items()):
+                if destination_hash in self.path_request_queued and now - deferred < self.PATH_REQUEST_TIMEOUT:
+                    continue
+                if now - self.path_request_last.get(destination_hash, 0) < self.PATH_REQUEST_WAIT and not RNS.Transport.has_path(destination_hash):
+                    continue
+                del self.path_deferred[destination_hash]
+                self.path_deferred_count -= len(messages)
+                released.extend(messages)
+
+        for message, enqueued in released:
+            message.path_deferred = True
+
+        if len(released) > 0:
+            with self.send_queue_condition:
+                self.send_queue.extendleft(reversed(released))
+                self.send_queue_condition.notify()
+
+
+    def path_warm_all(self):
+        with self.destination_cache_lock:
+            destination_hashes = [key[0] for key in self.destination_cache]
+        with self.reachability_lock:
+            destination_hashes.extend(self.reachability.keys())
+        count = self.path_request_many(dict.fromkeys(destination_hashes))
+        if count > 0:
+            log("LXMF - Path requests queued for " + str(count) + " destinations", LOG_DEBUG)
+
+
+    def path_stat(self):
+        with self.path_request_lock:
+            depth = len(self.path_request_queue)
+            deferred = self.path_deferred_count
+        return {
+            "depth": depth,
+            "deferred": deferred,
+            "requested": self.path_requested,
+            "warm": self.path_warm,
+            "cold": self.path_cold,
+        }
+
 
     def message_notification(self, message):
         self.message_method(message)
 
+        if self.propagation_node_auto and message.desired_method == LXMF.LXMessage.PROPAGATED:
+            if message.state == LXMF.LXMessage.SENT:
+                self.propagation_callback.result(self.propagation_node_hash(), True)
+            elif message.state == LXMF.LXMessage.FAILED:
+                self.propagation_callback.result(self.propagation_node_hash(), False)
+
+        if self.reachability_size > 0 and message.desired_method == LXMF.LXMessage.DIRECT:
+            if message.state == LXMF.LXMessage.DELIVERED:
+                self.reachability_update(message.destination_hash, True)
+            elif message.state == LXMF.LXMessage.FAILED:
+                self.reachability_update(message.destination_hash, False)
+
         if self.message_notification_callback is not None:
             self.message_notification_callback(message)
 
@@ -364,10 +1054,22 @@ class lxmf_connection:
             self.message_router.handle_outbound(message)
         elif message.state == LXMF.LXMessage.FAILED:
             self.log_message(message, "LXMF - Delivery receipt (failed)")
+            self.metrics.inc("messages_failed", method=message.desired_method_str)
+            if hasattr(message, "batch"):
+                message.batch.update(message)
+            else:
+                self.delivery_complete(message, lxmf_delivery.FAILED)
             if self.message_notification_failed_callback is not None:
                 self.message_notification_failed_callback(message)
         else:
             self.log_message(message, "LXMF - Delivery receipt (success)")
+            self.metrics.inc("messages_delivered", method=message.desired_method_str)
+            if hasattr(message, "send_time"):
+                self.metrics.observe("delivery_latency_seconds", time.time() - message.send_time, method=message.desired_method_str)
+            if hasattr(message, "batch"):
+                message.batch.update(message)
+            else:
+                self.delivery_complete(message, lxmf_delivery.DELIVERED)
             if self.message_notification_success_callback is not None:
                 self.message_notification_success_callback(message)
 
@@ -379,251 +1081,1509 @@ class lxmf_connection:
             message.desired_method_str = "propagated"
 
 
-    def announce(self, app_data=None, attached_interface=None, initial=False):
-        announce_timer = None
+    def announce(self, app_data=None, attached_interface=None, initial=False):
+        if initial:
+            delay = None
+            if self.announce_startup:
+                if self.announce_startup_delay > 0:
+                    delay = self.announce_startup_delay
+                else:
+                    self.announce_now(app_data=app_data, attached_interface=attached_interface)
+            if self.announce_periodic and self.announce_periodic_interval > 0:
+                self.announce_job = self.scheduler.add("LXMF - Announce", self.announce_now, interval=self.announce_periodic_interval*60, delay=delay, jitter=self.announce_periodic_jitter)
+            elif delay is not None:
+                self.announce_job = self.scheduler.add("LXMF - Announce", self.announce_now, delay=delay)
+            return
+
+        if app_data is None and attached_interface is None and self.announce_job is not None and self.announce_job.run_now():
+            return
+
+        self.announce_now(app_data=app_data, attached_interface=attached_interface)
+
+
+    def announce_now(self, app_data=None, attached_interface=None):
+        self.metrics.inc("announces_sent")
+        if self.announce_hidden:
+            self.destination.announce("".encode("utf-8"), attached_interface=attached_interface)
+            log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +" (Hidden)", LOG_DEBUG)
+        elif app_data != None:
+            if isinstance(app_data, str):
+                self.destination.announce(app_data.encode("utf-8"), attached_interface=attached_interface)
+                log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +":" + app_data, LOG_DEBUG)
+            else:
+                self.destination.announce(app_data, attached_interface=attached_interface)
+                log("LMF - Announced: " + RNS.prettyhexrep(self.destination_hash()), LOG_DEBUG)
+        elif self.announce_data:
+            if isinstance(self.announce_data, str):
+                self.destination.announce(self.announce_data.encode("utf-8"), attached_interface=attached_interface)
+                log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +":" + self.announce_data, LOG_DEBUG)
+            else:
+                self.destination.announce(self.announce_data, attached_interface=attached_interface)
+                log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()), LOG_DEBUG)
+        else:
+            self.destination.announce()
+            log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) + ": " + self.display_name, LOG_DEBUG)
+
+
+    def sync(self, initial=False):
+        if initial:
+            delay = None
+            if self.sync_startup:
+                if self.sync_startup_delay > 0:
+                    delay = self.sync_startup_delay
+                else:
+                    self.sync_now(self.sync_limit)
+            if self.sync_periodic and self.sync_periodic_interval > 0:
+                self.sync_job = self.scheduler.add("LXMF - Sync", self.sync_now, interval=self.sync_periodic_interval*60, delay=delay, jitter=self.sync_periodic_jitter, args=(self.sync_limit,))
+            elif delay is not None:
+                self.sync_job = self.scheduler.add("LXMF - Sync", self.sync_now, delay=delay, args=(self.sync_limit,))
+            return
+
+        if self.sync_job is not None and self.sync_job.run_now():
+            return
+
+        self.sync_now(self.sync_limit)
+
+
+    def sync_now(self, limit=None):
+        if self.message_router.get_outbound_propagation_node() is not None:
+            if self.message_router.propagation_transfer_state == LXMF.LXMRouter.PR_IDLE or self.message_router.propagation_transfer_state == LXMF.LXMRouter.PR_COMPLETE:
+                log("LXMF - Message sync requested from propagation node " + RNS.prettyhexrep(self.message_router.get_outbound_propagation_node()) + " for " + str(self.identity), LOG_DEBUG)
+                self.message_router.request_messages_from_propagation_node(self.identity, max_messages = limit)
+                if self.sync_job_monitor == None:
+                    self.sync_time = time.time()
+                    self.sync_node = self.propagation_node_hash()
+                    self.sync_limit_last = limit
+                    if self.sync_drain_time == None:
+                        self.sync_drain_time = self.sync_time
+                    self.sync_job_monitor = self.scheduler.add("LXMF - Sync monitor", self.sync_monitor, interval=1)
+                return True
+            else:
+                return False
+        else:
+            return False
+
+
+    def sync_monitor(self):
+        state = self.message_router.propagation_transfer_state
+        duration = time.time() - self.sync_time
+        if state == LXMF.LXMRouter.PR_COMPLETE:
+            success = True
+        elif state >= LXMF.LXMRouter.PR_NO_PATH or duration > self.SYNC_TIMEOUT:
+            success = False
+        else:
+            return
+        self.sync_job_monitor.cancel()
+        self.sync_job_monitor = None
+
+        if self.propagation_node_auto:
+            self.propagation_callback.result(self.sync_node, success, duration if success else None)
+
+        self.sync_count += 1
+        self.sync_duration_last = duration
+
+        if not success:
+            self.sync_failed += 1
+            self.sync_drain_time = None
+            log("LXMF - Message sync failed after " + str(round(duration, 1)) + " seconds", LOG_DEBUG)
+            return
+
+        messages = self.message_router.propagation_transfer_last_result or 0
+        self.sync_messages_last = messages
+        self.sync_messages_sum += messages
+        log("LXMF - Message sync completed: " + str(messages) + " messages in " + str(round(duration, 1)) + " seconds", LOG_DEBUG)
+
+        if self.sync_limit_last and messages >= self.sync_limit_last:
+            if self.sync_adaptive:
+                self.sync_backoff = 1
+                self.sync_now(self.sync_limit_last)
+            return
+
+        self.sync_drain_last = time.time() - self.sync_drain_time
+        self.sync_drain_time = None
+
+        if self.sync_adaptive and self.sync_job is not None:
+            if messages == 0:
+                backoff = min(self.sync_backoff*2, self.sync_adaptive_backoff)
+            else:
+                backoff = 1
+            if backoff != self.sync_backoff:
+                self.sync_backoff = backoff
+                self.scheduler.reschedule(self.sync_job, self.sync_periodic_interval*60*backoff)
+                log("LXMF - Message sync interval: " + str(self.sync_periodic_interval*backoff) + " minutes", LOG_DEBUG)
+
+
+    def sync_stat(self):
+        return {
+            "syncs": self.sync_count,
+            "failed": self.sync_failed,
+            "messages_last": self.sync_messages_last,
+            "messages_sum": self.sync_messages_sum,
+            "messages_avg": round(self.sync_messages_sum/(self.sync_count - self.sync_failed), 1) if self.sync_count > self.sync_failed else 0,
+            "duration_last": round(self.sync_duration_last, 3),
+            "drain_last": round(self.sync_drain_last, 3),
+            "backoff": self.sync_backoff,
+        }
+
+
+    def propagation_node_set(self, dest_str):
+        if not dest_str:
+            return False
+
+        if len(dest_str) != ((RNS.Reticulum.TRUNCATED_HASHLENGTH//8)*2):
+            log("LXMF - Propagation node length is invalid", LOG_ERROR)
+            return False
+
+        try:
+            dest_hash = bytes.fromhex(dest_str)
+        except Exception as e:
+            log("LXMF - Propagation node is invalid", LOG_ERROR)
+            return False
+
+        node_identity = RNS.Identity.recall(dest_hash)
+        if node_identity != None:
+            log("LXMF - Propagation node: " + RNS.prettyhexrep(dest_hash), LOG_INFO)
+            dest_hash = RNS.Destination.hash_from_name_and_identity("lxmf.propagation", node_identity)
+            self.message_router.set_outbound_propagation_node(dest_hash)
+            self.propagation_node_active = dest_str
+            return True
+        else:
+            log("LXMF - Propagation node identity not known", LOG_ERROR)
+            return False
+
+
+    def propagation_node_update(self, dest_str):
+        if self.propagation_node_hash_str() != dest_str:
+            if self.propagation_node_set(dest_str) and self.config_set_callback is not None:
+                 self.config_set_callback("propagation_node_active", dest_str)
+
+
+    def propagation_node_hash(self):
+        try:
+            return bytes.fromhex(self.propagation_node_active)
+        except:
+            return None
+
+
+    def propagation_node_hash_str(self):
+        if self.propagation_node_active:
+            return self.propagation_node_active
+        else:
+            return ""
+
+
+    def client_connected(self, link):
+        log("LXMF - Client connected " + str(link), LOG_EXTREME)
+        link.set_resource_strategy(RNS.Link.ACCEPT_ALL)
+        link.set_resource_concluded_callback(self.resource_concluded)
+        link.set_packet_callback(self.packet_received)
+
+
+    def packet_received(self, lxmf_bytes, packet):
+        log("LXMF - Single packet delivered " + str(packet), LOG_EXTREME)
+        self.process_lxmf_message_bytes(lxmf_bytes)
+
+
+    def resource_concluded(self, resource):
+        log("LXMF - Resource data transfer (multi packet) delivered " + str(resource.file), LOG_EXTREME)
+        if resource.status == RNS.Resource.COMPLETE:
+            if self.spool_threshold > 0 and os.fstat(resource.data.fileno()).st_size >= self.spool_threshold:
+                try:
+                    message = self.resource_unpack(resource.data)
+                except Exception as e:
+                    log("LXMF - Could not assemble LXMF message from received data", LOG_ERROR)
+                    log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+                    return
+                finally:
+                    resource.data.close()
+                self.process_lxmf_message(message)
+                return
+            lxmf_bytes = resource.data.read()
+            resource.data.close()
+            self.process_lxmf_message_bytes(lxmf_bytes)
+        else:
+            log("LXMF - Received resource message is not complete", LOG_EXTREME)
+
+
+    # Unpacks a message directly from the file of the resource (like LXMF.LXMessage.unpack_from_bytes).
+    # Fields of at least spool_threshold bytes are copied to the spool directory without reading them into memory.
+    # The signature is validated against a memory mapped copy of the signed part.
+    def resource_unpack(self, fh):
+        size = os.fstat(fh.fileno()).st_size
+        destination_hash = lxmf_attachment.read_exactly(fh, LXMF.LXMessage.DESTINATION_LENGTH)
+        source_hash = lxmf_attachment.read_exactly(fh, LXMF.LXMessage.DESTINATION_LENGTH)
+        signature = lxmf_attachment.read_exactly(fh, LXMF.LXMessage.SIGNATURE_LENGTH)
+
+        payload_start = fh.tell()
+        header = lxmf_attachment.read_exactly(fh, 1)
+        if header[0] not in (0x94, 0x95):
+            raise ValueError("Invalid payload")
+        attachments = []
+        timestamp = lxmf_attachment.unpack(fh)
+        title = lxmf_attachment.unpack(fh)
+        content = lxmf_attachment.unpack(fh)
+        fields = lxmf_attachment.unpack(fh, self.spool_path, self.spool_threshold, attachments)
+        payload_end = fh.tell()
+        stamp = lxmf_attachment.unpack(fh) if header[0] == 0x95 else None
+
+        destination_identity = RNS.Identity.recall(destination_hash)
+        if destination_identity != None:
+            destination = RNS.Destination(destination_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "lxmf", "delivery")
+        else:
+            destination = None
+
+        source_identity = RNS.Identity.recall(source_hash)
+        if source_identity != None:
+            source = RNS.Destination(source_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "lxmf", "delivery")
+        else:
+            source = None
+
+        message = LXMF.LXMessage(destination, source, "", title="", fields=fields, destination_hash=destination_hash, source_hash=source_hash)
+        message.signature = signature
+        message.stamp = stamp
+        message.incoming = True
+        message.timestamp = timestamp
+        message.packed = None
+        message.packed_size = size
+        message.set_title_from_bytes(title)
+        message.set_content_from_bytes(content)
+
+        # The hashed part is the payload without the stamp (header of 4 items).
+        fd, file = tempfile.mkstemp(dir=self.spool_path, suffix=".signed")
+        try:
+            with os.fdopen(fd, "w+b") as signed:
+                digest = hashlib.sha256()
+                for data in (destination_hash, source_hash, bytes([0x94])):
+                    digest.update(data)
+                    signed.write(data)
+                fh.seek(payload_start + 1)
+                for data in lxmf_attachment.read_chunks(fh, payload_end - payload_start - 1):
+                    digest.update(data)
+                    signed.write(data)
+                message.hash = digest.digest()
+                message.message_id = message.hash
+                signed.write(message.hash)
+                signed.flush()
+
+                if source_identity != None:
+                    try:
+                        message.source_blackholed = RNS.Reticulum.get_instance().is_blackholed(source_identity)
+                    except Exception as e:
+                        pass
+                    with mmap.mmap(signed.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        message.signature_validated = source.identity.validate(signature, data)
+                    if not message.signature_validated:
+                        message.unverified_reason = LXMF.LXMessage.SIGNATURE_INVALID
+                else:
+                    message.signature_validated = False
+                    message.unverified_reason = LXMF.LXMessage.SOURCE_UNKNOWN
+        finally:
+            lxmf_attachment.remove(file)
+
+        self.spooled += len(attachments)
+        self.spooled_bytes += sum(len(attachment) for attachment in attachments)
+
+        return message
+
+
+    def process_lxmf_message_bytes(self, lxmf_bytes):
+        try:
+            message = LXMF.LXMessage.unpack_from_bytes(lxmf_bytes)
+        except Exception as e:
+            log("LXMF - Could not assemble LXMF message from received data", LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+            return
+
+        self.process_lxmf_message(message)
+
+
+    def process_lxmf_message(self, message):
+        message.desired_method = LXMF.LXMessage.DIRECT
+
+        self.message_method(message)
+        self.log_message(message, "LXMF - Message received")
+        self.metrics.inc("messages_received", method=message.desired_method_str)
+
+        if self.duplicate_check(message):
+            return
+
+        if self.spool_threshold > 0:
+            self.spool(message)
+
+        if self.receive_dispatcher != None:
+            self.receive_dispatcher.put(message)
+        else:
+            self.message_received(message)
+
+
+    def process_lxmf_message_propagated(self, message):
+        message.desired_method = LXMF.LXMessage.PROPAGATED
+
+        self.message_method(message)
+        self.log_message(message, "LXMF - Message received")
+        self.metrics.inc("messages_received", method=message.desired_method_str)
+
+        if self.duplicate_check(message):
+            return
+
+        if self.spool_threshold > 0:
+            self.spool(message)
+
+        if self.receive_dispatcher != None:
+            self.receive_dispatcher.put(message)
+        else:
+            self.message_received(message)
+
+
+    def spool(self, message):
+        if not message.fields:
+            return
+        count = self.spooled
+        message.fields = self.spool_value(message.fields)
+        if self.spooled > count:
+            message.packed = None
+
+
+    def spool_value(self, value):
+        if isinstance(value, bytes):
+            if len(value) >= self.spool_threshold:
+                try:
+                    attachment = lxmf_attachment.create(self.spool_path, value)
+                    self.spooled += 1
+                    self.spooled_bytes += len(value)
+                    return attachment
+                except Exception as e:
+                    log("LXMF - Could not spool field data to " + self.spool_path + ": " + str(e), LOG_ERROR)
+        elif isinstance(value, dict):
+            return {key: self.spool_value(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            return [self.spool_value(item) for item in value]
+        return value
+
+
+    def spool_stat(self):
+        return {
+            "spooled": self.spooled,
+            "spooled_bytes": self.spooled_bytes,
+        }
+
+
+    # The callbacks of most tools change global data and are not thread-safe.
+    # Unless receive_concurrent is set, the receive workers call them one at a time.
+    def message_received(self, message):
+        if self.message_received_callback is not None:
+            log("LXMF - Call to registered message received callback", LOG_DEBUG)
+            start = time.time()
+            try:
+                if self.receive_lock != None:
+                    with self.receive_lock:
+                        self.profiler.call(self.message_received_callback, message)
+                else:
+                    self.profiler.call(self.message_received_callback, message)
+            finally:
+                self.metrics.observe("callback_duration_seconds", time.time() - start)
+        else:
+            log("LXMF - No message received callback registered", LOG_DEBUG)
+
+
+    def message_rejected(self, message):
+        log("LXMF - Receive queue full, message " + RNS.prettyhexrep(message.hash) + " from " + RNS.prettyhexrep(message.source_hash) + " rejected", LOG_WARNING)
+        if self.receive_overflow_reply != "":
+            self.send(message.source_hash, self.receive_overflow_reply)
+
+
+    def receive_stat(self):
+        if self.receive_dispatcher == None:
+            return {}
+        return self.receive_dispatcher.stat()
+
+
+    def duplicate_check(self, message):
+        if self.duplicate_cache_size <= 0:
+            return False
+
+        keys = [message.hash]
+        if message.fields and 0xA7 in message.fields and 0xA4 not in message.fields and 0xA5 not in message.fields and isinstance(message.fields[0xA7], bytes):
+            keys.append(message.fields[0xA7])
+
+        now = time.time()
+        with self.duplicate_cache_lock:
+            while len(self.duplicate_cache) > 0:
+                key, expire = next(iter(self.duplicate_cache.items()))
+                if expire > now:
+                    break
+                del self.duplicate_cache[key]
+
+            for key in keys:
+                if key in self.duplicate_cache:
+                    self.duplicate_hits += 1
+                    log("LXMF - Duplicate message " + RNS.prettyhexrep(message.hash) + " dropped", LOG_DEBUG)
+                    return True
+
+            for key in keys:
+                self.duplicate_cache[key] = now + self.duplicate_cache_ttl*60
+            while len(self.duplicate_cache) > self.duplicate_cache_size:
+                self.duplicate_cache.popitem(last=False)
+            self.duplicate_cache_unsaved = True
+
+        return False
+
+
+    def duplicate_cache_load(self):
+        if not os.path.isfile(self.duplicate_cache_path):
+            return
+        try:
+            with open(self.duplicate_cache_path, "rb") as fh:
+                data = umsgpack.unpackb(fh.read())
+            now = time.time()
+            with self.duplicate_cache_lock:
+                for key, expire in sorted(data.items(), key=lambda item: item[1]):
+                    if expire > now:
+                        self.duplicate_cache[key] = expire
+                while len(self.duplicate_cache) > self.duplicate_cache_size:
+                    self.duplicate_cache.popitem(last=False)
+            log("LXMF - Duplicate cache loaded (" + str(len(self.duplicate_cache)) + " messages)", LOG_DEBUG)
+        except Exception as e:
+            log("LXMF - Could not load the duplicate cache from " + self.duplicate_cache_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def duplicate_cache_save(self):
+        if not self.duplicate_cache_unsaved:
+            return
+        try:
+            with self.duplicate_cache_lock:
+                data = umsgpack.packb(dict(self.duplicate_cache))
+                self.duplicate_cache_unsaved = False
+            with open(self.duplicate_cache_path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(self.duplicate_cache_path + ".tmp", self.duplicate_cache_path)
+        except Exception as e:
+            log("LXMF - Could not save the duplicate cache to " + self.duplicate_cache_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def duplicate_stat(self):
+        with self.duplicate_cache_lock:
+            size = len(self.duplicate_cache)
+        return {
+            "size": size,
+            "hits": self.duplicate_hits,
+        }
+
+
+    def log_message(self, message, message_tag="LXMF - Message log"):
+        if not log_enabled(LOG_DEBUG):
+            return
+
+        if message.signature_validated:
+            signature_string = "Validated"
+        else:
+            if message.unverified_reason == LXMF.LXMessage.SIGNATURE_INVALID:
+                signature_string = "Invalid signature"
+            elif message.unverified_reason == LXMF.LXMessage.SOURCE_UNKNOWN:
+                signature_string = "Cannot verify, source is unknown"
+            else:
+                signature_string = "Signature is invalid, reason undetermined"
+        if message.packed:
+            size = len(message.packed)
+        else:
+            size = len(message.title) + len(message.content)
+        log(message_tag + ":", LOG_DEBUG)
+        log("-   Date/Time: " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(message.timestamp)), LOG_DEBUG)
+        log("-       Title: " + message.title.decode('utf-8'), LOG_DEBUG)
+        log("-     Content: " + message.content.decode('utf-8'), LOG_DEBUG)
+        log("-      Fields: " + str(message.fields), LOG_DEBUG)
+        log("-        Size: " + str(size) + " bytes", LOG_DEBUG)
+        log("-      Source: " + RNS.prettyhexrep(message.source_hash), LOG_DEBUG)
+        log("- Destination: " + RNS.prettyhexrep(message.destination_hash), LOG_DEBUG)
+        log("-   Signature: " + signature_string, LOG_DEBUG)
+        log("-    Attempts: " + str(message.delivery_attempts), LOG_DEBUG)
+        if hasattr(message, "desired_method_str"):
+            log("-      Method: " + message.desired_method_str + " (" + str(message.desired_method) + ")", LOG_DEBUG)
+        else:
+            log("-      Method: " + str(message.desired_method), LOG_DEBUG)
+        if hasattr(message, "app_data"):
+            log("-    App Data: " + message.app_data, LOG_DEBUG)
+
+
+class lxmf_connection_propagation():
+    EMITTED_DELTA_GRACE = 300
+    EMITTED_DELTA_IGNORE = 10
+
+    SCORE_HYSTERESIS = 1.5
+    SCORE_AGE_MAX = 24
+    SCORE_FAILURES_MAX = 5
+    NODES_MAX = 100
+
+    def __init__(self, owner, aspect_filter=None):
+        self.owner = owner
+        self.aspect_filter = aspect_filter
+        self.nodes = {}
+        self.lock = threading.Lock()
+        self.unsaved = False
+        self.path = self.owner.storage_path + "/propagation.data"
+        self.load()
+        self.owner.scheduler.add("LXMF - Propagation save", self.save, interval=300)
+        exit_register(self.save)
+
+
+    def received_announce(self, destination_hash, announced_identity, app_data):
+        self.owner.metrics.inc("announces_received", aspect=self.aspect_filter)
+
+        if app_data == None:
+            return
+
+        if len(app_data) == 0:
+            return
+
+        try:
+            unpacked = umsgpack.unpackb(app_data)
+            if len(unpacked) > 2:
+                node_active = unpacked[2]
+            else:
+                node_active = unpacked[0]
+            emitted = unpacked[1]
+        except:
+            return
+
+        hop_count = RNS.Transport.hops_to(destination_hash)
+        age = time.time() - emitted
+        if age < 0:
+            if age < -1*self.EMITTED_DELTA_GRACE:
+                return
+        log("LXMF - Received an propagation node announce from "+RNS.prettyhexrep(destination_hash)+": "+str(age)+" seconds ago, "+str(hop_count)+" hops away", LOG_INFO)
+
+        with self.lock:
+            if not node_active:
+                self.nodes.pop(destination_hash, None)
+            else:
+                node = self.node_get(destination_hash)
+                node["hops"] = hop_count
+                node["announce"] = time.time()
+            self.unsaved = True
+
+        self.select()
+
+
+    def node_get(self, destination_hash):
+        if destination_hash not in self.nodes:
+            if len(self.nodes) >= self.NODES_MAX:
+                active = self.owner.propagation_node_hash()
+                worst = max([key for key in self.nodes if key != active], key=lambda key: self.score(self.nodes[key]))
+                del self.nodes[worst]
+            self.nodes[destination_hash] = {"hops": RNS.Transport.hops_to(destination_hash), "announce": 0, "latency": 0, "failures": 0}
+        return self.nodes[destination_hash]
+
+
+    def score(self, node):
+        score = node["hops"]
+        score += min((time.time() - node["announce"])/3600, self.SCORE_AGE_MAX)
+        score += node["latency"]/10
+        score += node["failures"]*2
+        return score
+
+
+    def select(self):
+        active = self.owner.propagation_node_hash()
+
+        with self.lock:
+            if len(self.nodes) == 0:
+                return
+            best = min(self.nodes, key=lambda key: self.score(self.nodes[key]))
+            score = self.score(self.nodes[best])
+            if active == None or best == active:
+                switch = active == None
+            elif active in self.nodes:
+                switch = score + self.SCORE_HYSTERESIS < self.score(self.nodes[active])
+            else:
+                switch = self.nodes[best]["hops"] <= RNS.Transport.hops_to(active)
+
+        if switch:
+            log("LXMF - Propagation node selected: " + RNS.prettyhexrep(best) + " (Score: " + str(round(score, 2)) + ")", LOG_DEBUG)
+            self.owner.propagation_node_update(RNS.hexrep(best, False))
+
+
+    def result(self, destination_hash, success, latency=None):
+        if destination_hash == None:
+            return
+
+        with self.lock:
+            node = self.node_get(destination_hash)
+            if success:
+                node["failures"] = max(node["failures"] - 1, 0)
+                if latency != None:
+                    if node["latency"] > 0:
+                        node["latency"] = node["latency"]*0.7 + latency*0.3
+                    else:
+                        node["latency"] = latency
+            else:
+                node["failures"] = min(node["failures"] + 1, self.SCORE_FAILURES_MAX)
+            self.unsaved = True
+
+        if not success:
+            self.select()
+
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                data = umsgpack.unpackb(fh.read())
+            with self.lock:
+                for destination_hash, node in data.items():
+                    self.nodes[destination_hash] = node
+            log("LXMF - Propagation nodes loaded (" + str(len(self.nodes)) + " nodes)", LOG_DEBUG)
+        except Exception as e:
+            log("LXMF - Could not load the propagation nodes from " + self.path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def save(self):
+        if not self.unsaved:
+            return
+        try:
+            with self.lock:
+                data = umsgpack.packb(self.nodes)
+                self.unsaved = False
+            with open(self.path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            log("LXMF - Could not save the propagation nodes to " + self.path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def stat(self):
+        with self.lock:
+            return {RNS.hexrep(destination_hash, False): dict(node, score=round(self.score(node), 2)) for destination_hash, node in self.nodes.items()}
+
+
+class lxmf_connection_reachability():
+    def __init__(self, owner, aspect_filter=None):
+        self.owner = owner
+        self.aspect_filter = aspect_filter
+
+
+    def received_announce(self, destination_hash, announced_identity, app_data):
+        self.owner.metrics.inc("announces_received", aspect=self.aspect_filter)
+        if self.owner.reachability_size > 0:
+            self.owner.reachability_announce(destination_hash)
+
+
+class lxmf_metrics():
+    BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+    def __init__(self, prefix="lxmf"):
+        self.prefix = prefix
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram == None:
+                histogram = self.histograms[key] = [[0] * len(self.BUCKETS), 0, 0]
+            for i, bucket in enumerate(self.BUCKETS):
+                if value <= bucket:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+
+    def gauge(self, name, function, label=None):
+        self.gauges[name] = (function, label)
+
+
+    def name(self, name):
+        return self.prefix + "_" + re.sub("[^a-zA-Z0-9_]", "_", name)
+
+
+    def labels(self, labels):
+        if not labels:
+            return ""
+        return "{" + ",".join(key + "=\"" + str(value).replace("\\", "\\\\").replace("\"", "\\\"") + "\"" for key, value in labels) + "}"
+
+
+    def render(self):
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(value[0]), value[1], value[2])) for key, value in self.histograms.items())
+
+        types = set()
+        for (name, labels), value in counters:
+            name = self.name(name) + "_total"
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE " + name + " counter")
+            lines.append(name + self.labels(labels) + " " + str(value))
+
+        for (name, labels), (buckets, total, count) in histograms:
+            name = self.name(name)
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE " + name + " histogram")
+            for i, bucket in enumerate(self.BUCKETS):
+                lines.append(name + "_bucket" + self.labels(labels + (("le", str(bucket)),)) + " " + str(buckets[i]))
+            lines.append(name + "_bucket" + self.labels(labels + (("le", "+Inf"),)) + " " + str(count))
+            lines.append(name + "_sum" + self.labels(labels) + " " + str(round(total, 6)))
+            lines.append(name + "_count" + self.labels(labels) + " " + str(count))
+
+        for name, (function, label) in sorted(self.gauges.items()):
+            try:
+                values = function()
+            except Exception as e:
+                log("LXMF - Metrics gauge " + name + " failed: " + str(e), LOG_ERROR)
+                continue
+            if not isinstance(values, dict):
+                values = {None: values}
+            samples = []
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    for key_sub, value_sub in value.items():
+                        samples.append((self.name(name + "_" + str(key_sub)), ((label or "key", key),), value_sub))
+                elif key == None:
+                    samples.append((self.name(name), (), value))
+                elif label:
+                    samples.append((self.name(name), ((label, key),), value))
+                else:
+                    samples.append((self.name(name + "_" + str(key)), (), value))
+            for sample_name, labels, value in samples:
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                if sample_name not in types:
+                    types.add(sample_name)
+                    lines.append("# TYPE " + sample_name + " gauge")
+                lines.append(sample_name + self.labels(labels) + " " + str(value))
+
+        return "\n".join(lines) + "\n"
+
+
+    def start(self, host="127.0.0.1", port=9100):
+        try:
+            self.server = http.server.ThreadingHTTPServer((host, port), lxmf_metrics_handler)
+        except Exception as e:
+            log("LXMF - Metrics endpoint could not be started on " + host + ":" + str(port) + ": " + str(e), LOG_ERROR)
+            return False
+        self.server.daemon_threads = True
+        self.server.metrics = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        log("LXMF - Metrics endpoint: http://" + host + ":" + str(port) + "/metrics", LOG_INFO)
+        return True
+
+
+    def stop(self):
+        if self.server != None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class lxmf_metrics_handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args):
+        log("LXMF - Metrics request: " + (format % args), LOG_EXTREME)
+
+
+class lxmf_connection_dispatcher():
+    def __init__(self, owner, workers=1, queue_size=1000, overflow="drop_oldest"):
+        self.owner = owner
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.queues = [deque() for i in range(workers)]
+        self.conditions = [threading.Condition() for i in range(workers)]
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.wait_last = 0
+        self.wait_max = 0
+        self.wait_sum = 0
+        for i in range(workers):
+            threading.Thread(target=self.process, args=(i,), daemon=True).start()
+
+
+    def put(self, message):
+        index = int.from_bytes(message.source_hash[:4], "big") % len(self.queues)
+        queue = self.queues[index]
+        with self.conditions[index]:
+            if self.queue_size > 0 and len(queue) >= self.queue_size:
+                if self.overflow == "reject":
+                    self.rejected += 1
+                    reject = True
+                else:
+                    dropped, enqueued = queue.popleft()
+                    self.dropped += 1
+                    log("LXMF - Receive queue full, message " + RNS.prettyhexrep(dropped.hash) + " dropped", LOG_WARNING)
+                    reject = False
+            else:
+                reject = False
+            if not reject:
+                queue.append((message, time.time()))
+                self.enqueued += 1
+                self.conditions[index].notify()
+
+        if reject:
+            self.owner.message_rejected(message)
+
+
+    def process(self, index):
+        queue = self.queues[index]
+        condition = self.conditions[index]
+        while True:
+            with condition:
+                while len(queue) == 0:
+                    condition.wait()
+                message, enqueued = queue.popleft()
+
+            wait = time.time() - enqueued
+            self.wait_last = wait
+            self.wait_sum += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+
+            try:
+                self.owner.message_received(message)
+            except Exception as e:
+                log("LXMF - Message received callback failed for " + RNS.prettyhexrep(message.hash), LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+            self.processed += 1
+
+
+    def stat(self):
+        depth = sum(len(queue) for queue in self.queues)
+        return {
+            "workers": len(self.queues),
+            "depth": depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "wait_last": round(self.wait_last, 3),
+            "wait_max": round(self.wait_max, 3),
+            "wait_avg": round(self.wait_sum/self.processed, 3) if self.processed > 0 else 0,
+        }
+
+
+class lxmf_attachment():
+    CHUNK_SIZE = 65536
+
+    # msgpack types with a length (bin, str, ext, array, map): Size of the length.
+    UNPACK_LENGTH = {0xc4: 1, 0xc5: 2, 0xc6: 4, 0xd9: 1, 0xda: 2, 0xdb: 4, 0xc7: 1, 0xc8: 2, 0xc9: 4, 0xdc: 2, 0xdd: 4, 0xde: 2, 0xdf: 4}
+
+    # msgpack types with a fixed size (float, int, fixext): Size of the data.
+    UNPACK_FIXED = {0xca: 4, 0xcb: 8, 0xcc: 1, 0xcd: 2, 0xce: 4, 0xcf: 8, 0xd0: 1, 0xd1: 2, 0xd2: 4, 0xd3: 8, 0xd4: 2, 0xd5: 3, 0xd6: 5, 0xd7: 9, 0xd8: 17}
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.finalizer = weakref.finalize(self, lxmf_attachment.remove, path)
+
+
+    @staticmethod
+    def create(path, data):
+        fd, file = tempfile.mkstemp(dir=path, suffix=".field")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        return lxmf_attachment(file, len(data))
+
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+    # Copies size bytes from the file in chunks to a new file in path.
+    @staticmethod
+    def copy(path, fh, size):
+        fd, file = tempfile.mkstemp(dir=path, suffix=".field")
+        attachment = lxmf_attachment(file, size)
+        with os.fdopen(fd, "wb") as out:
+            for data in lxmf_attachment.read_chunks(fh, size):
+                out.write(data)
+        return attachment
+
+
+    @staticmethod
+    def read_exactly(fh, size):
+        data = fh.read(size)
+        if len(data) != size:
+            raise EOFError("Unexpected end of data")
+        return data
+
+
+    @staticmethod
+    def read_chunks(fh, size):
+        while size > 0:
+            data = lxmf_attachment.read_exactly(fh, min(size, lxmf_attachment.CHUNK_SIZE))
+            size -= len(data)
+            yield data
+
+
+    # Reads one msgpack value from the file.
+    # bin values of at least threshold bytes are copied to a file in path (attachment) instead of being read into memory.
+    @staticmethod
+    def unpack(fh, path=None, threshold=0, attachments=None):
+        head = lxmf_attachment.read_exactly(fh, 1)
+        code = head[0]
+
+        if 0x80 <= code <= 0x8f or code in (0xde, 0xdf):
+            count = code & 0x0f if code <= 0x8f else int.from_bytes(lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code]), "big")
+            value = {}
+            for i in range(count):
+                key = lxmf_attachment.unpack(fh)
+                value[key] = lxmf_attachment.unpack(fh, path, threshold, attachments)
+            return value
+
+        if 0x90 <= code <= 0x9f or code in (0xdc, 0xdd):
+            count = code & 0x0f if code <= 0x9f else int.from_bytes(lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code]), "big")
+            return [lxmf_attachment.unpack(fh, path, threshold, attachments) for i in range(count)]
+
+        if code in (0xc4, 0xc5, 0xc6):
+            size = int.from_bytes(lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code]), "big")
+            if path and threshold > 0 and size >= threshold:
+                attachment = lxmf_attachment.copy(path, fh, size)
+                if attachments != None:
+                    attachments.append(attachment)
+                return attachment
+            return lxmf_attachment.read_exactly(fh, size)
+
+        if 0xa0 <= code <= 0xbf:
+            data = lxmf_attachment.read_exactly(fh, code & 0x1f)
+        elif code in lxmf_attachment.UNPACK_LENGTH:
+            length = lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code])
+            data = length + lxmf_attachment.read_exactly(fh, int.from_bytes(length, "big") + (1 if code in (0xc7, 0xc8, 0xc9) else 0))
+        elif code in lxmf_attachment.UNPACK_FIXED:
+            data = lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_FIXED[code])
+        else:
+            data = b""
+        return umsgpack.unpackb(head + data)
+
+
+    @staticmethod
+    def unspool(value):
+        if isinstance(value, lxmf_attachment):
+            return value.read()
+        elif isinstance(value, dict):
+            return {key: lxmf_attachment.unspool(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            return [lxmf_attachment.unspool(item) for item in value]
+        return value
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __bytes__(self):
+        return self.read()
+
+
+    def __str__(self):
+        return "<attachment " + str(self.size) + " bytes>"
+
+
+    def __repr__(self):
+        return self.__str__()
+
+
+    def open(self):
+        return open(self.path, "rb")
+
+
+    def read(self):
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+
+    def memoryview(self):
+        if self.size == 0:
+            return memoryview(b"")
+        with open(self.path, "rb") as fh:
+            return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class lxmf_connection_batch():
+    def __init__(self, app_data=""):
+        self.app_data = app_data
+        self.timestamp = time.time()
+        self.total = 0
+        self.invalid = 0
+        self.queued = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+
+    def __str__(self):
+        return "<" + str(self.app_data) + " " + str(self.progress()) + ">"
+
+
+    def update(self, message):
+        with self.lock:
+            if message.state == LXMF.LXMessage.FAILED:
+                self.failed += 1
+            else:
+                self.delivered += 1
+
+
+    def pending(self):
+        return self.queued - self.delivered - self.failed
+
+
+    def done(self):
+        return self.pending() <= 0
+
+
+    def progress(self):
+        return {
+            "total": self.total,
+            "invalid": self.invalid,
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "pending": self.pending(),
+            "duration": round(time.time() - self.timestamp, 3),
+        }
+
+
+# Returned by lxmf_connection.send(). It is the hash of the message (bytes) and
+# additionally tracks the delivery of the message (also awaitable with asyncio).
+class lxmf_delivery(bytes):
+    PENDING   = "pending"
+    DELIVERED = "delivered"
+    FAILED    = "failed"
+    EXPIRED   = "expired"
+
+
+    def __new__(cls, message):
+        self = super().__new__(cls, message.hash)
+        self.destination_hash = message.destination_hash
+        self.app_data = message.app_data
+        self.send_time = message.send_time
+        self.state = lxmf_delivery.PENDING
+        self.latency = None
+        self.event = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+        return self
+
+
+    def __str__(self):
+        return "<" + RNS.hexrep(self, delimit=False) + " " + self.state + ">"
+
+
+    def __await__(self):
+        if not self.event.is_set():
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.add_done_callback(lambda delivery: loop.call_soon_threadsafe(lambda: future.done() or future.set_result(delivery.state)))
+            yield from future.__await__()
+        return self.state
+
 
-        if self.announce_periodic and self.announce_periodic_interval > 0:
-            announce_timer = threading.Timer(self.announce_periodic_interval*60, self.announce)
-            announce_timer.daemon = True
-            announce_timer.start()
+    def done(self):
+        return self.event.is_set()
 
-        if initial:
-            if self.announce_startup:
-                if self.announce_startup_delay > 0:
-                    if announce_timer is not None:
-                        announce_timer.cancel()
-                    announce_timer = threading.Timer(self.announce_startup_delay, self.announce)
-                    announce_timer.daemon = True
-                    announce_timer.start()
-                else:
-                    self.announce_now(app_data=app_data, attached_interface=attached_interface)
-            return
 
-        self.announce_now(app_data=app_data, attached_interface=attached_interface)
+    def wait(self, timeout=None):
+        self.event.wait(timeout)
+        return self.state
 
 
-    def announce_now(self, app_data=None, attached_interface=None):
-        if self.announce_hidden:
-            self.destination.announce("".encode("utf-8"), attached_interface=attached_interface)
-            log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +" (Hidden)", LOG_DEBUG)
-        elif app_data != None:
-            if isinstance(app_data, str):
-                self.destination.announce(app_data.encode("utf-8"), attached_interface=attached_interface)
-                log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +":" + app_data, LOG_DEBUG)
-            else:
-                self.destination.announce(app_data, attached_interface=attached_interface)
-                log("LMF - Announced: " + RNS.prettyhexrep(self.destination_hash()), LOG_DEBUG)
-        elif self.announce_data:
-            if isinstance(self.announce_data, str):
-                self.destination.announce(self.announce_data.encode("utf-8"), attached_interface=attached_interface)
-                log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +":" + self.announce_data, LOG_DEBUG)
-            else:
-                self.destination.announce(self.announce_data, attached_interface=attached_interface)
-                log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()), LOG_DEBUG)
-        else:
-            self.destination.announce()
-            log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) + ": " + self.display_name, LOG_DEBUG)
+    def add_done_callback(self, callback):
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback(self)
 
 
-    def sync(self, initial=False):
-        sync_timer = None
+    def complete(self, state):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.state = state
+            if state == lxmf_delivery.DELIVERED:
+                self.latency = time.time() - self.send_time
+            self.event.set()
+            callbacks = self.callbacks
+            self.callbacks = []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                log("LXMF - Delivery callback error: " + str(e), LOG_ERROR)
+
+
+class lxmf_scheduler():
+    def __init__(self):
+        self.jobs = []
+        self.heap = []
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.profiler = None
+        self.thread = threading.Thread(target=self.process, daemon=True)
+        self.thread.start()
+
+
+    def add(self, name, function, interval=0, delay=None, jitter=0, args=(), kwargs=None, owner=None):
+        job = lxmf_scheduler_job(self, name, function, interval, jitter, args, kwargs, owner)
+        if delay is None:
+            delay = job.interval
+        with self.condition:
+            self.jobs.append(job)
+            self.push(job, time.time() + float(delay), job.jitter)
+        return job
+
+
+    def cancel(self, job):
+        with self.condition:
+            job.active = False
+            job.generation += 1
+            if job in self.jobs:
+                self.jobs.remove(job)
+            self.condition.notify()
+
+
+    def run_now(self, job):
+        with self.condition:
+            if not job.active:
+                return False
+            self.push(job, time.time())
+        return True
 
-        if self.sync_periodic and self.sync_periodic_interval > 0:
-            sync_timer = threading.Timer(self.sync_periodic_interval*60, self.sync)
-            sync_timer.daemon = True
-            sync_timer.start()
 
-        if initial:
-            if self.sync_startup:
-                if self.sync_startup_delay > 0:
-                    if sync_timer is not None:
-                        sync_timer.cancel()
-                    sync_timer = threading.Timer(self.sync_startup_delay, self.sync)
-                    sync_timer.daemon = True
-                    sync_timer.start()
+    def reschedule(self, job, interval):
+        with self.condition:
+            if not job.active:
+                return False
+            base = job.base - job.interval + float(interval)
+            job.interval = float(interval)
+            self.push(job, max(base, time.time()), job.jitter)
+        return True
+
+
+    def push(self, job, base, jitter=0):
+        job.generation += 1
+        job.base = base
+        job.due = base
+        if jitter > 0:
+            job.due += random.uniform(0, jitter)
+        self.sequence += 1
+        heapq.heappush(self.heap, (job.due, self.sequence, job.generation, job))
+        self.condition.notify()
+
+
+    def process(self):
+        while True:
+            with self.condition:
+                while True:
+                    while self.heap and self.heap[0][2] != self.heap[0][3].generation:
+                        heapq.heappop(self.heap)
+                    timeout = None
+                    if self.heap:
+                        timeout = self.heap[0][0] - time.time()
+                        if timeout <= 0:
+                            break
+                    self.condition.wait(timeout)
+                due, sequence, generation, job = heapq.heappop(self.heap)
+
+            job.run(due)
+
+            with self.condition:
+                if job.generation != generation:
+                    continue
+                if job.interval > 0:
+                    self.push(job, max(job.base + job.interval, time.time()), job.jitter)
                 else:
-                    self.sync_now(self.sync_limit)
-            return
+                    job.active = False
+                    if job in self.jobs:
+                        self.jobs.remove(job)
 
-        self.sync_now(self.sync_limit)
 
+    def stat(self):
+        with self.condition:
+            return {job.name: job.stat() for job in self.jobs}
 
-    def sync_now(self, limit=None):
-        if self.message_router.get_outbound_propagation_node() is not None:
-            if self.message_router.propagation_transfer_state == LXMF.LXMRouter.PR_IDLE or self.message_router.propagation_transfer_state == LXMF.LXMRouter.PR_COMPLETE:
-                log("LXMF - Message sync requested from propagation node " + RNS.prettyhexrep(self.message_router.get_outbound_propagation_node()) + " for " + str(self.identity), LOG_DEBUG)
-                self.message_router.request_messages_from_propagation_node(self.identity, max_messages = limit)
-                return True
-            else:
-                return False
-        else:
-            return False
 
+# View on a shared scheduler which prefixes the job names of one tool.
+# The jobs added through the view are profiled by the profiler of the view (the tool).
+class lxmf_scheduler_prefix():
+    def __init__(self, scheduler, prefix):
+        self.scheduler = scheduler
+        self.prefix = prefix
+        self.profiler = None
 
-    def propagation_node_set(self, dest_str):
-        if not dest_str:
-            return False
 
-        if len(dest_str) != ((RNS.Reticulum.TRUNCATED_HASHLENGTH//8)*2):
-            log("LXMF - Propagation node length is invalid", LOG_ERROR)
-            return False
+    def add(self, name, function, interval=0, delay=None, jitter=0, args=(), kwargs=None):
+        return self.scheduler.add(self.prefix + name, function, interval, delay, jitter, args, kwargs, self)
 
-        try:
-            dest_hash = bytes.fromhex(dest_str)
-        except Exception as e:
-            log("LXMF - Propagation node is invalid", LOG_ERROR)
-            return False
 
-        node_identity = RNS.Identity.recall(dest_hash)
-        if node_identity != None:
-            log("LXMF - Propagation node: " + RNS.prettyhexrep(dest_hash), LOG_INFO)
-            dest_hash = RNS.Destination.hash_from_name_and_identity("lxmf.propagation", node_identity)
-            self.message_router.set_outbound_propagation_node(dest_hash)
-            self.propagation_node_active = dest_str
-            return True
-        else:
-            log("LXMF - Propagation node identity not known", LOG_ERROR)
-            return False
+    def cancel(self, job):
+        self.scheduler.cancel(job)
 
 
-    def propagation_node_update(self, dest_str):
-        if self.propagation_node_hash_str() != dest_str:
-            if self.propagation_node_set(dest_str) and self.config_set_callback is not None:
-                 self.config_set_callback("propagation_node_active", dest_str)
+    def run_now(self, job):
+        return self.scheduler.run_now(job)
 
 
-    def propagation_node_hash(self):
-        try:
-            return bytes.fromhex(self.propagation_node_active)
-        except:
-            return None
+    def reschedule(self, job, interval):
+        return self.scheduler.reschedule(job, interval)
 
 
-    def propagation_node_hash_str(self):
-        if self.propagation_node_active:
-            return self.propagation_node_active
-        else:
-            return ""
+    def stat(self):
+        return {name[len(self.prefix):]: stat for (name, stat) in self.scheduler.stat().items() if name.startswith(self.prefix)}
 
 
-    def client_connected(self, link):
-        log("LXMF - Client connected " + str(link), LOG_EXTREME)
-        link.set_resource_strategy(RNS.Link.ACCEPT_ALL)
-        link.set_resource_concluded_callback(self.resource_concluded)
-        link.set_packet_callback(self.packet_received)
+class lxmf_scheduler_job():
+    def __init__(self, scheduler, name, function, interval=0, jitter=0, args=(), kwargs=None, owner=None):
+        self.scheduler = scheduler
+        self.owner = owner if owner is not None else scheduler
+        self.name = name
+        self.function = function
+        self.interval = float(interval)
+        self.jitter = float(jitter)
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.active = True
+        self.generation = 0
+        self.base = 0
+        self.due = 0
+        self.runs = 0
+        self.errors = 0
+        self.late_last = 0
+        self.late_max = 0
+        self.late_sum = 0
+        self.duration_last = 0
 
 
-    def packet_received(self, lxmf_bytes, packet):
-        log("LXMF - Single packet delivered " + str(packet), LOG_EXTREME)
-        self.process_lxmf_message_bytes(lxmf_bytes)
+    def __str__(self):
+        return "<" + self.name + " " + str(self.stat()) + ">"
 
 
-    def resource_concluded(self, resource):
-        log("LXMF - Resource data transfer (multi packet) delivered " + str(resource.file), LOG_EXTREME)
-        if resource.status == RNS.Resource.COMPLETE:
-            lxmf_bytes = resource.data.read()
-            self.process_lxmf_message_bytes(lxmf_bytes)
-        else:
-            log("LXMF - Received resource message is not complete", LOG_EXTREME)
+    def cancel(self):
+        self.scheduler.cancel(self)
 
 
-    def process_lxmf_message_bytes(self, lxmf_bytes):
+    def run_now(self):
+        return self.scheduler.run_now(self)
+
+
+    def run(self, due):
+        start = time.time()
+        late = max(start - due, 0)
         try:
-            message = LXMF.LXMessage.unpack_from_bytes(lxmf_bytes)
+            profiler = self.owner.profiler
+            if profiler is not None:
+                profiler.call(self.function, *self.args, **self.kwargs)
+            else:
+                self.function(*self.args, **self.kwargs)
         except Exception as e:
-            log("LXMF - Could not assemble LXMF message from received data", LOG_ERROR)
-            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
-            return
+            self.errors += 1
+            log("Scheduler - Job '" + self.name + "' failed: " + str(e), LOG_ERROR)
+        self.runs += 1
+        self.late_last = late
+        self.late_max = max(self.late_max, late)
+        self.late_sum += late
+        self.duration_last = time.time() - start
+
+
+    def stat(self):
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "late_last": round(self.late_last, 3),
+            "late_max": round(self.late_max, 3),
+            "late_avg": round(self.late_sum/self.runs, 3) if self.runs > 0 else 0,
+            "duration_last": round(self.duration_last, 3),
+            "next": round(max(self.due - time.time(), 0), 3) if self.active else None,
+        }
 
-        message.desired_method = LXMF.LXMessage.DIRECT
 
-        self.message_method(message)
-        self.log_message(message, "LXMF - Message received")
+class lxmf_profiler():
+    STOP_TIMEOUT = 5
+    MEMORY_TOP = 50
 
-        if self.message_received_callback is not None:
-            log("LXMF - Call to registered message received callback", LOG_DEBUG)
-            self.message_received_callback(message)
-        else:
-            log("LXMF - No message received callback registered", LOG_DEBUG)
+    def __init__(self, path):
+        self.path = path
+        self.profiles = {}
+        self.local = threading.local()
+        self.condition = threading.Condition()
+        self.active = False
+        self.running = 0
+        self.timer = None
+        self.profile_file = None
+        self.snapshot = None
 
 
-    def process_lxmf_message_propagated(self, message):
-        message.desired_method = LXMF.LXMessage.PROPAGATED
+    def call(self, function, *args, **kwargs):
+        if not self.active or getattr(self.local, "profile", None) != None:
+            return function(*args, **kwargs)
 
-        self.message_method(message)
-        self.log_message(message, "LXMF - Message received")
+        with self.condition:
+            if not self.active:
+                profile = None
+            else:
+                profile = self.profiles.get(threading.get_ident())
+                if profile == None:
+                    profile = self.profiles[threading.get_ident()] = cProfile.Profile()
+                self.running += 1
+        if profile == None:
+            return function(*args, **kwargs)
+
+        self.local.profile = profile
+        profile.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            self.local.profile = None
+            with self.condition:
+                self.running -= 1
+                self.condition.notify_all()
 
-        if self.message_received_callback is not None:
-            log("LXMF - Call to registered message received callback", LOG_DEBUG)
-            self.message_received_callback(message)
-        else:
-            log("LXMF - No message received callback registered", LOG_DEBUG)
 
+    def file(self, kind, extension):
+        return os.path.join(self.path, kind + "_" + time.strftime("%Y%m%d_%H%M%S") + "." + extension)
 
-    def log_message(self, message, message_tag="LXMF - Message log"):
-        if message.signature_validated:
-            signature_string = "Validated"
-        else:
-            if message.unverified_reason == LXMF.LXMessage.SIGNATURE_INVALID:
-                signature_string = "Invalid signature"
-            elif message.unverified_reason == LXMF.LXMessage.SOURCE_UNKNOWN:
-                signature_string = "Cannot verify, source is unknown"
-            else:
-                signature_string = "Signature is invalid, reason undetermined"
-        title = message.title.decode('utf-8')
-        content = message.content.decode('utf-8')
-        fields = message.fields
-        log(message_tag + ":", LOG_DEBUG)
-        log("-   Date/Time: " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(message.timestamp)), LOG_DEBUG)
-        log("-       Title: " + title, LOG_DEBUG)
-        log("-     Content: " + content, LOG_DEBUG)
-        log("-      Fields: " + str(fields), LOG_DEBUG)
-        log("-        Size: " + str(len(title) + len(content) + len(title) + len(pickle.dumps(fields))) + " bytes", LOG_DEBUG)
-        log("-      Source: " + RNS.prettyhexrep(message.source_hash), LOG_DEBUG)
-        log("- Destination: " + RNS.prettyhexrep(message.destination_hash), LOG_DEBUG)
-        log("-   Signature: " + signature_string, LOG_DEBUG)
-        log("-    Attempts: " + str(message.delivery_attempts), LOG_DEBUG)
-        if hasattr(message, "desired_method_str"):
-            log("-      Method: " + message.desired_method_str + " (" + str(message.desired_method) + ")", LOG_DEBUG)
-        else:
-            log("-      Method: " + str(message.desired_method), LOG_DEBUG)
-        if hasattr(message, "app_data"):
-            log("-    App Data: " + message.app_data, LOG_DEBUG)
 
+    def profile_start(self, duration=30):
+        with self.condition:
+            if self.active:
+                return None
+            self.profiles = {}
+            self.active = True
+            self.profile_file = self.file("profile", "pstats")
+            self.timer = threading.Timer(duration, self.profile_stop)
+            self.timer.daemon = True
+            self.timer.start()
+        log("Profiler - CPU profile started for " + str(duration) + " seconds, output: " + self.profile_file, LOG_NOTICE)
+        return self.profile_file
+
+
+    def profile_stop(self):
+        with self.condition:
+            if not self.active:
+                return None
+            self.active = False
+            if self.timer != None and self.timer is not threading.current_thread():
+                self.timer.cancel()
+            self.timer = None
+            running = 1 if getattr(self.local, "profile", None) != None else 0
+            self.condition.wait_for(lambda: self.running <= running, self.STOP_TIMEOUT)
+            profiles = list(self.profiles.values())
+            self.profiles = {}
+            file = self.profile_file
 
-class lxmf_connection_propagation():
-    def __init__(self, owner, aspect_filter=None):
-        self.owner = owner
-        self.aspect_filter = aspect_filter
+        try:
+            stats = pstats.Stats(*profiles) if len(profiles) > 0 else None
+        except TypeError:
+            stats = None
+        if stats == None:
+            log("Profiler - CPU profile stopped, nothing was recorded", LOG_NOTICE)
+            return None
 
-    EMITTED_DELTA_GRACE = 300
-    EMITTED_DELTA_IGNORE = 10
+        try:
+            stats.dump_stats(file)
+        except Exception as e:
+            log("Profiler - Could not write CPU profile to " + file + ": " + str(e), LOG_ERROR)
+            return None
+        log("Profiler - CPU profile written to " + file, LOG_NOTICE)
+        return file
 
-    def received_announce(self, destination_hash, announced_identity, app_data):
-        if app_data == None:
-            return
 
-        if len(app_data) == 0:
-            return
+    def profile_toggle(self, duration=30):
+        if self.active:
+            return self.profile_stop()
+        return self.profile_start(duration)
+
 
+    def memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot()
+            log("Profiler - Memory tracing started, the next snapshot is compared against this one", LOG_NOTICE)
+            return None
+
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.snapshot, "lineno") if self.snapshot != None else snapshot.statistics("lineno")
+        self.snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+
+        file = self.file("memory", "txt")
         try:
-            unpacked = umsgpack.unpackb(app_data)
-            node_active = unpacked[0]
-            emitted = unpacked[1]
-            hop_count = RNS.Transport.hops_to(destination_hash)
-            age = time.time() - emitted
-            if age < 0:
-                if age < -1*PropDetector.EMITTED_DELTA_GRACE:
-                    return
-            log("LXMF - Received an propagation node announce from "+RNS.prettyhexrep(destination_hash)+": "+str(age)+" seconds ago, "+str(hop_count)+" hops away", LOG_INFO)
-            if self.owner.propagation_node_active == None:
-                self.owner.propagation_node_update(RNS.hexrep(destination_hash, False))
-            else:
-                prev_hop_count = RNS.Transport.hops_to(self.owner.propagation_node_hash())
-                if hop_count <= prev_hop_count:
-                    self.owner.propagation_node_update(RNS.hexrep(destination_hash, False))
-        except:
-            return
+            with open(file, "w") as fh:
+                fh.write("Traced memory: current " + str(current) + " bytes, peak " + str(peak) + " bytes\n\n")
+                for stat in stats[:self.MEMORY_TOP]:
+                    fh.write(str(stat) + "\n")
+        except Exception as e:
+            log("Profiler - Could not write memory snapshot to " + file + ": " + str(e), LOG_ERROR)
+            return None
+        log("Profiler - Memory snapshot diff written to " + file, LOG_NOTICE)
+        return file
+
+
+    def stacks(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        file = self.file("stacks", "txt")
+        try:
+            with open(file, "w") as fh:
+                for ident, frame in sys._current_frames().items():
+                    fh.write("Thread " + names.get(ident, "?") + " (" + str(ident) + "):\n")
+                    fh.write("".join(traceback.format_stack(frame)) + "\n")
+        except Exception as e:
+            log("Profiler - Could not write thread stacks to " + file + ": " + str(e), LOG_ERROR)
+            return None
+        log("Profiler - Thread stacks written to " + file, LOG_NOTICE)
+        return file
+
+
+    def signals(self, duration=30):
+        if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+            log("Profiler - Signal handlers not available", LOG_WARNING)
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=self.profile_toggle, args=(duration,), daemon=True).start())
+        signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=self.signal_dump, daemon=True).start())
+        log("Profiler - SIGUSR1: CPU profile on/off, SIGUSR2: thread stacks and memory snapshot", LOG_INFO)
+        return True
+
+
+    def signal_dump(self):
+        self.stacks()
+        self.memory()
 
 
 ##############################################################################################################
@@ -1285,11 +3245,8 @@ def data_save(file=None):
 
 #### Data - Save #####
 def data_save_periodic(initial=False):
-    data_timer = threading.Timer(CONFIG.getint("main", "periodic_save_data_interval"), data_save_periodic)
-    data_timer.daemon = True
-    data_timer.start()
-
     if initial:
+        LXMF_CONNECTION.scheduler.add("Data - Save", data_save_periodic, interval=CONFIG.getint("main", "periodic_save_data_interval"))
         return
 
     global DATA
@@ -1353,6 +3310,128 @@ LOG_MAXSIZE       = 5*1024*1024
 LOG_PREFIX        = ""
 LOG_SUFFIX        = ""
 LOG_FILE          = ""
+LOG_FORMAT        = "text" #text/json
+LOG_QUEUE_SIZE    = 10000
+LOG_WRITER        = None
+
+
+class log_writer():
+    def __init__(self, file, maxsize=LOG_MAXSIZE, queue_size=LOG_QUEUE_SIZE):
+        self.file = file
+        self.maxsize = maxsize
+        self.queue_size = queue_size
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.handle = None
+        self.size = 0
+        self.dropped = 0
+        self.stopped = False
+        self.thread = threading.Thread(target=self.process, daemon=True)
+        self.thread.start()
+
+
+    def write(self, text):
+        with self.condition:
+            if self.stopped or len(self.queue) >= self.queue_size:
+                self.dropped += 1
+                return
+            self.queue.append(text)
+            self.condition.notify()
+
+
+    def process(self):
+        while True:
+            with self.condition:
+                while len(self.queue) == 0 and not self.stopped:
+                    self.condition.wait()
+                if len(self.queue) == 0:
+                    break
+                lines = list(self.queue)
+                self.queue.clear()
+                dropped = self.dropped
+                self.dropped = 0
+
+            if dropped > 0:
+                lines.append("[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [Warning] Log queue full, " + str(dropped) + " lines dropped")
+
+            self.write_lines(lines)
+
+        self.close()
+
+
+    # On errors the lines are counted as dropped and the file is opened again with the next lines.
+    def write_lines(self, lines):
+        try:
+            if self.handle == None:
+                self.handle = open(self.file, "ab")
+                self.size = self.handle.tell()
+
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self.handle.write(data)
+            self.handle.flush()
+            self.size += len(data)
+        except Exception:
+            self.close()
+            with self.condition:
+                self.dropped += len(lines)
+            return
+
+        if self.size > self.maxsize:
+            try:
+                self.rotate()
+            except Exception:
+                self.close()
+
+
+    def rotate(self):
+        self.close()
+        file_prev = self.file + ".1"
+        if os.path.isfile(file_prev):
+            os.unlink(file_prev)
+        os.rename(self.file, file_prev)
+        self.size = 0
+
+
+    def close(self):
+        if self.handle != None:
+            try:
+                self.handle.close()
+            except Exception:
+                pass
+            self.handle = None
+
+
+    def stop(self, timeout=5):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+
+def log_start(file=None):
+    global LOG_WRITER
+
+    if file == None:
+        file = LOG_FILE
+
+    if LOG_WRITER != None or file == "":
+        return
+
+    LOG_WRITER = log_writer(file)
+    exit_register(log_stop)
+    exit_signals()
+
+
+def log_stop():
+    global LOG_WRITER
+
+    if LOG_WRITER != None:
+        LOG_WRITER.stop()
+        LOG_WRITER = None
+
+
+def log_enabled(level=3):
+    return bool(LOG_LEVEL) and LOG_LEVEL >= level
 
 
 def log(text, level=3, file=None):
@@ -1383,13 +3462,18 @@ def log(text, level=3, file=None):
         if not isinstance(text, str):
             text = str(text)
 
-        text = "[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [" + name + "] " + LOG_PREFIX + text + LOG_SUFFIX
+        if LOG_FORMAT == "json":
+            text = json.dumps({"time": time.strftime(LOG_TIMEFMT, time.localtime(time.time())), "level": name, "text": LOG_PREFIX + text + LOG_SUFFIX}, ensure_ascii=False)
+        else:
+            text = "[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [" + name + "] " + LOG_PREFIX + text + LOG_SUFFIX
 
         if file == None and LOG_FILE != "":
             file = LOG_FILE
 
         if file == None:
             print(text)
+        elif LOG_WRITER != None and file == LOG_WRITER.file:
+            LOG_WRITER.write(text)
         else:
             try:
                 file_handle = open(file, "a")
@@ -1419,15 +3503,67 @@ def exit():
     sys.exit(0)
 
 
+#### Exit - Register #####
+# Functions which have to run when the program ends (save data, flush the log).
+# RNS and the LXMF router end the program on SIGTERM/SIGINT with os._exit(), which skips atexit.
+# Therefore the functions run from atexit and from the signal handlers (exit_signals).
+EXIT_HANDLERS = []
+
+
+def exit_register(function, *args):
+    if len(EXIT_HANDLERS) == 0:
+        atexit.register(exit_run)
+    EXIT_HANDLERS.append((function, args))
+
+
+#### Exit - Run #####
+# Last registered first (like atexit), every function runs only once.
+def exit_run():
+    while len(EXIT_HANDLERS) > 0:
+        function, args = EXIT_HANDLERS.pop()
+        try:
+            function(*args)
+        except Exception as e:
+            log("Exit - Error in " + str(function) + ": " + str(e), LOG_ERROR)
+
+
+#### Exit - Signals #####
+# Chains the installed SIGTERM/SIGINT handlers (RNS, LXMF router) with exit_run().
+# Has to be called again after a new handler was installed (RNS.Reticulum, LXMF.LXMRouter).
+def exit_signals():
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        handler = signal.getsignal(signum)
+        if handler == signal.SIG_IGN or getattr(handler, "exit_run", None) is exit_run:
+            continue
+        signal.signal(signum, exit_signal_handler(handler))
+
+
+def exit_signal_handler(handler):
+    def signal_handler(signum, frame):
+        exit_run()
+        if callable(handler):
+            handler(signum, frame)
+        elif signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        else:
+            sys.exit(0)
+    signal_handler.exit_run = exit_run
+    return signal_handler
+
+
 ##############################################################################################################
 # Setup/Start
 
 
 #### Setup #####
-def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False):
+def setup(path=None, path_rns=None, path_log=None, loglevel=None, logformat=None, service=False):
     global PATH
     global PATH_RNS
     global LOG_LEVEL
+    global LOG_FORMAT
     global LOG_FILE
     global ROUTING_TABLE
     global RNS_CONNECTION
@@ -1450,6 +3586,9 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
     else:
         rns_loglevel = None
 
+    if logformat is not None:
+        LOG_FORMAT = logformat
+
     if service:
         LOG_LEVEL = LOG_LEVEL_SERVICE
         if path_log is not None:
@@ -1459,6 +3598,7 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         else:
             LOG_FILE = PATH
         LOG_FILE = LOG_FILE + "/" + NAME + ".log"
+        log_start(LOG_FILE)
         rns_loglevel = None
 
     if not config_read(PATH + "/config.cfg", PATH + "/config.cfg.owr"):
@@ -1492,7 +3632,10 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
             ROUTING_TABLE[key] = [value, name]
             ROUTING_TABLE[value] = [key, name]
 
-    RNS_CONNECTION = RNS.Reticulum(configdir=PATH_RNS, loglevel=rns_loglevel)
+    # Reuse the instance of a host process (lxmf_host) which runs several tools
+    RNS_CONNECTION = RNS.Reticulum.get_instance()
+    if RNS_CONNECTION == None:
+        RNS_CONNECTION = RNS.Reticulum(configdir=PATH_RNS, loglevel=rns_loglevel)
 
     log("...............................................................................", LOG_INFO)
     log("        Name: " + CONFIG["main"]["name"], LOG_INFO)
@@ -1502,9 +3645,6 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
     log("   Copyright: " + COPYRIGHT, LOG_INFO)
     log("...............................................................................", LOG_INFO)
 
-    if CONFIG["main"].getboolean("periodic_save_data"):
-        data_save_periodic(True)
-
     log("LXMF - Connecting ...", LOG_DEBUG)
 
     if CONFIG.has_option("lxmf", "propagation_node"):
@@ -1527,6 +3667,29 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         display_name=CONFIG["lxmf"]["display_name"],
         announce_hidden=CONFIG["lxmf"].getboolean("announce_hidden"),
         send_delay=CONFIG["lxmf"]["send_delay"],
+        send_rate=config_get(CONFIG, "lxmf", "send_rate", 0),
+        send_burst=config_get(CONFIG, "lxmf", "send_burst", 1),
+        send_queue_size=config_get(CONFIG, "lxmf", "send_queue_size", 0),
+        destination_cache_size=config_get(CONFIG, "lxmf", "destination_cache_size", 1000),
+        destination_cache_unknown_ttl=config_get(CONFIG, "lxmf", "destination_cache_unknown_ttl", 30),
+        reachability_size=config_get(CONFIG, "lxmf", "reachability_size", 1000),
+        reachability_fails=config_get(CONFIG, "lxmf", "reachability_fails", 2),
+        reachability_retry=config_get(CONFIG, "lxmf", "reachability_retry", 60),
+        path_request_rate=config_get(CONFIG, "lxmf", "path_request_rate", 2),
+        path_request_interval=config_get(CONFIG, "lxmf", "path_request_interval", 30),
+        duplicate_cache_size=config_get(CONFIG, "lxmf", "duplicate_cache_size", 10000),
+        duplicate_cache_ttl=config_get(CONFIG, "lxmf", "duplicate_cache_ttl", 1440),
+        receive_workers=config_get(CONFIG, "lxmf", "receive_workers", 0),
+        receive_queue_size=config_get(CONFIG, "lxmf", "receive_queue_size", 1000),
+        receive_overflow=config_get(CONFIG, "lxmf", "receive_overflow", "drop_oldest"),
+        receive_overflow_reply=config_get(CONFIG, "lxmf", "receive_overflow_reply", ""),
+        spool_threshold=config_get(CONFIG, "lxmf", "spool_threshold", 262144),
+        spool_path=config_get(CONFIG, "lxmf", "spool_path", None),
+        delivery_size=config_get(CONFIG, "lxmf", "delivery_size", 10000),
+        metrics_port=config_get(CONFIG, "lxmf", "metrics_port", 0),
+        metrics_host=config_get(CONFIG, "lxmf", "metrics_host", "127.0.0.1"),
+        profile_signals=config_getboolean(CONFIG, "lxmf", "profile_signals", False),
+        profile_duration=config_get(CONFIG, "lxmf", "profile_duration", 30),
         desired_method=CONFIG["lxmf"]["desired_method"],
         propagation_node=config_propagation_node,
         propagation_node_auto=CONFIG["lxmf"].getboolean("propagation_node_auto"),
@@ -1536,11 +3699,15 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         announce_startup_delay=CONFIG["lxmf"]["announce_startup_delay"],
         announce_periodic=CONFIG["lxmf"].getboolean("announce_periodic"),
         announce_periodic_interval=CONFIG["lxmf"]["announce_periodic_interval"],
+        announce_periodic_jitter=config_get(CONFIG, "lxmf", "announce_periodic_jitter", 0),
         sync_startup=CONFIG["lxmf"].getboolean("sync_startup"),
         sync_startup_delay=CONFIG["lxmf"]["sync_startup_delay"],
         sync_limit=CONFIG["lxmf"]["sync_limit"],
         sync_periodic=CONFIG["lxmf"].getboolean("sync_periodic"),
-        sync_periodic_interval=CONFIG["lxmf"]["sync_periodic_interval"])
+        sync_periodic_interval=CONFIG["lxmf"]["sync_periodic_interval"],
+        sync_periodic_jitter=config_get(CONFIG, "lxmf", "sync_periodic_jitter", 0),
+        sync_adaptive=config_getboolean(CONFIG, "lxmf", "sync_adaptive", False),
+        sync_adaptive_backoff=config_get(CONFIG, "lxmf", "sync_adaptive_backoff", 8))
 
     LXMF_CONNECTION.register_announce_callback(lxmf_announce_callback)
     LXMF_CONNECTION.register_message_received_callback(lxmf_message_received_callback)
@@ -1552,6 +3719,9 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
     log("LXMF - Address: " + RNS.prettyhexrep(LXMF_CONNECTION.destination_hash()), LOG_FORCE)
     log("...............................................................................", LOG_FORCE)
 
+    if CONFIG["main"].getboolean("periodic_save_data"):
+        data_save_periodic(True)
+
     log("Matrix - Connecting ...", LOG_DEBUG)
     MATRIX_CONNECTION = matrix_connection(
         storage_path=path,
@@ -1577,6 +3747,7 @@ def main():
         parser.add_argument("-pr", "--path_rns", action="store", type=str, default=None, help="Path to alternative Reticulum config directory")
         parser.add_argument("-pl", "--path_log", action="store", type=str, default=None, help="Path to alternative log directory")
         parser.add_argument("-l", "--loglevel", action="store", type=int, default=LOG_LEVEL)
+        parser.add_argument("-lf", "--logformat", action="store", type=str, default=LOG_FORMAT, choices=["text", "json"], help="Log format (text/json)")
         parser.add_argument("-s", "--service", action="store_true", default=False, help="Running as a service and should log to file")
         parser.add_argument("--exampleconfig", action="store_true", default=False, help="Print verbose configuration example to stdout and exit")
         parser.add_argument("--exampleconfigoverride", action="store_true", default=False, help="Print verbose configuration example to stdout and exit")
@@ -1595,7 +3766,7 @@ def main():
             print(DEFAULT_CONFIG_OVERRIDE)
             exit()
 
-        setup(path=params.path, path_rns=params.path_rns, path_log=params.path_log, loglevel=params.loglevel, service=params.service)
+        setup(path=params.path, path_rns=params.path_rns, path_log=params.path_log, loglevel=params.loglevel, logformat=params.logformat, service=params.service)
 
     except KeyboardInterrupt:
         print("Terminated by CTRL-C")
@@ -1676,6 +3847,7 @@ announce_startup_delay = 0 #Seconds
 # to let other peers reach it.
 announce_periodic = No
 announce_periodic_interval = 360 #Minutes
+announce_periodic_jitter = 0 #Seconds
 
 # The announce is hidden for client applications
 # but is still used for the routing tables.
@@ -1685,6 +3857,79 @@ announce_hidden = No
 # for LXMF/Reticulum processing.
 send_delay = 0 #Seconds
 
+# Outbound messages are queued and handed over to LXMF
+# in the background with this rate (0=Use send_delay).
+send_rate = 0 #Messages per second
+send_burst = 1 #Messages
+
+# Maximum number of queued outbound messages (0=Unlimited).
+send_queue_size = 0
+
+# Number of cached outbound destinations (0=Disabled).
+destination_cache_size = 1000
+
+# Time until a destination with unknown identity
+# is looked up again.
+destination_cache_unknown_ttl = 30 #Seconds
+
+# Number of destinations whose direct delivery results
+# are remembered (0=Disabled). After x failed direct deliveries
+# in a row, messages are sent as propagated messages right away
+# until the retry time has elapsed or the destination announces
+# again. Only used together with try_propagation_on_fail.
+reachability_size = 1000
+reachability_fails = 2
+reachability_retry = 60 #Minutes
+
+# Paths to known destinations without a path are requested
+# ahead of time, periodically and before a message is sent
+# to multiple recipients (0=Disabled).
+path_request_rate = 2 #Requests per second
+path_request_interval = 30 #Minutes
+
+# Number of received message hashes that are remembered
+# to drop messages received twice (0=Disabled).
+duplicate_cache_size = 10000
+duplicate_cache_ttl = 1440 #Minutes
+
+# Received messages are handed over to x worker threads
+# (0=Process directly). Messages of one source are always
+# processed in order by the same worker. This program is not
+# thread-safe: The workers process one message at a time, more
+# than one worker does not process messages in parallel.
+receive_workers = 0
+
+# Maximum number of queued received messages per worker (0=Unlimited).
+receive_queue_size = 1000
+
+# What happens if the queue is full (drop_oldest/reject).
+# A rejected message is answered with the reply text (if set).
+receive_overflow = drop_oldest
+receive_overflow_reply =
+
+# Field data (e.g. attachments) of received messages larger
+# than this size is moved to temporary files and read from
+# there when needed (0=Disabled).
+spool_threshold = 262144 #Bytes
+
+# Directory for these files (Empty=System temp directory).
+spool_path =
+
+# Number of sent messages whose delivery is tracked
+# (delivery state, latency, waiting for the result).
+delivery_size = 10000
+
+# Metrics endpoint (Prometheus text format) on http://host:port/metrics
+# (0=Disabled). Only bind to localhost unless access is restricted.
+metrics_port = 0
+metrics_host = 127.0.0.1
+
+# Profiling: SIGUSR1 starts/stops a CPU profile (cProfile) for
+# x seconds, SIGUSR2 writes the stacks of all threads and a memory
+# snapshot diff (tracemalloc). Files are written to the storage path.
+profile_signals = No
+profile_duration = 30 #Seconds
+
 # Sync LXMF messages at startup.
 sync_startup = No
 sync_startup_delay = 0 #Seconds
@@ -1694,6 +3939,14 @@ sync_periodic = No
 
 # The sync interval in minutes.
 sync_periodic_interval = 360 #Minutes
+sync_periodic_jitter = 0 #Seconds
+
+# Adaptive sync: If a sync reached the sync_limit, the next sync
+# follows immediately until all waiting messages are received.
+# If no messages were received, the sync interval is doubled
+# up to x times the sync_periodic_interval.
+sync_adaptive = No
+sync_adaptive_backoff = 8
 
 # Automatic LXMF syncs will only
 # download x messages at a time. You can change
@@ -37,16 +37,19 @@ import os
 import time
 import datetime
 import argparse
+import tempfile
+import shutil
 
 #### Config ####
 import configparser
 
 #### Variables ####
-from collections import defaultdict
+from collections import defaultdict, deque, OrderedDict
+import heapq
+from array import array
 
 #### JSON ####
 import json
-import pickle
 
 #### String ####
 import string
@@ -60,6 +63,19 @@ import fnmatch
 #### Process ####
 import signal
 import threading
+import atexit
+import asyncio
+
+#### Other ####
+import random
+import hashlib
+import mmap
+import weakref
+import http.server
+import cProfile
+import pstats
+import tracemalloc
+import traceback
 
 #### Reticulum, LXMF ####
 # Install: pip3 install rns lxmf
@@ -85,10 +101,18 @@ PATH_RNS = None
 #### Global Variables - System (Not changeable) ####
 DATA = None
 CONFIG = None
+CONFIG_SNAPSHOT = None
 STATISTIC = None
 RNS_MAIN_CONNECTION = None
 LXMF_CONNECTION = None
 RNS_CONNECTION = None
+FANOUT = None
+RATE_LIMITER = None
+RIGHTS = {}
+RECIPIENTS = {}
+TEMPLATES = {}
+TEMPLATES_SIZE = 10000
+TEMPLATE_VALUES = {}
 
 CONV_P2P                = 0x01
 CONV_GROUP              = 0x02
@@ -107,8 +131,19 @@ class lxmf_connection:
     message_notification_failed_callback = None
     config_set_callback = None
 
+    PATH_REQUEST_QUEUE_SIZE = 10000
+    PATH_REQUEST_TIMEOUT = 300
+    PATH_REQUEST_WAIT = 10
+    SYNC_TIMEOUT = 300
 
-    def __init__(self, storage_path=None, identity_file="identity", identity=None, destination_name="lxmf", destination_type="delivery", display_name="", announce_data=None, announce_hidden=False, send_delay=0, desired_method="direct", propagation_node=None, propagation_node_auto=False, propagation_node_active=None, try_propagation_on_fail=False, announce_startup=False, announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, sync_startup=False, sync_startup_delay=0, sync_limit=8, sync_periodic=False, sync_periodic_interval=360):
+    # Set by a host process (lxmf_host) which runs several tools in one process.
+    SCHEDULER = None
+    SCHEDULER_PREFIX = ""
+    RECEIVE_WORKERS_MIN = 0
+    MAIN_THREAD_CALL = None
+
+
+    def __init__(self, storage_path=None, identity_file="identity", identity=None, destination_name="lxmf", destination_type="delivery", display_name="", announce_data=None, announce_hidden=False, send_delay=0, send_rate=0, send_burst=1, send_queue_size=0, destination_cache_size=1000, destination_cache_unknown_ttl=30, reachability_size=1000, reachability_fails=2, reachability_retry=60, path_request_rate=2, path_request_interval=30, duplicate_cache_size=10000, duplicate_cache_ttl=1440, receive_workers=0, receive_concurrent=False, receive_queue_size=1000, receive_overflow="drop_oldest", receive_overflow_reply="", spool_threshold=262144, spool_path=None, delivery_size=10000, metrics_port=0, metrics_host="127.0.0.1", profile_signals=False, profile_duration=30, desired_method="direct", propagation_node=None, propagation_node_auto=False, propagation_node_active=None, try_propagation_on_fail=False, announce_startup=False, announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, announce_periodic_jitter=0, sync_startup=False, sync_startup_delay=0, sync_limit=8, sync_periodic=False, sync_periodic_interval=360, sync_periodic_jitter=0, sync_adaptive=False, sync_adaptive_backoff=8, scheduler=None):
         self.storage_path = storage_path
 
         self.identity_file = identity_file
@@ -124,6 +159,68 @@ class lxmf_connection:
         self.announce_hidden = announce_hidden
 
         self.send_delay = int(send_delay)
+        self.send_rate = float(send_rate)
+        if self.send_rate <= 0 and self.send_delay > 0:
+            self.send_rate = 1/self.send_delay
+        self.send_burst = max(int(send_burst), 1)
+        self.send_queue_size = int(send_queue_size)
+
+        self.destination_cache_size = int(destination_cache_size)
+        self.destination_cache_unknown_ttl = int(destination_cache_unknown_ttl)
+        self.destination_cache = OrderedDict()
+        self.destination_cache_unknown = {}
+        self.destination_cache_lock = threading.Lock()
+
+        self.reachability_size = int(reachability_size)
+        self.reachability_fails = int(reachability_fails)
+        self.reachability_retry = int(reachability_retry)
+        self.reachability = OrderedDict()
+        self.reachability_lock = threading.Lock()
+        self.reachability_unsaved = False
+        self.reachability_propagated = 0
+
+        self.path_request_rate = int(path_request_rate)
+        self.path_request_interval = int(path_request_interval)
+        self.path_request_queue = deque()
+        self.path_request_queued = set()
+        self.path_request_last = OrderedDict()
+        self.path_request_lock = threading.Lock()
+        self.path_requested = 0
+        self.path_warm = 0
+        self.path_cold = 0
+        self.path_deferred = OrderedDict()
+        self.path_deferred_count = 0
+
+        self.duplicate_cache_size = int(duplicate_cache_size)
+        self.duplicate_cache_ttl = int(duplicate_cache_ttl)
+        self.duplicate_cache = OrderedDict()
+        self.duplicate_cache_lock = threading.Lock()
+        self.duplicate_cache_unsaved = False
+        self.duplicate_hits = 0
+
+        self.receive_workers = max(int(receive_workers), self.RECEIVE_WORKERS_MIN)
+        self.receive_lock = None if receive_concurrent else threading.Lock()
+        self.receive_queue_size = int(receive_queue_size)
+        self.receive_overflow = receive_overflow
+        self.receive_overflow_reply = receive_overflow_reply
+        self.receive_dispatcher = None
+
+        self.spool_threshold = int(spool_threshold)
+        self.spool_path = spool_path
+        self.spooled = 0
+        self.spooled_bytes = 0
+
+        self.delivery_size = int(delivery_size)
+        self.deliveries = OrderedDict()
+        self.deliveries_lock = threading.Lock()
+        self.deliveries_expired = 0
+
+        self.metrics_port = int(metrics_port)
+        self.metrics_host = metrics_host
+        self.metrics = lxmf_metrics()
+
+        self.profile_signals = profile_signals
+        self.profile_duration = int(profile_duration)
 
         if desired_method == "propagated" or desired_method == "PROPAGATED":
             self.desired_method_direct = False
@@ -139,17 +236,47 @@ class lxmf_connection:
 
         self.announce_periodic = announce_periodic
         self.announce_periodic_interval = int(announce_periodic_interval)
+        self.announce_periodic_jitter = int(announce_periodic_jitter)
+        self.announce_job = None
 
         self.sync_startup = sync_startup
         self.sync_startup_delay = int(sync_startup_delay)
         self.sync_limit = int(sync_limit)
         self.sync_periodic = sync_periodic
         self.sync_periodic_interval = int(sync_periodic_interval)
+        self.sync_periodic_jitter = int(sync_periodic_jitter)
+        self.sync_adaptive = sync_adaptive
+        self.sync_adaptive_backoff = max(int(sync_adaptive_backoff), 1)
+        self.sync_job = None
+        self.sync_job_monitor = None
+        self.sync_backoff = 1
+        self.sync_drain_time = None
+        self.sync_count = 0
+        self.sync_failed = 0
+        self.sync_messages_last = 0
+        self.sync_messages_sum = 0
+        self.sync_duration_last = 0
+        self.sync_drain_last = 0
+
+        if scheduler is None:
+            if self.SCHEDULER is None:
+                scheduler = lxmf_scheduler()
+            elif self.SCHEDULER_PREFIX:
+                scheduler = lxmf_scheduler_prefix(self.SCHEDULER, self.SCHEDULER_PREFIX)
+            else:
+                scheduler = self.SCHEDULER
+        self.scheduler = scheduler
 
         if not self.storage_path:
             log("LXMF - No storage_path parameter", LOG_ERROR)
             return
 
+        self.profiler = lxmf_profiler(self.storage_path)
+        if self.scheduler.profiler is None:
+            self.scheduler.profiler = self.profiler
+        if self.profile_signals:
+            self.profiler.signals(self.profile_duration)
+
         if not os.path.isdir(self.storage_path):
             os.makedirs(self.storage_path)
             log("LXMF - Storage path was created", LOG_NOTICE)
@@ -181,7 +308,58 @@ class lxmf_connection:
                     log("LXMF - Could not create and save a new Primary Identity", LOG_ERROR)
                     log("LXMF - The contained exception was: %s" % (str(e)), LOG_ERROR)
 
-        self.message_router = LXMF.LXMRouter(identity=self.identity, storagepath=self.storage_path)
+        # The LXMF router installs signal handlers, which is only possible in the main thread.
+        if self.MAIN_THREAD_CALL is not None and threading.current_thread() is not threading.main_thread():
+            self.message_router = self.MAIN_THREAD_CALL(LXMF.LXMRouter, identity=self.identity, storagepath=self.storage_path)
+        else:
+            self.message_router = LXMF.LXMRouter(identity=self.identity, storagepath=self.storage_path)
+
+        # RNS and the LXMF router have installed their signal handlers, which end the program without atexit.
+        exit_signals()
+
+        self.send_queue = deque()
+        self.send_queue_condition = threading.Condition()
+        self.send_queue_enqueued = 0
+        self.send_queue_sent = 0
+        self.send_queue_failed = 0
+        self.send_queue_dropped = 0
+        self.send_queue_latency_last = 0
+        self.send_queue_latency_max = 0
+        self.send_queue_latency_sum = 0
+        self.send_tokens = self.send_burst
+        self.send_tokens_time = time.time()
+        self.send_queue_thread = threading.Thread(target=self.send_queue_process, daemon=True)
+        self.send_queue_thread.start()
+
+        self.reachability_callback = lxmf_connection_reachability(self, self.aspect_filter)
+        RNS.Transport.register_announce_handler(self.reachability_callback)
+
+        if self.reachability_size > 0:
+            self.reachability_path = self.storage_path + "/reachability.data"
+            self.reachability_load()
+            self.scheduler.add("LXMF - Reachability save", self.reachability_save, interval=300)
+            exit_register(self.reachability_save)
+
+        if self.spool_threshold > 0:
+            if not self.spool_path:
+                self.spool_path = tempfile.mkdtemp(prefix="lxmf_spool_")
+                exit_register(shutil.rmtree, self.spool_path, True)
+            elif not os.path.isdir(self.spool_path):
+                os.makedirs(self.spool_path)
+
+        if self.receive_workers > 0:
+            self.receive_dispatcher = lxmf_connection_dispatcher(self, self.receive_workers, self.receive_queue_size, self.receive_overflow)
+
+        if self.duplicate_cache_size > 0:
+            self.duplicate_cache_path = self.storage_path + "/duplicate.data"
+            self.duplicate_cache_load()
+            self.scheduler.add("LXMF - Duplicate save", self.duplicate_cache_save, interval=60)
+            exit_register(self.duplicate_cache_save)
+
+        if self.path_request_rate > 0:
+            self.scheduler.add("LXMF - Path request", self.path_request_process, interval=1)
+            if self.path_request_interval > 0:
+                self.scheduler.add("LXMF - Path warm", self.path_warm_all, interval=self.path_request_interval*60, jitter=60)
 
         if self.destination_name == "lxmf" and self.destination_type == "delivery":
             self.destination = self.message_router.register_delivery_identity(self.identity, display_name=self.display_name)
@@ -220,6 +398,21 @@ class lxmf_connection:
         if self.sync_startup or self.sync_periodic:
             self.sync(True)
 
+        self.metrics.gauge("send_queue", self.send_queue_stat)
+        self.metrics.gauge("path", self.path_stat)
+        self.metrics.gauge("reachability", self.reachability_stat)
+        self.metrics.gauge("duplicate", self.duplicate_stat)
+        self.metrics.gauge("receive_queue", self.receive_stat)
+        self.metrics.gauge("sync", self.sync_stat)
+        self.metrics.gauge("spool", self.spool_stat)
+        self.metrics.gauge("delivery", self.delivery_stat)
+        self.metrics.gauge("scheduler", self.scheduler.stat, "job")
+        if self.propagation_node_auto:
+            self.metrics.gauge("propagation", self.propagation_callback.stat)
+
+        if self.metrics_port > 0:
+            self.metrics.start(self.metrics_host, self.metrics_port)
+
 
     def register_announce_callback(self, handler_function):
         self.announce_callback = handler_function(self.aspect_filter)
@@ -309,29 +502,273 @@ class lxmf_connection:
         if destination_type == None:
             destination_type = self.destination_type
 
-        destination_identity = RNS.Identity.recall(destination)
-        destination = RNS.Destination(destination_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, destination_name, destination_type)
+        destination = self.destination_get(destination, destination_name, destination_type)
+        if destination == None:
+            return None
+
         return self.send_message(destination, self.destination, content, title, fields, timestamp, app_data)
 
 
-    def send_message(self, destination, source, content="", title="", fields=None, timestamp=None, app_data=""):
-        if self.desired_method_direct:
-            desired_method = LXMF.LXMessage.DIRECT
+    def send_many(self, destinations, content="", title="", fields=None, timestamp=None, app_data="", destination_name=None, destination_type=None):
+        batch = lxmf_connection_batch(app_data)
+
+        if fields is not None and not isinstance(fields, dict):
+            log("LXMF - Fields are invalid", LOG_ERROR)
+            return batch
+
+        if fields is not None:
+            fields = lxmf_attachment.unspool(fields)
+
+        if destination_name == None:
+            destination_name = self.destination_name
+        if destination_type == None:
+            destination_type = self.destination_type
+
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        if isinstance(title, str):
+            title = title.encode("utf-8")
+
+        if self.message_router.get_outbound_propagation_node() != None:
+            try_propagation_on_fail = self.try_propagation_on_fail
+        else:
+            try_propagation_on_fail = None
+
+        messages = []
+        for destination in destinations:
+            batch.total += 1
+
+            destination_hash = self.destination_bytes(destination)
+            if destination_hash == None:
+                batch.invalid += 1
+                continue
+
+            destination = self.destination_get(destination_hash, destination_name, destination_type)
+            if destination == None:
+                batch.invalid += 1
+                continue
+
+            desired_method = self.reachability_method(destination_hash)
+
+            message = LXMF.LXMessage(destination, self.destination, content, title=title, desired_method=desired_method)
+
+            if fields is not None:
+                message.fields = fields
+
+            if timestamp is not None:
+                message.timestamp = timestamp
+
+            message.app_data = app_data
+            message.batch = batch
+
+            self.message_method(message)
+
+            message.register_delivery_callback(self.message_notification)
+            message.register_failed_callback(self.message_notification)
+
+            if try_propagation_on_fail != None:
+                message.try_propagation_on_fail = try_propagation_on_fail
+
+            try:
+                message.pack()
+            except Exception as e:
+                batch.invalid += 1
+                log("LXMF - Could not pack message " + str(message), LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+                continue
+
+            messages.append(message)
+
+        if self.path_request_rate > 0:
+            self.path_request_many([message.destination_hash for message in messages if message.desired_method == LXMF.LXMessage.DIRECT])
+
+        if len(messages) > 0:
+            self.log_message(messages[0], "LXMF - Message send (" + str(len(messages)) + " recipients)")
+            send_time = time.time()
+            for message in messages:
+                message.send_time = send_time
+            batch.queued = self.send_queue_put_many(messages)
+            batch.dropped = len(messages) - batch.queued
+
+        log("LXMF - Batch " + str(batch), LOG_DEBUG)
+
+        return batch
+
+
+    def destination_bytes(self, destination):
+        if type(destination) is bytes:
+            return destination
+
+        if len(destination) == ((RNS.Reticulum.TRUNCATED_HASHLENGTH//8)*2)+2:
+            destination = destination[1:-1]
+
+        if len(destination) != ((RNS.Reticulum.TRUNCATED_HASHLENGTH//8)*2):
+            return None
+
+        try:
+            return bytes.fromhex(destination)
+        except Exception as e:
+            return None
+
+
+    def destination_get(self, destination_hash, destination_name, destination_type):
+        key = (destination_hash, destination_name + "." + destination_type)
+
+        with self.destination_cache_lock:
+            if key in self.destination_cache:
+                self.destination_cache.move_to_end(key)
+                return self.destination_cache[key]
+
+            if destination_hash in self.destination_cache_unknown:
+                if self.destination_cache_unknown[destination_hash] > time.time():
+                    return None
+                del self.destination_cache_unknown[destination_hash]
+
+        destination_identity = RNS.Identity.recall(destination_hash)
+        if destination_identity == None:
+            log("LXMF - Destination identity " + RNS.prettyhexrep(destination_hash) + " not known", LOG_DEBUG)
+            if self.destination_cache_size > 0 and self.destination_cache_unknown_ttl > 0:
+                with self.destination_cache_lock:
+                    if len(self.destination_cache_unknown) >= self.destination_cache_size:
+                        now = time.time()
+                        for key_unknown in [key_unknown for key_unknown, expire in self.destination_cache_unknown.items() if expire <= now]:
+                            del self.destination_cache_unknown[key_unknown]
+                        if len(self.destination_cache_unknown) >= self.destination_cache_size:
+                            del self.destination_cache_unknown[next(iter(self.destination_cache_unknown))]
+                    self.destination_cache_unknown[destination_hash] = time.time() + self.destination_cache_unknown_ttl
+            return None
+
+        destination = RNS.Destination(destination_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, destination_name, destination_type)
+
+        if self.destination_cache_size > 0:
+            with self.destination_cache_lock:
+                self.destination_cache[key] = destination
+                if len(self.destination_cache) > self.destination_cache_size:
+                    self.destination_cache.popitem(last=False)
+
+        return destination
+
+
+    def destination_cache_invalidate(self, destination_hash=None):
+        with self.destination_cache_lock:
+            if destination_hash == None:
+                self.destination_cache.clear()
+                self.destination_cache_unknown.clear()
+                return
+
+            for key in [key for key in self.destination_cache if key[0] == destination_hash]:
+                del self.destination_cache[key]
+            self.destination_cache_unknown.pop(destination_hash, None)
+
+
+    def reachability_method(self, destination_hash):
+        if not self.desired_method_direct:
+            return LXMF.LXMessage.PROPAGATED
+
+        if self.reachability_size > 0 and self.try_propagation_on_fail and self.message_router.get_outbound_propagation_node() != None:
+            with self.reachability_lock:
+                entry = self.reachability.get(destination_hash)
+                if entry != None and entry[2] >= self.reachability_fails and time.time() - entry[1] < self.reachability_retry*60:
+                    self.reachability_propagated += 1
+                    return LXMF.LXMessage.PROPAGATED
+
+        return LXMF.LXMessage.DIRECT
+
+
+    def reachability_entry(self, destination_hash):
+        entry = self.reachability.get(destination_hash)
+        if entry == None:
+            entry = [0, 0, 0, None, False]
+            self.reachability[destination_hash] = entry
+            if len(self.reachability) > self.reachability_size:
+                self.reachability.popitem(last=False)
         else:
-            desired_method = LXMF.LXMessage.PROPAGATED
+            self.reachability.move_to_end(destination_hash)
+        return entry
+
+
+    def reachability_update(self, destination_hash, success):
+        path = RNS.Transport.has_path(destination_hash)
+        with self.reachability_lock:
+            entry = self.reachability_entry(destination_hash)
+            if success:
+                entry[0] = time.time()
+                entry[2] = 0
+            else:
+                entry[1] = time.time()
+                entry[2] += 1
+            entry[3] = RNS.Transport.hops_to(destination_hash) if path else None
+            entry[4] = path
+            self.reachability_unsaved = True
+
+
+    def reachability_announce(self, destination_hash):
+        with self.reachability_lock:
+            entry = self.reachability.get(destination_hash)
+            if entry == None:
+                return
+            entry[2] = 0
+            entry[3] = RNS.Transport.hops_to(destination_hash)
+            entry[4] = True
+            self.reachability_unsaved = True
+
+
+    def reachability_load(self):
+        if not os.path.isfile(self.reachability_path):
+            return
+        try:
+            with open(self.reachability_path, "rb") as fh:
+                data = umsgpack.unpackb(fh.read())
+            with self.reachability_lock:
+                for destination_hash, entry in data.items():
+                    self.reachability[destination_hash] = list(entry)
+                while len(self.reachability) > self.reachability_size:
+                    self.reachability.popitem(last=False)
+            log("LXMF - Reachability loaded (" + str(len(self.reachability)) + " destinations)", LOG_DEBUG)
+        except Exception as e:
+            log("LXMF - Could not load the reachability from " + self.reachability_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def reachability_save(self):
+        if not self.reachability_unsaved:
+            return
+        try:
+            with self.reachability_lock:
+                data = umsgpack.packb(dict(self.reachability))
+                self.reachability_unsaved = False
+            with open(self.reachability_path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(self.reachability_path + ".tmp", self.reachability_path)
+        except Exception as e:
+            log("LXMF - Could not save the reachability to " + self.reachability_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def reachability_stat(self):
+        with self.reachability_lock:
+            return {
+                "destinations": len(self.reachability),
+                "unreachable": sum(1 for entry in self.reachability.values() if entry[2] >= self.reachability_fails),
+                "propagated": self.reachability_propagated,
+            }
+
+
+    def send_message(self, destination, source, content="", title="", fields=None, timestamp=None, app_data=""):
+        desired_method = self.reachability_method(destination.hash)
 
         message = LXMF.LXMessage(destination, source, content, title=title, desired_method=desired_method)
 
         if fields is not None:
-            message.fields = fields
+            message.fields = lxmf_attachment.unspool(fields)
 
         if timestamp is not None:
             message.timestamp = timestamp
 
         message.app_data = app_data
+        message.send_time = time.time()
 
         self.message_method(message)
-        self.log_message(message, "LXMF - Message send")
 
         message.register_delivery_callback(self.message_notification)
         message.register_failed_callback(self.message_notification)
@@ -340,18 +777,280 @@ class lxmf_connection:
             message.try_propagation_on_fail = self.try_propagation_on_fail
 
         try:
-            self.message_router.handle_outbound(message)
-            time.sleep(self.send_delay)
-            return message.hash
+            message.pack()
         except Exception as e:
-            log("LXMF - Could not send message " + str(message), LOG_ERROR)
+            log("LXMF - Could not pack message " + str(message), LOG_ERROR)
             log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
             return None
 
+        self.log_message(message, "LXMF - Message send")
+
+        delivery = self.delivery_register(message)
+
+        if not self.send_queue_put(message):
+            self.delivery_complete(message, lxmf_delivery.FAILED)
+            return None
+
+        return delivery
+
+
+    def send_queue_put(self, message):
+        with self.send_queue_condition:
+            if self.send_queue_size > 0 and len(self.send_queue) >= self.send_queue_size:
+                self.send_queue_dropped += 1
+                log("LXMF - Send queue full (" + str(len(self.send_queue)) + "), message " + str(message) + " dropped", LOG_WARNING)
+                return False
+            self.send_queue.append((message, time.time()))
+            self.send_queue_enqueued += 1
+            self.send_queue_condition.notify()
+        return True
+
+
+    def send_queue_put_many(self, messages):
+        with self.send_queue_condition:
+            count = len(messages)
+            if self.send_queue_size > 0:
+                count = max(min(count, self.send_queue_size - len(self.send_queue)), 0)
+                if count < len(messages):
+                    self.send_queue_dropped += len(messages) - count
+                    log("LXMF - Send queue full (" + str(len(self.send_queue)) + "), " + str(len(messages) - count) + " messages dropped", LOG_WARNING)
+            now = time.time()
+            self.send_queue.extend([(message, now) for message in messages[:count]])
+            self.send_queue_enqueued += count
+            self.send_queue_condition.notify()
+        return count
+
+
+    def send_queue_process(self):
+        while True:
+            with self.send_queue_condition:
+                while len(self.send_queue) == 0:
+                    self.send_queue_condition.wait()
+                message, enqueued = self.send_queue.popleft()
+
+            if self.path_defer(message, enqueued):
+                continue
+
+            self.send_queue_pace()
+
+            latency = time.time() - enqueued
+            self.send_queue_latency_last = latency
+            self.send_queue_latency_sum += latency
+            if latency > self.send_queue_latency_max:
+                self.send_queue_latency_max = latency
+
+            if message.desired_method == LXMF.LXMessage.DIRECT:
+                if RNS.Transport.has_path(message.destination_hash):
+                    self.path_warm += 1
+                else:
+                    self.path_cold += 1
+
+            try:
+                self.profiler.call(self.message_router.handle_outbound, message)
+                self.send_queue_sent += 1
+                self.metrics.inc("messages_sent", method=message.desired_method_str)
+            except Exception as e:
+                self.send_queue_failed += 1
+                self.metrics.inc("messages_failed", method=message.desired_method_str)
+                self.delivery_complete(message, lxmf_delivery.FAILED)
+                log("LXMF - Could not send message " + str(message), LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def delivery_register(self, message):
+        delivery = lxmf_delivery(message)
+        if self.delivery_size <= 0:
+            return delivery
+        expired = None
+        with self.deliveries_lock:
+            self.deliveries[message.hash] = delivery
+            if len(self.deliveries) > self.delivery_size:
+                expired = self.deliveries.popitem(last=False)[1]
+                self.deliveries_expired += 1
+        if expired != None:
+            expired.complete(lxmf_delivery.EXPIRED)
+        return delivery
+
+
+    def delivery_complete(self, message, state):
+        with self.deliveries_lock:
+            delivery = self.deliveries.pop(message.hash, None)
+        if delivery != None:
+            delivery.complete(state)
+
+
+    def delivery_get(self, message_hash):
+        with self.deliveries_lock:
+            return self.deliveries.get(message_hash)
+
+
+    def delivery_stat(self):
+        with self.deliveries_lock:
+            return {
+                "pending": len(self.deliveries),
+                "expired": self.deliveries_expired,
+            }
+
+
+    def send_queue_pace(self):
+        if self.send_rate <= 0:
+            return
+
+        now = time.time()
+        self.send_tokens = min(self.send_burst, self.send_tokens + (now - self.send_tokens_time) * self.send_rate)
+        self.send_tokens_time = now
+
+        if self.send_tokens < 1:
+            time.sleep((1 - self.send_tokens) / self.send_rate)
+            self.send_tokens = 1
+            self.send_tokens_time = time.time()
+
+        self.send_tokens -= 1
+
+
+    def send_queue_stat(self):
+        with self.send_queue_condition:
+            depth = len(self.send_queue)
+        handoff = self.send_queue_sent + self.send_queue_failed
+        return {
+            "depth": depth,
+            "enqueued": self.send_queue_enqueued,
+            "sent": self.send_queue_sent,
+            "failed": self.send_queue_failed,
+            "dropped": self.send_queue_dropped,
+            "latency_last": round(self.send_queue_latency_last, 3),
+            "latency_max": round(self.send_queue_latency_max, 3),
+            "latency_avg": round(self.send_queue_latency_sum/handoff, 3) if handoff > 0 else 0,
+        }
+
+
+    def path_request_many(self, destination_hashes):
+        count = 0
+        now = time.time()
+        with self.path_request_lock:
+            for destination_hash in destination_hashes:
+                if destination_hash in self.path_request_queued:
+                    continue
+                if len(self.path_request_queue) >= self.PATH_REQUEST_QUEUE_SIZE:
+                    break
+                if now - self.path_request_last.get(destination_hash, 0) < self.PATH_REQUEST_TIMEOUT:
+                    continue
+                if RNS.Transport.has_path(destination_hash):
+                    continue
+                self.path_request_queue.append(destination_hash)
+                self.path_request_queued.add(destination_hash)
+                count += 1
+        return count
+
+
+    def path_request_process(self):
+        with self.path_request_lock:
+            destination_hashes = []
+            while len(self.path_request_queue) > 0 and len(destination_hashes) < self.path_request_rate:
+                destination_hash = self.path_request_queue.popleft()
+                self.path_request_queued.discard(destination_hash)
+                self.path_request_last[destination_hash] = time.time()
+                self.path_request_last.move_to_end(destination_hash)
+                destination_hashes.append(destination_hash)
+            while len(self.path_request_last) > self.PATH_REQUEST_QUEUE_SIZE:
+                self.path_request_last.popitem(last=False)
+
+        for destination_hash in destination_hashes:
+            if RNS.Transport.has_path(destination_hash):
+                continue
+            try:
+                RNS.Transport.request_path(destination_hash)
+                self.path_requested += 1
+            except Exception as e:
+                log("LXMF - Could not request path to " + RNS.prettyhexrep(destination_hash) + ": " + str(e), LOG_ERROR)
+
+        self.path_deferred_release()
+
+
+    # Direct messages to a destination with a pending path request (path_request_many) wait for the path in the send queue.
+    # Otherwise the LXMF router would request the path itself, bypassing the rate of the path requests.
+    # Later messages to the same destination wait too, so the order is kept.
+    def path_defer(self, message, enqueued):
+        if message.desired_method != LXMF.LXMessage.DIRECT or hasattr(message, "path_deferred"):
+            return False
+
+        destination_hash = message.destination_hash
+        with self.path_request_lock:
+            if destination_hash in self.path_deferred:
+                self.path_deferred[destination_hash][1].append((message, enqueued))
+                self.path_deferred_count += 1
+                return True
+            if destination_hash not in self.path_request_queued and time.time() - self.path_request_last.get(destination_hash, 0) >= self.PATH_REQUEST_WAIT:
+                return False
+            if RNS.Transport.has_path(destination_hash):
+                return False
+            self.path_deferred[destination_hash] = (time.time(), [(message, enqueued)])
+            self.path_deferred_count += 1
+            return True
+
+
+    # The messages are sent when the path is known, PATH_REQUEST_WAIT seconds after the path request
+    # or at the latest after PATH_REQUEST_TIMEOUT seconds.
+    def path_deferred_release(self):
+        released = []
+        now = time.time()
+        with self.path_request_lock:
+            for destination_hash, (deferred, messages) in list(self.path_deferred.items()):
+                if destination_hash in self.path_request_queued and now - deferred < self.PATH_REQUEST_TIMEOUT:
+                    continue
+                if now - self.path_request_last.get(destination_hash, 0) < self.PATH_REQUEST_WAIT and not RNS.Transport.has_path(destination_hash):
+                    continue
+                del self.path_deferred[destination_hash]
+                self.path_deferred_count -= len(messages)
+                released.extend(messages)
+
+        for message, enqueued in released:
+            message.path_deferred = True
+
+        if len(released) > 0:
+            with self.send_queue_condition:
+                self.send_queue.extendleft(reversed(released))
+                self.send_queue_condition.notify()
+
+
+    def path_warm_all(self):
+        with self.destination_cache_lock:
+            destination_hashes = [key[0] for key in self.destination_cache]
+        with self.reachability_lock:
+            destination_hashes.extend(self.reachability.keys())
+        count = self.path_request_many(dict.fromkeys(destination_hashes))
+        if count > 0:
+            log("LXMF - Path requests queued for " + str(count) + " destinations", LOG_DEBUG)
+
+
+    def path_stat(self):
+        with self.path_request_lock:
+            depth = len(self.path_request_queue)
+            deferred = self.path_deferred_count
+        return {
+            "depth": depth,
+            "deferred": deferred,
+            "requested": self.path_requested,
+            "warm": self.path_warm,
+            "cold": self.path_cold,
+        }
+
 
     def message_notification(self, message):
         self.message_method(message)
 
+        if self.propagation_node_auto and message.desired_method == LXMF.LXMessage.PROPAGATED:
+            if message.state == LXMF.LXMessage.SENT:
+                self.propagation_callback.result(self.propagation_node_hash(), True)
+            elif message.state == LXMF.LXMessage.FAILED:
+                self.propagation_callback.result(self.propagation_node_hash(), False)
+
+        if self.reachability_size > 0 and message.desired_method == LXMF.LXMessage.DIRECT:
+            if message.state == LXMF.LXMessage.DELIVERED:
+                self.reachability_update(message.destination_hash, True)
+            elif message.state == LXMF.LXMessage.FAILED:
+                self.reachability_update(message.destination_hash, False)
+
         if self.message_notification_callback is not None:
             self.message_notification_callback(message)
 
@@ -365,10 +1064,22 @@ class lxmf_connection:
             self.message_router.handle_outbound(message)
         elif message.state == LXMF.LXMessage.FAILED:
             self.log_message(message, "LXMF - Delivery receipt (failed)")
+            self.metrics.inc("messages_failed", method=message.desired_method_str)
+            if hasattr(message, "batch"):
+                message.batch.update(message)
+            else:
+                self.delivery_complete(message, lxmf_delivery.FAILED)
             if self.message_notification_failed_callback is not None:
                 self.message_notification_failed_callback(message)
         else:
             self.log_message(message, "LXMF - Delivery receipt (success)")
+            self.metrics.inc("messages_delivered", method=message.desired_method_str)
+            if hasattr(message, "send_time"):
+                self.metrics.observe("delivery_latency_seconds", time.time() - message.send_time, method=message.desired_method_str)
+            if hasattr(message, "batch"):
+                message.batch.update(message)
+            else:
+                self.delivery_complete(message, lxmf_delivery.DELIVERED)
             if self.message_notification_success_callback is not None:
                 self.message_notification_success_callback(message)
 
@@ -381,29 +1092,27 @@ class lxmf_connection:
 
 
     def announce(self, app_data=None, attached_interface=None, initial=False):
-        announce_timer = None
-
-        if self.announce_periodic and self.announce_periodic_interval > 0:
-            announce_timer = threading.Timer(self.announce_periodic_interval*60, self.announce)
-            announce_timer.daemon = True
-            announce_timer.start()
-
         if initial:
+            delay = None
             if self.announce_startup:
                 if self.announce_startup_delay > 0:
-                    if announce_timer is not None:
-                        announce_timer.cancel()
-                    announce_timer = threading.Timer(self.announce_startup_delay, self.announce)
-                    announce_timer.daemon = True
-                    announce_timer.start()
+                    delay = self.announce_startup_delay
                 else:
                     self.announce_now(app_data=app_data, attached_interface=attached_interface)
+            if self.announce_periodic and self.announce_periodic_interval > 0:
+                self.announce_job = self.scheduler.add("LXMF - Announce", self.announce_now, interval=self.announce_periodic_interval*60, delay=delay, jitter=self.announce_periodic_jitter)
+            elif delay is not None:
+                self.announce_job = self.scheduler.add("LXMF - Announce", self.announce_now, delay=delay)
+            return
+
+        if app_data is None and attached_interface is None and self.announce_job is not None and self.announce_job.run_now():
             return
 
         self.announce_now(app_data=app_data, attached_interface=attached_interface)
 
 
     def announce_now(self, app_data=None, attached_interface=None):
+        self.metrics.inc("announces_sent")
         if self.announce_hidden:
             self.destination.announce("".encode("utf-8"), attached_interface=attached_interface)
             log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) +" (Hidden)", LOG_DEBUG)
@@ -427,23 +1136,20 @@ class lxmf_connection:
 
 
     def sync(self, initial=False):
-        sync_timer = None
-
-        if self.sync_periodic and self.sync_periodic_interval > 0:
-            sync_timer = threading.Timer(self.sync_periodic_interval*60, self.sync)
-            sync_timer.daemon = True
-            sync_timer.start()
-
         if initial:
+            delay = None
             if self.sync_startup:
                 if self.sync_startup_delay > 0:
-                    if sync_timer is not None:
-                        sync_timer.cancel()
-                    sync_timer = threading.Timer(self.sync_startup_delay, self.sync)
-                    sync_timer.daemon = True
-                    sync_timer.start()
+                    delay = self.sync_startup_delay
                 else:
                     self.sync_now(self.sync_limit)
+            if self.sync_periodic and self.sync_periodic_interval > 0:
+                self.sync_job = self.scheduler.add("LXMF - Sync", self.sync_now, interval=self.sync_periodic_interval*60, delay=delay, jitter=self.sync_periodic_jitter, args=(self.sync_limit,))
+            elif delay is not None:
+                self.sync_job = self.scheduler.add("LXMF - Sync", self.sync_now, delay=delay, args=(self.sync_limit,))
+            return
+
+        if self.sync_job is not None and self.sync_job.run_now():
             return
 
         self.sync_now(self.sync_limit)
@@ -454,6 +1160,13 @@ class lxmf_connection:
             if self.message_router.propagation_transfer_state == LXMF.LXMRouter.PR_IDLE or self.message_router.propagation_transfer_state == LXMF.LXMRouter.PR_COMPLETE:
                 log("LXMF - Message sync requested from propagation node " + RNS.prettyhexrep(self.message_router.get_outbound_propagation_node()) + " for " + str(self.identity), LOG_DEBUG)
                 self.message_router.request_messages_from_propagation_node(self.identity, max_messages = limit)
+                if self.sync_job_monitor == None:
+                    self.sync_time = time.time()
+                    self.sync_node = self.propagation_node_hash()
+                    self.sync_limit_last = limit
+                    if self.sync_drain_time == None:
+                        self.sync_drain_time = self.sync_time
+                    self.sync_job_monitor = self.scheduler.add("LXMF - Sync monitor", self.sync_monitor, interval=1)
                 return True
             else:
                 return False
@@ -461,6 +1174,68 @@ class lxmf_connection:
             return False
 
 
+    def sync_monitor(self):
+        state = self.message_router.propagation_transfer_state
+        duration = time.time() - self.sync_time
+        if state == LXMF.LXMRouter.PR_COMPLETE:
+            success = True
+        elif state >= LXMF.LXMRouter.PR_NO_PATH or duration > self.SYNC_TIMEOUT:
+            success = False
+        else:
+            return
+        self.sync_job_monitor.cancel()
+        self.sync_job_monitor = None
+
+        if self.propagation_node_auto:
+            self.propagation_callback.result(self.sync_node, success, duration if success else None)
+
+        self.sync_count += 1
+        self.sync_duration_last = duration
+
+        if not success:
+            self.sync_failed += 1
+            self.sync_drain_time = None
+            log("LXMF - Message sync failed after " + str(round(duration, 1)) + " seconds", LOG_DEBUG)
+            return
+
+        messages = self.message_router.propagation_transfer_last_result or 0
+        self.sync_messages_last = messages
+        self.sync_messages_sum += messages
+        log("LXMF - Message sync completed: " + str(messages) + " messages in " + str(round(duration, 1)) + " seconds", LOG_DEBUG)
+
+        if self.sync_limit_last and messages >= self.sync_limit_last:
+            if self.sync_adaptive:
+                self.sync_backoff = 1
+                self.sync_now(self.sync_limit_last)
+            return
+
+        self.sync_drain_last = time.time() - self.sync_drain_time
+        self.sync_drain_time = None
+
+        if self.sync_adaptive and self.sync_job is not None:
+            if messages == 0:
+                backoff = min(self.sync_backoff*2, self.sync_adaptive_backoff)
+            else:
+                backoff = 1
+            if backoff != self.sync_backoff:
+                self.sync_backoff = backoff
+                self.scheduler.reschedule(self.sync_job, self.sync_periodic_interval*60*backoff)
+                log("LXMF - Message sync interval: " + str(self.sync_periodic_interval*backoff) + " minutes", LOG_DEBUG)
+
+
+    def sync_stat(self):
+        return {
+            "syncs": self.sync_count,
+            "failed": self.sync_failed,
+            "messages_last": self.sync_messages_last,
+            "messages_sum": self.sync_messages_sum,
+            "messages_avg": round(self.sync_messages_sum/(self.sync_count - self.sync_failed), 1) if self.sync_count > self.sync_failed else 0,
+            "duration_last": round(self.sync_duration_last, 3),
+            "drain_last": round(self.sync_drain_last, 3),
+            "backoff": self.sync_backoff,
+        }
+
+
     def propagation_node_set(self, dest_str):
         if not dest_str:
             return False
@@ -522,12 +1297,105 @@ class lxmf_connection:
     def resource_concluded(self, resource):
         log("LXMF - Resource data transfer (multi packet) delivered " + str(resource.file), LOG_EXTREME)
         if resource.status == RNS.Resource.COMPLETE:
+            if self.spool_threshold > 0 and os.fstat(resource.data.fileno()).st_size >= self.spool_threshold:
+                try:
+                    message = self.resource_unpack(resource.data)
+                except Exception as e:
+                    log("LXMF - Could not assemble LXMF message from received data", LOG_ERROR)
+                    log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+                    return
+                finally:
+                    resource.data.close()
+                self.process_lxmf_message(message)
+                return
             lxmf_bytes = resource.data.read()
+            resource.data.close()
             self.process_lxmf_message_bytes(lxmf_bytes)
         else:
             log("LXMF - Received resource message is not complete", LOG_EXTREME)
 
 
+    # Unpacks a message directly from the file of the resource (like LXMF.LXMessage.unpack_from_bytes).
+    # Fields of at least spool_threshold bytes are copied to the spool directory without reading them into memory.
+    # The signature is validated against a memory mapped copy of the signed part.
+    def resource_unpack(self, fh):
+        size = os.fstat(fh.fileno()).st_size
+        destination_hash = lxmf_attachment.read_exactly(fh, LXMF.LXMessage.DESTINATION_LENGTH)
+        source_hash = lxmf_attachment.read_exactly(fh, LXMF.LXMessage.DESTINATION_LENGTH)
+        signature = lxmf_attachment.read_exactly(fh, LXMF.LXMessage.SIGNATURE_LENGTH)
+
+        payload_start = fh.tell()
+        header = lxmf_attachment.read_exactly(fh, 1)
+        if header[0] not in (0x94, 0x95):
+            raise ValueError("Invalid payload")
+        attachments = []
+        timestamp = lxmf_attachment.unpack(fh)
+        title = lxmf_attachment.unpack(fh)
+        content = lxmf_attachment.unpack(fh)
+        fields = lxmf_attachment.unpack(fh, self.spool_path, self.spool_threshold, attachments)
+        payload_end = fh.tell()
+        stamp = lxmf_attachment.unpack(fh) if header[0] == 0x95 else None
+
+        destination_identity = RNS.Identity.recall(destination_hash)
+        if destination_identity != None:
+            destination = RNS.Destination(destination_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "lxmf", "delivery")
+        else:
+            destination = None
+
+        source_identity = RNS.Identity.recall(source_hash)
+        if source_identity != None:
+            source = RNS.Destination(source_identity, RNS.Destination.OUT, RNS.Destination.SINGLE, "lxmf", "delivery")
+        else:
+            source = None
+
+        message = LXMF.LXMessage(destination, source, "", title="", fields=fields, destination_hash=destination_hash, source_hash=source_hash)
+        message.signature = signature
+        message.stamp = stamp
+        message.incoming = True
+        message.timestamp = timestamp
+        message.packed = None
+        message.packed_size = size
+        message.set_title_from_bytes(title)
+        message.set_content_from_bytes(content)
+
+        # The hashed part is the payload without the stamp (header of 4 items).
+        fd, file = tempfile.mkstemp(dir=self.spool_path, suffix=".signed")
+        try:
+            with os.fdopen(fd, "w+b") as signed:
+                digest = hashlib.sha256()
+                for data in (destination_hash, source_hash, bytes([0x94])):
+                    digest.update(data)
+                    signed.write(data)
+                fh.seek(payload_start + 1)
+                for data in lxmf_attachment.read_chunks(fh, payload_end - payload_start - 1):
+                    digest.update(data)
+                    signed.write(data)
+                message.hash = digest.digest()
+                message.message_id = message.hash
+                signed.write(message.hash)
+                signed.flush()
+
+                if source_identity != None:
+                    try:
+                        message.source_blackholed = RNS.Reticulum.get_instance().is_blackholed(source_identity)
+                    except Exception as e:
+                        pass
+                    with mmap.mmap(signed.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                        message.signature_validated = source.identity.validate(signature, data)
+                    if not message.signature_validated:
+                        message.unverified_reason = LXMF.LXMessage.SIGNATURE_INVALID
+                else:
+                    message.signature_validated = False
+                    message.unverified_reason = LXMF.LXMessage.SOURCE_UNKNOWN
+        finally:
+            lxmf_attachment.remove(file)
+
+        self.spooled += len(attachments)
+        self.spooled_bytes += sum(len(attachment) for attachment in attachments)
+
+        return message
+
+
     def process_lxmf_message_bytes(self, lxmf_bytes):
         try:
             message = LXMF.LXMessage.unpack_from_bytes(lxmf_bytes)
@@ -536,16 +1404,26 @@ class lxmf_connection:
             log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
             return
 
+        self.process_lxmf_message(message)
+
+
+    def process_lxmf_message(self, message):
         message.desired_method = LXMF.LXMessage.DIRECT
 
         self.message_method(message)
         self.log_message(message, "LXMF - Message received")
+        self.metrics.inc("messages_received", method=message.desired_method_str)
 
-        if self.message_received_callback is not None:
-            log("LXMF - Call to registered message received callback", LOG_DEBUG)
-            self.message_received_callback(message)
+        if self.duplicate_check(message):
+            return
+
+        if self.spool_threshold > 0:
+            self.spool(message)
+
+        if self.receive_dispatcher != None:
+            self.receive_dispatcher.put(message)
         else:
-            log("LXMF - No message received callback registered", LOG_DEBUG)
+            self.message_received(message)
 
 
     def process_lxmf_message_propagated(self, message):
@@ -553,15 +1431,161 @@ class lxmf_connection:
 
         self.message_method(message)
         self.log_message(message, "LXMF - Message received")
+        self.metrics.inc("messages_received", method=message.desired_method_str)
+
+        if self.duplicate_check(message):
+            return
+
+        if self.spool_threshold > 0:
+            self.spool(message)
+
+        if self.receive_dispatcher != None:
+            self.receive_dispatcher.put(message)
+        else:
+            self.message_received(message)
+
+
+    def spool(self, message):
+        if not message.fields:
+            return
+        count = self.spooled
+        message.fields = self.spool_value(message.fields)
+        if self.spooled > count:
+            message.packed = None
 
+
+    def spool_value(self, value):
+        if isinstance(value, bytes):
+            if len(value) >= self.spool_threshold:
+                try:
+                    attachment = lxmf_attachment.create(self.spool_path, value)
+                    self.spooled += 1
+                    self.spooled_bytes += len(value)
+                    return attachment
+                except Exception as e:
+                    log("LXMF - Could not spool field data to " + self.spool_path + ": " + str(e), LOG_ERROR)
+        elif isinstance(value, dict):
+            return {key: self.spool_value(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            return [self.spool_value(item) for item in value]
+        return value
+
+
+    def spool_stat(self):
+        return {
+            "spooled": self.spooled,
+            "spooled_bytes": self.spooled_bytes,
+        }
+
+
+    # The callbacks of most tools change global data and are not thread-safe.
+    # Unless receive_concurrent is set, the receive workers call them one at a time.
+    def message_received(self, message):
         if self.message_received_callback is not None:
             log("LXMF - Call to registered message received callback", LOG_DEBUG)
-            self.message_received_callback(message)
+            start = time.time()
+            try:
+                if self.receive_lock != None:
+                    with self.receive_lock:
+                        self.profiler.call(self.message_received_callback, message)
+                else:
+                    self.profiler.call(self.message_received_callback, message)
+            finally:
+                self.metrics.observe("callback_duration_seconds", time.time() - start)
         else:
             log("LXMF - No message received callback registered", LOG_DEBUG)
 
 
+    def message_rejected(self, message):
+        log("LXMF - Receive queue full, message " + RNS.prettyhexrep(message.hash) + " from " + RNS.prettyhexrep(message.source_hash) + " rejected", LOG_WARNING)
+        if self.receive_overflow_reply != "":
+            self.send(message.source_hash, self.receive_overflow_reply)
+
+
+    def receive_stat(self):
+        if self.receive_dispatcher == None:
+            return {}
+        return self.receive_dispatcher.stat()
+
+
+    def duplicate_check(self, message):
+        if self.duplicate_cache_size <= 0:
+            return False
+
+        keys = [message.hash]
+        if message.fields and 0xA7 in message.fields and 0xA4 not in message.fields and 0xA5 not in message.fields and isinstance(message.fields[0xA7], bytes):
+            keys.append(message.fields[0xA7])
+
+        now = time.time()
+        with self.duplicate_cache_lock:
+            while len(self.duplicate_cache) > 0:
+                key, expire = next(iter(self.duplicate_cache.items()))
+                if expire > now:
+                    break
+                del self.duplicate_cache[key]
+
+            for key in keys:
+                if key in self.duplicate_cache:
+                    self.duplicate_hits += 1
+                    log("LXMF - Duplicate message " + RNS.prettyhexrep(message.hash) + " dropped", LOG_DEBUG)
+                    return True
+
+            for key in keys:
+                self.duplicate_cache[key] = now + self.duplicate_cache_ttl*60
+            while len(self.duplicate_cache) > self.duplicate_cache_size:
+                self.duplicate_cache.popitem(last=False)
+            self.duplicate_cache_unsaved = True
+
+        return False
+
+
+    def duplicate_cache_load(self):
+        if not os.path.isfile(self.duplicate_cache_path):
+            return
+        try:
+            with open(self.duplicate_cache_path, "rb") as fh:
+                data = umsgpack.unpackb(fh.read())
+            now = time.time()
+            with self.duplicate_cache_lock:
+                for key, expire in sorted(data.items(), key=lambda item: item[1]):
+                    if expire > now:
+                        self.duplicate_cache[key] = expire
+                while len(self.duplicate_cache) > self.duplicate_cache_size:
+                    self.duplicate_cache.popitem(last=False)
+            log("LXMF - Duplicate cache loaded (" + str(len(self.duplicate_cache)) + " messages)", LOG_DEBUG)
+        except Exception as e:
+            log("LXMF - Could not load the duplicate cache from " + self.duplicate_cache_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def duplicate_cache_save(self):
+        if not self.duplicate_cache_unsaved:
+            return
+        try:
+            with self.duplicate_cache_lock:
+                data = umsgpack.packb(dict(self.duplicate_cache))
+                self.duplicate_cache_unsaved = False
+            with open(self.duplicate_cache_path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(self.duplicate_cache_path + ".tmp", self.duplicate_cache_path)
+        except Exception as e:
+            log("LXMF - Could not save the duplicate cache to " + self.duplicate_cache_path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def duplicate_stat(self):
+        with self.duplicate_cache_lock:
+            size = len(self.duplicate_cache)
+        return {
+            "size": size,
+            "hits": self.duplicate_hits,
+        }
+
+
     def log_message(self, message, message_tag="LXMF - Message log"):
+        if not log_enabled(LOG_DEBUG):
+            return
+
         if message.signature_validated:
             signature_string = "Validated"
         else:
@@ -571,15 +1595,16 @@ class lxmf_connection:
                 signature_string = "Cannot verify, source is unknown"
             else:
                 signature_string = "Signature is invalid, reason undetermined"
-        title = message.title.decode('utf-8')
-        content = message.content.decode('utf-8')
-        fields = message.fields
+        if message.packed:
+            size = len(message.packed)
+        else:
+            size = len(message.title) + len(message.content)
         log(message_tag + ":", LOG_DEBUG)
         log("-   Date/Time: " + time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(message.timestamp)), LOG_DEBUG)
-        log("-       Title: " + title, LOG_DEBUG)
-        log("-     Content: " + content, LOG_DEBUG)
-        log("-      Fields: " + str(fields), LOG_DEBUG)
-        log("-        Size: " + str(len(title) + len(content) + len(title) + len(pickle.dumps(fields))) + " bytes", LOG_DEBUG)
+        log("-       Title: " + message.title.decode('utf-8'), LOG_DEBUG)
+        log("-     Content: " + message.content.decode('utf-8'), LOG_DEBUG)
+        log("-      Fields: " + str(message.fields), LOG_DEBUG)
+        log("-        Size: " + str(size) + " bytes", LOG_DEBUG)
         log("-      Source: " + RNS.prettyhexrep(message.source_hash), LOG_DEBUG)
         log("- Destination: " + RNS.prettyhexrep(message.destination_hash), LOG_DEBUG)
         log("-   Signature: " + signature_string, LOG_DEBUG)
@@ -593,14 +1618,29 @@ class lxmf_connection:
 
 
 class lxmf_connection_propagation():
+    EMITTED_DELTA_GRACE = 300
+    EMITTED_DELTA_IGNORE = 10
+
+    SCORE_HYSTERESIS = 1.5
+    SCORE_AGE_MAX = 24
+    SCORE_FAILURES_MAX = 5
+    NODES_MAX = 100
+
     def __init__(self, owner, aspect_filter=None):
         self.owner = owner
         self.aspect_filter = aspect_filter
+        self.nodes = {}
+        self.lock = threading.Lock()
+        self.unsaved = False
+        self.path = self.owner.storage_path + "/propagation.data"
+        self.load()
+        self.owner.scheduler.add("LXMF - Propagation save", self.save, interval=300)
+        exit_register(self.save)
 
-    EMITTED_DELTA_GRACE = 300
-    EMITTED_DELTA_IGNORE = 10
 
     def received_announce(self, destination_hash, announced_identity, app_data):
+        self.owner.metrics.inc("announces_received", aspect=self.aspect_filter)
+
         if app_data == None:
             return
 
@@ -609,48 +1649,1085 @@ class lxmf_connection_propagation():
 
         try:
             unpacked = umsgpack.unpackb(app_data)
-            node_active = unpacked[0]
-            emitted = unpacked[1]
-            hop_count = RNS.Transport.hops_to(destination_hash)
-            age = time.time() - emitted
-            if age < 0:
-                if age < -1*PropDetector.EMITTED_DELTA_GRACE:
-                    return
-            log("LXMF - Received an propagation node announce from "+RNS.prettyhexrep(destination_hash)+": "+str(age)+" seconds ago, "+str(hop_count)+" hops away", LOG_INFO)
-            if self.owner.propagation_node_active == None:
-                self.owner.propagation_node_update(RNS.hexrep(destination_hash, False))
+            if len(unpacked) > 2:
+                node_active = unpacked[2]
             else:
-                prev_hop_count = RNS.Transport.hops_to(self.owner.propagation_node_hash())
-                if hop_count <= prev_hop_count:
-                    self.owner.propagation_node_update(RNS.hexrep(destination_hash, False))
+                node_active = unpacked[0]
+            emitted = unpacked[1]
         except:
             return
 
+        hop_count = RNS.Transport.hops_to(destination_hash)
+        age = time.time() - emitted
+        if age < 0:
+            if age < -1*self.EMITTED_DELTA_GRACE:
+                return
+        log("LXMF - Received an propagation node announce from "+RNS.prettyhexrep(destination_hash)+": "+str(age)+" seconds ago, "+str(hop_count)+" hops away", LOG_INFO)
 
-##############################################################################################################
-# RNS Class
-
+        with self.lock:
+            if not node_active:
+                self.nodes.pop(destination_hash, None)
+            else:
+                node = self.node_get(destination_hash)
+                node["hops"] = hop_count
+                node["announce"] = time.time()
+            self.unsaved = True
 
-class rns_connection:
-    def __init__(self, storage_path=None, identity_file="identity", identity=None, destination_name="rns", destination_type="connect", announce_startup=False, announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, announce_data="", announce_hidden=False):
-        self.storage_path = storage_path
+        self.select()
 
-        self.identity_file = identity_file
 
-        self.identity = identity
+    def node_get(self, destination_hash):
+        if destination_hash not in self.nodes:
+            if len(self.nodes) >= self.NODES_MAX:
+                active = self.owner.propagation_node_hash()
+                worst = max([key for key in self.nodes if key != active], key=lambda key: self.score(self.nodes[key]))
+                del self.nodes[worst]
+            self.nodes[destination_hash] = {"hops": RNS.Transport.hops_to(destination_hash), "announce": 0, "latency": 0, "failures": 0}
+        return self.nodes[destination_hash]
 
-        self.destination_name = destination_name
-        self.destination_type = destination_type
-        self.aspect_filter = self.destination_name + "." + self.destination_type
 
-        self.announce_startup = announce_startup
-        self.announce_startup_delay = int(announce_startup_delay)
+    def score(self, node):
+        score = node["hops"]
+        score += min((time.time() - node["announce"])/3600, self.SCORE_AGE_MAX)
+        score += node["latency"]/10
+        score += node["failures"]*2
+        return score
 
-        self.announce_periodic = announce_periodic
-        self.announce_periodic_interval = int(announce_periodic_interval)
 
-        self.announce_data = announce_data
-        self.announce_hidden = announce_hidden
+    def select(self):
+        active = self.owner.propagation_node_hash()
+
+        with self.lock:
+            if len(self.nodes) == 0:
+                return
+            best = min(self.nodes, key=lambda key: self.score(self.nodes[key]))
+            score = self.score(self.nodes[best])
+            if active == None or best == active:
+                switch = active == None
+            elif active in self.nodes:
+                switch = score + self.SCORE_HYSTERESIS < self.score(self.nodes[active])
+            else:
+                switch = self.nodes[best]["hops"] <= RNS.Transport.hops_to(active)
+
+        if switch:
+            log("LXMF - Propagation node selected: " + RNS.prettyhexrep(best) + " (Score: " + str(round(score, 2)) + ")", LOG_DEBUG)
+            self.owner.propagation_node_update(RNS.hexrep(best, False))
+
+
+    def result(self, destination_hash, success, latency=None):
+        if destination_hash == None:
+            return
+
+        with self.lock:
+            node = self.node_get(destination_hash)
+            if success:
+                node["failures"] = max(node["failures"] - 1, 0)
+                if latency != None:
+                    if node["latency"] > 0:
+                        node["latency"] = node["latency"]*0.7 + latency*0.3
+                    else:
+                        node["latency"] = latency
+            else:
+                node["failures"] = min(node["failures"] + 1, self.SCORE_FAILURES_MAX)
+            self.unsaved = True
+
+        if not success:
+            self.select()
+
+
+    def load(self):
+        if not os.path.isfile(self.path):
+            return
+        try:
+            with open(self.path, "rb") as fh:
+                data = umsgpack.unpackb(fh.read())
+            with self.lock:
+                for destination_hash, node in data.items():
+                    self.nodes[destination_hash] = node
+            log("LXMF - Propagation nodes loaded (" + str(len(self.nodes)) + " nodes)", LOG_DEBUG)
+        except Exception as e:
+            log("LXMF - Could not load the propagation nodes from " + self.path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def save(self):
+        if not self.unsaved:
+            return
+        try:
+            with self.lock:
+                data = umsgpack.packb(self.nodes)
+                self.unsaved = False
+            with open(self.path + ".tmp", "wb") as fh:
+                fh.write(data)
+            os.replace(self.path + ".tmp", self.path)
+        except Exception as e:
+            log("LXMF - Could not save the propagation nodes to " + self.path, LOG_ERROR)
+            log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+
+
+    def stat(self):
+        with self.lock:
+            return {RNS.hexrep(destination_hash, False): dict(node, score=round(self.score(node), 2)) for destination_hash, node in self.nodes.items()}
+
+
+class lxmf_connection_reachability():
+    def __init__(self, owner, aspect_filter=None):
+        self.owner = owner
+        self.aspect_filter = aspect_filter
+
+
+    def received_announce(self, destination_hash, announced_identity, app_data):
+        self.owner.metrics.inc("announces_received", aspect=self.aspect_filter)
+        if self.owner.reachability_size > 0:
+            self.owner.reachability_announce(destination_hash)
+
+
+class lxmf_metrics():
+    BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+    def __init__(self, prefix="lxmf"):
+        self.prefix = prefix
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram == None:
+                histogram = self.histograms[key] = [[0] * len(self.BUCKETS), 0, 0]
+            for i, bucket in enumerate(self.BUCKETS):
+                if value <= bucket:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+
+    def gauge(self, name, function, label=None):
+        self.gauges[name] = (function, label)
+
+
+    def name(self, name):
+        return self.prefix + "_" + re.sub("[^a-zA-Z0-9_]", "_", name)
+
+
+    def labels(self, labels):
+        if not labels:
+            return ""
+        return "{" + ",".join(key + "=\"" + str(value).replace("\\", "\\\\").replace("\"", "\\\"") + "\"" for key, value in labels) + "}"
+
+
+    def render(self):
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(value[0]), value[1], value[2])) for key, value in self.histograms.items())
+
+        types = set()
+        for (name, labels), value in counters:
+            name = self.name(name) + "_total"
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE " + name + " counter")
+            lines.append(name + self.labels(labels) + " " + str(value))
+
+        for (name, labels), (buckets, total, count) in histograms:
+            name = self.name(name)
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE " + name + " histogram")
+            for i, bucket in enumerate(self.BUCKETS):
+                lines.append(name + "_bucket" + self.labels(labels + (("le", str(bucket)),)) + " " + str(buckets[i]))
+            lines.append(name + "_bucket" + self.labels(labels + (("le", "+Inf"),)) + " " + str(count))
+            lines.append(name + "_sum" + self.labels(labels) + " " + str(round(total, 6)))
+            lines.append(name + "_count" + self.labels(labels) + " " + str(count))
+
+        for name, (function, label) in sorted(self.gauges.items()):
+            try:
+                values = function()
+            except Exception as e:
+                log("LXMF - Metrics gauge " + name + " failed: " + str(e), LOG_ERROR)
+                continue
+            if not isinstance(values, dict):
+                values = {None: values}
+            samples = []
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    for key_sub, value_sub in value.items():
+                        samples.append((self.name(name + "_" + str(key_sub)), ((label or "key", key),), value_sub))
+                elif key == None:
+                    samples.append((self.name(name), (), value))
+                elif label:
+                    samples.append((self.name(name), ((label, key),), value))
+                else:
+                    samples.append((self.name(name + "_" + str(key)), (), value))
+            for sample_name, labels, value in samples:
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                if sample_name not in types:
+                    types.add(sample_name)
+                    lines.append("# TYPE " + sample_name + " gauge")
+                lines.append(sample_name + self.labels(labels) + " " + str(value))
+
+        return "\n".join(lines) + "\n"
+
+
+    def start(self, host="127.0.0.1", port=9100):
+        try:
+            self.server = http.server.ThreadingHTTPServer((host, port), lxmf_metrics_handler)
+        except Exception as e:
+            log("LXMF - Metrics endpoint could not be started on " + host + ":" + str(port) + ": " + str(e), LOG_ERROR)
+            return False
+        self.server.daemon_threads = True
+        self.server.metrics = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        log("LXMF - Metrics endpoint: http://" + host + ":" + str(port) + "/metrics", LOG_INFO)
+        return True
+
+
+    def stop(self):
+        if self.server != None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class lxmf_metrics_handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self, format, *args):
+        log("LXMF - Metrics request: " + (format % args), LOG_EXTREME)
+
+
+class lxmf_connection_dispatcher():
+    def __init__(self, owner, workers=1, queue_size=1000, overflow="drop_oldest"):
+        self.owner = owner
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.queues = [deque() for i in range(workers)]
+        self.conditions = [threading.Condition() for i in range(workers)]
+        self.enqueued = 0
+        self.processed = 0
+        self.dropped = 0
+        self.rejected = 0
+        self.wait_last = 0
+        self.wait_max = 0
+        self.wait_sum = 0
+        for i in range(workers):
+            threading.Thread(target=self.process, args=(i,), daemon=True).start()
+
+
+    def put(self, message):
+        index = int.from_bytes(message.source_hash[:4], "big") % len(self.queues)
+        queue = self.queues[index]
+        with self.conditions[index]:
+            if self.queue_size > 0 and len(queue) >= self.queue_size:
+                if self.overflow == "reject":
+                    self.rejected += 1
+                    reject = True
+                else:
+                    dropped, enqueued = queue.popleft()
+                    self.dropped += 1
+                    log("LXMF - Receive queue full, message " + RNS.prettyhexrep(dropped.hash) + " dropped", LOG_WARNING)
+                    reject = False
+            else:
+                reject = False
+            if not reject:
+                queue.append((message, time.time()))
+                self.enqueued += 1
+                self.conditions[index].notify()
+
+        if reject:
+            self.owner.message_rejected(message)
+
+
+    def process(self, index):
+        queue = self.queues[index]
+        condition = self.conditions[index]
+        while True:
+            with condition:
+                while len(queue) == 0:
+                    condition.wait()
+                message, enqueued = queue.popleft()
+
+            wait = time.time() - enqueued
+            self.wait_last = wait
+            self.wait_sum += wait
+            if wait > self.wait_max:
+                self.wait_max = wait
+
+            try:
+                self.owner.message_received(message)
+            except Exception as e:
+                log("LXMF - Message received callback failed for " + RNS.prettyhexrep(message.hash), LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+            self.processed += 1
+
+
+    def stat(self):
+        depth = sum(len(queue) for queue in self.queues)
+        return {
+            "workers": len(self.queues),
+            "depth": depth,
+            "enqueued": self.enqueued,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "wait_last": round(self.wait_last, 3),
+            "wait_max": round(self.wait_max, 3),
+            "wait_avg": round(self.wait_sum/self.processed, 3) if self.processed > 0 else 0,
+        }
+
+
+class lxmf_attachment():
+    CHUNK_SIZE = 65536
+
+    # msgpack types with a length (bin, str, ext, array, map): Size of the length.
+    UNPACK_LENGTH = {0xc4: 1, 0xc5: 2, 0xc6: 4, 0xd9: 1, 0xda: 2, 0xdb: 4, 0xc7: 1, 0xc8: 2, 0xc9: 4, 0xdc: 2, 0xdd: 4, 0xde: 2, 0xdf: 4}
+
+    # msgpack types with a fixed size (float, int, fixext): Size of the data.
+    UNPACK_FIXED = {0xca: 4, 0xcb: 8, 0xcc: 1, 0xcd: 2, 0xce: 4, 0xcf: 8, 0xd0: 1, 0xd1: 2, 0xd2: 4, 0xd3: 8, 0xd4: 2, 0xd5: 3, 0xd6: 5, 0xd7: 9, 0xd8: 17}
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.finalizer = weakref.finalize(self, lxmf_attachment.remove, path)
+
+
+    @staticmethod
+    def create(path, data):
+        fd, file = tempfile.mkstemp(dir=path, suffix=".field")
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        return lxmf_attachment(file, len(data))
+
+
+    @staticmethod
+    def remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+    # Copies size bytes from the file in chunks to a new file in path.
+    @staticmethod
+    def copy(path, fh, size):
+        fd, file = tempfile.mkstemp(dir=path, suffix=".field")
+        attachment = lxmf_attachment(file, size)
+        with os.fdopen(fd, "wb") as out:
+            for data in lxmf_attachment.read_chunks(fh, size):
+                out.write(data)
+        return attachment
+
+
+    @staticmethod
+    def read_exactly(fh, size):
+        data = fh.read(size)
+        if len(data) != size:
+            raise EOFError("Unexpected end of data")
+        return data
+
+
+    @staticmethod
+    def read_chunks(fh, size):
+        while size > 0:
+            data = lxmf_attachment.read_exactly(fh, min(size, lxmf_attachment.CHUNK_SIZE))
+            size -= len(data)
+            yield data
+
+
+    # Reads one msgpack value from the file.
+    # bin values of at least threshold bytes are copied to a file in path (attachment) instead of being read into memory.
+    @staticmethod
+    def unpack(fh, path=None, threshold=0, attachments=None):
+        head = lxmf_attachment.read_exactly(fh, 1)
+        code = head[0]
+
+        if 0x80 <= code <= 0x8f or code in (0xde, 0xdf):
+            count = code & 0x0f if code <= 0x8f else int.from_bytes(lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code]), "big")
+            value = {}
+            for i in range(count):
+                key = lxmf_attachment.unpack(fh)
+                value[key] = lxmf_attachment.unpack(fh, path, threshold, attachments)
+            return value
+
+        if 0x90 <= code <= 0x9f or code in (0xdc, 0xdd):
+            count = code & 0x0f if code <= 0x9f else int.from_bytes(lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code]), "big")
+            return [lxmf_attachment.unpack(fh, path, threshold, attachments) for i in range(count)]
+
+        if code in (0xc4, 0xc5, 0xc6):
+            size = int.from_bytes(lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code]), "big")
+            if path and threshold > 0 and size >= threshold:
+                attachment = lxmf_attachment.copy(path, fh, size)
+                if attachments != None:
+                    attachments.append(attachment)
+                return attachment
+            return lxmf_attachment.read_exactly(fh, size)
+
+        if 0xa0 <= code <= 0xbf:
+            data = lxmf_attachment.read_exactly(fh, code & 0x1f)
+        elif code in lxmf_attachment.UNPACK_LENGTH:
+            length = lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_LENGTH[code])
+            data = length + lxmf_attachment.read_exactly(fh, int.from_bytes(length, "big") + (1 if code in (0xc7, 0xc8, 0xc9) else 0))
+        elif code in lxmf_attachment.UNPACK_FIXED:
+            data = lxmf_attachment.read_exactly(fh, lxmf_attachment.UNPACK_FIXED[code])
+        else:
+            data = b""
+        return umsgpack.unpackb(head + data)
+
+
+    @staticmethod
+    def unspool(value):
+        if isinstance(value, lxmf_attachment):
+            return value.read()
+        elif isinstance(value, dict):
+            return {key: lxmf_attachment.unspool(item) for key, item in value.items()}
+        elif isinstance(value, list):
+            return [lxmf_attachment.unspool(item) for item in value]
+        return value
+
+
+    def __len__(self):
+        return self.size
+
+
+    def __bytes__(self):
+        return self.read()
+
+
+    def __str__(self):
+        return "<attachment " + str(self.size) + " bytes>"
+
+
+    def __repr__(self):
+        return self.__str__()
+
+
+    def open(self):
+        return open(self.path, "rb")
+
+
+    def read(self):
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+
+    def memoryview(self):
+        if self.size == 0:
+            return memoryview(b"")
+        with open(self.path, "rb") as fh:
+            return memoryview(mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class lxmf_connection_batch():
+    def __init__(self, app_data=""):
+        self.app_data = app_data
+        self.timestamp = time.time()
+        self.total = 0
+        self.invalid = 0
+        self.queued = 0
+        self.dropped = 0
+        self.delivered = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+
+    def __str__(self):
+        return "<" + str(self.app_data) + " " + str(self.progress()) + ">"
+
+
+    def update(self, message):
+        with self.lock:
+            if message.state == LXMF.LXMessage.FAILED:
+                self.failed += 1
+            else:
+                self.delivered += 1
+
+
+    def pending(self):
+        return self.queued - self.delivered - self.failed
+
+
+    def done(self):
+        return self.pending() <= 0
+
+
+    def progress(self):
+        return {
+            "total": self.total,
+            "invalid": self.invalid,
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "delivered": self.delivered,
+            "failed": self.failed,
+            "pending": self.pending(),
+            "duration": round(time.time() - self.timestamp, 3),
+        }
+
+
+# Returned by lxmf_connection.send(). It is the hash of the message (bytes) and
+# additionally tracks the delivery of the message (also awaitable with asyncio).
+class lxmf_delivery(bytes):
+    PENDING   = "pending"
+    DELIVERED = "delivered"
+    FAILED    = "failed"
+    EXPIRED   = "expired"
+
+
+    def __new__(cls, message):
+        self = super().__new__(cls, message.hash)
+        self.destination_hash = message.destination_hash
+        self.app_data = message.app_data
+        self.send_time = message.send_time
+        self.state = lxmf_delivery.PENDING
+        self.latency = None
+        self.event = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+        return self
+
+
+    def __str__(self):
+        return "<" + RNS.hexrep(self, delimit=False) + " " + self.state + ">"
+
+
+    def __await__(self):
+        if not self.event.is_set():
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self.add_done_callback(lambda delivery: loop.call_soon_threadsafe(lambda: future.done() or future.set_result(delivery.state)))
+            yield from future.__await__()
+        return self.state
+
+
+    def done(self):
+        return self.event.is_set()
+
+
+    def wait(self, timeout=None):
+        self.event.wait(timeout)
+        return self.state
+
+
+    def add_done_callback(self, callback):
+        with self.lock:
+            if not self.event.is_set():
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+
+    def complete(self, state):
+        with self.lock:
+            if self.event.is_set():
+                return
+            self.state = state
+            if state == lxmf_delivery.DELIVERED:
+                self.latency = time.time() - self.send_time
+            self.event.set()
+            callbacks = self.callbacks
+            self.callbacks = []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                log("LXMF - Delivery callback error: " + str(e), LOG_ERROR)
+
+
+class lxmf_scheduler():
+    def __init__(self):
+        self.jobs = []
+        self.heap = []
+        self.sequence = 0
+        self.condition = threading.Condition()
+        self.profiler = None
+        self.thread = threading.Thread(target=self.process, daemon=True)
+        self.thread.start()
+
+
+    def add(self, name, function, interval=0, delay=None, jitter=0, args=(), kwargs=None, owner=None):
+        job = lxmf_scheduler_job(self, name, function, interval, jitter, args, kwargs, owner)
+        if delay is None:
+            delay = job.interval
+        with self.condition:
+            self.jobs.append(job)
+            self.push(job, time.time() + float(delay), job.jitter)
+        return job
+
+
+    def cancel(self, job):
+        with self.condition:
+            job.active = False
+            job.generation += 1
+            if job in self.jobs:
+                self.jobs.remove(job)
+            self.condition.notify()
+
+
+    def run_now(self, job):
+        with self.condition:
+            if not job.active:
+                return False
+            self.push(job, time.time())
+        return True
+
+
+    def reschedule(self, job, interval):
+        with self.condition:
+            if not job.active:
+                return False
+            base = job.base - job.interval + float(interval)
+            job.interval = float(interval)
+            self.push(job, max(base, time.time()), job.jitter)
+        return True
+
+
+    def push(self, job, base, jitter=0):
+        job.generation += 1
+        job.base = base
+        job.due = base
+        if jitter > 0:
+            job.due += random.uniform(0, jitter)
+        self.sequence += 1
+        heapq.heappush(self.heap, (job.due, self.sequence, job.generation, job))
+        self.condition.notify()
+
+
+    def process(self):
+        while True:
+            with self.condition:
+                while True:
+                    while self.heap and self.heap[0][2] != self.heap[0][3].generation:
+                        heapq.heappop(self.heap)
+                    timeout = None
+                    if self.heap:
+                        timeout = self.heap[0][0] - time.time()
+                        if timeout <= 0:
+                            break
+                    self.condition.wait(timeout)
+                due, sequence, generation, job = heapq.heappop(self.heap)
+
+            job.run(due)
+
+            with self.condition:
+                if job.generation != generation:
+                    continue
+                if job.interval > 0:
+                    self.push(job, max(job.base + job.interval, time.time()), job.jitter)
+                else:
+                    job.active = False
+                    if job in self.jobs:
+                        self.jobs.remove(job)
+
+
+    def stat(self):
+        with self.condition:
+            return {job.name: job.stat() for job in self.jobs}
+
+
+# View on a shared scheduler which prefixes the job names of one tool.
+# The jobs added through the view are profiled by the profiler of the view (the tool).
+class lxmf_scheduler_prefix():
+    def __init__(self, scheduler, prefix):
+        self.scheduler = scheduler
+        self.prefix = prefix
+        self.profiler = None
+
+
+    def add(self, name, function, interval=0, delay=None, jitter=0, args=(), kwargs=None):
+        return self.scheduler.add(self.prefix + name, function, interval, delay, jitter, args, kwargs, self)
+
+
+    def cancel(self, job):
+        self.scheduler.cancel(job)
+
+
+    def run_now(self, job):
+        return self.scheduler.run_now(job)
+
+
+    def reschedule(self, job, interval):
+        return self.scheduler.reschedule(job, interval)
+
+
+    def stat(self):
+        return {name[len(self.prefix):]: stat for (name, stat) in self.scheduler.stat().items() if name.startswith(self.prefix)}
+
+
+class lxmf_scheduler_job():
+    def __init__(self, scheduler, name, function, interval=0, jitter=0, args=(), kwargs=None, owner=None):
+        self.scheduler = scheduler
+        self.owner = owner if owner is not None else scheduler
+        self.name = name
+        self.function = function
+        self.interval = float(interval)
+        self.jitter = float(jitter)
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.active = True
+        self.generation = 0
+        self.base = 0
+        self.due = 0
+        self.runs = 0
+        self.errors = 0
+        self.late_last = 0
+        self.late_max = 0
+        self.late_sum = 0
+        self.duration_last = 0
+
+
+    def __str__(self):
+        return "<" + self.name + " " + str(self.stat()) + ">"
+
+
+    def cancel(self):
+        self.scheduler.cancel(self)
+
+
+    def run_now(self):
+        return self.scheduler.run_now(self)
+
+
+    def run(self, due):
+        start = time.time()
+        late = max(start - due, 0)
+        try:
+            profiler = self.owner.profiler
+            if profiler is not None:
+                profiler.call(self.function, *self.args, **self.kwargs)
+            else:
+                self.function(*self.args, **self.kwargs)
+        except Exception as e:
+            self.errors += 1
+            log("Scheduler - Job '" + self.name + "' failed: " + str(e), LOG_ERROR)
+        self.runs += 1
+        self.late_last = late
+        self.late_max = max(self.late_max, late)
+        self.late_sum += late
+        self.duration_last = time.time() - start
+
+
+    def stat(self):
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "errors": self.errors,
+            "late_last": round(self.late_last, 3),
+            "late_max": round(self.late_max, 3),
+            "late_avg": round(self.late_sum/self.runs, 3) if self.runs > 0 else 0,
+            "duration_last": round(self.duration_last, 3),
+            "next": round(max(self.due - time.time(), 0), 3) if self.active else None,
+        }
+
+
+class lxmf_profiler():
+    STOP_TIMEOUT = 5
+    MEMORY_TOP = 50
+
+    def __init__(self, path):
+        self.path = path
+        self.profiles = {}
+        self.local = threading.local()
+        self.condition = threading.Condition()
+        self.active = False
+        self.running = 0
+        self.timer = None
+        self.profile_file = None
+        self.snapshot = None
+
+
+    def call(self, function, *args, **kwargs):
+        if not self.active or getattr(self.local, "profile", None) != None:
+            return function(*args, **kwargs)
+
+        with self.condition:
+            if not self.active:
+                profile = None
+            else:
+                profile = self.profiles.get(threading.get_ident())
+                if profile == None:
+                    profile = self.profiles[threading.get_ident()] = cProfile.Profile()
+                self.running += 1
+        if profile == None:
+            return function(*args, **kwargs)
+
+        self.local.profile = profile
+        profile.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            self.local.profile = None
+            with self.condition:
+                self.running -= 1
+                self.condition.notify_all()
+
+
+    def file(self, kind, extension):
+        return os.path.join(self.path, kind + "_" + time.strftime("%Y%m%d_%H%M%S") + "." + extension)
+
+
+    def profile_start(self, duration=30):
+        with self.condition:
+            if self.active:
+                return None
+            self.profiles = {}
+            self.active = True
+            self.profile_file = self.file("profile", "pstats")
+            self.timer = threading.Timer(duration, self.profile_stop)
+            self.timer.daemon = True
+            self.timer.start()
+        log("Profiler - CPU profile started for " + str(duration) + " seconds, output: " + self.profile_file, LOG_NOTICE)
+        return self.profile_file
+
+
+    def profile_stop(self):
+        with self.condition:
+            if not self.active:
+                return None
+            self.active = False
+            if self.timer != None and self.timer is not threading.current_thread():
+                self.timer.cancel()
+            self.timer = None
+            running = 1 if getattr(self.local, "profile", None) != None else 0
+            self.condition.wait_for(lambda: self.running <= running, self.STOP_TIMEOUT)
+            profiles = list(self.profiles.values())
+            self.profiles = {}
+            file = self.profile_file
+
+        try:
+            stats = pstats.Stats(*profiles) if len(profiles) > 0 else None
+        except TypeError:
+            stats = None
+        if stats == None:
+            log("Profiler - CPU profile stopped, nothing was recorded", LOG_NOTICE)
+            return None
+
+        try:
+            stats.dump_stats(file)
+        except Exception as e:
+            log("Profiler - Could not write CPU profile to " + file + ": " + str(e), LOG_ERROR)
+            return None
+        log("Profiler - CPU profile written to " + file, LOG_NOTICE)
+        return file
+
+
+    def profile_toggle(self, duration=30):
+        if self.active:
+            return self.profile_stop()
+        return self.profile_start(duration)
+
+
+    def memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.snapshot = tracemalloc.take_snapshot()
+            log("Profiler - Memory tracing started, the next snapshot is compared against this one", LOG_NOTICE)
+            return None
+
+        snapshot = tracemalloc.take_snapshot()
+        stats = snapshot.compare_to(self.snapshot, "lineno") if self.snapshot != None else snapshot.statistics("lineno")
+        self.snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+
+        file = self.file("memory", "txt")
+        try:
+            with open(file, "w") as fh:
+                fh.write("Traced memory: current " + str(current) + " bytes, peak " + str(peak) + " bytes\n\n")
+                for stat in stats[:self.MEMORY_TOP]:
+                    fh.write(str(stat) + "\n")
+        except Exception as e:
+            log("Profiler - Could not write memory snapshot to " + file + ": " + str(e), LOG_ERROR)
+            return None
+        log("Profiler - Memory snapshot diff written to " + file, LOG_NOTICE)
+        return file
+
+
+    def stacks(self):
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        file = self.file("stacks", "txt")
+        try:
+            with open(file, "w") as fh:
+                for ident, frame in sys._current_frames().items():
+                    fh.write("Thread " + names.get(ident, "?") + " (" + str(ident) + "):\n")
+                    fh.write("".join(traceback.format_stack(frame)) + "\n")
+        except Exception as e:
+            log("Profiler - Could not write thread stacks to " + file + ": " + str(e), LOG_ERROR)
+            return None
+        log("Profiler - Thread stacks written to " + file, LOG_NOTICE)
+        return file
+
+
+    def signals(self, duration=30):
+        if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+            log("Profiler - Signal handlers not available", LOG_WARNING)
+            return False
+        signal.signal(signal.SIGUSR1, lambda signum, frame: threading.Thread(target=self.profile_toggle, args=(duration,), daemon=True).start())
+        signal.signal(signal.SIGUSR2, lambda signum, frame: threading.Thread(target=self.signal_dump, daemon=True).start())
+        log("Profiler - SIGUSR1: CPU profile on/off, SIGUSR2: thread stacks and memory snapshot", LOG_INFO)
+        return True
+
+
+    def signal_dump(self):
+        self.stacks()
+        self.memory()
+
+
+##############################################################################################################
+# Rate limit
+
+
+class lxmf_rate_limiter():
+    ALLOWED = 0
+    LIMITED = 1
+    REPEATED = 2
+
+    def __init__(self, size=65536):
+        self.size = max(int(size), 1)
+        self.slots = {}
+        self.keys = []
+        self.tokens = array("d")
+        self.times = array("d")
+        self.limited = array("b")
+        self.hand = 0
+        self.global_tokens = None
+        self.global_time = 0
+        self.lock = threading.Lock()
+        self.allowed_count = 0
+        self.limited_count = 0
+        self.global_limited_count = 0
+
+
+    def check(self, key, rate, burst):
+        if rate <= 0:
+            return self.ALLOWED
+
+        now = time.time()
+        with self.lock:
+            index = self.slots.get(key)
+            if index == None:
+                index = self.slot_get(key)
+                self.tokens[index] = burst
+                self.times[index] = now
+                self.limited[index] = 0
+
+            tokens = min(self.tokens[index] + (now - self.times[index])*rate, burst)
+            self.times[index] = now
+            if tokens >= 1:
+                self.tokens[index] = tokens - 1
+                self.limited[index] = 0
+                self.allowed_count += 1
+                return self.ALLOWED
+
+            self.tokens[index] = tokens
+            self.limited_count += 1
+            if self.limited[index]:
+                return self.REPEATED
+            self.limited[index] = 1
+            return self.LIMITED
+
+
+    # Upper limit over all keys. Its bucket is kept outside the table, so it is never evicted.
+    def check_global(self, rate, burst):
+        if rate <= 0:
+            return self.ALLOWED
+
+        now = time.time()
+        with self.lock:
+            if self.global_tokens == None:
+                self.global_tokens = burst
+                self.global_time = now
+
+            tokens = min(self.global_tokens + (now - self.global_time)*rate, burst)
+            self.global_time = now
+            if tokens >= 1:
+                self.global_tokens = tokens - 1
+                return self.ALLOWED
+
+            self.global_tokens = tokens
+            self.global_limited_count += 1
+            return self.LIMITED
+
+
+    def slot_get(self, key):
+        if len(self.keys) < self.size:
+            index = len(self.keys)
+            self.keys.append(key)
+            self.tokens.append(0)
+            self.times.append(0)
+            self.limited.append(0)
+        else:
+            index = min([(self.hand + i) % self.size for i in range(min(8, self.size))], key=lambda i: self.times[i])
+            self.hand = (index + 1) % self.size
+            del self.slots[self.keys[index]]
+            self.keys[index] = key
+        self.slots[key] = index
+        return index
+
+
+    def stat(self):
+        with self.lock:
+            return {
+                "sources": len(self.slots),
+                "allowed": self.allowed_count,
+                "limited": self.limited_count,
+                "global_limited": self.global_limited_count,
+            }
+
+
+##############################################################################################################
+# RNS Class
+
+
+class rns_connection:
+    def __init__(self, storage_path=None, identity_file="identity", identity=None, destination_name="rns", destination_type="connect", announce_startup=False, announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, announce_periodic_jitter=0, announce_data="", announce_hidden=False, scheduler=None):
+        self.storage_path = storage_path
+
+        self.identity_file = identity_file
+
+        self.identity = identity
+
+        self.destination_name = destination_name
+        self.destination_type = destination_type
+        self.aspect_filter = self.destination_name + "." + self.destination_type
+
+        self.announce_startup = announce_startup
+        self.announce_startup_delay = int(announce_startup_delay)
+
+        self.announce_periodic = announce_periodic
+        self.announce_periodic_interval = int(announce_periodic_interval)
+        self.announce_periodic_jitter = int(announce_periodic_jitter)
+        self.announce_job = None
+
+        self.announce_data = announce_data
+        self.announce_hidden = announce_hidden
+
+        if scheduler is None:
+            scheduler = lxmf_scheduler()
+        self.scheduler = scheduler
 
         if not self.storage_path:
             log("RNS - No storage_path parameter", LOG_ERROR)
@@ -744,23 +2821,20 @@ class rns_connection:
 
 
     def announce(self, app_data=None, attached_interface=None, initial=False):
-        announce_timer = None
-
-        if self.announce_periodic and self.announce_periodic_interval > 0:
-            announce_timer = threading.Timer(self.announce_periodic_interval*60, self.announce)
-            announce_timer.daemon = True
-            announce_timer.start()
-
         if initial:
+            delay = None
             if self.announce_startup:
                 if self.announce_startup_delay > 0:
-                    if announce_timer is not None:
-                        announce_timer.cancel()
-                    announce_timer = threading.Timer(self.announce_startup_delay, self.announce)
-                    announce_timer.daemon = True
-                    announce_timer.start()
+                    delay = self.announce_startup_delay
                 else:
                     self.announce_now(app_data=app_data, attached_interface=attached_interface)
+            if self.announce_periodic and self.announce_periodic_interval > 0:
+                self.announce_job = self.scheduler.add("RNS - Announce", self.announce_now, interval=self.announce_periodic_interval*60, delay=delay, jitter=self.announce_periodic_jitter)
+            elif delay is not None:
+                self.announce_job = self.scheduler.add("RNS - Announce", self.announce_now, delay=delay)
+            return
+
+        if app_data is None and attached_interface is None and self.announce_job is not None and self.announce_job.run_now():
             return
 
         self.announce_now(app_data=app_data, attached_interface=attached_interface)
@@ -786,18 +2860,244 @@ class rns_connection:
                 log("RNS - Announced: " + RNS.prettyhexrep(self.destination_hash()), LOG_DEBUG)
 
 
+##############################################################################################################
+# Fan-out
+
+
+# Sends the messages of the group with background workers instead of in the receive callback.
+# The recipients are distributed to the workers by their hash, so the messages to one recipient keep their order.
+# The rate limit is a ceiling over all messages sent through it.
+# The progress of group messages is tracked per job (hash of the originating message, field 0xA7).
+class lxmf_fanout():
+    def __init__(self, connection, workers=2, queue_size=0, rate=0, burst=1, chunk=50, jobs_size=100):
+        self.connection = connection
+        self.workers = max(int(workers), 0)
+        self.queue_size = int(queue_size)
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1)
+        self.chunk = max(int(chunk), 1)
+        if self.rate > 0:
+            self.chunk = min(self.chunk, int(self.burst))
+        self.jobs_size = max(int(jobs_size), 1)
+
+        self.jobs = OrderedDict()
+        self.jobs_lock = threading.Lock()
+
+        self.queues = [deque() for index in range(self.workers)]
+        self.queued = 0
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+        self.tokens = self.burst
+        self.tokens_time = time.time()
+        self.tokens_lock = threading.Lock()
+
+        for index in range(self.workers):
+            thread = threading.Thread(target=self.process, args=(index,), daemon=True)
+            thread.start()
+
+
+    def send(self, key, source, destinations, content="", title="", fields=None, timestamp=None, app_data=""):
+        job = lxmf_fanout_job(key, source, app_data)
+        job.total = len(destinations)
+        if key != None:
+            self.job_add(job)
+
+        # The spooled fields are read once for all chunks of the job.
+        if fields is not None:
+            fields = lxmf_attachment.unspool(fields)
+
+        args = (content, title, fields, timestamp, app_data)
+
+        if self.workers == 0:
+            self.send_chunks(job, destinations, args)
+            return job
+
+        shards = [[] for index in range(self.workers)]
+        for destination in destinations:
+            destination_hash = self.connection.destination_bytes(destination)
+            shards[int.from_bytes(destination_hash[:4], "big") % self.workers if destination_hash != None else 0].append(destination)
+
+        with self.condition:
+            if self.queue_size > 0 and self.queued + job.total > self.queue_size:
+                job.dropped = job.total
+                self.dropped += job.total
+                log("LXMF - Fan-out queue full (" + str(self.queued) + "), job " + str(job) + " dropped", LOG_WARNING)
+                return job
+            job.queued = job.total
+            self.queued += job.total
+            for index in range(self.workers):
+                if len(shards[index]) > 0:
+                    self.queues[index].append((job, shards[index], args))
+            self.condition.notify_all()
+
+        return job
+
+
+    def send_chunks(self, job, destinations, args):
+        for i in range(0, len(destinations), self.chunk):
+            chunk = destinations[i:i+self.chunk]
+            self.pace(len(chunk))
+            try:
+                job.add(self.connection.send_many(chunk, *args))
+            except Exception as e:
+                job.fail(len(chunk))
+                log("LXMF - Fan-out of job " + str(job) + " failed", LOG_ERROR)
+                log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
+            if self.workers > 0:
+                job.dequeue(len(chunk))
+                with self.condition:
+                    self.queued -= len(chunk)
+
+
+    def process(self, index):
+        queue = self.queues[index]
+        while True:
+            with self.condition:
+                while len(queue) == 0:
+                    self.condition.wait()
+                job, destinations, args = queue.popleft()
+            self.send_chunks(job, destinations, args)
+
+
+    # Rate ceiling over all workers (the tokens may become negative, the next chunk waits for them).
+    def pace(self, count):
+        if self.rate <= 0:
+            return
+
+        with self.tokens_lock:
+            now = time.time()
+            self.tokens = min(self.burst, self.tokens + (now - self.tokens_time) * self.rate)
+            self.tokens_time = now
+            self.tokens -= count
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+    def job_add(self, job):
+        with self.jobs_lock:
+            self.jobs.pop(job.key, None)
+            self.jobs[job.key] = job
+            while len(self.jobs) > self.jobs_size:
+                self.jobs.popitem(last=False)
+
+
+    def job_get(self, key):
+        with self.jobs_lock:
+            return self.jobs.get(key)
+
+
+    # Last job of a source (/delivery).
+    def job_last(self, source):
+        with self.jobs_lock:
+            for job in reversed(self.jobs.values()):
+                if job.source == source:
+                    return job
+        return None
+
+
+    def job_list(self):
+        with self.jobs_lock:
+            return list(reversed(self.jobs.values()))
+
+
+    def stat(self):
+        with self.condition:
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "dropped": self.dropped,
+                "jobs": len(self.jobs),
+            }
+
+
+class lxmf_fanout_job():
+    def __init__(self, key, source="", app_data=""):
+        self.key = key
+        self.source = source
+        self.app_data = app_data
+        self.timestamp = time.time()
+        self.total = 0
+        self.queued = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = []
+        self.lock = threading.Lock()
+
+
+    def __str__(self):
+        return "<" + str(self.key) + " " + str(self.app_data) + ">"
+
+
+    def add(self, batch):
+        with self.lock:
+            self.batches.append(batch)
+
+
+    def fail(self, count):
+        with self.lock:
+            self.failed += count
+
+
+    def dequeue(self, count):
+        with self.lock:
+            self.queued -= count
+
+
+    def progress(self):
+        with self.lock:
+            batches = list(self.batches)
+            progress = {
+                "total": self.total,
+                "queued": self.queued,
+                "sent": 0,
+                "delivered": 0,
+                "failed": self.failed,
+                "dropped": self.dropped,
+                "pending": 0,
+                "duration": round(time.time() - self.timestamp, 3),
+            }
+        for batch in batches:
+            progress["sent"] += batch.queued
+            progress["delivered"] += batch.delivered
+            progress["failed"] += batch.failed + batch.invalid
+            progress["dropped"] += batch.dropped
+            progress["pending"] += batch.pending()
+        return progress
+
+
+    def done(self):
+        progress = self.progress()
+        return progress["queued"] <= 0 and progress["pending"] <= 0
+
+
 ##############################################################################################################
 # LXMF Functions
 
 
 #### LXMF - Announce ####
 class lxmf_announce_callback:
+    filtered = 0
+    processed = 0
+
     def __init__(self, aspect_filter=None):
         self.aspect_filter = aspect_filter
 
 
     @staticmethod
     def received_announce(destination_hash, announced_identity, app_data):
+        global DATA
+
+        config = CONFIG_SNAPSHOT
+
+        if destination_hash.hex() not in DATA.index or not (config.main.auto_name_def or config.main.auto_name_change):
+            lxmf_announce_callback.filtered += 1
+            return
+
+        lxmf_announce_callback.processed += 1
+
         if app_data == None:
             return
 
@@ -816,61 +3116,61 @@ class lxmf_announce_callback:
         except:
             return
 
-        log("LXMF - Received an announce from " + RNS.prettyhexrep(destination_hash) + ": " + app_data, LOG_INFO)
+        log("LXMF - Received an announce from " + RNS.prettyhexrep(destination_hash) + ": " + app_data, LOG_DEBUG)
 
-        global DATA
+        lng_key = "-" + config.main.lng
+        config_lng = config.lng(lng_key)
 
-        lng_key = "-" + CONFIG["main"]["lng"]
+        if config.main.auto_name_def or config.main.auto_name_change:
+            source_hash = RNS.hexrep(destination_hash, False)
+            for user_section in DATA.member_sections(source_hash):
+                val = DATA[user_section][source_hash]
+                if (val == "" and config.main.auto_name_def) or (val != "" and config.main.auto_name_change):
+                    value = app_data
+                    if value != val:
+                        if val == "":
+                            content_type = "name_def"
+                            content_add = " " + value
+                        else:
+                            content_type = "name_change"
+                            content_add = " " + val + " -> " + value
 
-        sections = []
-        for (key, val) in CONFIG.items("rights"):
-            if DATA.has_section(key):
-                sections.append(key)
+                        DATA[user_section][source_hash] = value
 
-        if CONFIG["main"].getboolean("auto_name_def") or CONFIG["main"].getboolean("auto_name_change"):
-            source_hash = RNS.hexrep(destination_hash, False)
-            for section in DATA.sections():
-                for (key, val) in DATA.items(section):
-                    if key == source_hash:
-                        if (val == "" and CONFIG["main"].getboolean("auto_name_def")) or (val != "" and CONFIG["main"].getboolean("auto_name_change")):
-                            value = app_data
-                            if value != DATA[section][key]:
-                                if DATA[section][key] == "":
-                                    content_type = "name_def"
-                                    content_add = " " + value
-                                else:
-                                    content_type = "name_change"
-                                    content_add = " " + DATA[section][key] + " -> " + value
-
-                                DATA[section][key] = value
-
-                                content_group = config_get(CONFIG, "interface_messages", "member_"+content_type, "", lng_key)
-                                if content_group != "":
-                                    fields = fields_generate(lng_key, h=destination_hash ,n=value, tpl=content_type)
-                                    content_group = replace(content_group, source_hash, value, "", lng_key)
-                                    content_group = content_group + content_add
-                                    for section in sections:
-                                        if "receive_auto_"+content_type in config_get(CONFIG, "rights", section).split(","):
-                                            for (key, val) in DATA.items(section):
-                                                if key != source_hash:
-                                                    LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
-
-                                if CONFIG["main"].getboolean("auto_save_data"):
-                                    DATA.remove_option("main", "unsaved")
-                                    if not data_save(PATH + "/data.cfg"):
-                                        DATA["main"]["unsaved"] = "True"
-                                else:
-                                    DATA["main"]["unsaved"] = "True"
+                        content_group = config_lng.interface_messages.get("member_"+content_type)
+                        if content_group != "":
+                            fields = fields_generate(lng_key, h=destination_hash ,n=value, tpl=content_type)
+                            content_group = replace(content_group, source_hash, value, "", lng_key)
+                            content_group = content_group + content_add
+                            recipients = recipients_get("receive_auto_"+content_type, source_hash)
+                            lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
+
+                        if config.main.auto_save_data:
+                            DATA.remove_option("main", "unsaved")
+                            if not data_save(PATH + "/data.cfg"):
+                                DATA["main"]["unsaved"] = "True"
+                        else:
+                            DATA["main"]["unsaved"] = "True"
+
+
+    @staticmethod
+    def stat():
+        return {
+            "filtered": lxmf_announce_callback.filtered,
+            "processed": lxmf_announce_callback.processed,
+        }
 
 
 #### LXMF - Message ####
 def lxmf_message_received_callback(message):
-    if CONFIG["lxmf"].getboolean("signature_validated") and not message.signature_validated:
+    config = CONFIG_SNAPSHOT
+
+    if config.lxmf.signature_validated and not message.signature_validated:
         log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " have no valid signature", LOG_DEBUG)
         return
 
     title = message.title.decode('utf-8').strip()
-    denys = config_getarray(CONFIG, "message", "deny_title")
+    denys = config.message.getarray("deny_title")
     if len(denys) > 0:
         if "*" in denys:
             return
@@ -879,7 +3179,7 @@ def lxmf_message_received_callback(message):
                 return
 
     content = message.content.decode('utf-8').strip()
-    denys = config_getarray(CONFIG, "message", "deny_content")
+    denys = config.message.getarray("deny_content")
     if len(denys) > 0:
         if "*" in denys:
             return
@@ -888,7 +3188,7 @@ def lxmf_message_received_callback(message):
                 return
 
     if message.fields:
-        denys = config_getarray(CONFIG, "message", "deny_fields")
+        denys = config.message.getarray("deny_fields")
         if len(denys) > 0:
             if "*" in denys:
                 return
@@ -896,88 +3196,95 @@ def lxmf_message_received_callback(message):
                 if deny in message.fields:
                     return
 
-    if not CONFIG["message"].getboolean("title"):
+    if not config.message.title:
         title = ""
 
-    if CONFIG["message"].getboolean("fields") and message.fields:
+    if config.message.fields and message.fields:
         pass
     elif content == "":
         return
 
     fields = message.fields
 
-    lng_key = "-" + CONFIG["main"]["lng"]
-
-    sections = []
-    for (key, val) in CONFIG.items("rights"):
-        if DATA.has_section(key):
-            sections.append(key)
+    lng_key = "-" + config.main.lng
+    config_lng = config.lng(lng_key)
 
     destination_hash = RNS.hexrep(message.destination_hash, False)
     source_hash = RNS.hexrep(message.source_hash, False)
     source_name = ""
     source_right = ""
 
-    for section in DATA.sections():
+    source_sections = DATA.member_sections(source_hash)
+
+    for section in source_sections:
         if section.startswith("block"):
-            if DATA.has_option(section, source_hash):
-                log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " blocked", LOG_DEBUG)
-                source_right = section.replace("block_", "")
-                source_rights = config_get(CONFIG, "rights", source_right)
-                source_rights = source_rights.split(",")
-                if "reply_block" in source_rights:
-                    content_user = config_get(CONFIG, "interface_messages", "reply_block", "", lng_key)
-                    content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
-                    if content_user != "":
-                        LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
-                return
+            log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " blocked", LOG_DEBUG)
+            source_right = section.replace("block_", "")
+            source_rights = RIGHTS.get(source_right, frozenset())
+            if RATE_LIMITER:
+                rate, burst = rate_limit_get("default")
+                if RATE_LIMITER.check(message.source_hash, rate, burst) != RATE_LIMITER.ALLOWED:
+                    return
+            if "reply_block" in source_rights:
+                content_user = config_lng.interface_messages.reply_block
+                content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
+                if content_user != "":
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+            return
 
     source_rights = []
-    for section in DATA.sections():
-        for (key, val) in DATA.items(section):
-            if key == source_hash:
-                if source_name == "":
-                    source_name = val
-                source_right = section
-                source_rights.append(section)
+    for section in source_sections:
+        if source_name == "":
+            source_name = DATA[section][source_hash]
+        source_right = section
+        source_rights.append(section)
+
+    if RATE_LIMITER:
+        rate, burst = rate_limit_get(source_right if source_right != "" else "default")
+        state = RATE_LIMITER.check(message.source_hash, rate, burst)
+        if state != RATE_LIMITER.ALLOWED:
+            log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " rate limited", LOG_DEBUG)
+            if state == RATE_LIMITER.LIMITED:
+                content_user = config_lng.interface_messages.reply_rate_limit
+                content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
+                if content_user != "":
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+            return
 
     if fields:
         if "c_n" in fields and "c_t" in fields and "m_t" in fields:
-            if fields["c_n"] == CONFIG["cluster"]["name"] and fields["c_t"] == CONFIG["cluster"]["type"] and "cluster" in source_rights and config_getboolean(CONFIG, "cluster", "enabled"):
-                title_prefix = config_get(CONFIG, "message", "cluster_receive_title_prefix", "", lng_key)
-                content_prefix = config_get(CONFIG, "message", "cluster_receive_prefix", "", lng_key)
-                content_suffix = config_get(CONFIG, "message", "cluster_receive_suffix", "", lng_key)
+            if fields["c_n"] == config.cluster.name and fields["c_t"] == config.cluster.type and "cluster" in source_rights and config.cluster.enabled:
+                if not rate_limit_global(message.source_hash):
+                    return
 
-                title_prefix = replace(title_prefix, source_hash, source_name, source_right, lng_key)
-                content_prefix = replace(content_prefix, source_hash, source_name, source_right, lng_key)
-                content_suffix = replace(content_suffix, source_hash, source_name, source_right, lng_key)
+                title_prefix = config_lng.message.cluster_receive_title_prefix
+                content_prefix = config_lng.message.cluster_receive_prefix
+                content_suffix = config_lng.message.cluster_receive_suffix
 
                 source = source_name.rsplit('/', 1)[-1]
-                destination = config_get(CONFIG, "cluster", "display_name", "", lng_key).rsplit('/', 1)[-1]
-                title_prefix = title_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_source"+CONFIG["interface"]["delimiter_output"], source)
-                title_prefix = title_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_destination"+CONFIG["interface"]["delimiter_output"], destination)
-                content_prefix = content_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_source"+CONFIG["interface"]["delimiter_output"], source)
-                content_prefix = content_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_destination"+CONFIG["interface"]["delimiter_output"], destination)
-                content_suffix = content_suffix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_source"+CONFIG["interface"]["delimiter_output"], source)
-                content_suffix = content_suffix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_destination"+CONFIG["interface"]["delimiter_output"], destination)
-
-                search = config_get(CONFIG, "message", "cluster_receive_search")
+                destination = config_lng.cluster.display_name.rsplit('/', 1)[-1]
+                context = template_context(source_hash, source_name, source_right, lng_key, {"cluster_source": source, "cluster_destination": destination})
+                title_prefix = template_render(title_prefix, context)
+                content_prefix = template_render(content_prefix, context)
+                content_suffix = template_render(content_suffix, context)
+
+                search = config.message.cluster_receive_search
                 if search != "":
-                    content = content.replace(search, config_get(CONFIG, "message", "cluster_receive_replace"))
+                    content = content.replace(search, config.message.cluster_receive_replace)
 
-                search = config_get(CONFIG, "message", "cluster_receive_regex_search")
+                search = config.message.cluster_receive_regex_search
                 if search != "":
-                    content = re.sub(search, config_get(CONFIG, "message", "cluster_receive_regex_replace"), content)
+                    content = re.sub(search, config.message.cluster_receive_regex_replace, content)
 
                 title = title_prefix + title
                 content = content_prefix + content + content_suffix
 
-                if config_get(CONFIG, "message", "timestamp", "", lng_key) == "client":
+                if config_lng.message.timestamp == "client":
                     timestamp = message.timestamp
                 else:
                     timestamp = time.time()
 
-                if CONFIG["message"].getboolean("fields"):
+                if config.message.fields:
                     if message.fields:
                         fields = fields_remove(message.fields, "fields_remove_anonymous" if "anonymous" in source_rights else "fields_remove")
                     else:
@@ -986,19 +3293,16 @@ def lxmf_message_received_callback(message):
                     fields = {}
                 fields = fields(fields)
 
-                if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("cluster"):
+                if config.statistic.enabled and config.statistic.cluster:
                     statistic("add", "cluster_in_" + message.desired_method_str)
 
                 if fields["m_t"] == "message":
-                    for section in sections:
-                        if "receive_cluster" in config_get(CONFIG, "rights", section).split(","):
-                            for (key, val) in DATA.items(section):
-                                if key != source_hash:
-                                    LXMF_CONNECTION.send(key, content, title, fields, timestamp, "cluster_send")
+                    recipients = recipients_get("receive_cluster", source_hash)
+                    lxmf_send_many(recipients, content, title, fields, timestamp, "cluster_send", message, source_hash)
                 elif fields["m_t"] == "pin":
-                    delimiter = CONFIG["interface"]["delimiter_output"]
+                    delimiter = config.interface.delimiter_output
 
-                    value_new = config_get(CONFIG, "interface_menu", "cluster_pin", "", lng_key)
+                    value_new = config_lng.interface_menu.cluster_pin
                     value_new = replace(value_new, source_hash, source_name, source_right, lng_key)
                     value_new = value_new.replace(delimiter+"value"+delimiter, content)
 
@@ -1012,18 +3316,15 @@ def lxmf_message_received_callback(message):
 
                     DATA["pin"][key] = value_new
 
-                    content_group = config_get(CONFIG, "interface_messages", "cluster_pin_add", "", lng_key)
+                    content_group = config_lng.interface_messages.cluster_pin_add
                     content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                     content_group = content_group.replace(delimiter+"key"+delimiter, key)
                     content_group = content_group.replace(delimiter+"value"+delimiter, value_new)
                     if content_group != "":
-                        for section in sections:
-                            if "receive_cluster_pin_add" in config_get(CONFIG, "rights", section).split(","):
-                                for (key, val) in DATA.items(section):
-                                    if key != source_hash:
-                                        LXMF_CONNECTION.send(key, content_group, "", fields, None, "cluster_send")
+                        recipients = recipients_get("receive_cluster_pin_add", source_hash)
+                        lxmf_send_many(recipients, content_group, "", fields, None, "cluster_send")
 
-                    if CONFIG["main"].getboolean("auto_save_data"):
+                    if config.main.auto_save_data:
                         DATA.remove_option("main", "unsaved")
                         if not data_save(PATH + "/data.cfg"):
                             DATA["main"]["unsaved"] = "True"
@@ -1033,13 +3334,16 @@ def lxmf_message_received_callback(message):
             return
 
     if source_right == "" and DATA["main"].getboolean("auto_add_user"):
-        if CONFIG["lxmf"].getboolean("signature_validated_new") and not message.signature_validated:
+        if config.lxmf.signature_validated_new and not message.signature_validated:
             log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " have no valid signature 'new'", LOG_DEBUG)
             return
 
+        if not rate_limit_global(message.source_hash):
+            return
+
         source_right = DATA["main"]["auto_add_user_type"]
         if DATA.has_section(source_right) and source_right != "main":
-            if CONFIG["main"].getboolean("auto_name_add"):
+            if config.main.auto_name_add:
                 app_data = RNS.Identity.recall_app_data(message.source_hash)
                 if app_data != None and len(app_data) > 0:
                     try:
@@ -1051,17 +3355,14 @@ def lxmf_message_received_callback(message):
                     source_name = app_data.decode('utf-8')
             DATA[source_right][source_hash] = source_name
             DATA.remove_option("main", "unsaved")
-            content = config_get(CONFIG, "interface_messages", "auto_add_"+source_right, "", lng_key)
-            content_group = config_get(CONFIG, "interface_messages", "member_join", "", lng_key)
+            content = config_lng.interface_messages.get("auto_add_"+source_right)
+            content_group = config_lng.interface_messages.member_join
             content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
             if content_group != "":
                 fields = fields_generate(lng_key, h=message.source_hash ,n=source_name, m=True, tpl="join")
-                for section in sections:
-                    if "receive_join" in config_get(CONFIG, "rights", section).split(","):
-                        for (key, val) in DATA.items(section):
-                            if key != source_hash:
-                                LXMF_CONNECTION.send(key, content_group, title, fields, None, "interface_send")
-            if CONFIG["main"].getboolean("auto_save_data"):
+                recipients = recipients_get("receive_join", source_hash)
+                lxmf_send_many(recipients, content_group, title, fields, None, "interface_send")
+            if config.main.auto_save_data:
                 DATA.remove_option("main", "unsaved")
                 if not data_save(PATH + "/data.cfg"):
                     DATA["main"]["unsaved"] = "True"
@@ -1069,129 +3370,131 @@ def lxmf_message_received_callback(message):
                 DATA["main"]["unsaved"] = "True"
             content = replace(content, source_hash, source_name, source_right, lng_key)
             if content != "":
-                LXMF_CONNECTION.send(source_hash, content, title, fields_generate(lng_key, m=True, d=True, r=True, cmd=source_right, config=source_right, tpl="info"), None, "interface_send")
+                lxmf_send(source_hash, content, title, fields_generate(lng_key, m=True, d=True, r=True, cmd=source_right, config=source_right, tpl="info"), None, "interface_send")
         return
     elif source_right == "":
         log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " not exist (auto add disabled)", LOG_DEBUG)
         return
 
 
-    source_rights = config_get(CONFIG, "rights", source_right)
-    if source_rights == "":
+    source_rights = RIGHTS.get(source_right, frozenset())
+    if not source_rights:
         log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " have no right", LOG_DEBUG)
         return
-    source_rights = source_rights.split(",")
+
+    if not rate_limit_global(message.source_hash):
+        return
 
 
-    if CONFIG["lxmf"].getboolean("signature_validated_known") and not message.signature_validated:
+    if config.lxmf.signature_validated_known and not message.signature_validated:
         log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " have no valid signature 'known'", LOG_DEBUG)
         if "reply_signature" in source_rights:
-            content_user = config_get(CONFIG, "interface_messages", "reply_signature", "", lng_key)
+            content_user = config_lng.interface_messages.reply_signature
             content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
             if content_user != "":
-                LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
         return
 
 
-    length = config_getint(CONFIG, "message", "receive_length_min", 0, lng_key)
+    length = config_lng.message.receive_length_min
     if length> 0:
         if len(content) < length:
             if "reply_length_min" in source_rights:
-                content_user = config_get(CONFIG, "interface_messages", "reply_length_min", "", lng_key)
+                content_user = config_lng.interface_messages.reply_length_min
                 content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                 if content_user != "":
-                    LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
             return
 
 
-    length = config_getint(CONFIG, "message", "receive_length_max", 0, lng_key)
+    length = config_lng.message.receive_length_max
     if length > 0:
         if len(content) > length:
             if "reply_length_max" in source_rights:
-                content_user = config_get(CONFIG, "interface_messages", "reply_length_max", "", lng_key)
+                content_user = config_lng.interface_messages.reply_length_max
                 content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                 if content_user != "":
-                    LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
             return
 
 
-    title_prefix = config_get(CONFIG, "message", "receive_title_prefix", "", lng_key)
-    content_prefix = config_get(CONFIG, "message", "receive_prefix", "", lng_key)
-    content_suffix = config_get(CONFIG, "message", "receive_suffix", "", lng_key)
+    title_prefix = config_lng.message.receive_title_prefix
+    content_prefix = config_lng.message.receive_prefix
+    content_suffix = config_lng.message.receive_suffix
 
-    search = config_get(CONFIG, "message", "receive_search")
+    search = config.message.receive_search
     if search != "":
-        content = content.replace(search, config_get(CONFIG, "message", "receive_replace"))
+        content = content.replace(search, config.message.receive_replace)
 
-    search = config_get(CONFIG, "message", "receive_regex_search")
+    search = config.message.receive_regex_search
     if search != "":
-        content = re.sub(search, config_get(CONFIG, "message", "receive_regex_replace"), content)
+        content = re.sub(search, config.message.receive_regex_replace, content)
 
     title = title_prefix + title
     content = content_prefix + content + content_suffix
 
 
     # Interface
-    if content.startswith(CONFIG["interface"]["delimiter_input"]):
-        if not config_getboolean(CONFIG, "interface", "enabled"):
+    if content.startswith(config.interface.delimiter_input):
+        if not config.interface.enabled:
             log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " 'interface' disabled", LOG_DEBUG)
             if "reply_interface_enabled" in source_rights:
-                content_user = config_get(CONFIG, "interface_messages", "reply_interface_enabled", "", lng_key)
+                content_user = config_lng.interface_messages.reply_interface_enabled
                 content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                 if content_user != "":
-                    LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
             return
 
         if "interface" not in source_rights:
             log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " 'interface' not allowed", LOG_DEBUG)
             if "reply_interface_right" in source_rights:
-                content_user = config_get(CONFIG, "interface_messages", "reply_interface_right", "", lng_key)
+                content_user = config_lng.interface_messages.reply_interface_right
                 content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                 if content_user != "":
-                    LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
             return
 
-        content = interface(content[len(CONFIG["interface"]["delimiter_input"]):], source_hash, source_name, source_right, source_rights, lng_key, message)
+        content = interface(content[len(config.interface.delimiter_input):], source_hash, source_name, source_right, source_rights, lng_key, message)
         if content == "":
             log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " 'interface' not allowed (empty response)", LOG_DEBUG)
             return
 
-        if CONFIG["statistic"].getboolean("enabled"):
-            if CONFIG["statistic"].getboolean("interface"):
+        if config.statistic.enabled:
+            if config.statistic.interface:
                 statistic("add", "interface_received_" + message.desired_method_str)
-            if CONFIG["statistic"].getboolean("user"):
+            if config.statistic.user:
                 statistic("value_set", source_hash, "activity", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
                 statistic("value_set", source_hash, "activity_receive", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
 
-        LXMF_CONNECTION.send(source_hash, content, "", fields_generate(lng_key), None, "interface_send")
+        lxmf_send(source_hash, content, "", fields_generate(lng_key), None, "interface_send")
         return
 
 
     # Message - Cluster
-    if content.startswith(CONFIG["cluster"]["delimiter_input"]):
-        if not config_getboolean(CONFIG, "cluster", "enabled") or not DATA["main"].getboolean("enabled_cluster"):
+    if content.startswith(config.cluster.delimiter_input):
+        if not config.cluster.enabled or not DATA["main"].getboolean("enabled_cluster"):
            log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " 'cluster' disabled", LOG_DEBUG)
            if "reply_cluster_enabled" in source_rights:
-               content_user = config_get(CONFIG, "interface_messages", "reply_cluster_enabled", "", lng_key)
+               content_user = config_lng.interface_messages.reply_cluster_enabled
                content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                if content_user != "":
-                   LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                   lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
            return
 
         if "send_cluster" not in source_rights:
             log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " 'cluster' not allowed", LOG_DEBUG)
             if "reply_cluster_right" in source_rights:
-                content_user = config_get(CONFIG, "interface_messages", "reply_cluster_right", "", lng_key)
+                content_user = config_lng.interface_messages.reply_cluster_right
                 content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                 if content_user != "":
-                    LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
             return
 
         try:
-            content = content[len(CONFIG["cluster"]["delimiter_input"]):]
+            content = content[len(config.cluster.delimiter_input):]
             destination, content = content.split(" ", 1)
         except:
-            LXMF_CONNECTION.send(source_hash, config_get(CONFIG, "interface_menu", "cluster_format_error", "", lng_key) , "", fields_generate(lng_key), None, "interface_send")
+            lxmf_send(source_hash, config_lng.interface_menu.cluster_format_error , "", fields_generate(lng_key), None, "interface_send")
             return
 
         destinations = []
@@ -1200,76 +3503,68 @@ def lxmf_message_received_callback(message):
                 destinations.append(key)
 
         if len(destinations) == 0:
-            LXMF_CONNECTION.send(source_hash, config_get(CONFIG, "interface_menu", "cluster_found_error", "", lng_key) , "", fields_generate(lng_key), None, "interface_send")
+            lxmf_send(source_hash, config_lng.interface_menu.cluster_found_error , "", fields_generate(lng_key), None, "interface_send")
             return
 
-        length = config_getint(CONFIG, "message", "cluster_send_length_min", 0, lng_key)
+        length = config_lng.message.cluster_send_length_min
         if length> 0:
             if len(content) < length:
                 if "reply_length_min" in source_rights:
-                    content_user = config_get(CONFIG, "interface_messages", "reply_length_min", "", lng_key)
+                    content_user = config_lng.interface_messages.reply_length_min
                     content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                     if content_user != "":
-                        LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                        lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
                 return
 
-        length = config_getint(CONFIG, "message", "cluster_send_length_max", 0, lng_key)
+        length = config_lng.message.cluster_send_length_max
         if length > 0:
             if len(content) > length:
                 if "reply_length_max" in source_rights:
-                    content_user = config_get(CONFIG, "interface_messages", "reply_length_max", "", lng_key)
+                    content_user = config_lng.interface_messages.reply_length_max
                     content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                     if content_user != "":
-                        LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                        lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
                 return
 
-        title_prefix = config_get(CONFIG, "message", "cluster_send_title_prefix", "", lng_key)
-        content_prefix = config_get(CONFIG, "message", "cluster_send_prefix", "", lng_key)
-        content_suffix = config_get(CONFIG, "message", "cluster_send_suffix", "", lng_key)
+        title_prefix = config_lng.message.cluster_send_title_prefix
+        content_prefix = config_lng.message.cluster_send_prefix
+        content_suffix = config_lng.message.cluster_send_suffix
 
+        source = config_lng.cluster.display_name.rsplit('/', 1)[-1]
         if "anonymous" in source_rights:
-            title_prefix = replace(title_prefix, "", "", source_right, lng_key)
-            content_prefix = replace(content_prefix, "", "", source_right, lng_key)
-            content_suffix = replace(content_suffix, "", "", source_right, lng_key)
+            context = template_context("", "", source_right, lng_key, {"cluster_source": source, "cluster_destination": destination})
         else:
-            title_prefix = replace(title_prefix, source_hash, source_name, source_right, lng_key)
-            content_prefix = replace(content_prefix, source_hash, source_name, source_right, lng_key)
-            content_suffix = replace(content_suffix, source_hash, source_name, source_right, lng_key)
-
-        source = config_get(CONFIG, "cluster", "display_name", "", lng_key).rsplit('/', 1)[-1]
-        title_prefix = title_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_source"+CONFIG["interface"]["delimiter_output"], source)
-        title_prefix = title_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_destination"+CONFIG["interface"]["delimiter_output"], destination)
-        content_prefix = content_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_source"+CONFIG["interface"]["delimiter_output"], source)
-        content_prefix = content_prefix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_destination"+CONFIG["interface"]["delimiter_output"], destination)
-        content_suffix = content_suffix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_source"+CONFIG["interface"]["delimiter_output"], source)
-        content_suffix = content_suffix.replace(CONFIG["interface"]["delimiter_output"]+"cluster_destination"+CONFIG["interface"]["delimiter_output"], destination)
-
-        search = config_get(CONFIG, "message", "cluster_send_search")
+            context = template_context(source_hash, source_name, source_right, lng_key, {"cluster_source": source, "cluster_destination": destination})
+        title_prefix = template_render(title_prefix, context)
+        content_prefix = template_render(content_prefix, context)
+        content_suffix = template_render(content_suffix, context)
+
+        search = config.message.cluster_send_search
         if search != "":
-            content = content.replace(search, config_get(CONFIG, "message", "cluster_send_replace"))
+            content = content.replace(search, config.message.cluster_send_replace)
 
-        search = config_get(CONFIG, "message", "cluster_send_regex_search")
+        search = config.message.cluster_send_regex_search
         if search != "":
-            content = re.sub(search, config_get(CONFIG, "message", "cluster_send_regex_replace"), content)
+            content = re.sub(search, config.message.cluster_send_regex_replace, content)
 
-        if CONFIG["message"].getboolean("fields"):
+        if config.message.fields:
             if message.fields:
                 fields = fields_remove(message.fields, "fields_remove_anonymous" if "anonymous" in source_rights else "fields_remove")
             else:
                 fields = {}
         else:
             fields = {}
-        if CONFIG["main"].getboolean("fields_message"):
+        if config.main.fields_message:
             if not 0xA7 in fields:
                 fields[0xA7] = message.hash
             if not "anonymous" in source_rights and 0xAF not in fields:
                 fields[0xAF] = {}
                 fields[0xAF]["h"] = message.source_hash
                 fields[0xAF]["n"] = source_name
-        fields["c_n"] = CONFIG["cluster"]["name"]
-        fields["c_t"] = CONFIG["cluster"]["type"]
+        fields["c_n"] = config.cluster.name
+        fields["c_t"] = config.cluster.type
 
-        delimiter_input = CONFIG["interface"]["delimiter_input"]
+        delimiter_input = config.interface.delimiter_input
         if (content.startswith(delimiter_input+"pin ") or content.startswith(delimiter_input+"pins ")) and "cluster_pin_add" in source_rights:
             content = content.lstrip(delimiter_input+"pin ")
             content = content.lstrip(delimiter_input+"pins ")
@@ -1280,27 +3575,26 @@ def lxmf_message_received_callback(message):
         title = title_prefix + title
         content = content_prefix + content + content_suffix
 
-        if config_get(CONFIG, "message", "timestamp", "", lng_key) == "client":
+        if config_lng.message.timestamp == "client":
             timestamp = message.timestamp
         else:
             timestamp = time.time()
 
-        if CONFIG["statistic"].getboolean("enabled"):
-            if CONFIG["statistic"].getboolean("cluster"):
+        if config.statistic.enabled:
+            if config.statistic.cluster:
                 statistic("add", "cluster_received_" + message.desired_method_str)
-            if CONFIG["statistic"].getboolean("user"):
+            if config.statistic.user:
                 statistic("add", source_hash)
                 statistic("value_set", source_hash, "activity", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
                 statistic("value_set", source_hash, "activity_receive", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
 
-        for val in destinations:
-            LXMF_CONNECTION.send(key, content, title, fields, timestamp, "cluster_out")
+        lxmf_send_many(destinations, content, title, fields, timestamp, "cluster_out")
 
         cluster_loop = False
-        if destination in config_get(CONFIG, "cluster", "display_name", "", lng_key).split("/"):
+        if destination in config_lng.cluster.display_name.split("/"):
             cluster_loop = True
 
-        if CONFIG["message"].getboolean("fields"):
+        if config.message.fields:
             if message.fields:
                 fields = fields_remove(message.fields, "fields_remove_anonymous" if "anonymous" in source_rights else "fields_remove")
             else:
@@ -1308,9 +3602,9 @@ def lxmf_message_received_callback(message):
         else:
             fields = {}
 
-        if CONFIG["main"].getboolean("fields_message"):
-            if CONFIG["lxmf"]["destination_type_conv"] != "":
-                fields[0xB3] = CONFIG["lxmf"].getint("destination_type_conv")
+        if config.main.fields_message:
+            if config.lxmf.destination_type_conv != "":
+                fields[0xB3] = int(config.lxmf.destination_type_conv)
             if not 0xA7 in fields:
                 fields[0xA7] = message.hash
             if not "anonymous" in source_rights and 0xAF not in fields:
@@ -1318,11 +3612,11 @@ def lxmf_message_received_callback(message):
                 fields[0xAF]["h"] = message.source_hash
                 fields[0xAF]["n"] = source_name
 
-        for section in sections:
-            if "receive_cluster_send" in config_get(CONFIG, "rights", section).split(",") or (cluster_loop and "receive_cluster_loop" in config_get(CONFIG, "rights", section).split(",")):
-                for (key, val) in DATA.items(section):
-                    if key != source_hash:
-                        LXMF_CONNECTION.send(key, content, title, fields, timestamp, "local_send")
+        if cluster_loop:
+            recipients = recipients_get(("receive_cluster_send", "receive_cluster_loop"), source_hash)
+        else:
+            recipients = recipients_get("receive_cluster_send", source_hash)
+        lxmf_send_many(recipients, content, title, fields, timestamp, "local_send", message, source_hash)
 
         return
 
@@ -1331,51 +3625,50 @@ def lxmf_message_received_callback(message):
     if DATA["main"].getboolean("enabled_local"):
         if "send_local" in source_rights:
 
-            length = config_getint(CONFIG, "message", "send_length_min", 0, lng_key)
+            length = config_lng.message.send_length_min
             if length> 0:
                 if len(content) < length:
                     if "reply_length_min" in source_rights:
-                        content_user = config_get(CONFIG, "interface_messages", "reply_length_min", "", lng_key)
+                        content_user = config_lng.interface_messages.reply_length_min
                         content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                         if content_user != "":
-                            LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                            lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
                     return
 
-            length = config_getint(CONFIG, "message", "send_length_max", 0, lng_key)
+            length = config_lng.message.send_length_max
             if length > 0:
                 if len(content) > length:
                     if "reply_length_max" in source_rights:
-                        content_user = config_get(CONFIG, "interface_messages", "reply_length_max", "", lng_key)
+                        content_user = config_lng.interface_messages.reply_length_max
                         content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                         if content_user != "":
-                            LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                            lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
                     return
 
-            title_prefix = config_get(CONFIG, "message", "send_title_prefix", "", lng_key)
-            content_prefix = config_get(CONFIG, "message", "send_prefix", "", lng_key)
-            content_suffix = config_get(CONFIG, "message", "send_suffix", "", lng_key)
+            title_prefix = config_lng.message.send_title_prefix
+            content_prefix = config_lng.message.send_prefix
+            content_suffix = config_lng.message.send_suffix
 
             if "anonymous" in source_rights:
-                title_prefix = replace(title_prefix, "", "", source_right, lng_key)
-                content_prefix = replace(content_prefix, "", "", source_right, lng_key)
-                content_suffix = replace(content_suffix, "", "", source_right, lng_key)
+                context = template_context("", "", source_right, lng_key)
             else:
-                title_prefix = replace(title_prefix, source_hash, source_name, source_right, lng_key)
-                content_prefix = replace(content_prefix, source_hash, source_name, source_right, lng_key)
-                content_suffix = replace(content_suffix, source_hash, source_name, source_right, lng_key)
+                context = template_context(source_hash, source_name, source_right, lng_key)
+            title_prefix = template_render(title_prefix, context)
+            content_prefix = template_render(content_prefix, context)
+            content_suffix = template_render(content_suffix, context)
 
-            search = config_get(CONFIG, "message", "send_search")
+            search = config.message.send_search
             if search != "":
-                content = content.replace(search, config_get(CONFIG, "message", "send_replace"))
+                content = content.replace(search, config.message.send_replace)
 
-            search = config_get(CONFIG, "message", "send_regex_search")
+            search = config.message.send_regex_search
             if search != "":
-                content = re.sub(search, config_get(CONFIG, "message", "send_regex_replace"), content)
+                content = re.sub(search, config.message.send_regex_replace, content)
 
             title = title_prefix + title
             content = content_prefix + content + content_suffix
 
-            if CONFIG["message"].getboolean("fields"):
+            if config.message.fields:
                 if message.fields:
                     fields = fields_remove(message.fields, "fields_remove_anonymous" if "anonymous" in source_rights else "fields_remove")
                 else:
@@ -1383,9 +3676,9 @@ def lxmf_message_received_callback(message):
             else:
                 fields = {}
 
-            if CONFIG["main"].getboolean("fields_message"):
-                if CONFIG["lxmf"]["destination_type_conv"] != "":
-                    fields[0xB3] = CONFIG["lxmf"].getint("destination_type_conv")
+            if config.main.fields_message:
+                if config.lxmf.destination_type_conv != "":
+                    fields[0xB3] = int(config.lxmf.destination_type_conv)
                 if not 0xA7 in fields:
                     fields[0xA7] = message.hash
                 if not "anonymous" in source_rights and 0xAF not in fields:
@@ -1393,38 +3686,35 @@ def lxmf_message_received_callback(message):
                     fields[0xAF]["h"] = message.source_hash
                     fields[0xAF]["n"] = source_name
 
-            if config_get(CONFIG, "message", "timestamp", "", lng_key) == "client":
+            if config_lng.message.timestamp == "client":
                 timestamp = message.timestamp
             else:
                 timestamp = time.time()
 
-            if CONFIG["statistic"].getboolean("enabled"):
-                if CONFIG["statistic"].getboolean("local"):
+            if config.statistic.enabled:
+                if config.statistic.local:
                     statistic("add", "local_received_" + message.desired_method_str)
-                if CONFIG["statistic"].getboolean("user"):
+                if config.statistic.user:
                     statistic("add", source_hash)
                     statistic("value_set", source_hash, "activity", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
                     statistic("value_set", source_hash, "activity_receive", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
 
-            for section in sections:
-                if "receive_local" in config_get(CONFIG, "rights", section).split(","):
-                    for (key, val) in DATA.items(section):
-                        if key != source_hash:
-                            LXMF_CONNECTION.send(key, content, title, fields, timestamp, "local_send")
+            recipients = recipients_get("receive_local", source_hash)
+            lxmf_send_many(recipients, content, title, fields, timestamp, "local_send", message, source_hash)
             return
         else:
             log("LXMF - Source " + RNS.prettyhexrep(message.source_hash) + " 'send' not allowed", LOG_DEBUG)
             if "reply_local_right" in source_rights:
-                content_user = config_get(CONFIG, "interface_messages", "reply_local_right", "", lng_key)
+                content_user = config_lng.interface_messages.reply_local_right
                 content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                 if content_user != "":
-                    LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                    lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
     else:
         if "reply_local_enabled" in source_rights:
-            content_user = config_get(CONFIG, "interface_messages", "reply_local_enabled", "", lng_key)
+            content_user = config_lng.interface_messages.reply_local_enabled
             content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
             if content_user != "":
-                LXMF_CONNECTION.send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
+                lxmf_send(source_hash, content_user, "", fields_generate(lng_key), None, "interface_send")
 
 
     return
@@ -1432,38 +3722,61 @@ def lxmf_message_received_callback(message):
 
 #### LXMF - Notification ####
 def lxmf_message_notification_success_callback(message):
-    if CONFIG["statistic"].getboolean("enabled"):
-        if message.app_data.startswith("cluster") and CONFIG["statistic"].getboolean("cluster"):
+    if CONFIG_SNAPSHOT.statistic.enabled:
+        if message.app_data.startswith("cluster") and CONFIG_SNAPSHOT.statistic.cluster:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_success")
-        elif message.app_data.startswith("router") and CONFIG["statistic"].getboolean("router"):
+        elif message.app_data.startswith("router") and CONFIG_SNAPSHOT.statistic.router:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_success")
-        elif message.app_data.startswith("local") and CONFIG["statistic"].getboolean("local"):
+        elif message.app_data.startswith("local") and CONFIG_SNAPSHOT.statistic.local:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_success")
-        elif message.app_data.startswith("interface") and CONFIG["statistic"].getboolean("interface"):
+        elif message.app_data.startswith("interface") and CONFIG_SNAPSHOT.statistic.interface:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_success")
 
-        if CONFIG["statistic"].getboolean("user"):
+        if CONFIG_SNAPSHOT.statistic.user:
             if message.desired_method_str == "direct":
                 destination_hash = RNS.hexrep(message.destination_hash, False)
-                statistic("value_set", destination_hash, "activity", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
-                statistic("value_set", destination_hash, "activity_send", time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time())))
+                activity = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(time.time()))
+                statistic("value_set", destination_hash, "activity", activity)
+                statistic("value_set", destination_hash, "activity_send", activity)
     return
 
 
 #### LXMF - Notification ####
 def lxmf_message_notification_failed_callback(message):
-    if CONFIG["statistic"].getboolean("enabled"):
-        if message.app_data.startswith("cluster") and CONFIG["statistic"].getboolean("cluster"):
+    if CONFIG_SNAPSHOT.statistic.enabled:
+        if message.app_data.startswith("cluster") and CONFIG_SNAPSHOT.statistic.cluster:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_failed")
-        elif message.app_data.startswith("router") and CONFIG["statistic"].getboolean("router"):
+        elif message.app_data.startswith("router") and CONFIG_SNAPSHOT.statistic.router:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_failed")
-        elif message.app_data.startswith("local") and CONFIG["statistic"].getboolean("local"):
+        elif message.app_data.startswith("local") and CONFIG_SNAPSHOT.statistic.local:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_failed")
-        elif message.app_data.startswith("interface") and CONFIG["statistic"].getboolean("interface"):
+        elif message.app_data.startswith("interface") and CONFIG_SNAPSHOT.statistic.interface:
             statistic("add", message.app_data + "_" + message.desired_method_str + "_failed")
     return
 
 
+#### LXMF - Send ####
+# All messages of the group are sent through FANOUT (rate ceiling, order per recipient).
+def lxmf_send(destination, content="", title="", fields=None, timestamp=None, app_data=""):
+    if FANOUT == None:
+        return LXMF_CONNECTION.send(destination, content, title, fields, timestamp, app_data)
+    return FANOUT.send(None, "", [destination], content, title, fields, timestamp, app_data)
+
+
+#### LXMF - Send many ####
+# With the originating message the progress is tracked per 0xA7 hash for "/delivery".
+def lxmf_send_many(destinations, content="", title="", fields=None, timestamp=None, app_data="", message=None, source_hash=""):
+    if FANOUT == None:
+        return LXMF_CONNECTION.send_many(destinations, content, title, fields, timestamp, app_data)
+    key = None
+    if message != None:
+        key = fields.get(0xA7, message.hash) if fields else message.hash
+        if not isinstance(key, bytes):
+            key = RNS.Identity.get_random_hash()
+        key = RNS.hexrep(key, False)
+    return FANOUT.send(key, source_hash, destinations, content, title, fields, timestamp, app_data)
+
+
 ##############################################################################################################
 # RNS Functions
 
@@ -1481,11 +3794,6 @@ class rns_announce_callback:
 
             lng_key = "-" + CONFIG["main"]["lng"]
 
-            sections = []
-            for (key, val) in CONFIG.items("rights"):
-                if DATA.has_section(key):
-                    sections.append(key)
-
             receive = app_data.decode("utf-8")
             if receive != "":
                 receive = json.loads(receive)
@@ -1497,10 +3805,8 @@ class rns_announce_callback:
                             content_group = config_get(CONFIG, "interface_messages", "cluster_join", "", lng_key)
                             content_group = replace(content_group, receive["h"], receive["c_n"], "", lng_key)
                             if content_group != "":
-                                for section in sections:
-                                    if "receive_cluster_join" in config_get(CONFIG, "rights", section).split(","):
-                                        for (key, val) in DATA.items(section):
-                                                LXMF_CONNECTION.send(key, content_group, "", fields_generate(lng_key), None, "interface_send")
+                                recipients = recipients_get("receive_cluster_join")
+                                lxmf_send_many(recipients, content_group, "", fields_generate(lng_key), None, "interface_send")
                         DATA["cluster"][receive["h"]] = receive["c_n"]
                         executed = True
 
@@ -1528,21 +3834,21 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
 
     content = ""
 
-    delimiter = CONFIG["interface"]["delimiter_output"]
+    config = CONFIG_SNAPSHOT
+    config_lng = config.lng(lng_key)
 
-    sections = []
-    for (key, val) in CONFIG.items("rights"):
-        if DATA.has_section(key):
-            sections.append(key)
+    delimiter = config.interface.delimiter_output
+
+    sections = [section for section in RIGHTS if DATA.has_section(section)]
 
     # "/help" command.
     if (cmd == "help" or cmd == "?") and "help" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "help_"+source_right, "", lng_key)
+        content = config_lng.interface_menu.get("help_"+source_right)
         interface_help = ""
         interface_help_command = ""
         for value in source_rights:
-            interface_help = interface_help + config_get(CONFIG, "interface_help", value, "", lng_key)
-            interface_help_command = interface_help_command + config_get(CONFIG, "interface_help_command", value, "", lng_key)
+            interface_help = interface_help + config_lng.interface_help.get(value)
+            interface_help_command = interface_help_command + config_lng.interface_help_command.get(value)
         content = content.replace(delimiter+"interface_help"+delimiter, interface_help)
         content = content.replace(delimiter+"interface_help_command"+delimiter, interface_help_command)
         content = replace(content, source_hash, source_name, source_right, lng_key)
@@ -1551,85 +3857,82 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
     # "/update" command.
     elif (cmd == "update") and "update" in source_rights:
         try:
-            content = config_get(CONFIG, "interface_menu", "update_ok", "", lng_key)
-            LXMF_CONNECTION.send(source_hash, content, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=source_right, config=source_right, tpl="update"), None, "interface_send")
+            content = config_lng.interface_menu.get("update_ok")
+            lxmf_send(source_hash, content, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=source_right, config=source_right, tpl="update"), None, "interface_send")
             content = ""
         except:
-            content = config_get(CONFIG, "interface_menu", "update_error", "", lng_key)
+            content = config_lng.interface_menu.get("update_error")
 
 
     # "/update_all" command.
     elif (cmd == "update_all") and "update_all" in source_rights:
         try:
-            content = config_get(CONFIG, "interface_menu", "update_all_ok", "", lng_key)
+            content = config_lng.interface_menu.get("update_all_ok")
             for section in sections:
-                for (key, val) in DATA.items(section):
-                    LXMF_CONNECTION.send(key, content, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=section, config=section, tpl="update"), None, "interface_send")
+                recipients = []
+                recipients.extend(DATA.members(section))
+                lxmf_send_many(recipients, content, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=section, config=section, tpl="update"), None, "interface_send")
             content = ""
         except:
-            content = config_get(CONFIG, "interface_menu", "update_all_error", "", lng_key)
+            content = config_lng.interface_menu.get("update_all_error")
 
 
     # "/join" command.
     elif (cmd == "join" or cmd == "subscribe") and "join" in source_rights:
         try:
-            content = config_get(CONFIG, "interface_messages", "auto_add_"+source_right, "", lng_key)
+            content = config_lng.interface_messages.get("auto_add_"+source_right)
             content = replace(content, source_hash, source_name, source_right, lng_key)
             if content != "":
-                LXMF_CONNECTION.send(source_hash, content, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=source_right, config=source_right, tpl="info"), None, "interface_send")
+                lxmf_send(source_hash, content, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=source_right, config=source_right, tpl="info"), None, "interface_send")
                 content = ""
         except:
-            content = config_get(CONFIG, "interface_menu", "join_error", "", lng_key)
+            content = config_lng.interface_menu.get("join_error")
 
 
     # "/leave" command.
     elif (cmd == "leave" or cmd == "unsubscribe" or cmd == "part") and "leave" in source_rights:
         try:
-            for section in sections:
-                for (key, val) in DATA.items(section):
-                    if key == source_hash:
-                        DATA.remove_option(section, key)
+            for section in DATA.member_sections(source_hash):
+                if section in sections:
+                    DATA.remove_option(section, source_hash)
 
-            if CONFIG["statistic"].getboolean("enabled"):
-                statistic("del", key)
+            if config.statistic.enabled:
+                statistic("del", source_hash)
 
-            content_group = config_get(CONFIG, "interface_messages", "member_leave", "", lng_key)
+            content_group = config_lng.interface_messages.get("member_leave")
             content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
             if content_group != "":
                 fields = fields_generate(lng_key, h=message.source_hash ,n=source_name, m=True, tpl="leave")
-                for section in sections:
-                    if "receive_leave" in config_get(CONFIG, "rights", section).split(","):
-                        for (key, val) in DATA.items(section):
-                            LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                recipients = recipients_get("receive_leave")
+                lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-            content = config_get(CONFIG, "interface_menu", "leave_ok", "", lng_key)
+            content = config_lng.interface_menu.get("leave_ok")
             content = replace(content, source_hash, source_name, source_right, lng_key)
             if content != "":
-                LXMF_CONNECTION.send(source_hash, content, "", {0xA3: None, 0xB1: "info"}, None, "interface_send")
+                lxmf_send(source_hash, content, "", {0xA3: None, 0xB1: "info"}, None, "interface_send")
                 content = ""
 
-            if CONFIG["main"].getboolean("auto_save_data"):
+            if config.main.auto_save_data:
                 DATA.remove_option("main", "unsaved")
                 if not data_save(PATH + "/data.cfg"):
                     DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "leave_error", "", lng_key)
+            content = config_lng.interface_menu.get("leave_error")
 
 
     # "/name" command.
     elif (cmd == "name" or cmd == "nick") and "name" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "name", "", lng_key)
+        content = config_lng.interface_menu.get("name")
         content = replace(content, source_hash, source_name, source_right, lng_key)
 
     elif (cmd.startswith("name ") or cmd.startswith("nick ") or cmd.startswith("setname ")) and "name" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
-            for section in sections:
-                for (key, val) in DATA.items(section):
-                    if key == source_hash:
-                        DATA[section][key] = value
+            for section in DATA.member_sections(source_hash):
+                if section in sections:
+                    DATA[section][source_hash] = value
 
             if source_name == "":
                 content_type = "name_def"
@@ -1638,45 +3941,42 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                 content_type = "name_change"
                 content_add = " " + source_name + " -> " + value
 
-            content_group = config_get(CONFIG, "interface_messages", "member_"+content_type, "", lng_key)
+            content_group = config_lng.interface_messages.get("member_"+content_type)
             if content_group != "":
                 fields = fields_generate(lng_key, h=message.source_hash ,n=source_name, tpl=content_type)
                 content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                 content_group = content_group + content_add
-                for section in sections:
-                    if "receive_"+content_type in config_get(CONFIG, "rights", section).split(","):
-                        for (key, val) in DATA.items(section):
-                            if key != source_hash:
-                                LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                recipients = recipients_get("receive_"+content_type, source_hash)
+                lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-            content = config_get(CONFIG, "interface_menu", "name_ok", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("name_ok") + " " + value
 
-            if CONFIG["main"].getboolean("auto_save_data"):
+            if config.main.auto_save_data:
                 DATA.remove_option("main", "unsaved")
                 if not data_save(PATH + "/data.cfg"):
                     DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "name_error", "", lng_key)
+            content = config_lng.interface_menu.get("name_error")
 
 
     # "/address" command.
     elif cmd == "address" and "address" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "address_"+source_right, "", lng_key)
+        content = config_lng.interface_menu.get("address_"+source_right)
         content = replace(content, source_hash, source_name, source_right, lng_key)
 
 
     # "/info" command.
     elif cmd == "info" and "info" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "info_"+source_right, "", lng_key)
+        content = config_lng.interface_menu.get("info_"+source_right)
         content = replace(content, source_hash, source_name, source_right, lng_key)
 
 
     # "/pin" command.
     elif (cmd == "pin" or cmd == "pins") and "pin" in source_rights:
         count = 0
-        content = config_get(CONFIG, "interface_menu", "pin_header", "", lng_key)
+        content = config_lng.interface_menu.get("pin_header")
         content = replace(content, source_hash, source_name, source_right, lng_key)
         for (key, val) in DATA.items("pin"):
             count += 1
@@ -1686,11 +3986,11 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
     elif (cmd.startswith("pin ") or cmd.startswith("pins ")) and "pin_add" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
-            value_new = config_get(CONFIG, "interface_menu", "pin", "", lng_key)
+            value_new = config_lng.interface_menu.get("pin")
             value_new = replace(value_new, source_hash, source_name, source_right, lng_key)
             value_new = value_new.replace(delimiter+"value"+delimiter, value)
 
-            key = time.strftime(config_get(CONFIG, "message", "pin_id", "%y%m%d-%H%M%S", lng_key), time.localtime(time.time()))
+            key = time.strftime(config_lng.message.get("pin_id", "%y%m%d-%H%M%S"), time.localtime(time.time()))
             if DATA.has_option("pin", key):
                 key = key + "-"
                 key_int = 0
@@ -1700,27 +4000,24 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
 
             DATA["pin"][key] = value_new
 
-            content_group = config_get(CONFIG, "interface_messages", "pin_add", "", lng_key)
+            content_group = config_lng.interface_messages.get("pin_add")
             content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
             content_group = content_group.replace(delimiter+"key"+delimiter, key)
             content_group = content_group.replace(delimiter+"value"+delimiter, value_new)
             if content_group != "":
-                for section in sections:
-                    if "receive_pin_add" in config_get(CONFIG, "rights", section).split(","):
-                        for (key, val) in DATA.items(section):
-                            if key != source_hash:
-                                LXMF_CONNECTION.send(key, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name), None, "interface_send")
+                recipients = recipients_get("receive_pin_add", source_hash)
+                lxmf_send_many(recipients, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name), None, "interface_send")
 
-            content = config_get(CONFIG, "interface_menu", "pin_add_ok", "", lng_key)
+            content = config_lng.interface_menu.get("pin_add_ok")
 
-            if CONFIG["main"].getboolean("auto_save_data"):
+            if config.main.auto_save_data:
                 DATA.remove_option("main", "unsaved")
                 if not data_save(PATH + "/data.cfg"):
                     DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
     elif (cmd.startswith("unpin ") or cmd.startswith("unpins ")) and "pin_remove" in source_rights:
         try:
@@ -1731,34 +4028,31 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                 value = DATA["pin"][key]
                 DATA.remove_option("pin", key)
 
-                content_group = config_get(CONFIG, "interface_messages", "pin_remove", "", lng_key)
+                content_group = config_lng.interface_messages.get("pin_remove")
                 content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                 content_group = content_group.replace(delimiter+"key"+delimiter, key)
                 content_group = content_group.replace(delimiter+"value"+delimiter, value)
                 if content_group != "":
-                    for section in sections:
-                        if "receive_pin_add" in config_get(CONFIG, "rights", section).split(","):
-                            for (key, val) in DATA.items(section):
-                                if key != source_hash:
-                                    LXMF_CONNECTION.send(key, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name), None, "interface_send")
+                    recipients = recipients_get("receive_pin_add", source_hash)
+                    lxmf_send_many(recipients, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name), None, "interface_send")
 
-                content = config_get(CONFIG, "interface_menu", "pin_remove_ok", "", lng_key)
+                content = config_lng.interface_menu.get("pin_remove_ok")
 
-                if CONFIG["main"].getboolean("auto_save_data"):
+                if config.main.auto_save_data:
                     DATA.remove_option("main", "unsaved")
                     if not data_save(PATH + "/data.cfg"):
                         DATA["main"]["unsaved"] = "True"
                 else:
                     DATA["main"]["unsaved"] = "True"
             else:
-                content = config_get(CONFIG, "interface_menu", "pin_found_error", "", lng_key)
+                content = config_lng.interface_menu.get("pin_found_error")
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/version" command.
     elif cmd == "version" and "version" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "version_header", "", lng_key)
+        content = config_lng.interface_menu.get("version_header")
         content = replace(content, source_hash, source_name, source_right, lng_key)
         content = content + NAME + "\n" + DESCRIPTION + "\nV" + VERSION
 
@@ -1766,26 +4060,30 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
     # "/groups" command.
     elif (cmd == "groups"  or cmd == "group" or cmd == "cluster") and "groups" in source_rights:
         count = 0
-        content = config_get(CONFIG, "interface_menu", "groups_header", "", lng_key)
+        content = config_lng.interface_menu.get("groups_header")
         content = replace(content, source_hash, source_name, source_right, lng_key)
-        content_member = config_get(CONFIG, "interface_menu", "groups_member", "", lng_key)
+        content_member = template_compile(config_lng.interface_menu.get("groups_member"))
+        context = template_context(lng_key=lng_key)
+        contents = [content]
         data_dict = defaultdict(dict)
         section = "cluster"
         for (key, val) in DATA.items(section):
             data_dict[val] = key
         for key in sorted(data_dict):
             count += 1
-            content = content + replace(content_member, data_dict[key], key, section, lng_key)
-        content = content.replace(delimiter+"count"+delimiter, str(count))
+            contents.append(content_member.render(context.source(data_dict[key], key, section)))
+        content = "".join(contents).replace(delimiter+"count"+delimiter, str(count))
 
     elif (cmd.startswith("groups ") or cmd.startswith("group ") or cmd.startswith("cluster ")) and "groups" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             executed = False
             count = 0
-            content = config_get(CONFIG, "interface_menu", "groups_search_header", "", lng_key)
+            content = config_lng.interface_menu.get("groups_search_header")
             content = replace(content, source_hash, source_name, source_right, lng_key)
-            content_member = config_get(CONFIG, "interface_menu", "groups_search_member", "", lng_key)
+            content_member = template_compile(config_lng.interface_menu.get("groups_search_member"))
+            context = template_context(lng_key=lng_key)
+            contents = [content]
             data_dict = defaultdict(dict)
             section = "cluster"
             for (key, val) in DATA.items(section):
@@ -1794,25 +4092,27 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                     data_dict[val] = key
             for key in sorted(data_dict):
                 count += 1
-                content = content + replace(content_member, data_dict[key], key, section, lng_key)
-            content = content.replace(delimiter+"count"+delimiter, str(count))
+                contents.append(content_member.render(context.source(data_dict[key], key, section)))
+            content = "".join(contents).replace(delimiter+"count"+delimiter, str(count))
             if not executed:
-                content = config_get(CONFIG, "interface_menu", "groups_search_found_error", "", lng_key)
+                content = config_lng.interface_menu.get("groups_search_found_error")
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/members" command.
     elif (cmd == "members"  or cmd == "member" or cmd == "names" or cmd == "who") and "members" in source_rights:
         count = 0
-        content = config_get(CONFIG, "interface_menu", "members_header", "", lng_key)
+        content = config_lng.interface_menu.get("members_header")
         content = replace(content, source_hash, source_name, source_right, lng_key)
-        content_member = config_get(CONFIG, "interface_menu", "members_member", "", lng_key)
+        content_member = template_compile(config_lng.interface_menu.get("members_member"))
+        context = template_context(lng_key=lng_key)
+        contents = [content]
         for section in sections:
             for (key, val) in DATA.items(section):
                 count += 1
-                content = content + replace(content_member, key, val, section, lng_key)
-        content = content.replace(delimiter+"count"+delimiter, str(count))
+                contents.append(content_member.render(context.source(key, val, section)))
+        content = "".join(contents).replace(delimiter+"count"+delimiter, str(count))
 
 
     # "/search" command.
@@ -1821,33 +4121,37 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             cmd, value = cmd.split(" ", 1)
             executed = False
             count = 0
-            content = config_get(CONFIG, "interface_menu", "search_header", "", lng_key)
+            content = config_lng.interface_menu.get("search_header")
             content = replace(content, source_hash, source_name, source_right, lng_key)
-            content_member = config_get(CONFIG, "interface_menu", "search_member", "", lng_key)
+            content_member = template_compile(config_lng.interface_menu.get("search_member"))
+            context = template_context(lng_key=lng_key)
+            contents = [content]
             for section in sections:
                 for (key, val) in DATA.items(section):
                     if fnmatch.fnmatch(key, value) or fnmatch.fnmatch(val, value):
                         executed = True
                         count += 1
-                        content = content + replace(content_member, key, val, section, lng_key).replace(delimiter+"activity_receive"+delimiter, statistic_value_get(key, "activity_receive")).replace(delimiter+"activity_send"+delimiter, statistic_value_get(key, "activity_send"))
-            content = content.replace(delimiter+"count"+delimiter, str(count))
+                        contents.append(content_member.render(context.source(key, val, section)))
+            content = "".join(contents).replace(delimiter+"count"+delimiter, str(count))
             if not executed:
-                content = config_get(CONFIG, "interface_menu", "search_found_error", "", lng_key)
+                content = config_lng.interface_menu.get("search_found_error")
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/activitys" command.
     elif (cmd == "activitys" or cmd == "activity") and "activitys" in source_rights:
         count = 0
-        content = config_get(CONFIG, "interface_menu", "activitys_header", "", lng_key)
+        content = config_lng.interface_menu.get("activitys_header")
         content = replace(content, source_hash, source_name, source_right, lng_key)
-        content_member = config_get(CONFIG, "interface_menu", "activitys_member", "", lng_key)
+        content_member = template_compile(config_lng.interface_menu.get("activitys_member"))
+        context = template_context(lng_key=lng_key)
+        contents = [content]
         for section in sections:
             for (key, val) in DATA.items(section):
                 count += 1
-                content = content + replace(content_member, key, val, section, lng_key).replace(delimiter+"activity_receive"+delimiter, statistic_value_get(key, "activity_receive")).replace(delimiter+"activity_send"+delimiter, statistic_value_get(key, "activity_send"))
-        content = content.replace(delimiter+"count"+delimiter, str(count))
+                contents.append(content_member.render(context.source(key, val, section)))
+        content = "".join(contents).replace(delimiter+"count"+delimiter, str(count))
 
 
     # "/statistic" command.
@@ -1858,8 +4162,8 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             value = "day"
         values = ["day", "last_day", "week", "last_week", "month", "last_month", "year", "last_year", "all", "max"] 
         if value in values:
-            if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("cluster") and "statistic_cluster" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
-                content = content + replace(config_get(CONFIG, "interface_menu", "statistic_header_cluster", "", lng_key), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
+            if config.statistic.enabled and config.statistic.cluster and "statistic_cluster" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
+                content = content + replace(config_lng.interface_menu.get("statistic_header_cluster"), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
                 if "statistic_min" in source_rights:
                     statistic_recalculate("cluster_received_direct")
                     statistic_recalculate("cluster_received_propagated")
@@ -1893,8 +4197,8 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                     content = content + "#Out - Direct - Failed:\n" + statistic_get("cluster_out_direct_failed") + "\n\n"
                     content = content + "#Out - Propagated - Failed:\n" + statistic_get("cluster_out_propagated_failed") + "\n\n"
 
-            if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("router") and "statistic_router" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
-                content = content + replace(config_get(CONFIG, "interface_menu", "statistic_header_router", "", lng_key), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
+            if config.statistic.enabled and config.statistic.router and "statistic_router" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
+                content = content + replace(config_lng.interface_menu.get("statistic_header_router"), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
                 if "statistic_min" in source_rights:
                     statistic_recalculate("router_in_direct")
                     statistic_recalculate("router_in_propagated")
@@ -1913,8 +4217,8 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                     content = content + "#Out - Direct - Failed:\n" + statistic_get("router_out_direct_failed") + "\n\n"
                     content = content + "#Out - Propagated - Failed:\n" + statistic_get("router_out_propagated_failed") + "\n\n"
 
-            if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("local") and "statistic_local" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
-                content = content + replace(config_get(CONFIG, "interface_menu", "statistic_header_local", "", lng_key), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
+            if config.statistic.enabled and config.statistic.local and "statistic_local" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
+                content = content + replace(config_lng.interface_menu.get("statistic_header_local"), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
                 if "statistic_min" in source_rights:
                     statistic_recalculate("local_received_direct")
                     statistic_recalculate("local_received_propagated")
@@ -1933,8 +4237,8 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                     content = content + "#Send - Direct - Failed:\n" + statistic_get("local_send_direct_failed") + "\n\n"
                     content = content + "#Send - Propagated - Failed:\n" + statistic_get("local_send_propagated_failed") + "\n\n"
 
-            if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("interface") and "statistic_interface" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
-                content = content + replace(config_get(CONFIG, "interface_menu", "statistic_header_interface", "", lng_key), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
+            if config.statistic.enabled and config.statistic.interface and "statistic_interface" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
+                content = content + replace(config_lng.interface_menu.get("statistic_header_interface"), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
                 if "statistic_min" in source_rights:
                     statistic_recalculate("interface_received_direct")
                     statistic_recalculate("interface_received_propagated")
@@ -1953,13 +4257,13 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                     content = content + "#Send - Direct - Failed:\n" + statistic_get("interface_send_direct_failed") + "\n\n"
                     content = content + "#Send - Propagated - Failed:\n" + statistic_get("interface_send_propagated_failed") + "\n\n"
 
-            if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("user") and "statistic_self" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
-                content = content + replace(config_get(CONFIG, "interface_menu", "statistic_header_self", "", lng_key), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
+            if config.statistic.enabled and config.statistic.user and "statistic_self" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
+                content = content + replace(config_lng.interface_menu.get("statistic_header_self"), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
                 if "statistic_min" in source_rights or "statistic_full" in source_rights:
                     content = content + statistic_get(source_hash) + "\n\n"
 
-            if CONFIG["statistic"].getboolean("enabled") and CONFIG["statistic"].getboolean("user") and "statistic_user" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
-                content = content + replace(config_get(CONFIG, "interface_menu", "statistic_header_user", "", lng_key), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
+            if config.statistic.enabled and config.statistic.user and "statistic_user" in source_rights and ("statistic_min" in source_rights or "statistic_full" in source_rights):
+                content = content + replace(config_lng.interface_menu.get("statistic_header_user"), source_hash, source_name, source_right, lng_key).replace(delimiter+"value"+delimiter, value)
                 for section in STATISTIC.sections():
                     if section != "main" and not section.startswith("cluster") and not section.startswith("local") and not section.startswith("interface"):
                         if "statistic_min" in source_rights:
@@ -1968,86 +4272,107 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                         if "statistic_full" in source_rights:
                             content = "<" + section + ">:\n" + statistic_get(section) + "\n\n"
         else:
-            content = config_get(CONFIG, "interface_menu", "statistic_found_error", "", lng_key)
+            content = config_lng.interface_menu.get("statistic_found_error")
 
 
     # "/status" command.
     elif cmd == "status" and "status" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "status_"+source_right, "", lng_key)
+        content = config_lng.interface_menu.get("status_"+source_right)
         content = replace(content, source_hash, source_name, source_right, lng_key)
         content = content.replace(delimiter+"enabled_local"+delimiter, DATA["main"]["enabled_local"])
         content = content.replace(delimiter+"enabled_cluster"+delimiter, DATA["main"]["enabled_cluster"])
 
 
     # "/delivery" command.
-    #elif cmd == "delivery" and "delivery" in source_rights:
-    # TODO
+    elif (cmd == "delivery" or cmd == "message") and "delivery" in source_rights:
+        job = FANOUT.job_last(source_hash) if FANOUT else None
+        if job:
+            content = config_lng.interface_menu.get("delivery_header")
+            content = content + delivery_job_text(job, lng_key)
+            content = replace(content, source_hash, source_name, source_right, lng_key)
+        else:
+            content = config_lng.interface_menu.get("delivery_found_error")
+
+    elif (cmd.startswith("delivery ") or cmd.startswith("message ")) and "delivery" in source_rights and "delivery_all" in source_rights:
+        cmd, value = cmd.split(" ", 1)
+        value = value.strip().lower()
+        jobs = []
+        if FANOUT:
+            for job in FANOUT.job_list():
+                if value == "all" or job.key.startswith(value):
+                    jobs.append(job)
+        if len(jobs) > 0:
+            content = config_lng.interface_menu.get("delivery_header")
+            content = content + "".join(delivery_job_text(job, lng_key) for job in jobs)
+            content = replace(content, source_hash, source_name, source_right, lng_key)
+        else:
+            content = config_lng.interface_menu.get("delivery_found_error")
 
 
     # "/enable_local" command.
     elif cmd == "enable_local" and "enable_local" in source_rights:
         if DATA["main"].getboolean("enabled_local"):
-            content = config_get(CONFIG, "interface_menu", "enable_local_true", "", lng_key)
+            content = config_lng.interface_menu.get("enable_local_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "enable_local_false", "", lng_key)
+            content = config_lng.interface_menu.get("enable_local_false")
 
     elif cmd.startswith("enable_local ") and "enable_local" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["enabled_local"] = "True"
-                content = config_get(CONFIG, "interface_menu", "enable_local_true", "", lng_key)
+                content = config_lng.interface_menu.get("enable_local_true")
                 DATA["main"]["unsaved_local"] = "True"
             else:
                 DATA["main"]["enabled_local"] = "False"
-                content = config_get(CONFIG, "interface_menu", "enable_local_false", "", lng_key)
+                content = config_lng.interface_menu.get("enable_local_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "enable_local_error", "", lng_key)
+            content = config_lng.interface_menu.get("enable_local_error")
 
 
     # "/enable_cluster" command.
     elif cmd == "enable_cluster" and "enable_cluster" in source_rights:
         if DATA["main"].getboolean("enabled_cluster"):
-            content = config_get(CONFIG, "interface_menu", "enable_cluster_true", "", lng_key)
+            content = config_lng.interface_menu.get("enable_cluster_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "enable_cluster_false", "", lng_key)
+            content = config_lng.interface_menu.get("enable_cluster_false")
 
     elif cmd.startswith("enable_cluster ") and "enable_cluster" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["enabled_cluster"] = "True"
-                content = config_get(CONFIG, "interface_menu", "enable_cluster_true", "", lng_key)
+                content = config_lng.interface_menu.get("enable_cluster_true")
                 DATA["main"]["unsaved_cluster"] = "True"
             else:
                 DATA["main"]["enabled_cluster"] = "False"
-                content = config_get(CONFIG, "interface_menu", "enable_cluster_false", "", lng_key)
+                content = config_lng.interface_menu.get("enable_cluster_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "enable_cluster_error", "", lng_key)
+            content = config_lng.interface_menu.get("enable_cluster_error")
 
 
     # "/auto_add_user" command.
     elif cmd == "auto_add_user" and "auto_add_user" in source_rights:
         if DATA["main"].getboolean("auto_add_user"):
-            content = config_get(CONFIG, "interface_menu", "auto_add_user_true", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_user_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "auto_add_user_false", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_user_false")
 
     elif cmd.startswith("auto_add_user ") and "auto_add_user" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["auto_add_user"] = "True"
-                content = config_get(CONFIG, "interface_menu", "auto_add_user_true", "", lng_key)
+                content = config_lng.interface_menu.get("auto_add_user_true")
                 DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["auto_add_user"] = "False"
-                content = config_get(CONFIG, "interface_menu", "auto_add_user_false", "", lng_key)
+                content = config_lng.interface_menu.get("auto_add_user_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "auto_add_user_error", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_user_error")
 
 
     # "/auto_add_user_type" command.
@@ -2058,76 +4383,76 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
         try:
             cmd, value = cmd.split(" ", 1)
             DATA["main"]["auto_add_user_type"] = value
-            content = config_get(CONFIG, "interface_menu", "auto_add_user_type", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("auto_add_user_type") + " " + value
             DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "auto_add_user_type_error", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_user_type_error")
 
 
     # "/auto_add_cluster" command.
     elif cmd == "auto_add_cluster" and "auto_add_cluster" in source_rights:
         if DATA["main"].getboolean("auto_add_cluster"):
-            content = config_get(CONFIG, "interface_menu", "auto_add_cluster_true", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_cluster_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "auto_add_cluster_false", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_cluster_false")
 
     elif cmd.startswith("auto_add_cluster ") and "auto_add_cluster" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["auto_add_cluster"] = "True"
-                content = config_get(CONFIG, "interface_menu", "auto_add_cluster_true", "", lng_key)
+                content = config_lng.interface_menu.get("auto_add_cluster_true")
                 DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["auto_add_cluster"] = "False"
-                content = config_get(CONFIG, "interface_menu", "auto_add_cluster_false", "", lng_key)
+                content = config_lng.interface_menu.get("auto_add_cluster_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "auto_add_cluster_error", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_cluster_error")
 
 
     # "/auto_add_router" command.
     elif cmd == "auto_add_router" and "auto_add_router" in source_rights:
         if DATA["main"].getboolean("auto_add_router"):
-            content = config_get(CONFIG, "interface_menu", "auto_add_router_true", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_router_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "auto_add_router_false", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_router_false")
 
     elif cmd.startswith("auto_add_router ") and "auto_add_router" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["auto_add_router"] = "True"
-                content = config_get(CONFIG, "interface_menu", "auto_add_router_true", "", lng_key)
+                content = config_lng.interface_menu.get("auto_add_router_true")
                 DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["auto_add_router"] = "False"
-                content = config_get(CONFIG, "interface_menu", "auto_add_router_false", "", lng_key)
+                content = config_lng.interface_menu.get("auto_add_router_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "auto_add_router_error", "", lng_key)
+            content = config_lng.interface_menu.get("auto_add_router_error")
 
 
     # "/invite_user" command.
     elif cmd == "invite_user" and "invite_user" in source_rights:
         if DATA["main"].getboolean("invite_user"):
-            content = config_get(CONFIG, "interface_menu", "invite_user_true", "", lng_key)
+            content = config_lng.interface_menu.get("invite_user_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "invite_user_false", "", lng_key)
+            content = config_lng.interface_menu.get("invite_user_false")
 
     elif cmd.startswith("invite_user ") and "invite_user" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["invite_user"] = "True"
-                content = config_get(CONFIG, "interface_menu", "invite_user_true", "", lng_key)
+                content = config_lng.interface_menu.get("invite_user_true")
                 DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["invite_user"] = "False"
-                content = config_get(CONFIG, "interface_menu", "invite_user_false", "", lng_key)
+                content = config_lng.interface_menu.get("invite_user_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "invite_user_error", "", lng_key)
+            content = config_lng.interface_menu.get("invite_user_error")
 
 
     # "/invite_user_type" command.
@@ -2138,32 +4463,32 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
         try:
             cmd, value = cmd.split(" ", 1)
             DATA["main"]["invite_user_type"] = value
-            content = config_get(CONFIG, "interface_menu", "invite_user_type", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("invite_user_type") + " " + value
             DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "invite_user_type_error", "", lng_key)
+            content = config_lng.interface_menu.get("invite_user_type_error")
 
 
     # "/allow_user" command.
     elif cmd == "allow_user" and "allow_user" in source_rights:
         if DATA["main"].getboolean("allow_user"):
-            content = config_get(CONFIG, "interface_menu", "allow_user_true", "", lng_key)
+            content = config_lng.interface_menu.get("allow_user_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "allow_user_false", "", lng_key)
+            content = config_lng.interface_menu.get("allow_user_false")
 
     elif cmd.startswith("allow_user ") and "allow_user" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["allow_user"] = "True"
-                content = config_get(CONFIG, "interface_menu", "allow_user_true", "", lng_key)
+                content = config_lng.interface_menu.get("allow_user_true")
                 DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["allow_user"] = "False"
-                content = config_get(CONFIG, "interface_menu", "allow_user_false", "", lng_key)
+                content = config_lng.interface_menu.get("allow_user_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "allow_user_error", "", lng_key)
+            content = config_lng.interface_menu.get("allow_user_error")
 
 
     # "/allow_user_type" command.
@@ -2174,32 +4499,32 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
         try:
             cmd, value = cmd.split(" ", 1)
             DATA["main"]["allow_user_type"] = value
-            content = config_get(CONFIG, "interface_menu", "allow_user_type", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("allow_user_type") + " " + value
             DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "allow_user_type_error", "", lng_key)
+            content = config_lng.interface_menu.get("allow_user_type_error")
 
 
     # "/deny_user" command.
     elif cmd == "deny_user" and "deny_user" in source_rights:
         if DATA["main"].getboolean("deny_user"):
-            content = config_get(CONFIG, "interface_menu", "deny_user_true", "", lng_key)
+            content = config_lng.interface_menu.get("deny_user_true")
         else:
-            content = config_get(CONFIG, "interface_menu", "deny_user_false", "", lng_key)
+            content = config_lng.interface_menu.get("deny_user_false")
 
     elif cmd.startswith("deny_user ") and "deny_user" in source_rights:
         try:
             cmd, value = cmd.split(" ", 1)
             if val_to_bool(value):
                 DATA["main"]["deny_user"] = "True"
-                content = config_get(CONFIG, "interface_menu", "deny_user_true", "", lng_key)
+                content = config_lng.interface_menu.get("deny_user_true")
                 DATA["main"]["unsaved"] = "True"
             else:
                 DATA["main"]["deny_user"] = "False"
-                content = config_get(CONFIG, "interface_menu", "deny_user_false", "", lng_key)
+                content = config_lng.interface_menu.get("deny_user_false")
                 DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "deny_user_error", "", lng_key)
+            content = config_lng.interface_menu.get("deny_user_error")
 
 
     # "/deny_user_type" command.
@@ -2210,10 +4535,10 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
         try:
             cmd, value = cmd.split(" ", 1)
             DATA["main"]["deny_user_type"] = value
-            content = config_get(CONFIG, "interface_menu", "deny_user_type", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("deny_user_type") + " " + value
             DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "deny_user_type_error", "", lng_key)
+            content = config_lng.interface_menu.get("deny_user_type_error")
 
 
     # "/description" command.
@@ -2226,19 +4551,16 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             cmd, value = cmd.split(" ", 1)
             DATA["main"]["description"+lng_key] = value
 
-            content_group = config_get(CONFIG, "interface_messages", "description", "", lng_key)
+            content_group = config_lng.interface_messages.get("description")
             content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
             if content_group != "":
-                for section in sections:
-                    if "receive_description" in config_get(CONFIG, "rights", section).split(","):
-                        for (key, val) in DATA.items(section):
-                            if key != source_hash:
-                                LXMF_CONNECTION.send(key, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name, tpl="description"), None, "interface_send")
+                recipients = recipients_get("receive_description", source_hash)
+                lxmf_send_many(recipients, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name, tpl="description"), None, "interface_send")
 
-            content = config_get(CONFIG, "interface_menu", "description", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("description") + " " + value
             DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "description_error", "", lng_key)
+            content = config_lng.interface_menu.get("description_error")
 
 
     # "/rules" command.
@@ -2251,72 +4573,97 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             cmd, value = cmd.split(" ", 1)
             DATA["main"]["rules"+lng_key] = value
 
-            content_group = config_get(CONFIG, "interface_messages", "rules", "", lng_key)
+            content_group = config_lng.interface_messages.get("rules")
             content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
             if content_group != "":
-                for section in sections:
-                    if "receive_rules" in config_get(CONFIG, "rights", section).split(","):
-                        for (key, val) in DATA.items(section):
-                            if key != source_hash:
-                                LXMF_CONNECTION.send(key, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name, tpl="rules"), None, "interface_send")
+                recipients = recipients_get("receive_rules", source_hash)
+                lxmf_send_many(recipients, content_group, "", fields_generate(lng_key, h=message.source_hash ,n=source_name, tpl="rules"), None, "interface_send")
 
-            content = config_get(CONFIG, "interface_menu", "rules", "", lng_key) + " " + value
+            content = config_lng.interface_menu.get("rules") + " " + value
             DATA["main"]["unsaved"] = "True"
         except:
-            content = config_get(CONFIG, "interface_menu", "rules_error", "", lng_key)
+            content = config_lng.interface_menu.get("rules_error")
 
 
     # "/readme" command.
     elif cmd == "readme" and "readme" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "readme", "", lng_key)
+        content = config_lng.interface_menu.get("readme")
         content = replace(content, source_hash, source_name, source_right, lng_key)
 
 
     # "/time" command.
     elif cmd == "time" and "time" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "time", "", lng_key)
+        content = config_lng.interface_menu.get("time")
         content = time.strftime(content, time.localtime(time.time()))
         content = replace(content, source_hash, source_name, source_right, lng_key)
 
 
     # "/announce" command.
     elif cmd == "announce" and "announce" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "announce", "", lng_key)
+        content = config_lng.interface_menu.get("announce")
         content = replace(content, source_hash, source_name, source_right, lng_key)
-        LXMF_CONNECTION.announce_now()
-        if CONFIG["cluster"].getboolean("enabled"):
-            RNS_CONNECTION.announce_now()
+        LXMF_CONNECTION.announce()
+        if config.cluster.enabled:
+            RNS_CONNECTION.announce()
 
 
     # "/sync" command.
     elif cmd == "sync" and "sync" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "sync", "", lng_key)
+        content = config_lng.interface_menu.get("sync")
         content = replace(content, source_hash, source_name, source_right, lng_key)
-        LXMF_CONNECTION.sync_now()
+        LXMF_CONNECTION.sync()
 
 
     # "/show run" command.
     elif (cmd == "show run" or cmd == "sh run") and "show_run" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "show_run_header", "", lng_key)
+        content = config_lng.interface_menu.get("show_run_header")
         content = replace(content, source_hash, source_name, source_right, lng_key)
         for (key, val) in DATA.items("main"):
             content = content + key + " = " + val + "\n"
 
 
+    # "/profile" command.
+    elif (cmd == "profile" or cmd.startswith("profile ")) and "profile" in source_rights:
+        try:
+            cmd, value = cmd.split(" ", 1)
+            value = value.strip()
+        except:
+            value = ""
+        if value == "stop":
+            file = LXMF_CONNECTION.profiler.profile_stop()
+            key = "profile_stop"
+        elif value == "memory" or value == "mem":
+            tracing = tracemalloc.is_tracing()
+            file = LXMF_CONNECTION.profiler.memory()
+            key = "profile_memory" if tracing else "profile_memory_start"
+        elif value == "stacks":
+            file = LXMF_CONNECTION.profiler.stacks()
+            key = "profile_stacks"
+        else:
+            duration = int(value) if value.isdigit() else config.lxmf.get("profile_duration", 30)
+            file = LXMF_CONNECTION.profiler.profile_start(duration)
+            key = "profile"
+        if file != None or key == "profile_memory_start":
+            content = config_lng.interface_menu.get(key) + (file if file != None else "")
+        else:
+            content = config_lng.interface_menu.get("profile_error")
+        content = replace(content, source_hash, source_name, source_right, lng_key)
+
+
     # "/show" command.
     elif (cmd.startswith("show") or cmd.startswith("list") or cmd.startswith("sh")) and "show" in source_rights:
         try:
             cmd, key = cmd.split(" ", 1)
             if DATA.has_section(key) and key != "main":
-                content = config_get(CONFIG, "interface_menu", "show_header", "", lng_key)
+                content = config_lng.interface_menu.get("show_header")
                 content = replace(content, source_hash, source_name, source_right, lng_key)
                 content = content + "[" + key + "]\n"
                 for (section_key, section_val) in DATA.items(key):
                     content = content + section_key + " = " + section_val + "\n"
             else:
-                content = config_get(CONFIG, "interface_menu", "user_type_error", "", lng_key) + " " + key
+                content = config_lng.interface_menu.get("user_type_error") + " " + key
         except:
-            content = config_get(CONFIG, "interface_menu", "show_header", "", lng_key)
+            content = config_lng.interface_menu.get("show_header")
             content = replace(content, source_hash, source_name, source_right, lng_key)
             for section in DATA.sections():
                 if section in sections or section.replace("block_", "") in sections:
@@ -2333,20 +4680,18 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             if DATA.has_section(key) and key != "main":
                 value = LXMF_CONNECTION.destination_correct(value)
                 if value != "":
-                    for section in DATA.sections():
+                    for section in DATA.member_sections(value):
                         if section != "main":
-                            for (key, val) in DATA.items(section):
-                                if key == value:
-                                    DATA.remove_option(section, key)
+                            DATA.remove_option(section, value)
                     DATA[key][value] = name
-                    content = config_get(CONFIG, "interface_menu", "user_add", "", lng_key) + " " + value + " -> " + key
+                    content = config_lng.interface_menu.get("user_add") + " " + value + " -> " + key
                     DATA["main"]["unsaved"] = "True"
                 else:
-                    content = config_get(CONFIG, "interface_menu", "user_format_error", "", lng_key)
+                    content = config_lng.interface_menu.get("user_format_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "user_type_error", "", lng_key)
+                content = config_lng.interface_menu.get("user_type_error")
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/user" command.
@@ -2358,36 +4703,34 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                 if value != "":
                     if DATA.has_option(key, value):
                         DATA.remove_option(key, value)
-                        content = config_get(CONFIG, "interface_menu", "user_del", "", lng_key) + " " + value + " -> " + key
+                        content = config_lng.interface_menu.get("user_del") + " " + value + " -> " + key
                         DATA["main"]["unsaved"] = "True"
 
-                        if CONFIG["statistic"].getboolean("enabled"):
+                        if config.statistic.enabled:
                             statistic("del", value)
 
                     else:
-                        content = config_get(CONFIG, "interface_menu", "user_error", "", lng_key) + " " + value + " -> " + key
+                        content = config_lng.interface_menu.get("user_error") + " " + value + " -> " + key
                 else:
-                    content = config_get(CONFIG, "interface_menu", "user_format_error", "", lng_key)
+                    content = config_lng.interface_menu.get("user_format_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "user_type_error", "", lng_key)
+                content = config_lng.interface_menu.get("user_type_error")
         except:
             try:
                 cmd, value = cmd.split(" ", 1)
                 value = LXMF_CONNECTION.destination_correct(value)
                 if value != "":
-                    for section in DATA.sections():
+                    for section in DATA.member_sections(value):
                         if section != "main":
-                            for (key, val) in DATA.items(section):
-                                if key == value:
-                                    DATA.remove_option(section, key)
-                                    if CONFIG["statistic"].getboolean("enabled"):
-                                        statistic("del", value)
+                            DATA.remove_option(section, value)
+                            if config.statistic.enabled:
+                                statistic("del", value)
                     content = "OK: Removed user '" + value + "' from all types"
                     DATA["main"]["unsaved"] = "True"
                 else:
-                    content = config_get(CONFIG, "interface_menu", "user_format_error", "", lng_key)
+                    content = config_lng.interface_menu.get("user_format_error")
             except:
-               content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+               content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/user" command.
@@ -2397,22 +4740,21 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             if DATA.has_section(key) and key != "main":
                 value = LXMF_CONNECTION.destination_correct(value)
                 if value != "":
-                    for section in DATA.sections():
+                    for section in DATA.member_sections(value):
                         if section != "main":
-                            for (key_old, val_old) in DATA.items(section):
-                                if key_old == value:
-                                    DATA.remove_option(section, key_old)
-                                    DATA[key][value] = val_old
-                                    content = config_get(CONFIG, "interface_menu", "user_move", "", lng_key) + " " + value + " -> " + key
-                                    DATA["main"]["unsaved"] = "True"
+                            val_old = DATA[section][value]
+                            DATA.remove_option(section, value)
+                            DATA[key][value] = val_old
+                            content = config_lng.interface_menu.get("user_move") + " " + value + " -> " + key
+                            DATA["main"]["unsaved"] = "True"
                     if content == "":
-                        content = config_get(CONFIG, "interface_menu", "user_format_error", "", lng_key)
+                        content = config_lng.interface_menu.get("user_format_error")
                 else:
-                    content = config_get(CONFIG, "interface_menu", "user_format_error", "", lng_key)
+                    content = config_lng.interface_menu.get("user_format_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "user_type_error", "", lng_key)
+                content = config_lng.interface_menu.get("user_type_error")
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/user" command.
@@ -2424,22 +4766,22 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                 executed = False
                 for section in sections:
                     if DATA.has_option(section, key):
-                        content = config_get(CONFIG, "interface_menu", "user_rename", "", lng_key) + " " + DATA[section][key] + " -> " + value
+                        content = config_lng.interface_menu.get("user_rename") + " " + DATA[section][key] + " -> " + value
                         DATA[section][key] = value
                         executed = True
                 if executed:
-                    if CONFIG["main"].getboolean("auto_save_data"):
+                    if config.main.auto_save_data:
                         DATA.remove_option("main", "unsaved")
                         if not data_save(PATH + "/data.cfg"):
                             DATA["main"]["unsaved"] = "True"
                     else:
                         DATA["main"]["unsaved"] = "True"
                 else:
-                    content = config_get(CONFIG, "interface_menu", "user_found_error", "", lng_key) 
+                    content = config_lng.interface_menu.get("user_found_error") 
             else:
-                content = config_get(CONFIG, "interface_menu", "user_format_error", "", lng_key)
+                content = config_lng.interface_menu.get("user_format_error")
         except:
-           content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+           content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/invite" command.
@@ -2452,46 +4794,43 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                     value = LXMF_CONNECTION.destination_correct(value)
                     if value != "":
                         user_name = ""
-                        if CONFIG["main"].getboolean("auto_name_add"):
+                        if config.main.auto_name_add:
                             app_data = RNS.Identity.recall_app_data(bytes.fromhex(value))
                             if app_data != None:
                                 user_name = app_data.decode('utf-8')
                         DATA[key][value] = user_name
 
-                        content_user = config_get(CONFIG, "interface_messages", "invite_"+key, "", lng_key)
+                        content_user = config_lng.interface_messages.get("invite_"+key)
                         content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                         content_user = content_user.replace(delimiter+"user_name"+delimiter, user_name)
                         if content_user != "":
-                            LXMF_CONNECTION.send(value, content_user, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=key, config=key), None, "interface_send")
+                            lxmf_send(value, content_user, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=key, config=key), None, "interface_send")
 
-                        content_group = config_get(CONFIG, "interface_messages", "member_invite", "", lng_key)
+                        content_group = config_lng.interface_messages.get("member_invite")
                         content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                         content_group = content_group.replace(delimiter+"user_address"+delimiter, value)
                         content_group = content_group.replace(delimiter+"user_name"+delimiter, user_name)
                         if content_group != "":
                             fields = fields_generate(lng_key, h=bytes.fromhex(value) ,n=user_name, m=True, tpl="invite")
-                            for section in sections:
-                                if "receive_invite" in config_get(CONFIG, "rights", section).split(","):
-                                    for (key, val) in DATA.items(section):
-                                        if key != source_hash:
-                                            LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                            recipients = recipients_get("receive_invite", source_hash)
+                            lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-                        content = config_get(CONFIG, "interface_menu", "invite_ok", "", lng_key) + " <" + value + ">"
+                        content = config_lng.interface_menu.get("invite_ok") + " <" + value + ">"
 
-                        if CONFIG["main"].getboolean("auto_save_data"):
+                        if config.main.auto_save_data:
                             DATA.remove_option("main", "unsaved")
                             if not data_save(PATH + "/data.cfg"):
                                 DATA["main"]["unsaved"] = "True"
                         else:
                             DATA["main"]["unsaved"] = "True"
                     else:
-                        content = config_get(CONFIG, "interface_menu", "invite_format_error", "", lng_key)
+                        content = config_lng.interface_menu.get("invite_format_error")
                 else:
-                    content = config_get(CONFIG, "interface_menu", "invite_type_error", "", lng_key)
+                    content = config_lng.interface_menu.get("invite_type_error")
             except:
-                content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+                content = config_lng.interface_menu.get("cmd_error")
         else:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/kick" command.
@@ -2501,49 +4840,46 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             value = LXMF_CONNECTION.destination_correct(value)
             if value != "":
                 executed = False
-                for section in sections:
-                    for (key, val) in DATA.items(section):
-                        if key == value:
-                            user_section = section
-                            user_name = val
-                            executed = True
-                            DATA.remove_option(section, key)
+                for section in DATA.member_sections(value):
+                    if section in sections:
+                        user_section = section
+                        user_name = DATA[section][value]
+                        executed = True
+                        DATA.remove_option(section, value)
                 if executed:
-                    if CONFIG["statistic"].getboolean("enabled"):
+                    if config.statistic.enabled:
                         statistic("del", value)
 
-                    content_user = config_get(CONFIG, "interface_messages", "kick_"+user_section, "", lng_key)
+                    content_user = config_lng.interface_messages.get("kick_"+user_section)
                     content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                     if content_user != "":
-                        LXMF_CONNECTION.send(value, content_user, "", fields_generate(lng_key), None, "interface_send")
+                        lxmf_send(value, content_user, "", fields_generate(lng_key), None, "interface_send")
 
-                    content_group = config_get(CONFIG, "interface_messages", "member_kick", "", lng_key)
+                    content_group = config_lng.interface_messages.get("member_kick")
                     content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                     content_group = content_group.replace(delimiter+"user_address"+delimiter, value)
                     content_group = content_group.replace(delimiter+"user_name"+delimiter, user_name)
                     if content_group != "":
                         fields = fields_generate(lng_key, h=bytes.fromhex(value) ,n=user_name, m=True, tpl="kick")
-                        for section in sections:
-                            if "receive_kick" in config_get(CONFIG, "rights", section).split(","):
-                                for (key, val) in DATA.items(section):
-                                    LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                        recipients = recipients_get("receive_kick")
+                        lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-                    content = config_get(CONFIG, "interface_menu", "kick_ok", "", lng_key)
+                    content = config_lng.interface_menu.get("kick_ok")
                     content = content.replace(delimiter+"user_address"+delimiter, value)
                     content = content.replace(delimiter+"user_name"+delimiter, user_name)
 
-                    if CONFIG["main"].getboolean("auto_save_data"):
+                    if config.main.auto_save_data:
                         DATA.remove_option("main", "unsaved")
                         if not data_save(PATH + "/data.cfg"):
                             DATA["main"]["unsaved"] = "True"
                     else:
                         DATA["main"]["unsaved"] = "True"
                 else:
-                    content = config_get(CONFIG, "interface_menu", "kick_found_error", "", lng_key) 
+                    content = config_lng.interface_menu.get("kick_found_error") 
             else:
-                content = config_get(CONFIG, "interface_menu", "kick_format_error", "", lng_key) 
+                content = config_lng.interface_menu.get("kick_format_error") 
         except:
-           content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+           content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/block" command.
@@ -2553,49 +4889,46 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             value = LXMF_CONNECTION.destination_correct(value)
             if value != "":
                 executed = False
-                for section in sections:
-                    for (key, val) in DATA.items(section):
-                        if key == value:
-                            user_section = section
-                            user_name = val
-                            executed = True
-                            if not DATA.has_section("block_"+section):
-                                DATA.add_section("block_"+section)
-                            DATA["block_"+section][key] = val
-                            DATA.remove_option(section, key)
+                for section in DATA.member_sections(value):
+                    if section in sections:
+                        user_section = section
+                        user_name = DATA[section][value]
+                        executed = True
+                        if not DATA.has_section("block_"+section):
+                            DATA.add_section("block_"+section)
+                        DATA["block_"+section][value] = user_name
+                        DATA.remove_option(section, value)
                 if executed:
-                    content_user = config_get(CONFIG, "interface_messages", "block_"+user_section, "", lng_key)
+                    content_user = config_lng.interface_messages.get("block_"+user_section)
                     content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                     if content_user != "":
-                        LXMF_CONNECTION.send(value, content_user, "", fields_generate(lng_key), None, "interface_send")
+                        lxmf_send(value, content_user, "", fields_generate(lng_key), None, "interface_send")
 
-                    content_group = config_get(CONFIG, "interface_messages", "member_block", "", lng_key)
+                    content_group = config_lng.interface_messages.get("member_block")
                     content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                     content_group = content_group.replace(delimiter+"user_address"+delimiter, value)
                     content_group = content_group.replace(delimiter+"user_name"+delimiter, user_name)
                     if content_group != "":
                         fields = fields_generate(lng_key, h=bytes.fromhex(value) ,n=user_name, m=True, tpl="block")
-                        for section in sections:
-                            if "receive_block" in config_get(CONFIG, "rights", section).split(","):
-                                for (key, val) in DATA.items(section):
-                                    LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                        recipients = recipients_get("receive_block")
+                        lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-                    content = config_get(CONFIG, "interface_menu", "block_ok", "", lng_key)
+                    content = config_lng.interface_menu.get("block_ok")
                     content = content.replace(delimiter+"user_address"+delimiter, value)
                     content = content.replace(delimiter+"user_name"+delimiter, user_name)
 
-                    if CONFIG["main"].getboolean("auto_save_data"):
+                    if config.main.auto_save_data:
                         DATA.remove_option("main", "unsaved")
                         if not data_save(PATH + "/data.cfg"):
                             DATA["main"]["unsaved"] = "True"
                     else:
                         DATA["main"]["unsaved"] = "True"
                 else:
-                    content = config_get(CONFIG, "interface_menu", "block_found_error", "", lng_key)
+                    content = config_lng.interface_menu.get("block_found_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "block_format_error", "", lng_key)
+                content = config_lng.interface_menu.get("block_format_error")
         except:
-           content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+           content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/unblock" command.
@@ -2605,50 +4938,46 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             value = LXMF_CONNECTION.destination_correct(value)
             if value != "":
                 executed = False
-                for section in DATA.sections():
+                for section in DATA.member_sections(value):
                     if section.startswith("block"):
-                        for (key, val) in DATA.items(section):
-                            if key == value:
-                                user_section = section.replace("block_", "")
-                                user_name = val
-                                executed = True
-                                if not DATA.has_section(user_section):
-                                    DATA.add_section(user_section)
-                                DATA[user_section][key] = val
-                                DATA.remove_option(section, key)
+                        user_section = section.replace("block_", "")
+                        user_name = DATA[section][value]
+                        executed = True
+                        if not DATA.has_section(user_section):
+                            DATA.add_section(user_section)
+                        DATA[user_section][value] = user_name
+                        DATA.remove_option(section, value)
                 if executed:
-                    content_user = config_get(CONFIG, "interface_messages", "unblock_"+user_section, "", lng_key)
+                    content_user = config_lng.interface_messages.get("unblock_"+user_section)
                     content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                     if content_user != "":
-                        LXMF_CONNECTION.send(value, content_user, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=user_section, config=user_section), None, "interface_send")
+                        lxmf_send(value, content_user, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=user_section, config=user_section), None, "interface_send")
 
-                    content_group = config_get(CONFIG, "interface_messages", "member_unblock", "", lng_key)
+                    content_group = config_lng.interface_messages.get("member_unblock")
                     content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                     content_group = content_group.replace(delimiter+"user_address"+delimiter, value)
                     content_group = content_group.replace(delimiter+"user_name"+delimiter, user_name)
                     if content_group != "":
                         fields = fields_generate(lng_key, h=bytes.fromhex(value) ,n=user_name, m=True, tpl="unblock")
-                        for section in sections:
-                            if "receive_block" in config_get(CONFIG, "rights", section).split(","):
-                                for (key, val) in DATA.items(section):
-                                    LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                        recipients = recipients_get("receive_block")
+                        lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-                    content = config_get(CONFIG, "interface_menu", "unblock_ok", "", lng_key)
+                    content = config_lng.interface_menu.get("unblock_ok")
                     content = content.replace(delimiter+"user_address"+delimiter, value)
                     content = content.replace(delimiter+"user_name"+delimiter, user_name)
 
-                    if CONFIG["main"].getboolean("auto_save_data"):
+                    if config.main.auto_save_data:
                         DATA.remove_option("main", "unsaved")
                         if not data_save(PATH + "/data.cfg"):
                             DATA["main"]["unsaved"] = "True"
                     else:
                         DATA["main"]["unsaved"] = "True"
                 else:
-                    content = config_get(CONFIG, "interface_menu", "unblock_found_error", "", lng_key)
+                    content = config_lng.interface_menu.get("unblock_found_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "unblock_format_error", "", lng_key)
+                content = config_lng.interface_menu.get("unblock_format_error")
         except:
-           content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+           content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/allow" command.
@@ -2661,48 +4990,44 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                 if value != "":
                     executed = False
                     section = "wait"
-                    if DATA.has_section(section):
-                        for (key, val) in DATA.items(section):
-                            if key == value:
-                                user_name = val
-                                executed = True
-                                DATA[user_section][key] = val
-                                DATA.remove_option(section, key)
+                    if DATA.has_option(section, value):
+                        user_name = DATA[section][value]
+                        executed = True
+                        DATA[user_section][value] = user_name
+                        DATA.remove_option(section, value)
                     if executed:
-                        content_user = config_get(CONFIG, "interface_messages", "allow_"+user_section, "", lng_key)
+                        content_user = config_lng.interface_messages.get("allow_"+user_section)
                         content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                         if content_user != "":
-                            LXMF_CONNECTION.send(value, content_user, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=user_section, config=user_section), None, "interface_send")
+                            lxmf_send(value, content_user, "", fields_generate(lng_key, m=True, d=True, r=True, cmd=user_section, config=user_section), None, "interface_send")
 
-                        content_group = config_get(CONFIG, "interface_messages", "member_allow", "", lng_key)
+                        content_group = config_lng.interface_messages.get("member_allow")
                         content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                         content_group = content_group.replace(delimiter+"user_address"+delimiter, value)
                         content_group = content_group.replace(delimiter+"user_name"+delimiter, user_name)
                         if content_group != "":
                             fields = fields_generate(lng_key, h=bytes.fromhex(value) ,n=user_name, m=True, tpl="allow")
-                            for section in sections:
-                                if "receive_block" in config_get(CONFIG, "rights", section).split(","):
-                                    for (key, val) in DATA.items(section):
-                                        LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                            recipients = recipients_get("receive_block")
+                            lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-                        content = config_get(CONFIG, "interface_menu", "allow_ok", "", lng_key)
+                        content = config_lng.interface_menu.get("allow_ok")
                         content = content.replace(delimiter+"user_address"+delimiter, value)
                         content = content.replace(delimiter+"user_name"+delimiter, user_name)
 
-                        if CONFIG["main"].getboolean("auto_save_data"):
+                        if config.main.auto_save_data:
                             DATA.remove_option("main", "unsaved")
                             if not data_save(PATH + "/data.cfg"):
                                 DATA["main"]["unsaved"] = "True"
                         else:
                             DATA["main"]["unsaved"] = "True"
                     else:
-                        content = config_get(CONFIG, "interface_menu", "allow_found_error", "", lng_key)
+                        content = config_lng.interface_menu.get("allow_found_error")
                 else:
-                    content = config_get(CONFIG, "interface_menu", "allow_format_error", "", lng_key)
+                    content = config_lng.interface_menu.get("allow_format_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "allow_type_error", "", lng_key)
+                content = config_lng.interface_menu.get("allow_type_error")
         except:
-           content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+           content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/deny" command.
@@ -2714,78 +5039,77 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
                 value = LXMF_CONNECTION.destination_correct(value)
                 if value != "":
                     executed = False
-                    for section in sections:
-                        for (key, val) in DATA.items(section):
-                            if key == value:
-                                user_name = val
-                                executed = True
-                                DATA[user_section][key] = val
-                                DATA.remove_option(section, key)
+                    for section in DATA.member_sections(value):
+                        if section in sections:
+                            user_name = DATA[section][value]
+                            executed = True
+                            DATA[user_section][value] = user_name
+                            DATA.remove_option(section, value)
                     if executed:
-                        content_user = config_get(CONFIG, "interface_messages", "deny_"+user_section, "", lng_key)
+                        content_user = config_lng.interface_messages.get("deny_"+user_section)
                         content_user = replace(content_user, source_hash, source_name, source_right, lng_key)
                         if content_user != "":
-                            LXMF_CONNECTION.send(value, content_user, "", fields_generate(lng_key), None, "interface_send")
+                            lxmf_send(value, content_user, "", fields_generate(lng_key), None, "interface_send")
 
-                        content_group = config_get(CONFIG, "interface_messages", "member_deny", "", lng_key)
+                        content_group = config_lng.interface_messages.get("member_deny")
                         content_group = replace(content_group, source_hash, source_name, source_right, lng_key)
                         content_group = content_group.replace(delimiter+"user_address"+delimiter, value)
                         content_group = content_group.replace(delimiter+"user_name"+delimiter, user_name)
                         if content_group != "":
                             fields = fields_generate(lng_key, h=bytes.fromhex(value) ,n=user_name, m=True, tpl="deny")
-                            for section in sections:
-                                if "receive_block" in config_get(CONFIG, "rights", section).split(","):
-                                    for (key, val) in DATA.items(section):
-                                        LXMF_CONNECTION.send(key, content_group, "", fields, None, "interface_send")
+                            recipients = recipients_get("receive_block")
+                            lxmf_send_many(recipients, content_group, "", fields, None, "interface_send")
 
-                        content = config_get(CONFIG, "interface_menu", "deny_ok", "", lng_key)
+                        content = config_lng.interface_menu.get("deny_ok")
                         content = content.replace(delimiter+"user_address"+delimiter, value)
                         content = content.replace(delimiter+"user_name"+delimiter, user_name)
 
-                        if CONFIG["main"].getboolean("auto_save_data"):
+                        if config.main.auto_save_data:
                             DATA.remove_option("main", "unsaved")
                             if not data_save(PATH + "/data.cfg"):
                                 DATA["main"]["unsaved"] = "True"
                         else:
                             DATA["main"]["unsaved"] = "True"
                     else:
-                        content = config_get(CONFIG, "interface_menu", "deny_found_error", "", lng_key)
+                        content = config_lng.interface_menu.get("deny_found_error")
                 else:
-                    content = config_get(CONFIG, "interface_menu", "deny_format_error", "", lng_key)
+                    content = config_lng.interface_menu.get("deny_format_error")
             else:
-                content = config_get(CONFIG, "interface_menu", "deny_type_error", "", lng_key)
+                content = config_lng.interface_menu.get("deny_type_error")
         except:
-           content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+           content = config_lng.interface_menu.get("cmd_error")
 
 
     # "/load" command.
     elif (cmd == "load" or cmd == "read") and "load" in source_rights:
         if data_read(PATH + "/data.cfg"):
-            content = config_get(CONFIG, "interface_menu", "load_ok", "", lng_key)
+            content = config_lng.interface_menu.get("load_ok")
         else:
-            content = config_get(CONFIG, "interface_menu", "load_error", "", lng_key)
+            content = config_lng.interface_menu.get("load_error")
 
 
     # "/save" command.
     elif (cmd == "save" or cmd == "wr") and "save" in source_rights:
         DATA.remove_option("main", "unsaved")
         if data_save(PATH + "/data.cfg"):
-            content = config_get(CONFIG, "interface_menu", "save_ok", "", lng_key)
+            content = config_lng.interface_menu.get("save_ok")
         else:
-            content = config_get(CONFIG, "interface_menu", "save_error", "", lng_key)
+            content = config_lng.interface_menu.get("save_error")
             DATA["main"]["unsaved"] = "True"
 
-        if CONFIG["statistic"].getboolean("enabled"):
+        if config.statistic.enabled:
             statistic_save(PATH + "/statistic.cfg")
 
 
     # "/reload" command.
     elif cmd == "reload" and "reload" in source_rights:
-        content = config_get(CONFIG, "interface_menu", "reload_error", "", lng_key)
+        content = config_lng.interface_menu.get("reload_error")
         DATA.remove_option("main", "unsaved")
         if data_save(PATH + "/data.cfg"):
-            if data_read(PATH + "/data.cfg"):
-                content = config_get(CONFIG, "interface_menu", "reload_ok", "", lng_key)
+            if data_read(PATH + "/data.cfg") and config_read(PATH + "/config.cfg", PATH + "/config.cfg.owr"):
+                config = CONFIG_SNAPSHOT
+                config_lng = config.lng(lng_key)
+                content = config_lng.interface_menu.get("reload_ok")
         else:
             DATA["main"]["unsaved"] = "True"
 
@@ -2798,66 +5122,66 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
             if value == "all":
                 for section in STATISTIC.sections():
                     statistic_reset(section)
-                if CONFIG["main"].getboolean("auto_save_statistic"):
+                if config.main.auto_save_statistic:
                     statistic_save(PATH + "/statistic.cfg")
                 else:
                     if not STATISTIC.has_section("main"):
                         STATISTIC.add_section("main")
                     STATISTIC["main"]["unsaved"] = "True"
-                content = config_get(CONFIG, "interface_menu", "reset_statistic_ok", "", lng_key)
+                content = config_lng.interface_menu.get("reset_statistic_ok")
 
             elif value == "cluster":
                 for section in STATISTIC.sections():
                     if section.startswith("cluster"):
                         statistic_reset(section)
-                if CONFIG["main"].getboolean("auto_save_statistic"):
+                if config.main.auto_save_statistic:
                     statistic_save(PATH + "/statistic.cfg")
                 else:
                     if not STATISTIC.has_section("main"):
                         STATISTIC.add_section("main")
                     STATISTIC["main"]["unsaved"] = "True"
-                content = config_get(CONFIG, "interface_menu", "reset_statistic_ok", "", lng_key)
+                content = config_lng.interface_menu.get("reset_statistic_ok")
 
             elif value == "local":
                 for section in STATISTIC.sections():
                     if section.startswith("local"):
                         statistic_reset(section)
-                if CONFIG["main"].getboolean("auto_save_statistic"):
+                if config.main.auto_save_statistic:
                     statistic_save(PATH + "/statistic.cfg")
                 else:
                     if not STATISTIC.has_section("main"):
                         STATISTIC.add_section("main")
                     STATISTIC["main"]["unsaved"] = "True"
-                content = config_get(CONFIG, "interface_menu", "reset_statistic_ok", "", lng_key)
+                content = config_lng.interface_menu.get("reset_statistic_ok")
 
             elif value == "interface":
                 for section in STATISTIC.sections():
                     if section.startswith("interface"):
                         statistic_reset(section)
-                if CONFIG["main"].getboolean("auto_save_statistic"):
+                if config.main.auto_save_statistic:
                     statistic_save(PATH + "/statistic.cfg")
                 else:
                     if not STATISTIC.has_section("main"):
                         STATISTIC.add_section("main")
                     STATISTIC["main"]["unsaved"] = "True"
-                content = config_get(CONFIG, "interface_menu", "reset_statistic_ok", "", lng_key)
+                content = config_lng.interface_menu.get("reset_statistic_ok")
 
             elif value == "user":
                 for section in STATISTIC.sections():
                     if not section.startswith("cluster") and not section.startswith("local") and not section.startswith("interface"):
                         statistic_reset(section)
-                if CONFIG["main"].getboolean("auto_save_statistic"):
+                if config.main.auto_save_statistic:
                     statistic_save(PATH + "/statistic.cfg")
                 else:
                     if not STATISTIC.has_section("main"):
                         STATISTIC.add_section("main")
                     STATISTIC["main"]["unsaved"] = "True"
-                content = config_get(CONFIG, "interface_menu", "reset_statistic_ok", "", lng_key)
+                content = config_lng.interface_menu.get("reset_statistic_ok")
 
             else:
-                content = config_get(CONFIG, "interface_menu", "reset_statistic_error", "", lng_key)
+                content = config_lng.interface_menu.get("reset_statistic_error")
         except:
-            content = config_get(CONFIG, "interface_menu", "cmd_error", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_error")
 
 
     else:
@@ -2869,40 +5193,52 @@ def interface(cmd, source_hash, source_name, source_right, source_rights, lng_ke
         for section in sections:
             if (cmd == section or cmd == section+"s") and section+"s" in source_rights:
                 count = 0
-                content = config_get(CONFIG, "interface_menu", section+"s_header", "", lng_key)
+                content = config_lng.interface_menu.get(section+"s_header")
                 content = replace(content, source_hash, source_name, source_right, lng_key)
-                content_member = config_get(CONFIG, "interface_menu", section+"s_member", "", lng_key)
+                content_member = template_compile(config_lng.interface_menu.get(section+"s_member"))
+                context = template_context(lng_key=lng_key)
+                contents = [content]
                 for (key, val) in DATA.items(section):
                     count += 1
-                    content = content + replace(content_member, key, val, section, lng_key)
-                content = content.replace(delimiter+"count"+delimiter, str(count))
+                    contents.append(content_member.render(context.source(key, val, section)))
+                content = "".join(contents).replace(delimiter+"count"+delimiter, str(count))
                 executed = True
                 break
 
         # cmd_unknown
         if not executed:
-            content = config_get(CONFIG, "interface_menu", "cmd_unknown", "", lng_key)
+            content = config_lng.interface_menu.get("cmd_unknown")
 
 
     # unsaved
     if DATA["main"].getboolean("unsaved") and "unsaved" in source_rights:
-        if CONFIG["main"].getboolean("auto_save_data"):
+        if config.main.auto_save_data:
             DATA.remove_option("main", "unsaved")
             if data_save(PATH + "/data.cfg"):
-                content = content + "\n" + config_get(CONFIG, "interface_menu", "save_ok", "", lng_key)
+                content = content + "\n" + config_lng.interface_menu.get("save_ok")
             else:
-                content = content + "\n" + config_get(CONFIG, "interface_menu", "save_error", "", lng_key)
+                content = content + "\n" + config_lng.interface_menu.get("save_error")
                 DATA["main"]["unsaved"] = "True"
         else:
-            content = content + "\n" + config_get(CONFIG, "interface_menu", "save_info", "", lng_key)
+            content = content + "\n" + config_lng.interface_menu.get("save_info")
+
+
+    return content
 
 
+#### Interface - Delivery #####
+def delivery_job_text(job, lng_key=""):
+    delimiter = CONFIG_SNAPSHOT.interface.delimiter_output
+    content = config_get(CONFIG, "interface_menu", "delivery_job", "", lng_key)
+    content = content.replace(delimiter+"key"+delimiter, job.key)
+    for key, value in job.progress().items():
+        content = content.replace(delimiter+key+delimiter, str(value))
     return content
 
 
 #### Fields #####
 def fields_remove(fields=None, key="fields_remove"):
-    search = config_getarray(CONFIG, "message", key)
+    search = CONFIG_SNAPSHOT.message.getarray(key)
 
     delete = []
     for field in fields:
@@ -2917,14 +5253,14 @@ def fields_remove(fields=None, key="fields_remove"):
 
 #### Fields #####
 def fields_generate(lng_key, fields=None, h=None, n=None, m=False, d=False, r=False, cmd=None, config=None, tpl=None):
-    if not CONFIG["main"].getboolean("fields_message"):
+    if not CONFIG_SNAPSHOT.main.fields_message:
         return fields
 
     if not fields:
         fields = {}
 
-    if CONFIG["lxmf"]["destination_type_conv"] != "":
-        fields[0xB3] = CONFIG["lxmf"].getint("destination_type_conv")
+    if CONFIG_SNAPSHOT.lxmf.destination_type_conv != "":
+        fields[0xB3] = int(CONFIG_SNAPSHOT.lxmf.destination_type_conv)
 
     if h:
         fields[0xAF] = {}
@@ -2939,7 +5275,7 @@ def fields_generate(lng_key, fields=None, h=None, n=None, m=False, d=False, r=Fa
 
     if m:
         fields[0xA3]["m"] = {}
-        for (key, val) in CONFIG.items("rights"):
+        for key in RIGHTS:
             if DATA.has_section(key):
                 fields[0xA3]["m"][key] = {}
                 for (section_key, section_val) in DATA.items(key):
@@ -2950,22 +5286,22 @@ def fields_generate(lng_key, fields=None, h=None, n=None, m=False, d=False, r=Fa
                        pass
 
     if d:
-        fields[0xA3]["d"] = config_get(DATA, "main", "description", "", lng_key).replace(CONFIG["interface"]["delimiter_output"]+"n"+CONFIG["interface"]["delimiter_output"], "\n")
+        fields[0xA3]["d"] = config_get(DATA, "main", "description", "", lng_key).replace(CONFIG_SNAPSHOT.interface.delimiter_output+"n"+CONFIG_SNAPSHOT.interface.delimiter_output, "\n")
 
     if r:
-        fields[0xA3]["r"] = config_get(DATA, "main", "rules", "", lng_key).replace(CONFIG["interface"]["delimiter_output"]+"n"+CONFIG["interface"]["delimiter_output"], "\n")
+        fields[0xA3]["r"] = config_get(DATA, "main", "rules", "", lng_key).replace(CONFIG_SNAPSHOT.interface.delimiter_output+"n"+CONFIG_SNAPSHOT.interface.delimiter_output, "\n")
 
     if cmd:
         fields[0xA3]["cmd"] = []
-        if CONFIG.has_option("cmds", cmd):
-            cmds = config_get(CONFIG, "cmds", cmd).split(",")
+        if cmd in CONFIG_SNAPSHOT.cmds:
+            cmds = CONFIG_SNAPSHOT.cmds.get(cmd).split(",")
             for cmd in cmds:
                 fields[0xA3]["cmd"].append({"c": "/"+cmd})
 
     if config:
         fields[0xA3]["config"] = {}
-        if CONFIG.has_option("configs", config):
-            configs = config_get(CONFIG, "configs", config).split(",")
+        if config in CONFIG_SNAPSHOT.configs:
+            configs = CONFIG_SNAPSHOT.configs.get(config).split(",")
             for config in configs:
                 if config != "":
                     key, value = config.split("=", 1)
@@ -2986,40 +5322,134 @@ def fields_generate(lng_key, fields=None, h=None, n=None, m=False, d=False, r=Fa
     return fields
 
 
-#### Replace #####
-def replace(text, source_hash, source_name, source_right, lng_key):
-    delimiter = CONFIG["interface"]["delimiter_output"]
-
-    text = text.replace(delimiter+"source_address"+delimiter, source_hash)
-    text = text.replace(delimiter+"source_name"+delimiter, source_name)
-    text = text.replace(delimiter+"source_right"+delimiter, source_right)
-
-    text = text.replace(delimiter+"name"+delimiter, config_get(CONFIG, "main", "name", "", lng_key))
-    text = text.replace(delimiter+"display_name"+delimiter, config_get(CONFIG, "lxmf", "display_name", "", lng_key))
-    text = text.replace(delimiter+"description"+delimiter, config_get(DATA, "main", "description", "", lng_key))
-    text = text.replace(delimiter+"rules"+delimiter, config_get(DATA, "main", "rules", "", lng_key))
-    text = text.replace(delimiter+"destination_address"+delimiter, LXMF_CONNECTION.destination_hash_str())
-    text = text.replace(delimiter+"propagation_node"+delimiter, config_get(CONFIG, "lxmf", "propagation_node", "", lng_key))
-    text = text.replace(delimiter+"cluster_name"+delimiter, config_get(CONFIG, "cluster", "display_name", "", lng_key).rsplit('/', 1)[-1])
-
-    text = text.replace(delimiter+"n"+delimiter, "\n")
-
-    if delimiter+"count_members"+delimiter in text:
-        count = 0
-        for (section, section_val) in CONFIG.items("rights"):
-            if DATA.has_section(section):
-                for (key, val) in DATA.items(section):
-                    count += 1
-        text = text.replace(delimiter+"count_members"+delimiter, str(count))
+#### Template #####
+# Text with placeholders (!source_name!) parsed once into literal and placeholder segments.
+# Unknown placeholders and placeholders without a value stay in the text (e.g. !count! of the lists).
+class template():
+    PLACEHOLDERS = ("source_address", "source_name", "source_right", "name", "display_name", "description", "rules", "destination_address", "propagation_node", "cluster_name", "cluster_source", "cluster_destination", "activity_receive", "activity_send", "count_members", "count_pin", "n")
+
+    def __init__(self, text, delimiter="!"):
+        self.text = text
+        self.segments = []
+        position = 0
+        if delimiter != "":
+            for match in re.finditer(re.escape(delimiter) + "(" + "|".join(self.PLACEHOLDERS) + ")" + re.escape(delimiter), text):
+                if match.start() > position:
+                    self.segments.append((False, text[position:match.start()]))
+                self.segments.append((True, match.group(1)))
+                position = match.end()
+        if position < len(text):
+            self.segments.append((False, text[position:]))
+        self.delimiter = delimiter
+        self.static = not any(placeholder for (placeholder, value) in self.segments)
+
+
+    def render(self, context):
+        if self.static:
+            return self.text
+        return "".join([context.get(value, self.delimiter) if placeholder else value for (placeholder, value) in self.segments])
+
+
+#### Template - Context #####
+# Values of the placeholders for one or more renderings (e.g. all lines of /members).
+# Derived values (count_members, ...) are determined on first use and kept for the following renderings.
+class template_context():
+    def __init__(self, source_hash="", source_name="", source_right="", lng_key="", values=None):
+        self.lng_key = lng_key
+        self.values = {}
+        if values:
+            self.values.update(values)
+        self.source(source_hash, source_name, source_right)
+
+
+    def source(self, source_hash="", source_name="", source_right=""):
+        self.values["source_address"] = source_hash
+        self.values["source_name"] = source_name
+        self.values["source_right"] = source_right
+        return self
+
+
+    def get(self, key, delimiter="!"):
+        value = self.values.get(key)
+        if value == None:
+            if key == "activity_receive" or key == "activity_send":
+                return statistic_value_get(self.values["source_address"], key) if STATISTIC else ""
+            value = template_value(key, self.lng_key)
+            if value == None:
+                return delimiter + key + delimiter
+            self.values[key] = value
+        return value
+
+
+#### Template - Value #####
+# Placeholder values which are the same for all sources.
+# The counters are cached until the members change (DATA.version) or the rights/config are read again.
+def template_value(key, lng_key=""):
+    if key == "count_members" or key == "count_pin":
+        entry = TEMPLATE_VALUES.get(key)
+        if entry == None or entry[0] != DATA.version:
+            if key == "count_members":
+                value = str(sum([len(DATA.members(section)) for section in RIGHTS]))
+            else:
+                value = str(len(DATA.members("pin")))
+            entry = (DATA.version, value)
+            TEMPLATE_VALUES[key] = entry
+        return entry[1]
+
+    config = CONFIG_SNAPSHOT.lng(lng_key)
+    if key == "n":
+        return "\n"
+    elif key == "name":
+        return config.main.name
+    elif key == "display_name":
+        return config.lxmf.display_name
+    elif key == "description" or key == "rules":
+        delimiter = config.interface.delimiter_output
+        return config_get(DATA, "main", key, "", lng_key).replace(delimiter+"n"+delimiter, "\n")
+    elif key == "destination_address":
+        return LXMF_CONNECTION.destination_hash_str()
+    elif key == "propagation_node":
+        return config.lxmf.propagation_node
+    elif key == "cluster_name":
+        return config.cluster.display_name.rsplit('/', 1)[-1]
+    return None
+
+
+#### Template - Compile #####
+# Compiled templates of all texts (cached, the config texts are compiled at config_read()).
+def template_compile(text):
+    entry = TEMPLATES.get(text)
+    if entry == None:
+        if len(TEMPLATES) >= TEMPLATES_SIZE:
+            TEMPLATES.clear()
+        entry = template(text, CONFIG_SNAPSHOT.interface.delimiter_output)
+        TEMPLATES[text] = entry
+    return entry
+
+
+def template_compile_config():
+    TEMPLATES.clear()
+    TEMPLATE_VALUES.clear()
+    for config in CONFIG_SNAPSHOT.languages():
+        for section in ("interface_messages", "interface_menu", "interface_help", "message"):
+            if section in config.sections():
+                for (key, val) in getattr(config, section).items():
+                    if isinstance(val, str) and val != "":
+                        template_compile(val)
+
+
+#### Template - Render #####
+def template_render(text, context):
+    if text == "":
+        return text
+    return template_compile(text).render(context)
 
-    if delimiter+"count_pin"+delimiter in text:
-        count = 0
-        if DATA.has_section("pin"):
-            for (key, val) in DATA.items("pin"):
-                count += 1
-        text = text.replace(delimiter+"count_pin"+delimiter, str(count))
 
-    return text
+#### Replace #####
+def replace(text, source_hash, source_name, source_right, lng_key, values=None):
+    if text == "":
+        return text
+    return template_compile(text).render(template_context(source_hash, source_name, source_right, lng_key, values))
 
 
 ##############################################################################################################
@@ -3027,6 +5457,31 @@ def replace(text, source_hash, source_name, source_right, lng_key):
 
 
 #### Config - Get #####
+def rate_limit_get(key):
+    value = CONFIG_SNAPSHOT.rate_limit.get(key, "")
+    if value == "" and key != "global":
+        value = CONFIG_SNAPSHOT.rate_limit.get("default", "0")
+    try:
+        rate, _, burst = str(value).partition("/")
+        rate = float(rate)
+        burst = float(burst) if burst != "" else max(rate, 1)
+    except ValueError:
+        log("Rate limit - Invalid value for '" + str(key) + "': " + str(value), LOG_WARNING)
+        return 0, 0
+    return rate/60, max(burst, 1)
+
+
+# Upper limit over all sources, only checked for sources which are allowed to send.
+def rate_limit_global(source_hash):
+    if not RATE_LIMITER:
+        return True
+    rate, burst = rate_limit_get("global")
+    if RATE_LIMITER.check_global(rate, burst) != RATE_LIMITER.ALLOWED:
+        log("LXMF - Source " + RNS.prettyhexrep(source_hash) + " dropped (global rate limit)", LOG_DEBUG)
+        return False
+    return True
+
+
 def config_get(config, section, key, default="", lng_key=""):
     if not config or section == "" or key == "": return default
     if not config.has_section(section): return default
@@ -3094,6 +5549,156 @@ def config_getoption(config, section, key, default=False, lng_key=""):
     return default
 
 
+#### Config - Snapshot - Types #####
+# Options whose type can not be taken from the default value (rate "10/5" with the default "0").
+CONFIG_SNAPSHOT_TYPES = {
+    ("rate_limit", "global"): str,
+    ("rate_limit", "default"): str,
+    ("rate_limit", "admin"): str,
+    ("rate_limit", "mod"): str,
+    ("rate_limit", "cluster"): str,
+    ("rate_limit", "router"): str,
+}
+
+
+#### Config - Snapshot #####
+# Read-only copy of the config with typed values for the message handling (CONFIG_SNAPSHOT.statistic.enabled).
+# The types are taken from CONFIG_SNAPSHOT_TYPES or the default config (True/False -> bool, 0 -> int, 0.5 -> float, all others -> str).
+# Values which can not be converted keep the raw string and log a warning.
+# Options missing in the config are empty (""/False/0) like the defaults of config_get().
+# lng(lng_key) returns the copy with the language variants (key-de) resolved.
+class config_snapshot():
+    def __init__(self, config, config_default=None, lng_key=None, types=None):
+        if lng_key == None:
+            types = {}
+            values = {}
+            if config_default:
+                default = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+                default.read_string(config_default)
+                for section in default.sections():
+                    values[section] = {}
+                    for key in default.options(section):
+                        types[(section, key)] = CONFIG_SNAPSHOT_TYPES.get((section, key), config_snapshot.type(default.get(section, key, raw=True)))
+                        values[section][key] = types[(section, key)]()
+            for section in config.sections():
+                values.setdefault(section, {})
+                for key in config.options(section):
+                    try:
+                        values[section][key] = config.get(section, key)
+                    except configparser.Error:
+                        values[section][key] = config.get(section, key, raw=True)
+            languages = {}
+            for (section, options) in values.items():
+                for key in options:
+                    if "-" in key and key.rsplit("-", 1)[0] in options:
+                        languages["-" + key.rsplit("-", 1)[1]] = None
+        else:
+            values = config
+            languages = {}
+
+        sections = {}
+        for (section, options) in values.items():
+            resolved = {}
+            for (key, value) in options.items():
+                lng = lng_key if lng_key and key+lng_key in options else ""
+                if lng:
+                    value = options[key+lng]
+                value_type = types.get((section, key), CONFIG_SNAPSHOT_TYPES.get((section, key), str))
+                try:
+                    resolved[key] = config_snapshot.value(value, value_type)
+                except ValueError:
+                    if lng or not lng_key:
+                        log("Config - Option '" + key + lng + "' in section '" + section + "' is not a valid " + value_type.__name__ + ", using the raw value: " + value, LOG_WARNING)
+                    resolved[key] = value
+            sections[section] = config_snapshot_section(resolved)
+
+        for lng in languages:
+            languages[lng] = config_snapshot(values, lng_key=lng, types=types)
+        languages[lng_key if lng_key else ""] = self
+
+        self.__dict__.update(sections)
+        self.__dict__["_languages"] = languages
+
+
+    def __setattr__(self, key, value):
+        raise AttributeError("config snapshot is read-only")
+
+
+    def lng(self, lng_key=""):
+        return self._languages.get(lng_key, self)
+
+
+    def languages(self):
+        return list(self._languages.values())
+
+
+    def sections(self):
+        return [key for key in self.__dict__ if key != "_languages"]
+
+
+    @staticmethod
+    def type(value):
+        if value == None:
+            return str
+        if value.lower() in configparser.ConfigParser.BOOLEAN_STATES and not value.isdigit():
+            return bool
+        if value.lstrip("-").isdigit():
+            return int
+        if value.lstrip("-").replace(".", "", 1).isdigit():
+            return float
+        return str
+
+
+    # Raises ValueError if the value does not match the type.
+    # An int option with a float value ("0.5") is a float.
+    @staticmethod
+    def value(value, value_type):
+        if value == None:
+            return value_type()
+        if not isinstance(value, str):
+            return value
+        if value_type == bool:
+            if value.lower() not in configparser.ConfigParser.BOOLEAN_STATES:
+                raise ValueError(value)
+            return configparser.ConfigParser.BOOLEAN_STATES[value.lower()]
+        elif value_type == int:
+            try:
+                return int(value)
+            except ValueError:
+                return float(value)
+        elif value_type == float:
+            return float(value)
+        return value
+
+
+class config_snapshot_section():
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
+    def __setattr__(self, key, value):
+        raise AttributeError("config snapshot is read-only")
+
+
+    def __contains__(self, key):
+        return key in self.__dict__
+
+
+    def get(self, key, default=""):
+        return self.__dict__.get(key, default)
+
+
+    def getarray(self, key, default=[]):
+        value = self.__dict__.get(key, "")
+        if value == "":
+            return default
+        return [val_to_val(value.strip()) for value in value.split(",")]
+
+
+    def items(self):
+        return self.__dict__.items()
+
+
 #### Config - Set #####
 def config_set(key=None, value=""):
     global PATH
@@ -3123,24 +5728,31 @@ def config_set(key=None, value=""):
 
 
 #### Config - Read #####
+# The config, its snapshot and the rights are only replaced after the file was read successfully (/reload).
 def config_read(file=None, file_override=None):
     global CONFIG
+    global CONFIG_SNAPSHOT
 
     if file is None:
         return False
     else:
-        CONFIG = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
-        CONFIG.sections()
+        config = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        config.sections()
         if os.path.isfile(file):
             try:
                 if file_override is None:
-                    CONFIG.read(file, encoding='utf-8')
+                    config.read(file, encoding='utf-8')
                 elif os.path.isfile(file_override):
-                    CONFIG.read([file, file_override], encoding='utf-8')
+                    config.read([file, file_override], encoding='utf-8')
                 else:
-                    CONFIG.read(file, encoding='utf-8')
+                    config.read(file, encoding='utf-8')
+                snapshot = config_snapshot(config, DEFAULT_CONFIG)
             except Exception as e:
                 return False
+            CONFIG = config
+            CONFIG_SNAPSHOT = snapshot
+            rights_compile()
+            template_compile_config()
         else:
             if not config_default(file=file, file_override=file_override):
                 return False
@@ -3211,6 +5823,81 @@ def config_default(file=None, file_override=None):
 # Data
 
 
+#### Data - Parser #####
+# Data with an index of all keys (member hashs) -> sections.
+# The index is updated by every change of the data (set/remove_option/remove_section/read).
+# The version is increased by every change of the index (not by changed values).
+class data_parser(configparser.ConfigParser):
+    def __init__(self, *args, **kwargs):
+        self.index = {}
+        self.version = 0
+        super().__init__(*args, **kwargs)
+
+
+    def _read(self, fp, fpname):
+        super()._read(fp, fpname)
+        self.index_rebuild()
+
+
+    def set(self, section, option, value=None):
+        super().set(section, option, value)
+        if section != self.default_section:
+            sections = self.index.setdefault(self.optionxform(option), set())
+            if section not in sections:
+                sections.add(section)
+                self.version += 1
+
+
+    def remove_option(self, section, option):
+        existed = super().remove_option(section, option)
+        if existed:
+            self.index_remove(section, self.optionxform(option))
+        return existed
+
+
+    def remove_section(self, section):
+        keys = list(self._sections[section]) if section in self._sections else []
+        existed = super().remove_section(section)
+        if existed:
+            for key in keys:
+                self.index_remove(section, key)
+        return existed
+
+
+    def index_remove(self, section, key):
+        sections = self.index.get(key)
+        if sections != None and section in sections:
+            sections.discard(section)
+            if len(sections) == 0:
+                del self.index[key]
+            self.version += 1
+
+
+    def index_rebuild(self):
+        self.index = {}
+        self.version += 1
+        for (section, values) in self._sections.items():
+            for key in values:
+                self.index.setdefault(key, set()).add(section)
+
+
+    # All sections which contain the key (in the order of the sections).
+    def member_sections(self, key):
+        sections = self.index.get(self.optionxform(key))
+        if not sections:
+            return []
+        if len(sections) == 1:
+            return list(sections)
+        return [section for section in self._sections if section in sections]
+
+
+    # All keys of a section (without value interpolation).
+    def members(self, section):
+        if section not in self._sections:
+            return []
+        return list(self._sections[section])
+
+
 #### Data - Read #####
 def data_read(file=None):
     global DATA
@@ -3218,7 +5905,9 @@ def data_read(file=None):
     if file is None:
         return False
     else:
-        DATA = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        DATA = data_parser(allow_no_value=True, inline_comment_prefixes="#")
+        RECIPIENTS.clear()
+        TEMPLATE_VALUES.clear()
         DATA.sections()
         if os.path.isfile(file):
             try:
@@ -3251,11 +5940,8 @@ def data_save(file=None):
 
 #### Data - Save #####
 def data_save_periodic(initial=False):
-    data_timer = threading.Timer(CONFIG.getint("main", "periodic_save_data_interval")*60, data_save_periodic)
-    data_timer.daemon = True
-    data_timer.start()
-
     if initial:
+        LXMF_CONNECTION.scheduler.add("Data - Save", data_save_periodic, interval=CONFIG.getint("main", "periodic_save_data_interval")*60)
         return
 
     global DATA
@@ -3291,6 +5977,43 @@ def data_default(file=None):
     return True
 
 
+#### Data - Rights #####
+# The rights of every section ([rights] incl. the [cmds] additions) as sets.
+def rights_compile():
+    global RIGHTS
+
+    rights = {}
+    if CONFIG.has_section("rights"):
+        for (key, val) in CONFIG.items("rights"):
+            rights[key] = frozenset(val.split(",")) if val != "" else frozenset()
+            if CONFIG.has_option("cmds", key) and CONFIG["cmds"][key] != "":
+                rights[key] = rights[key].union(["interface"], CONFIG["cmds"][key].split(","))
+    RIGHTS = rights
+    RECIPIENTS.clear()
+    TEMPLATE_VALUES.clear()
+
+
+#### Data - Recipients #####
+# All members of the sections with one of the rights (e.g. receive_local) without duplicates.
+# Cached until the members change (DATA.version) or the rights are compiled again.
+def recipients_get(rights, exclude=None):
+    if isinstance(rights, str):
+        rights = (rights,)
+
+    entry = RECIPIENTS.get(rights)
+    if entry == None or entry[0] != DATA.version:
+        members = {}
+        for (section, section_rights) in RIGHTS.items():
+            if not section_rights.isdisjoint(rights):
+                members.update(dict.fromkeys(DATA.members(section)))
+        entry = (DATA.version, tuple(members))
+        RECIPIENTS[rights] = entry
+
+    if exclude == None:
+        return list(entry[1])
+    return [key for key in entry[1] if key != exclude]
+
+
 ##############################################################################################################
 # Statistic/Counter
 
@@ -3323,7 +6046,7 @@ def statistic(cmd="add", section="global", key="", value=1):
         return statistic_save(PATH + "/statistic.cfg")
 
     if changed:
-        if CONFIG["main"].getboolean("auto_save_statistic"):
+        if CONFIG_SNAPSHOT.main.auto_save_statistic:
             statistic_save(PATH + "/statistic.cfg")
         else:
             if not STATISTIC.has_section("main"):
@@ -3338,37 +6061,31 @@ def statistic_add(section="global", value=1):
     if not STATISTIC.has_section(section):
         statistic_default(section)
 
+    # The indexes are the current day/week/month/year after the recalculation.
     statistic_recalculate(section)
 
-    date = datetime.date.today()
-    day = date.timetuple().tm_yday
-    month = date.timetuple().tm_mon
-    year = date.timetuple().tm_year
-    week = date.isocalendar()[1]
+    data = STATISTIC[section]
 
     #day
-    if STATISTIC[section]["day_index"] == str(day):
-        STATISTIC[section]["day_value"] = str(STATISTIC.getint(section, "day_value")+value)
+    day_value = int(data["day_value"])+value
+    data["day_value"] = str(day_value)
 
     #week
-    if STATISTIC[section]["week_index"] == str(week):
-        STATISTIC[section]["week_value"] = str(STATISTIC.getint(section, "week_value")+value)
+    data["week_value"] = str(int(data["week_value"])+value)
 
     #month
-    if STATISTIC[section]["month_index"] == str(month):
-        STATISTIC[section]["month_value"] = str(STATISTIC.getint(section, "month_value")+value)
+    data["month_value"] = str(int(data["month_value"])+value)
 
     #year
-    if STATISTIC[section]["year_index"] == str(year):
-        STATISTIC[section]["year_value"] = str(STATISTIC.getint(section, "year_value")+value)
+    data["year_value"] = str(int(data["year_value"])+value)
 
     #all
-    STATISTIC[section]["all_value"] = str(STATISTIC.getint(section, "all_value")+value)
+    data["all_value"] = str(int(data["all_value"])+value)
 
     #max
-    if STATISTIC.getint(section, "day_value") > STATISTIC.getint(section, "max_value"):
-        STATISTIC[section]["max_value"] = STATISTIC[section]["day_value"]
-        STATISTIC[section]["max_index"] = time.strftime("%Y-%m-%d", time.localtime(time.time()))
+    if day_value > int(data["max_value"]):
+        data["max_value"] = str(day_value)
+        data["max_index"] = time.strftime("%Y-%m-%d", time.localtime(time.time()))
     return
 
 
@@ -3490,7 +6207,7 @@ def statistic_read(file=None):
     if file is None:
         return False
     else:
-        STATISTIC = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        STATISTIC = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#", interpolation=None)
         STATISTIC.sections()
         if os.path.isfile(file):
             try:
@@ -3519,11 +6236,8 @@ def statistic_save(file=None):
 
 #### Statistic - Save #####
 def statistic_save_periodic(initial=False):
-    statistic_timer = threading.Timer(CONFIG.getint("main", "periodic_save_statistic_interval")*60, statistic_save_periodic)
-    statistic_timer.daemon = True
-    statistic_timer.start()
-
     if initial:
+        LXMF_CONNECTION.scheduler.add("Statistic - Save", statistic_save_periodic, interval=CONFIG.getint("main", "periodic_save_statistic_interval")*60)
         return
 
     global STATISTIC
@@ -3622,6 +6336,128 @@ LOG_MAXSIZE       = 5*1024*1024
 LOG_PREFIX        = ""
 LOG_SUFFIX        = ""
 LOG_FILE          = ""
+LOG_FORMAT        = "text" #text/json
+LOG_QUEUE_SIZE    = 10000
+LOG_WRITER        = None
+
+
+class log_writer():
+    def __init__(self, file, maxsize=LOG_MAXSIZE, queue_size=LOG_QUEUE_SIZE):
+        self.file = file
+        self.maxsize = maxsize
+        self.queue_size = queue_size
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.handle = None
+        self.size = 0
+        self.dropped = 0
+        self.stopped = False
+        self.thread = threading.Thread(target=self.process, daemon=True)
+        self.thread.start()
+
+
+    def write(self, text):
+        with self.condition:
+            if self.stopped or len(self.queue) >= self.queue_size:
+                self.dropped += 1
+                return
+            self.queue.append(text)
+            self.condition.notify()
+
+
+    def process(self):
+        while True:
+            with self.condition:
+                while len(self.queue) == 0 and not self.stopped:
+                    self.condition.wait()
+                if len(self.queue) == 0:
+                    break
+                lines = list(self.queue)
+                self.queue.clear()
+                dropped = self.dropped
+                self.dropped = 0
+
+            if dropped > 0:
+                lines.append("[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [Warning] Log queue full, " + str(dropped) + " lines dropped")
+
+            self.write_lines(lines)
+
+        self.close()
+
+
+    # On errors the lines are counted as dropped and the file is opened again with the next lines.
+    def write_lines(self, lines):
+        try:
+            if self.handle == None:
+                self.handle = open(self.file, "ab")
+                self.size = self.handle.tell()
+
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self.handle.write(data)
+            self.handle.flush()
+            self.size += len(data)
+        except Exception:
+            self.close()
+            with self.condition:
+                self.dropped += len(lines)
+            return
+
+        if self.size > self.maxsize:
+            try:
+                self.rotate()
+            except Exception:
+                self.close()
+
+
+    def rotate(self):
+        self.close()
+        file_prev = self.file + ".1"
+        if os.path.isfile(file_prev):
+            os.unlink(file_prev)
+        os.rename(self.file, file_prev)
+        self.size = 0
+
+
+    def close(self):
+        if self.handle != None:
+            try:
+                self.handle.close()
+            except Exception:
+                pass
+            self.handle = None
+
+
+    def stop(self, timeout=5):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+
+def log_start(file=None):
+    global LOG_WRITER
+
+    if file == None:
+        file = LOG_FILE
+
+    if LOG_WRITER != None or file == "":
+        return
+
+    LOG_WRITER = log_writer(file)
+    exit_register(log_stop)
+    exit_signals()
+
+
+def log_stop():
+    global LOG_WRITER
+
+    if LOG_WRITER != None:
+        LOG_WRITER.stop()
+        LOG_WRITER = None
+
+
+def log_enabled(level=3):
+    return bool(LOG_LEVEL) and LOG_LEVEL >= level
 
 
 def log(text, level=3, file=None):
@@ -3652,13 +6488,18 @@ def log(text, level=3, file=None):
         if not isinstance(text, str):
             text = str(text)
 
-        text = "[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [" + name + "] " + LOG_PREFIX + text + LOG_SUFFIX
+        if LOG_FORMAT == "json":
+            text = json.dumps({"time": time.strftime(LOG_TIMEFMT, time.localtime(time.time())), "level": name, "text": LOG_PREFIX + text + LOG_SUFFIX}, ensure_ascii=False)
+        else:
+            text = "[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [" + name + "] " + LOG_PREFIX + text + LOG_SUFFIX
 
         if file == None and LOG_FILE != "":
             file = LOG_FILE
 
         if file == None:
             print(text)
+        elif LOG_WRITER != None and file == LOG_WRITER.file:
+            LOG_WRITER.write(text)
         else:
             try:
                 file_handle = open(file, "a")
@@ -3688,19 +6529,73 @@ def exit():
     sys.exit(0)
 
 
+#### Exit - Register #####
+# Functions which have to run when the program ends (save data, flush the log).
+# RNS and the LXMF router end the program on SIGTERM/SIGINT with os._exit(), which skips atexit.
+# Therefore the functions run from atexit and from the signal handlers (exit_signals).
+EXIT_HANDLERS = []
+
+
+def exit_register(function, *args):
+    if len(EXIT_HANDLERS) == 0:
+        atexit.register(exit_run)
+    EXIT_HANDLERS.append((function, args))
+
+
+#### Exit - Run #####
+# Last registered first (like atexit), every function runs only once.
+def exit_run():
+    while len(EXIT_HANDLERS) > 0:
+        function, args = EXIT_HANDLERS.pop()
+        try:
+            function(*args)
+        except Exception as e:
+            log("Exit - Error in " + str(function) + ": " + str(e), LOG_ERROR)
+
+
+#### Exit - Signals #####
+# Chains the installed SIGTERM/SIGINT handlers (RNS, LXMF router) with exit_run().
+# Has to be called again after a new handler was installed (RNS.Reticulum, LXMF.LXMRouter).
+def exit_signals():
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        handler = signal.getsignal(signum)
+        if handler == signal.SIG_IGN or getattr(handler, "exit_run", None) is exit_run:
+            continue
+        signal.signal(signum, exit_signal_handler(handler))
+
+
+def exit_signal_handler(handler):
+    def signal_handler(signum, frame):
+        exit_run()
+        if callable(handler):
+            handler(signum, frame)
+        elif signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        else:
+            sys.exit(0)
+    signal_handler.exit_run = exit_run
+    return signal_handler
+
+
 ##############################################################################################################
 # Setup/Start
 
 
 #### Setup #####
-def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False):
+def setup(path=None, path_rns=None, path_log=None, loglevel=None, logformat=None, service=False):
     global PATH
     global PATH_RNS
     global LOG_LEVEL
+    global LOG_FORMAT
     global LOG_FILE
     global RNS_MAIN_CONNECTION
     global LXMF_CONNECTION
     global RNS_CONNECTION
+    global RATE_LIMITER
+    global FANOUT
 
     if path is not None:
         if path.endswith("/"):
@@ -3718,6 +6613,9 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
     else:
         rns_loglevel = None
 
+    if logformat is not None:
+        LOG_FORMAT = logformat
+
     if service:
         LOG_LEVEL = LOG_LEVEL_SERVICE
         if path_log is not None:
@@ -3727,6 +6625,7 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         else:
             LOG_FILE = PATH
         LOG_FILE = LOG_FILE + "/" + NAME + ".log"
+        log_start(LOG_FILE)
         rns_loglevel = None
 
     if not config_read(PATH + "/config.cfg", PATH + "/config.cfg.owr"):
@@ -3754,12 +6653,10 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
             print("Statistic - Error reading statistic file " + PATH + "/statistic.cfg")
             panic()
 
-    if CONFIG.has_section("cmds") and CONFIG.has_section("rights"):
-        for (key, val) in CONFIG.items("cmds"):
-            if val != "" and CONFIG.has_option("rights", key):
-                CONFIG["rights"][key] += ",interface,"+val
-
-    RNS_MAIN_CONNECTION = RNS.Reticulum(configdir=PATH_RNS, loglevel=rns_loglevel)
+    # Reuse the instance of a host process (lxmf_host) which runs several tools
+    RNS_MAIN_CONNECTION = RNS.Reticulum.get_instance()
+    if RNS_MAIN_CONNECTION == None:
+        RNS_MAIN_CONNECTION = RNS.Reticulum(configdir=PATH_RNS, loglevel=rns_loglevel)
 
     log("...............................................................................", LOG_INFO)
     log("        Name: " + CONFIG["main"]["name"], LOG_INFO)
@@ -3796,6 +6693,9 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         except:
             pass
 
+    if config_getboolean(CONFIG, "rate_limit", "enabled", False):
+        RATE_LIMITER = lxmf_rate_limiter(config_getint(CONFIG, "rate_limit", "size", 65536))
+
     LXMF_CONNECTION = lxmf_connection(
         storage_path=path,
         identity_file="identity",
@@ -3806,6 +6706,29 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         announce_data = announce_data,
         announce_hidden=CONFIG["lxmf"].getboolean("announce_hidden"),
         send_delay=CONFIG["lxmf"]["send_delay"],
+        send_rate=config_get(CONFIG, "lxmf", "send_rate", 0),
+        send_burst=config_get(CONFIG, "lxmf", "send_burst", 1),
+        send_queue_size=config_get(CONFIG, "lxmf", "send_queue_size", 0),
+        destination_cache_size=config_get(CONFIG, "lxmf", "destination_cache_size", 1000),
+        destination_cache_unknown_ttl=config_get(CONFIG, "lxmf", "destination_cache_unknown_ttl", 30),
+        reachability_size=config_get(CONFIG, "lxmf", "reachability_size", 1000),
+        reachability_fails=config_get(CONFIG, "lxmf", "reachability_fails", 2),
+        reachability_retry=config_get(CONFIG, "lxmf", "reachability_retry", 60),
+        path_request_rate=config_get(CONFIG, "lxmf", "path_request_rate", 2),
+        path_request_interval=config_get(CONFIG, "lxmf", "path_request_interval", 30),
+        duplicate_cache_size=config_get(CONFIG, "lxmf", "duplicate_cache_size", 10000),
+        duplicate_cache_ttl=config_get(CONFIG, "lxmf", "duplicate_cache_ttl", 1440),
+        receive_workers=config_get(CONFIG, "lxmf", "receive_workers", 0),
+        receive_queue_size=config_get(CONFIG, "lxmf", "receive_queue_size", 1000),
+        receive_overflow=config_get(CONFIG, "lxmf", "receive_overflow", "drop_oldest"),
+        receive_overflow_reply=config_get(CONFIG, "lxmf", "receive_overflow_reply", ""),
+        spool_threshold=config_get(CONFIG, "lxmf", "spool_threshold", 262144),
+        spool_path=config_get(CONFIG, "lxmf", "spool_path", None),
+        delivery_size=config_get(CONFIG, "lxmf", "delivery_size", 10000),
+        metrics_port=config_get(CONFIG, "lxmf", "metrics_port", 0),
+        metrics_host=config_get(CONFIG, "lxmf", "metrics_host", "127.0.0.1"),
+        profile_signals=config_getboolean(CONFIG, "lxmf", "profile_signals", False),
+        profile_duration=config_get(CONFIG, "lxmf", "profile_duration", 30),
         desired_method=CONFIG["lxmf"]["desired_method"],
         propagation_node=config_propagation_node,
         propagation_node_auto=CONFIG["lxmf"].getboolean("propagation_node_auto"),
@@ -3815,13 +6738,32 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         announce_startup_delay=CONFIG["lxmf"]["announce_startup_delay"],
         announce_periodic=CONFIG["lxmf"].getboolean("announce_periodic"),
         announce_periodic_interval=CONFIG["lxmf"]["announce_periodic_interval"],
+        announce_periodic_jitter=config_get(CONFIG, "lxmf", "announce_periodic_jitter", 0),
         sync_startup=CONFIG["lxmf"].getboolean("sync_startup"),
         sync_startup_delay=CONFIG["lxmf"]["sync_startup_delay"],
         sync_limit=CONFIG["lxmf"]["sync_limit"],
         sync_periodic=CONFIG["lxmf"].getboolean("sync_periodic"),
-        sync_periodic_interval=CONFIG["lxmf"]["sync_periodic_interval"])
+        sync_periodic_interval=CONFIG["lxmf"]["sync_periodic_interval"],
+        sync_periodic_jitter=config_get(CONFIG, "lxmf", "sync_periodic_jitter", 0),
+        sync_adaptive=config_getboolean(CONFIG, "lxmf", "sync_adaptive", False),
+        sync_adaptive_backoff=config_get(CONFIG, "lxmf", "sync_adaptive_backoff", 8))
 
     LXMF_CONNECTION.register_announce_callback(lxmf_announce_callback)
+    LXMF_CONNECTION.metrics.gauge("data_entries", lambda: {section: len(DATA[section]) for section in DATA.sections()}, "section")
+    LXMF_CONNECTION.metrics.gauge("announce_filter", lxmf_announce_callback.stat)
+    if RATE_LIMITER:
+        LXMF_CONNECTION.metrics.gauge("rate_limit", RATE_LIMITER.stat)
+
+    FANOUT = lxmf_fanout(
+        LXMF_CONNECTION,
+        workers=config_getint(CONFIG, "lxmf", "fanout_workers", 2),
+        queue_size=config_getint(CONFIG, "lxmf", "fanout_queue_size", 0),
+        rate=config_get(CONFIG, "lxmf", "fanout_rate", 0),
+        burst=config_get(CONFIG, "lxmf", "fanout_burst", 50),
+        chunk=config_getint(CONFIG, "lxmf", "fanout_chunk", 50),
+        jobs_size=config_getint(CONFIG, "lxmf", "fanout_jobs", 100))
+    LXMF_CONNECTION.metrics.gauge("fanout", FANOUT.stat)
+
     LXMF_CONNECTION.register_message_received_callback(lxmf_message_received_callback)
     LXMF_CONNECTION.register_config_set_callback(config_set)
 
@@ -3869,8 +6811,10 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
             announce_startup_delay=CONFIG["rns"]["announce_startup_delay"],
             announce_periodic=CONFIG["rns"].getboolean("announce_periodic"),
             announce_periodic_interval=CONFIG["rns"]["announce_periodic_interval"],
+            announce_periodic_jitter=config_get(CONFIG, "rns", "announce_periodic_jitter", 0),
             announce_data = json.dumps(announce_data, separators=(',', ':')),
-            announce_hidden=CONFIG["rns"].getboolean("announce_hidden")
+            announce_hidden=CONFIG["rns"].getboolean("announce_hidden"),
+            scheduler=LXMF_CONNECTION.scheduler
             )
         RNS_CONNECTION.register_announce_callback(rns_announce_callback)
         log("RNS - Connected", LOG_DEBUG)
@@ -3895,6 +6839,7 @@ def main():
         parser.add_argument("-pr", "--path_rns", action="store", type=str, default=None, help="Path to alternative Reticulum config directory")
         parser.add_argument("-pl", "--path_log", action="store", type=str, default=None, help="Path to alternative log directory")
         parser.add_argument("-l", "--loglevel", action="store", type=int, default=LOG_LEVEL)
+        parser.add_argument("-lf", "--logformat", action="store", type=str, default=LOG_FORMAT, choices=["text", "json"], help="Log format (text/json)")
         parser.add_argument("-s", "--service", action="store_true", default=False, help="Running as a service and should log to file")
         parser.add_argument("--exampleconfig", action="store_true", default=False, help="Print verbose configuration example to stdout and exit")
         parser.add_argument("--exampleconfigoverride", action="store_true", default=False, help="Print verbose configuration example to stdout and exit")
@@ -3920,7 +6865,7 @@ def main():
             print(DEFAULT_DATA)
             exit()
 
-        setup(path=params.path, path_rns=params.path_rns, path_log=params.path_log, loglevel=params.loglevel, service=params.service)
+        setup(path=params.path, path_rns=params.path_rns, path_log=params.path_log, loglevel=params.loglevel, logformat=params.logformat, service=params.service)
 
     except KeyboardInterrupt:
         print("Terminated by CTRL-C")
@@ -4097,6 +7042,7 @@ announce_startup_delay = 0 #Seconds
 # to let other peers reach it.
 announce_periodic = Yes
 announce_periodic_interval = 120 #Minutes
+announce_periodic_jitter = 0 #Seconds
 
 # The announce is hidden for client applications
 # but is still used for the routing tables.
@@ -4106,6 +7052,93 @@ announce_hidden = No
 # for LXMF/Reticulum processing.
 send_delay = 0 #Seconds
 
+# Outbound messages are queued and handed over to LXMF
+# in the background with this rate (0=Use send_delay).
+send_rate = 0 #Messages per second
+send_burst = 1 #Messages
+
+# Maximum number of queued outbound messages (0=Unlimited).
+send_queue_size = 0
+
+# All messages of the group (group messages, notices and replies)
+# are sent by background workers (0=In the receive callback).
+# The messages to one member keep their order.
+fanout_workers = 2
+# Maximum number of recipients waiting for the workers (0=Unlimited).
+fanout_queue_size = 0
+# Maximum rate over all messages of the group (0=Unlimited).
+fanout_rate = 0 #Messages per second
+fanout_burst = 50 #Messages
+# Recipients handed over to LXMF at once.
+fanout_chunk = 50
+# Number of group messages whose progress is kept (/delivery).
+fanout_jobs = 100
+
+# Number of cached outbound destinations (0=Disabled).
+destination_cache_size = 1000
+
+# Time until a destination with unknown identity
+# is looked up again.
+destination_cache_unknown_ttl = 30 #Seconds
+
+# Number of destinations whose direct delivery results
+# are remembered (0=Disabled). After x failed direct deliveries
+# in a row, messages are sent as propagated messages right away
+# until the retry time has elapsed or the destination announces
+# again. Only used together with try_propagation_on_fail.
+reachability_size = 1000
+reachability_fails = 2
+reachability_retry = 60 #Minutes
+
+# Paths to known destinations without a path are requested
+# ahead of time, periodically and before a message is sent
+# to multiple recipients (0=Disabled).
+path_request_rate = 2 #Requests per second
+path_request_interval = 30 #Minutes
+
+# Number of received message hashes that are remembered
+# to drop messages received twice (0=Disabled).
+duplicate_cache_size = 10000
+duplicate_cache_ttl = 1440 #Minutes
+
+# Received messages are handed over to x worker threads
+# (0=Process directly). Messages of one source are always
+# processed in order by the same worker. This program is not
+# thread-safe: The workers process one message at a time, more
+# than one worker does not process messages in parallel.
+receive_workers = 0
+
+# Maximum number of queued received messages per worker (0=Unlimited).
+receive_queue_size = 1000
+
+# What happens if the queue is full (drop_oldest/reject).
+# A rejected message is answered with the reply text (if set).
+receive_overflow = drop_oldest
+receive_overflow_reply =
+
+# Field data (e.g. attachments) of received messages larger
+# than this size is moved to temporary files and read from
+# there when needed (0=Disabled).
+spool_threshold = 262144 #Bytes
+
+# Directory for these files (Empty=System temp directory).
+spool_path =
+
+# Number of sent messages whose delivery is tracked
+# (delivery state, latency, waiting for the result).
+delivery_size = 10000
+
+# Metrics endpoint (Prometheus text format) on http://host:port/metrics
+# (0=Disabled). Only bind to localhost unless access is restricted.
+metrics_port = 0
+metrics_host = 127.0.0.1
+
+# Profiling: SIGUSR1 starts/stops a CPU profile (cProfile) for
+# x seconds, SIGUSR2 writes the stacks of all threads and a memory
+# snapshot diff (tracemalloc). Files are written to the storage path.
+profile_signals = No
+profile_duration = 30 #Seconds
+
 # Sync LXMF messages at startup.
 sync_startup = No
 sync_startup_delay = 0 #Seconds
@@ -4115,6 +7148,14 @@ sync_periodic = No
 
 # The sync interval in minutes.
 sync_periodic_interval = 360 #Minutes
+sync_periodic_jitter = 0 #Seconds
+
+# Adaptive sync: If a sync reached the sync_limit, the next sync
+# follows immediately until all waiting messages are received.
+# If no messages were received, the sync interval is doubled
+# up to x times the sync_periodic_interval.
+sync_adaptive = No
+sync_adaptive_backoff = 8
 
 # Automatic LXMF syncs will only
 # download x messages at a time. You can change
@@ -4145,6 +7186,7 @@ announce_startup_delay = 0 #Seconds
 # to let other peers reach it.
 announce_periodic = Yes
 announce_periodic_interval = 120 #Minutes
+announce_periodic_jitter = 0 #Seconds
 
 # The announce is hidden for client applications
 # but is still used for the routing tables.
@@ -4344,13 +7386,36 @@ user = True
 # Delimiter for different rights: ,
 [rights]
 
-admin = interface,receive_local,receive_cluster,receive_cluster_pin_add,receive_cluster_loop,receive_cluster_join,receive_join,receive_leave,receive_invite,receive_kick,receive_block,receive_unblock,receive_allow,receive_deny,receive_description,receive_rules,receive_pin_add,receive_pin_remove,receive_name_def,receive_name_change,receive_auto_name_def,receive_auto_name_change,reply_signature,reply_cluster_enabled,reply_cluster_right,reply_interface_enabled,reply_interface_right,reply_local_enabled,reply_local_right,reply_block,reply_length_min,reply_length_max,send_local,send_cluster,help,update,update_all,join,leave,name,address,info,pin,pin_add,pin_remove,cluster_pin_add,description,rules,readme,time,version,groups,members,admins,moderators,users,guests,search,activitys,statistic,statistic_min,statistic_full,statistic_cluster,statistic_router,statistic_local,statistic_interface,statistic_self,statistic_user,status,delivery,enable_local,enable_cluster,auto_add_user,auto_add_user_type,auto_add_cluster,auto_add_router,invite_user,invite_user_type,allow_user,allow_user_type,deny_user,deny_user_type,description_set,rules_set,announce,sync,show_run,show,add,del,move,rename,invite,kick,block,unblock,allow,deny,load,save,reload,reset,unsaved
+admin = interface,receive_local,receive_cluster,receive_cluster_pin_add,receive_cluster_loop,receive_cluster_join,receive_join,receive_leave,receive_invite,receive_kick,receive_block,receive_unblock,receive_allow,receive_deny,receive_description,receive_rules,receive_pin_add,receive_pin_remove,receive_name_def,receive_name_change,receive_auto_name_def,receive_auto_name_change,reply_signature,reply_cluster_enabled,reply_cluster_right,reply_interface_enabled,reply_interface_right,reply_local_enabled,reply_local_right,reply_block,reply_length_min,reply_length_max,send_local,send_cluster,help,update,update_all,join,leave,name,address,info,pin,pin_add,pin_remove,cluster_pin_add,description,rules,readme,time,version,groups,members,admins,moderators,users,guests,search,activitys,statistic,statistic_min,statistic_full,statistic_cluster,statistic_router,statistic_local,statistic_interface,statistic_self,statistic_user,status,delivery,delivery_all,enable_local,enable_cluster,auto_add_user,auto_add_user_type,auto_add_cluster,auto_add_router,invite_user,invite_user_type,allow_user,allow_user_type,deny_user,deny_user_type,description_set,rules_set,announce,sync,show_run,profile,show,add,del,move,rename,invite,kick,block,unblock,allow,deny,load,save,reload,reset,unsaved
 mod = interface,receive_local,receive_cluster,receive_cluster_pin_add,receive_cluster_loop,receive_join,receive_leave,receive_invite,receive_kick,receive_block,receive_unblock,receive_allow,receive_deny,receive_description,receive_rules,receive_pin_add,reply_signature,reply_cluster_enabled,reply_cluster_right,reply_interface_enabled,reply_interface_right,reply_local_enabled,reply_local_right,reply_block,reply_length_min,reply_length_max,send_local,send_cluster,help,update,update_all,join,leave,name,address,info,pin,pin_add,pin_remove,cluster_pin_add,description,rules,readme,time,version,groups,members,admins,moderators,users,guests,search,activitys,statistic,statistic_min,statistic_cluster,statistic_router,statistic_local,statistic_self,delivery,show,add,del,move,rename,invite,kick,block,unblock,allow,deny
 user = interface,receive_local,receive_cluster,receive_cluster_pin_add,receive_cluster_loop,receive_join,receive_leave,receive_invite,receive_kick,receive_block,receive_unblock,receive_allow,receive_description,receive_rules,receive_pin_add,reply_signature,reply_cluster_enabled,reply_cluster_right,reply_interface_enabled,reply_interface_right,reply_local_enabled,reply_local_right,reply_block,reply_length_min,reply_length_max,send_local,send_cluster,help,update,join,leave,name,address,info,pin,pin_add,pin_remove,cluster_pin_add,description,rules,readme,time,version,groups,members,admins,moderators,users,guests,search,activitys,statistic,statistic_min,statistic_cluster,statistic_router,statistic_local,statistic_self,delivery,invite
 guest = interface,receive_local,receive_cluster,receive_cluster_loop,update,join,leave
 wait = interface,update,join,leave
 
 
+#### User rate limit ####
+
+# Limit the incoming messages per source (token bucket).
+# Format: messages per minute/burst (0 = no limit)
+# A right without its own entry uses the default value.
+# Unknown and blocked sources also use the default value.
+# The global value is an upper limit over all allowed sources.
+[rate_limit]
+
+# Enable/Disable this functionality.
+enabled = False
+
+# Number of sources held in memory.
+size = 65536
+
+global = 600/100
+default = 10/5
+admin = 0
+mod = 0
+cluster = 0
+router = 0
+
+
 #### User cmd assignment ####
 
 # Define the individual cmds for the different user types.
@@ -4445,6 +7510,7 @@ wait =
 # statistic_user = Displays the user statistics on the statistics text.
 # status = Use of the "/status" command allowed.
 # delivery = Use of the "/delivery" command allowed.
+# delivery_all = Use of the "/delivery <hash/all>" command allowed (Delivery status of all group messages).
 # enable_local = Use of the "/enable_local" command allowed.
 # enable_cluster = Use of the "/enable_cluster" command allowed.
 # auto_add_user = Use of the "/auto_add_user" command allowed.
@@ -4466,6 +7532,7 @@ wait =
 # announce = Use of the "/announce" command allowed.
 # sync = Use of the "/sync" command allowed.
 # show_run = Use of the "/show_run" command allowed.
+# profile = Use of the "/profile" command allowed.
 # show = Use of the "/show" command allowed.
 # add = Use of the "/add" command allowed.
 # del = Use of the "/del" command allowed.
@@ -4652,6 +7719,8 @@ reply_local_right = Info: No authorization to send messages!
 reply_local_right-de = Info: Keine Berechtigung zum senden von Nachrichten!
 reply_block = Info: You are blocked!
 reply_block-de = Info: Sie sind geblockt!
+reply_rate_limit = Info: Too many messages, please wait!
+reply_rate_limit-de = Info: Zu viele Nachrichten, bitte warten!
 reply_length_min = Info: Minimum message length not reached!
 reply_length_min-de = Info: Minimale Nachrichtenlänge unterschritten!
 reply_length_max = Info: Maximum message length exceeded!
@@ -4825,7 +7894,12 @@ status_guest = Status:!n!!n!Local message routing:!enabled_local!!n!Cluster mess
 status_guest-de = Status:!n!!n!Lokales Nachrichten Routing:!enabled_local!!n!Cluster Nachrichten Routing:!enabled_cluster!!n!
 
 # "/delivery" command.
-# todo
+delivery_header = Delivery status:!n!!n!
+delivery_header-de = Lieferstatus:!n!!n!
+delivery_job = !key!:!n!Recipients: !total! (Waiting: !queued!, Sent: !sent!)!n!Delivered: !delivered!, Failed: !failed!, Dropped: !dropped!, Pending: !pending!!n!Duration: !duration!s!n!!n!
+delivery_job-de = !key!:!n!Empfänger: !total! (Wartend: !queued!, Gesendet: !sent!)!n!Zugestellt: !delivered!, Fehlgeschlagen: !failed!, Verworfen: !dropped!, Ausstehend: !pending!!n!Dauer: !duration!s!n!!n!
+delivery_found_error = ERROR: No message found
+delivery_found_error-de = FEHLER: Keine Nachricht gefunden
 
 # "/enable_local" command.
 enable_local_true = OK: Local message routing enabled.
@@ -4947,6 +8021,20 @@ sync-de = Synchronisiere Nachrichten mit Propagation node <!propagation_node!>.
 show_run_header = Current settings/data:!n!!n!
 show_run_header-de = Aktuelle Konfiguration/Daten:!n!!n!
 
+# "/profile" command.
+profile = CPU profile started, output:!n!
+profile-de = CPU Profil gestartet, Ausgabe:!n!
+profile_stop = CPU profile written:!n!
+profile_stop-de = CPU Profil geschrieben:!n!
+profile_memory = Memory snapshot diff written:!n!
+profile_memory-de = Speicher Snapshot Differenz geschrieben:!n!
+profile_memory_start = Memory tracing started. Repeat the command to write the difference.
+profile_memory_start-de = Speicher Tracing gestartet. Befehl wiederholen um die Differenz zu schreiben.
+profile_stacks = Thread stacks written:!n!
+profile_stacks-de = Thread Stacks geschrieben:!n!
+profile_error = Error: Profile already running or nothing recorded!
+profile_error-de = Fehler: Profil läuft bereits oder keine Daten aufgezeichnet!
+
 # "/show" command.
 show_header = 
 show_header-de = 
@@ -5143,6 +8231,9 @@ status-de = /status = Status anzeigen!n!
 delivery = /delivery or /message = Show delivery status of last message!n!
 delivery-de = /delivery oder /message = Lieferstatus der letzten Nachricht anzeigen!n!
 
+delivery_all = /delivery <message_hash/all> or /message <message_hash/all> = Show delivery status of group messages!n!
+delivery_all-de = /delivery <nachrichten_hash/all> oder /message <nachrichten_hash/all> = Lieferstatus der Gruppennachrichten anzeigen!n!
+
 enable_local = /enable_local <true/false> = Local message routing!n!
 enable_local-de = /enable_local <true/false> Lokales Nachrichten Routing!n!
 
@@ -5206,6 +8297,9 @@ sync-de = /sync = Nachrichten mit Propagation Node synchronisieren!n!
 show_run = /show run = Show current configuration!n!
 show_run-de = /show run = Aktuelle Konfiguration anzeigen!n!
 
+profile = /profile [seconds] = Start CPU profile!n!/profile stop = Stop CPU profile!n!/profile memory = Memory snapshot diff!n!/profile stacks = Thread stacks!n!
+profile-de = /profile [Sekunden] = CPU Profil starten!n!/profile stop = CPU Profil stoppen!n!/profile memory = Speicher Snapshot Differenz!n!/profile stacks = Thread Stacks!n!
+
 show = /show or /list!n!/show or /list <admin/mod/user/guest>!n!
 show-de = /show oder /list!n!/show oder /list <admin/mod/user/guest>!n!
 
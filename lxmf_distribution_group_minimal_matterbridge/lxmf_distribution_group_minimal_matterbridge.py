@@ -56,6 +56,7 @@ import re
 import signal
 import threading
 import requests
+import http.server
 from datetime import datetime
 
 #### Reticulum, LXMF ####
@@ -131,7 +132,8 @@ class LxmfConnection:
                  desired_method="direct", propagation_node=None, propagation_node_auto=False,
                  propagation_node_active=None, try_propagation_on_fail=False, announce_startup=False,
                  announce_startup_delay=0, announce_periodic=False, announce_periodic_interval=360, sync_startup=False,
-                 sync_startup_delay=0, sync_limit=8, sync_periodic=False, sync_periodic_interval=360):
+                 sync_startup_delay=0, sync_limit=8, sync_periodic=False, sync_periodic_interval=360,
+                 metrics_port=0, metrics_host="127.0.0.1"):
         self.storage_path = storage_path
 
         self.identity_file = identity_file
@@ -169,6 +171,10 @@ class LxmfConnection:
         self.sync_periodic = sync_periodic
         self.sync_periodic_interval = int(sync_periodic_interval)
 
+        self.metrics_port = int(metrics_port)
+        self.metrics_host = metrics_host
+        self.metrics = lxmf_metrics()
+
         if not self.storage_path:
             log("LXMF - No storage_path parameter", LOG_ERROR)
             return
@@ -246,6 +252,9 @@ class LxmfConnection:
         if self.sync_startup or self.sync_periodic:
             self.sync(True)
 
+        if self.metrics_port > 0:
+            self.metrics.start(self.metrics_host, self.metrics_port)
+
     def register_announce_callback(self, handler_function):
         self.announce_callback = handler_function(self.aspect_filter)
         RNS.Transport.register_announce_handler(self.announce_callback)
@@ -345,6 +354,7 @@ class LxmfConnection:
             message.timestamp = timestamp
 
         message.app_data = app_data
+        message.send_time = time.time()
 
         self.message_method(message)
         self.log_message(message, "LXMF - Message send")
@@ -357,9 +367,11 @@ class LxmfConnection:
 
         try:
             self.message_router.handle_outbound(message)
+            self.metrics.inc("messages_sent", method=message.desired_method_str)
             time.sleep(self.send_delay)
             return message.hash
         except Exception as e:
+            self.metrics.inc("messages_failed", method=message.desired_method_str)
             log("LXMF - Could not send message " + str(message), LOG_ERROR)
             log("LXMF - The contained exception was: " + str(e), LOG_ERROR)
             return None
@@ -381,10 +393,15 @@ class LxmfConnection:
             self.message_router.handle_outbound(message)
         elif message.state == LXMF.LXMessage.FAILED:
             self.log_message(message, "LXMF - Delivery receipt (failed)")
+            self.metrics.inc("messages_failed", method=message.desired_method_str)
             if self.message_notification_failed_callback is not None:
                 self.message_notification_failed_callback(message)
         else:
             self.log_message(message, "LXMF - Delivery receipt (success)")
+            self.metrics.inc("messages_delivered", method=message.desired_method_str)
+            if hasattr(message, "send_time"):
+                self.metrics.observe("delivery_latency_seconds", time.time() - message.send_time,
+                                     method=message.desired_method_str)
             if self.message_notification_success_callback is not None:
                 self.message_notification_success_callback(message)
 
@@ -438,6 +455,7 @@ class LxmfConnection:
         else:
             self.destination.announce()
             log("LXMF - Announced: " + RNS.prettyhexrep(self.destination_hash()) + ": " + self.display_name, LOG_DEBUG)
+        self.metrics.inc("announces_sent")
 
     def sync(self, initial=False):
         sync_timer = None
@@ -546,10 +564,15 @@ class LxmfConnection:
 
         self.message_method(message)
         self.log_message(message, "LXMF - Message received")
+        self.metrics.inc("messages_received", method=message.desired_method_str)
 
         if self.message_received_callback is not None:
             log("LXMF - Call to registered message received callback", LOG_DEBUG)
-            self.message_received_callback(message)
+            start = time.time()
+            try:
+                self.message_received_callback(message)
+            finally:
+                self.metrics.observe("callback_duration_seconds", time.time() - start)
         else:
             log("LXMF - No message received callback registered", LOG_DEBUG)
 
@@ -558,10 +581,15 @@ class LxmfConnection:
 
         self.message_method(message)
         self.log_message(message, "LXMF - Message received")
+        self.metrics.inc("messages_received", method=message.desired_method_str)
 
         if self.message_received_callback is not None:
             log("LXMF - Call to registered message received callback", LOG_DEBUG)
-            self.message_received_callback(message)
+            start = time.time()
+            try:
+                self.message_received_callback(message)
+            finally:
+                self.metrics.observe("callback_duration_seconds", time.time() - start)
         else:
             log("LXMF - No message received callback registered", LOG_DEBUG)
 
@@ -620,6 +648,7 @@ class lxmf_connection_propagation():
             if age < 0:
                 if age < -1 * PropDetector.EMITTED_DELTA_GRACE:
                     return
+            self.owner.metrics.inc("announces_received", aspect=self.aspect_filter)
             log("LXMF - Received an propagation node announce from " + RNS.prettyhexrep(destination_hash) + ": " + str(
                 age) + " seconds ago, " + str(hop_count) + " hops away", LOG_INFO)
             if self.owner.propagation_node_active is None:
@@ -632,6 +661,136 @@ class lxmf_connection_propagation():
             return
 
 
+class lxmf_metrics():
+    BUCKETS = (0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+    def __init__(self, prefix="lxmf"):
+        self.prefix = prefix
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.server = None
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram == None:
+                histogram = self.histograms[key] = [[0] * len(self.BUCKETS), 0, 0]
+            for i, bucket in enumerate(self.BUCKETS):
+                if value <= bucket:
+                    histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def gauge(self, name, function, label=None):
+        self.gauges[name] = (function, label)
+
+    def name(self, name):
+        return self.prefix + "_" + re.sub("[^a-zA-Z0-9_]", "_", name)
+
+    def labels(self, labels):
+        if not labels:
+            return ""
+        return "{" + ",".join(key + "=\"" + str(value).replace("\\", "\\\\").replace("\"", "\\\"") + "\"" for key, value in labels) + "}"
+
+    def render(self):
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted((key, (list(value[0]), value[1], value[2])) for key, value in self.histograms.items())
+
+        types = set()
+        for (name, labels), value in counters:
+            name = self.name(name) + "_total"
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE " + name + " counter")
+            lines.append(name + self.labels(labels) + " " + str(value))
+
+        for (name, labels), (buckets, total, count) in histograms:
+            name = self.name(name)
+            if name not in types:
+                types.add(name)
+                lines.append("# TYPE " + name + " histogram")
+            for i, bucket in enumerate(self.BUCKETS):
+                lines.append(name + "_bucket" + self.labels(labels + (("le", str(bucket)),)) + " " + str(buckets[i]))
+            lines.append(name + "_bucket" + self.labels(labels + (("le", "+Inf"),)) + " " + str(count))
+            lines.append(name + "_sum" + self.labels(labels) + " " + str(round(total, 6)))
+            lines.append(name + "_count" + self.labels(labels) + " " + str(count))
+
+        for name, (function, label) in sorted(self.gauges.items()):
+            try:
+                values = function()
+            except Exception as e:
+                log("LXMF - Metrics gauge " + name + " failed: " + str(e), LOG_ERROR)
+                continue
+            if not isinstance(values, dict):
+                values = {None: values}
+            samples = []
+            for key, value in values.items():
+                if isinstance(value, dict):
+                    for key_sub, value_sub in value.items():
+                        samples.append((self.name(name + "_" + str(key_sub)), ((label or "key", key),), value_sub))
+                elif key == None:
+                    samples.append((self.name(name), (), value))
+                elif label:
+                    samples.append((self.name(name), ((label, key),), value))
+                else:
+                    samples.append((self.name(name + "_" + str(key)), (), value))
+            for sample_name, labels, value in samples:
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                if sample_name not in types:
+                    types.add(sample_name)
+                    lines.append("# TYPE " + sample_name + " gauge")
+                lines.append(sample_name + self.labels(labels) + " " + str(value))
+
+        return "\n".join(lines) + "\n"
+
+    def start(self, host="127.0.0.1", port=9100):
+        try:
+            self.server = http.server.ThreadingHTTPServer((host, port), lxmf_metrics_handler)
+        except Exception as e:
+            log("LXMF - Metrics endpoint could not be started on " + host + ":" + str(port) + ": " + str(e), LOG_ERROR)
+            return False
+        self.server.daemon_threads = True
+        self.server.metrics = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        log("LXMF - Metrics endpoint: http://" + host + ":" + str(port) + "/metrics", LOG_INFO)
+        return True
+
+    def stop(self):
+        if self.server != None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class lxmf_metrics_handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        log("LXMF - Metrics request: " + (format % args), LOG_EXTREME)
+
+
 ##############################################################################################################
 # LXMF Functions
 
@@ -1296,7 +1455,9 @@ def setup(path=None, path_rns=None, path_log=None, loglevel=None, service=False)
         sync_startup_delay=CONFIG["lxmf"]["sync_startup_delay"],
         sync_limit=CONFIG["lxmf"]["sync_limit"],
         sync_periodic=CONFIG["lxmf"].getboolean("sync_periodic"),
-        sync_periodic_interval=CONFIG["lxmf"]["sync_periodic_interval"])
+        sync_periodic_interval=CONFIG["lxmf"]["sync_periodic_interval"],
+        metrics_port=config_getint(CONFIG, "lxmf", "metrics_port", 0),
+        metrics_host=config_get(CONFIG, "lxmf", "metrics_host", "127.0.0.1"))
 
     LXMF_CONNECTION.register_announce_callback(lxmf_announce_callback)
     LXMF_CONNECTION.register_message_received_callback(lxmf_message_received_callback)
@@ -1484,6 +1645,11 @@ sync_limit = 0
 # Allow only messages with valid signature.
 signature_validated = No
 
+# Metrics endpoint (Prometheus text format) on http://host:port/metrics
+# (0=Disabled). Only bind to localhost unless access is restricted.
+metrics_port = 0
+metrics_host = 127.0.0.1
+
 
 #### Message settings ####
 [message]
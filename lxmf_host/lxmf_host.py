@@ -0,0 +1,860 @@
+#!/usr/bin/env python3
+##############################################################################################################
+#
+# Copyright (c) 2022 Sebastian Obele  /  obele.eu
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in all
+# copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+#
+# This software uses the following software-parts:
+# Reticulum, LXMF, NomadNet  /  Copyright (c) 2016-2022 Mark Qvist  /  unsigned.io  /  MIT License
+#
+##############################################################################################################
+
+
+##############################################################################################################
+# Include
+
+
+#### System ####
+import sys
+import os
+import time
+import argparse
+import importlib.util
+from collections import deque
+
+#### Config ####
+import configparser
+
+#### JSON ####
+import json
+
+#### Regex ####
+import re
+
+#### Process ####
+import signal
+import threading
+import atexit
+
+#### Reticulum, LXMF ####
+# Install: pip3 install rns lxmf
+# Source: https://markqvist.github.io
+import RNS
+import LXMF
+
+
+##############################################################################################################
+# Globals
+
+
+#### Global Variables - Configuration ####
+NAME = "LXMF Host"
+DESCRIPTION = "Runs several tools in one process with a shared Reticulum instance"
+VERSION = "0.0.1 (2026-10-17)"
+COPYRIGHT = "(c) 2022 Sebastian Obele  /  obele.eu"
+PATH = os.path.expanduser("~") + "/." + os.path.splitext(os.path.basename(__file__))[0]
+PATH_RNS = None
+
+
+#### Global Variables - System (Not changeable) ####
+CONFIG = None
+RNS_CONNECTION = None
+SCHEDULER = None
+TOOLS = {}
+CALLS = deque()
+CALLS_CONDITION = threading.Condition()
+
+
+##############################################################################################################
+# Tools
+
+
+#### Tool - Load ####
+# Every tool is loaded as its own module, so all globals (config, data, connection, ...) stay separated.
+def tool_load(name, file):
+    if not os.path.isabs(file):
+        file = os.path.join(os.path.dirname(os.path.abspath(__file__)), file)
+    spec = importlib.util.spec_from_file_location("lxmf_host_" + name, file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+#### Tool - Start ####
+def tool_start(name, section, path_log=None, loglevel=None, logformat=None, service=False):
+    global SCHEDULER
+
+    file = config_get(CONFIG, section, "file")
+    path = os.path.expanduser(config_get(CONFIG, section, "path", "~/." + name))
+
+    try:
+        module = tool_load(name, file)
+    except Exception as e:
+        log("Tool - " + name + " - Error loading " + file + ": " + str(e), LOG_ERROR)
+        return False
+
+    if not hasattr(module, "lxmf_connection") or not hasattr(module, "setup"):
+        log("Tool - " + name + " - Not a supported tool: " + file, LOG_ERROR)
+        return False
+
+    if SCHEDULER is None:
+        SCHEDULER = module.lxmf_scheduler()
+
+    module.lxmf_connection.SCHEDULER = SCHEDULER
+    module.lxmf_connection.SCHEDULER_PREFIX = name + ": "
+    module.lxmf_connection.MAIN_THREAD_CALL = staticmethod(main_thread_call)
+    module.lxmf_connection.RECEIVE_WORKERS_MIN = config_getint(CONFIG, section, "receive_workers", CONFIG.getint("main", "receive_workers"))
+
+    # The signal handlers of the host end the program, so the exit functions of the tool run from there.
+    exit_register(module.exit_run)
+
+    thread = threading.Thread(target=tool_run, args=(name, module, path, path_log, loglevel, logformat, service), name=name, daemon=True)
+    TOOLS[name] = thread
+    log("Tool - " + name + " - Starting (" + file + ", " + path + ")", LOG_INFO)
+    thread.start()
+    return True
+
+
+#### Tool - Run ####
+def tool_run(name, module, path, path_log=None, loglevel=None, logformat=None, service=False):
+    try:
+        module.setup(path=path, path_rns=PATH_RNS, path_log=path_log, loglevel=loglevel, logformat=logformat, service=service)
+    except SystemExit:
+        pass
+    except Exception as e:
+        log("Tool - " + name + " - Error: " + str(e), LOG_ERROR)
+    log("Tool - " + name + " - Stopped", LOG_WARNING)
+
+
+#### Main thread - Call ####
+# Runs a function in the main thread and waits for the result (e.g. LXMF router, which installs signal handlers).
+def main_thread_call(function, *args, **kwargs):
+    call = {"function": function, "args": args, "kwargs": kwargs, "result": None, "error": None, "done": threading.Event()}
+    with CALLS_CONDITION:
+        CALLS.append(call)
+        CALLS_CONDITION.notify()
+    call["done"].wait()
+    if call["error"] is not None:
+        raise call["error"]
+    return call["result"]
+
+
+#### Main thread - Process ####
+def main_thread_process(timeout=1):
+    with CALLS_CONDITION:
+        if len(CALLS) == 0:
+            CALLS_CONDITION.wait(timeout)
+        calls = list(CALLS)
+        CALLS.clear()
+    for call in calls:
+        try:
+            call["result"] = call["function"](*call["args"], **call["kwargs"])
+        except Exception as e:
+            call["error"] = e
+        call["done"].set()
+    # A new LXMF router has replaced the signal handlers.
+    if len(calls) > 0:
+        exit_signals()
+
+
+##############################################################################################################
+# Config
+
+
+#### Config - Get #####
+def config_get(config, section, key, default="", lng_key=""):
+    if not config or section == "" or key == "": return default
+    if not config.has_section(section): return default
+    if config.has_option(section, key+lng_key):
+        return config[section][key+lng_key]
+    elif config.has_option(section, key):
+        return config[section][key]
+    return default
+
+
+def config_getarray(config, section, key, default=[], lng_key=""):
+    if not config or section == "" or key == "": return default
+    if not config.has_section(section): return default
+    value = ""
+    if config.has_option(section, key+lng_key):
+        value = config[section][key+lng_key]
+    elif config.has_option(section, key):
+        value = config[section][key]
+    if value != "":
+        values_return = []
+        values = value.split(",")
+        for value in values:
+            values_return.append(val_to_val(value.strip()))
+        return values_return
+    return default
+
+
+def config_getint(config, section, key, default=0, lng_key=""):
+    if not config or section == "" or key == "": return default
+    if not config.has_section(section): return default
+    if config.has_option(section, key+lng_key):
+        return config.getint(section, key+lng_key)
+    elif config.has_option(section, key):
+        return config.getint(section, key)
+    return default
+
+
+def config_getboolean(config, section, key, default=False, lng_key=""):
+    if not config or section == "" or key == "": return default
+    if not config.has_section(section): return default
+    if config.has_option(section, key+lng_key):
+        return config[section].getboolean(key+lng_key)
+    elif config.has_option(section, key):
+        return config[section].getboolean(key)
+    return default
+
+
+def config_getsection(config, section, default="", lng_key=""):
+    if not config or section == "": return default
+    if not config.has_section(section): return default
+    if config.has_section(section+lng_key):
+        return key+lng_key
+    elif config.has_section(section):
+        return key
+    return default
+
+
+def config_getoption(config, section, key, default=False, lng_key=""):
+    if not config or section == "" or key == "": return default
+    if not config.has_section(section): return default
+    if config.has_option(section, key+lng_key):
+        return key+lng_key
+    elif config.has_option(section, key):
+        return key
+    return default
+
+
+#### Config - Set #####
+def config_set(key=None, value=""):
+    global PATH
+
+    try:
+        file = PATH + "/config.cfg.owr"
+        if os.path.isfile(file):
+            fh = open(file,'r')
+            data = fh.read()
+            fh.close()
+            data = re.sub(r'^#?'+key+'( +)?=( +)?(\w+)?', key+" = "+value, data, count=1, flags=re.MULTILINE)
+            fh = open(file,'w')
+            fh.write(data)
+            fh.close()
+    
+        file = PATH + "/config.cfg"
+        if os.path.isfile(file):
+            fh = open(file,'r')
+            data = fh.read()
+            fh.close()
+            data = re.sub(r'^#?'+key+'( +)?=( +)?(\w+)?', key+" = "+value, data, count=1, flags=re.MULTILINE)
+            fh = open(file,'w')
+            fh.write(data)
+            fh.close()
+    except:
+        pass
+
+
+#### Config - Read #####
+def config_read(file=None, file_override=None):
+    global CONFIG
+
+    if file is None:
+        return False
+    else:
+        CONFIG = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        CONFIG.sections()
+        if os.path.isfile(file):
+            try:
+                if file_override is None:
+                    CONFIG.read(file, encoding='utf-8')
+                elif os.path.isfile(file_override):
+                    CONFIG.read([file, file_override], encoding='utf-8')
+                else:
+                    CONFIG.read(file, encoding='utf-8')
+            except Exception as e:
+                return False
+        else:
+            if not config_default(file=file, file_override=file_override):
+                return False
+    return True
+
+
+#### Config - Save #####
+def config_save(file=None):
+    global CONFIG
+
+    if file is None:
+        return False
+    else:
+        if os.path.isfile(file):
+            try:
+                with open(file,"w") as file:
+                    CONFIG.write(file)
+            except Exception as e:
+                return False
+        else:
+            return False
+    return True
+
+
+#### Config - Default #####
+def config_default(file=None, file_override=None):
+    global CONFIG
+
+    if file is None:
+        return False
+    elif DEFAULT_CONFIG != "":
+        if file_override and DEFAULT_CONFIG_OVERRIDE != "":
+            if not os.path.isdir(os.path.dirname(file_override)):
+                try:
+                    os.makedirs(os.path.dirname(file_override))
+                except Exception:
+                    return False
+            if not os.path.exists(file_override):
+                try:
+                    config_file = open(file_override, "w")
+                    config_file.write(DEFAULT_CONFIG_OVERRIDE)
+                    config_file.close()
+                except:
+                    return False
+
+        if not os.path.isdir(os.path.dirname(file)):
+            try:
+                os.makedirs(os.path.dirname(file))
+            except Exception:
+                return False
+        try:
+            config_file = open(file, "w")
+            config_file.write(DEFAULT_CONFIG)
+            config_file.close()
+            if not config_read(file=file, file_override=file_override):
+                return False
+        except:
+            return False
+    else:
+        return False
+
+    if not CONFIG.has_section("main"): CONFIG.add_section("main")
+    CONFIG["main"]["default_config"] = "True"
+    return True
+
+
+##############################################################################################################
+# Value convert
+
+
+def val_to_bool(val, fallback_true=True, fallback_false=False):
+    if val == "on" or val == "On" or val == "true" or val == "True" or val == "yes" or val == "Yes" or val == "1" or val == "open" or val == "opened" or val == "up":
+        return True
+    elif val == "off" or val == "Off" or val == "false" or val == "False" or val == "no" or val == "No" or val == "0" or val == "close" or val == "closed" or val == "down":
+        return False
+    elif val != "":
+        return fallback_true
+    else:
+        return fallback_false
+
+
+def val_to_val(val):
+    if val.isdigit():
+        return int(val)
+    elif val.isnumeric():
+        return float(val)
+    elif val.lower() == "true":
+        return True
+    elif val.lower() == "false":
+        return False
+    elif val.startswith("0x") or val.startswith("0X"):
+        try:
+            val_int = int(val, 16)
+            return val_int
+        except:
+            pass
+    return val
+
+
+##############################################################################################################
+# Log
+
+
+LOG_FORCE    = -1
+LOG_CRITICAL = 0
+LOG_ERROR    = 1
+LOG_WARNING  = 2
+LOG_NOTICE   = 3
+LOG_INFO     = 4
+LOG_VERBOSE  = 5
+LOG_DEBUG    = 6
+LOG_EXTREME  = 7
+
+LOG_LEVEL         = LOG_NOTICE
+LOG_LEVEL_SERVICE = LOG_NOTICE
+LOG_TIMEFMT       = "%Y-%m-%d %H:%M:%S"
+LOG_MAXSIZE       = 5*1024*1024
+LOG_PREFIX        = ""
+LOG_SUFFIX        = ""
+LOG_FILE          = ""
+LOG_FORMAT        = "text" #text/json
+LOG_QUEUE_SIZE    = 10000
+LOG_WRITER        = None
+
+
+class log_writer():
+    def __init__(self, file, maxsize=LOG_MAXSIZE, queue_size=LOG_QUEUE_SIZE):
+        self.file = file
+        self.maxsize = maxsize
+        self.queue_size = queue_size
+        self.queue = deque()
+        self.condition = threading.Condition()
+        self.handle = None
+        self.size = 0
+        self.dropped = 0
+        self.stopped = False
+        self.thread = threading.Thread(target=self.process, daemon=True)
+        self.thread.start()
+
+
+    def write(self, text):
+        with self.condition:
+            if self.stopped or len(self.queue) >= self.queue_size:
+                self.dropped += 1
+                return
+            self.queue.append(text)
+            self.condition.notify()
+
+
+    def process(self):
+        while True:
+            with self.condition:
+                while len(self.queue) == 0 and not self.stopped:
+                    self.condition.wait()
+                if len(self.queue) == 0:
+                    break
+                lines = list(self.queue)
+                self.queue.clear()
+                dropped = self.dropped
+                self.dropped = 0
+
+            if dropped > 0:
+                lines.append("[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [Warning] Log queue full, " + str(dropped) + " lines dropped")
+
+            self.write_lines(lines)
+
+        self.close()
+
+
+    # On errors the lines are counted as dropped and the file is opened again with the next lines.
+    def write_lines(self, lines):
+        try:
+            if self.handle == None:
+                self.handle = open(self.file, "ab")
+                self.size = self.handle.tell()
+
+            data = ("\n".join(lines) + "\n").encode("utf-8")
+            self.handle.write(data)
+            self.handle.flush()
+            self.size += len(data)
+        except Exception:
+            self.close()
+            with self.condition:
+                self.dropped += len(lines)
+            return
+
+        if self.size > self.maxsize:
+            try:
+                self.rotate()
+            except Exception:
+                self.close()
+
+
+    def rotate(self):
+        self.close()
+        file_prev = self.file + ".1"
+        if os.path.isfile(file_prev):
+            os.unlink(file_prev)
+        os.rename(self.file, file_prev)
+        self.size = 0
+
+
+    def close(self):
+        if self.handle != None:
+            try:
+                self.handle.close()
+            except Exception:
+                pass
+            self.handle = None
+
+
+    def stop(self, timeout=5):
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.thread.join(timeout)
+
+
+def log_start(file=None):
+    global LOG_WRITER
+
+    if file == None:
+        file = LOG_FILE
+
+    if LOG_WRITER != None or file == "":
+        return
+
+    LOG_WRITER = log_writer(file)
+    exit_register(log_stop)
+    exit_signals()
+
+
+def log_stop():
+    global LOG_WRITER
+
+    if LOG_WRITER != None:
+        LOG_WRITER.stop()
+        LOG_WRITER = None
+
+
+def log_enabled(level=3):
+    return bool(LOG_LEVEL) and LOG_LEVEL >= level
+
+
+def log(text, level=3, file=None):
+    if not LOG_LEVEL:
+        return
+
+    if LOG_LEVEL >= level:
+        name = "Unknown"
+        if (level == LOG_FORCE):
+            name = ""
+        if (level == LOG_CRITICAL):
+            name = "Critical"
+        if (level == LOG_ERROR):
+            name = "Error"
+        if (level == LOG_WARNING):
+            name = "Warning"
+        if (level == LOG_NOTICE):
+            name = "Notice"
+        if (level == LOG_INFO):
+            name = "Info"
+        if (level == LOG_VERBOSE):
+            name = "Verbose"
+        if (level == LOG_DEBUG):
+            name = "Debug"
+        if (level == LOG_EXTREME):
+            name = "Extra"
+
+        if not isinstance(text, str):
+            text = str(text)
+
+        if LOG_FORMAT == "json":
+            text = json.dumps({"time": time.strftime(LOG_TIMEFMT, time.localtime(time.time())), "level": name, "text": LOG_PREFIX + text + LOG_SUFFIX}, ensure_ascii=False)
+        else:
+            text = "[" + time.strftime(LOG_TIMEFMT, time.localtime(time.time())) +"] [" + name + "] " + LOG_PREFIX + text + LOG_SUFFIX
+
+        if file == None and LOG_FILE != "":
+            file = LOG_FILE
+
+        if file == None:
+            print(text)
+        elif LOG_WRITER != None and file == LOG_WRITER.file:
+            LOG_WRITER.write(text)
+        else:
+            try:
+                file_handle = open(file, "a")
+                file_handle.write(text + "\n")
+                file_handle.close()
+                
+                if os.path.getsize(file) > LOG_MAXSIZE:
+                    file_prev = file + ".1"
+                    if os.path.isfile(file_prev):
+                        os.unlink(file_prev)
+                    os.rename(file, file_prev)
+            except:
+                return
+
+
+##############################################################################################################
+# System
+
+
+#### Panic #####
+def panic():
+    sys.exit(255)
+
+
+#### Exit #####
+def exit():
+    sys.exit(0)
+
+
+#### Exit - Register #####
+# Functions which have to run when the program ends (save data, flush the log).
+# RNS and the LXMF router end the program on SIGTERM/SIGINT with os._exit(), which skips atexit.
+# Therefore the functions run from atexit and from the signal handlers (exit_signals).
+EXIT_HANDLERS = []
+
+
+def exit_register(function, *args):
+    if len(EXIT_HANDLERS) == 0:
+        atexit.register(exit_run)
+    EXIT_HANDLERS.append((function, args))
+
+
+#### Exit - Run #####
+# Last registered first (like atexit), every function runs only once.
+def exit_run():
+    while len(EXIT_HANDLERS) > 0:
+        function, args = EXIT_HANDLERS.pop()
+        try:
+            function(*args)
+        except Exception as e:
+            log("Exit - Error in " + str(function) + ": " + str(e), LOG_ERROR)
+
+
+#### Exit - Signals #####
+# Chains the installed SIGTERM/SIGINT handlers (RNS, LXMF router) with exit_run().
+# Has to be called again after a new handler was installed (RNS.Reticulum, LXMF.LXMRouter).
+def exit_signals():
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        handler = signal.getsignal(signum)
+        if handler == signal.SIG_IGN or getattr(handler, "exit_run", None) is exit_run:
+            continue
+        signal.signal(signum, exit_signal_handler(handler))
+
+
+def exit_signal_handler(handler):
+    def signal_handler(signum, frame):
+        exit_run()
+        if callable(handler):
+            handler(signum, frame)
+        elif signum == signal.SIGINT:
+            raise KeyboardInterrupt
+        else:
+            sys.exit(0)
+    signal_handler.exit_run = exit_run
+    return signal_handler
+
+
+##############################################################################################################
+# Setup/Start
+
+
+#### Setup #####
+def setup(path=None, path_rns=None, path_log=None, loglevel=None, logformat=None, service=False):
+    global PATH
+    global PATH_RNS
+    global LOG_LEVEL
+    global LOG_FORMAT
+    global LOG_FILE
+    global RNS_CONNECTION
+
+    if path is not None:
+        if path.endswith("/"):
+            path = path[:-1]
+        PATH = path
+
+    if path_rns is not None:
+        if path_rns.endswith("/"):
+            path_rns = path_rns[:-1]
+        PATH_RNS = path_rns
+
+    if loglevel is not None:
+        LOG_LEVEL = loglevel
+        rns_loglevel = loglevel
+    else:
+        rns_loglevel = None
+
+    if logformat is not None:
+        LOG_FORMAT = logformat
+
+    if service:
+        LOG_LEVEL = LOG_LEVEL_SERVICE
+        if path_log is not None:
+            if path_log.endswith("/"):
+                path_log = path_log[:-1]
+            LOG_FILE = path_log
+        else:
+            LOG_FILE = PATH
+        LOG_FILE = LOG_FILE + "/" + NAME + ".log"
+        log_start(LOG_FILE)
+        rns_loglevel = None
+
+    if not config_read(PATH + "/config.cfg", PATH + "/config.cfg.owr"):
+        print("Config - Error reading config file " + PATH + "/config.cfg")
+        panic()
+
+    if CONFIG["main"].getboolean("default_config"):
+        print("Exit!")
+        print("First start with the default config!")
+        print("You should probably edit the config file \"" + PATH + "/config.cfg\" to suit your needs and use-case!")
+        print("You should make all your changes at the user configuration file \"" + PATH + "/config.cfg.owr\" to override the default configuration file!")
+        print("Then restart this program again!")
+        exit()
+
+    if not CONFIG["main"].getboolean("enabled"):
+        print("Disabled in config file. Exit!")
+        exit()
+
+    RNS_CONNECTION = RNS.Reticulum(configdir=PATH_RNS, loglevel=rns_loglevel)
+    exit_signals()
+
+    log("...............................................................................", LOG_INFO)
+    log("        Name: " + CONFIG["main"]["name"], LOG_INFO)
+    log("Program File: " + __file__, LOG_INFO)
+    log(" Config File: " + PATH + "/config", LOG_INFO)
+    log("     Version: " + VERSION, LOG_INFO)
+    log("   Copyright: " + COPYRIGHT, LOG_INFO)
+    log("...............................................................................", LOG_INFO)
+
+    for section in CONFIG.sections():
+        if not section.startswith("tool_") or not config_getboolean(CONFIG, section, "enabled"):
+            continue
+        tool_start(section[5:], section, path_log=path_log, loglevel=loglevel, logformat=logformat, service=service)
+        start = time.time()
+        while time.time() - start < CONFIG.getint("main", "start_delay"):
+            main_thread_process(0.1)
+
+    if len(TOOLS) == 0:
+        print("No tool enabled in config file. Exit!")
+        exit()
+
+    log("Host - Running " + str(len(TOOLS)) + " tool(s): " + ", ".join(TOOLS.keys()), LOG_NOTICE)
+
+    while True:
+        main_thread_process()
+        if not any(thread.is_alive() for thread in TOOLS.values()):
+            log("Host - All tools stopped. Exit!", LOG_ERROR)
+            panic()
+
+
+#### Start ####
+def main():
+    try:
+        description = NAME + " - " + DESCRIPTION
+        parser = argparse.ArgumentParser(description=description)
+
+        parser.add_argument("-p", "--path", action="store", type=str, default=None, help="Path to alternative config directory")
+        parser.add_argument("-pr", "--path_rns", action="store", type=str, default=None, help="Path to alternative Reticulum config directory")
+        parser.add_argument("-pl", "--path_log", action="store", type=str, default=None, help="Path to alternative log directory")
+        parser.add_argument("-l", "--loglevel", action="store", type=int, default=LOG_LEVEL)
+        parser.add_argument("-lf", "--logformat", action="store", type=str, default=LOG_FORMAT, choices=["text", "json"], help="Log format (text/json)")
+        parser.add_argument("-s", "--service", action="store_true", default=False, help="Running as a service and should log to file")
+        parser.add_argument("--exampleconfig", action="store_true", default=False, help="Print verbose configuration example to stdout and exit")
+        parser.add_argument("--exampleconfigoverride", action="store_true", default=False, help="Print verbose configuration example to stdout and exit")
+
+        params = parser.parse_args()
+
+        if params.exampleconfig:
+            print("Config File: " + PATH + "/config.cfg")
+            print("Content:")
+            print(DEFAULT_CONFIG)
+            exit()
+
+        if params.exampleconfigoverride:
+            print("Config Override File: " + PATH + "/config.cfg.owr")
+            print("Content:")
+            print(DEFAULT_CONFIG_OVERRIDE)
+            exit()
+
+        setup(path=params.path, path_rns=params.path_rns, path_log=params.path_log, loglevel=params.loglevel, logformat=params.logformat, service=params.service)
+
+    except KeyboardInterrupt:
+        print("Terminated by CTRL-C")
+        exit()
+
+
+##############################################################################################################
+# Files
+
+
+#### Default configuration override file ####
+DEFAULT_CONFIG_OVERRIDE = '''# This is the user configuration file to override the default configuration file.
+# All settings made here have precedence.
+# This file can be used to clearly summarize all settings that deviate from the default.
+# This also has the advantage that all changed settings can be kept when updating the program.
+'''
+
+
+#### Default configuration file ####
+DEFAULT_CONFIG = '''# This is the default config file.
+# You should probably edit it to suit your needs and use-case.
+
+
+
+
+#### Main program settings ####
+[main]
+
+enabled = True
+
+# Name of the program. Only for display in the log or program startup.
+name = LXMF Host
+
+# Minimum number of receive worker threads of every tool.
+# The received messages of every tool are processed in its own
+# worker queues, so a slow tool does not block the other tools.
+# Can be overwritten in the tool sections.
+receive_workers = 1
+
+# Waiting time in seconds between the start of the tools.
+start_delay = 1
+
+
+
+
+#### Tool settings ####
+# Every section [tool_<name>] starts one tool in this process.
+# All tools share the Reticulum instance and the scheduler of this process.
+# Every tool uses its own config/storage directory with its own
+# identity, LXMF router, config and data files.
+# The config of the tool is created at the first start.
+# enabled = Start the tool
+# file = Program file of the tool (absolute or relative to this program)
+# path = Config/storage directory of the tool
+# receive_workers = Minimum number of receive worker threads
+
+[tool_echo]
+enabled = False
+file = ../lxmf_echo/lxmf_echo.py
+path = ~/.lxmf_host/echo
+
+[tool_group1]
+enabled = False
+file = ../lxmf_distribution_group/lxmf_distribution_group.py
+path = ~/.lxmf_host/group1
+
+[tool_group2]
+enabled = False
+file = ../lxmf_distribution_group/lxmf_distribution_group.py
+path = ~/.lxmf_host/group2
+'''
+
+
+##############################################################################################################
+# Init
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import configparser
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from tests.tools import tool_load
+
+
+class test_config_snapshot(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = tool_load("lxmf_distribution_group")
+
+
+    def snapshot(self, config=""):
+        parser = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        parser.read_string(self.module.DEFAULT_CONFIG)
+        parser.read_string(config)
+        return self.module.config_snapshot(parser, self.module.DEFAULT_CONFIG)
+
+
+    def test_type(self):
+        self.assertEqual(self.module.config_snapshot.type("True"), bool)
+        self.assertEqual(self.module.config_snapshot.type("off"), bool)
+        self.assertEqual(self.module.config_snapshot.type("0"), int)
+        self.assertEqual(self.module.config_snapshot.type("1"), int)
+        self.assertEqual(self.module.config_snapshot.type("-5"), int)
+        self.assertEqual(self.module.config_snapshot.type("0.5"), float)
+        self.assertEqual(self.module.config_snapshot.type("-0.5"), float)
+        self.assertEqual(self.module.config_snapshot.type("1.2.3"), str)
+        self.assertEqual(self.module.config_snapshot.type("10/5"), str)
+        self.assertEqual(self.module.config_snapshot.type(""), str)
+        self.assertEqual(self.module.config_snapshot.type(None), str)
+
+
+    def test_value(self):
+        self.assertIs(self.module.config_snapshot.value("yes", bool), True)
+        self.assertIs(self.module.config_snapshot.value("False", bool), False)
+        self.assertEqual(self.module.config_snapshot.value("10", int), 10)
+        self.assertEqual(self.module.config_snapshot.value("0.5", int), 0.5)
+        self.assertEqual(self.module.config_snapshot.value("2", float), 2.0)
+        self.assertEqual(self.module.config_snapshot.value(None, bool), False)
+        self.assertEqual(self.module.config_snapshot.value(None, int), 0)
+        self.assertEqual(self.module.config_snapshot.value(None, str), "")
+        for (value, value_type) in (("maybe", bool), ("ten", int), ("", int), ("x", float)):
+            with self.subTest(value=value, type=value_type.__name__):
+                with self.assertRaises(ValueError):
+                    self.module.config_snapshot.value(value, value_type)
+
+
+    def test_default_types(self):
+        snapshot = self.snapshot()
+        self.assertIs(snapshot.statistic.enabled, True)
+        self.assertIs(snapshot.rate_limit.enabled, False)
+        self.assertEqual(snapshot.rate_limit.size, 65536)
+        self.assertEqual(snapshot.lxmf.send_rate, 0)
+        self.assertEqual(snapshot.rate_limit.default, "10/5")
+        self.assertEqual(snapshot.rate_limit.admin, "0")
+        self.assertEqual(snapshot.interface.delimiter_output, "!")
+
+
+    def test_user_values(self):
+        snapshot = self.snapshot("[lxmf]\nsend_rate = 0.5\n[rate_limit]\nenabled = yes\nsize = 100\nadmin = 20/10\n[custom]\nkey = 1\n")
+        self.assertEqual(snapshot.lxmf.send_rate, 0.5)
+        self.assertIs(snapshot.rate_limit.enabled, True)
+        self.assertEqual(snapshot.rate_limit.size, 100)
+        self.assertEqual(snapshot.rate_limit.admin, "20/10")
+        # Options which are not in the default config are kept as str.
+        self.assertEqual(snapshot.custom.key, "1")
+
+
+    def test_rate_limit(self):
+        self.module.CONFIG_SNAPSHOT = self.snapshot("[rate_limit]\nadmin = 20/10\nmod = 30\nuser = \n")
+        self.assertEqual(self.module.rate_limit_get("admin"), (20/60, 10))
+        self.assertEqual(self.module.rate_limit_get("mod"), (0.5, 30))
+        self.assertEqual(self.module.rate_limit_get("user"), (10/60, 5))
+        self.assertEqual(self.module.rate_limit_get("cluster"), (0, 1))
+        self.assertEqual(self.module.rate_limit_get("global"), (10, 100))
+
+
+    def test_missing(self):
+        parser = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        parser.read_string("[main]\nname = Group\n")
+        snapshot = self.module.config_snapshot(parser, self.module.DEFAULT_CONFIG)
+        self.assertEqual(snapshot.main.name, "Group")
+        self.assertIs(snapshot.statistic.enabled, False)
+        self.assertEqual(snapshot.rate_limit.size, 0)
+        self.assertEqual(snapshot.lxmf.display_name, "")
+
+
+    def test_invalid(self):
+        with mock.patch.object(self.module, "log") as log:
+            snapshot = self.snapshot("[statistic]\nenabled = maybe\n[rate_limit]\nsize = many\n")
+        self.assertEqual(snapshot.statistic.enabled, "maybe")
+        self.assertEqual(snapshot.rate_limit.size, "many")
+        texts = [call.args[0] for call in log.call_args_list]
+        self.assertIn("Config - Option 'enabled' in section 'statistic' is not a valid bool, using the raw value: maybe", texts)
+        self.assertIn("Config - Option 'size' in section 'rate_limit' is not a valid int, using the raw value: many", texts)
+        self.assertEqual(len(texts), 2)
+
+
+    def test_invalid_rate_limit(self):
+        with mock.patch.object(self.module, "log") as log:
+            self.module.CONFIG_SNAPSHOT = self.snapshot("[rate_limit]\nadmin = fast\n")
+            self.assertEqual(self.module.rate_limit_get("admin"), (0, 0))
+        self.assertEqual(log.call_count, 1)
+
+
+    def test_languages(self):
+        with mock.patch.object(self.module, "log") as log:
+            snapshot = self.snapshot("[main]\nname = Group\nname-de = Gruppe\n[statistic]\nenabled-de = no\n[rate_limit]\nsize-de = viele\n")
+        self.assertEqual(snapshot.main.name, "Group")
+        self.assertIs(snapshot.statistic.enabled, True)
+        self.assertEqual(snapshot.rate_limit.size, 65536)
+        snapshot_de = snapshot.lng("-de")
+        self.assertEqual(snapshot_de.main.name, "Gruppe")
+        self.assertIs(snapshot_de.statistic.enabled, False)
+        self.assertEqual(snapshot_de.rate_limit.size, "viele")
+        self.assertEqual(snapshot_de.lxmf.display_name, snapshot.lxmf.display_name)
+        self.assertEqual(snapshot_de.interface_messages.auto_error, snapshot.interface_messages.get("auto_error-de"))
+        self.assertIs(snapshot.lng(""), snapshot)
+        self.assertIs(snapshot.lng("-xx"), snapshot)
+        self.assertIs(snapshot_de.lng("-de"), snapshot_de)
+        self.assertEqual(log.call_count, 1)
+
+
+    def test_read_only(self):
+        snapshot = self.snapshot()
+        with self.assertRaises(AttributeError):
+            snapshot.main = None
+        with self.assertRaises(AttributeError):
+            snapshot.main.name = "Group"
+
+
+    def test_config_read(self):
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "config.cfg"), "w") as fh:
+                fh.write(self.module.DEFAULT_CONFIG)
+            with open(os.path.join(path, "config.cfg.owr"), "w") as fh:
+                fh.write("[statistic]\nenabled = maybe\n[lxmf]\nsend_rate = 0.5\n")
+            with mock.patch.object(self.module, "log"):
+                self.assertTrue(self.module.config_read(os.path.join(path, "config.cfg"), os.path.join(path, "config.cfg.owr")))
+        self.assertEqual(self.module.CONFIG_SNAPSHOT.statistic.enabled, "maybe")
+        self.assertEqual(self.module.CONFIG_SNAPSHOT.lxmf.send_rate, 0.5)
+        self.assertEqual(self.module.CONFIG.get("lxmf", "send_rate"), "0.5")
+
+
+if __name__ == "__main__":
+    unittest.main()
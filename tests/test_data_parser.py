@@ -0,0 +1,141 @@
+import random
+import unittest
+
+from tests.tools import tool_load
+
+
+DATA = '''
+[admin]
+aaaa = Admin
+
+[user]
+bbbb = User
+cccc = User
+
+[block_user]
+aaaa = Blocked
+'''
+
+
+class test_data_parser(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = tool_load("lxmf_distribution_group")
+
+
+    def setUp(self):
+        self.data = self.module.data_parser(allow_no_value=True, inline_comment_prefixes="#")
+        self.data.read_string(DATA)
+
+
+    def assertIndex(self):
+        index = {}
+        for section in self.data.sections():
+            for key in self.data.members(section):
+                index.setdefault(key, set()).add(section)
+        self.assertEqual(self.data.index, index)
+
+
+    def test_read(self):
+        self.assertIndex()
+        self.assertEqual(self.data.member_sections("aaaa"), ["admin", "block_user"])
+        self.assertEqual(self.data.member_sections("AAAA"), ["admin", "block_user"])
+        self.assertEqual(self.data.member_sections("dddd"), [])
+        self.assertEqual(self.data.members("user"), ["bbbb", "cccc"])
+        self.assertEqual(self.data.members("unknown"), [])
+
+
+    def test_read_again(self):
+        version = self.data.version
+        self.data.read_string("[user]\ndddd = User\n")
+        self.assertIndex()
+        self.assertEqual(self.data.member_sections("dddd"), ["user"])
+        self.assertGreater(self.data.version, version)
+
+
+    def test_set(self):
+        version = self.data.version
+        self.data.set("user", "aaaa", "User")
+        self.assertEqual(self.data.member_sections("aaaa"), ["admin", "user", "block_user"])
+        self.assertEqual(self.data.version, version + 1)
+        self.data["guest"] = {}
+        self.data["guest"]["DDDD"] = "Guest"
+        self.assertEqual(self.data.member_sections("dddd"), ["guest"])
+        self.assertEqual(self.data.version, version + 2)
+        self.assertIndex()
+
+
+    def test_set_value(self):
+        # Only new members change the version (e.g. a new name does not).
+        version = self.data.version
+        self.data["user"]["bbbb"] = "Renamed"
+        self.data.set("user", "cccc", "Renamed")
+        self.assertEqual(self.data.version, version)
+        self.assertIndex()
+
+
+    def test_default_section(self):
+        version = self.data.version
+        self.data.set(self.data.default_section, "eeee", "Default")
+        self.assertEqual(self.data.member_sections("eeee"), [])
+        self.assertEqual(self.data.version, version)
+
+
+    def test_remove_option(self):
+        version = self.data.version
+        self.assertTrue(self.data.remove_option("admin", "AAAA"))
+        self.assertEqual(self.data.member_sections("aaaa"), ["block_user"])
+        self.assertEqual(self.data.version, version + 1)
+        self.assertTrue(self.data.remove_option("block_user", "aaaa"))
+        self.assertNotIn("aaaa", self.data.index)
+        self.assertFalse(self.data.remove_option("user", "aaaa"))
+        self.assertEqual(self.data.version, version + 2)
+        self.assertIndex()
+
+
+    def test_remove_section(self):
+        version = self.data.version
+        self.assertTrue(self.data.remove_section("user"))
+        self.assertEqual(self.data.member_sections("bbbb"), [])
+        self.assertEqual(self.data.member_sections("aaaa"), ["admin", "block_user"])
+        self.assertGreater(self.data.version, version)
+        version = self.data.version
+        self.assertFalse(self.data.remove_section("user"))
+        self.assertEqual(self.data.version, version)
+        self.assertIndex()
+
+
+    def test_move(self):
+        # Moving a member like /move: add to the new section, remove from the old one.
+        self.data["admin"]["bbbb"] = self.data["user"]["bbbb"]
+        self.data.remove_option("user", "bbbb")
+        self.assertEqual(self.data.member_sections("bbbb"), ["admin"])
+        self.assertIndex()
+
+
+    def test_random(self):
+        rand = random.Random(1)
+        sections = ["admin", "mod", "user", "guest", "wait", "block_user"]
+        keys = ["%04x" % i for i in range(32)]
+        for section in sections:
+            if not self.data.has_section(section):
+                self.data.add_section(section)
+        for i in range(2000):
+            section = rand.choice(sections)
+            key = rand.choice(keys)
+            version = self.data.version
+            if rand.random() < 0.6:
+                new = key not in self.data.members(section)
+                self.data[section][key] = "Name"
+                self.assertEqual(self.data.version != version, new)
+            else:
+                existed = key in self.data.members(section)
+                self.assertEqual(self.data.remove_option(section, key), existed)
+                self.assertEqual(self.data.version != version, existed)
+        self.assertIndex()
+        for key in keys:
+            self.assertEqual(self.data.member_sections(key), [section for section in self.data.sections() if self.data.has_option(section, key)])
+
+
+if __name__ == "__main__":
+    unittest.main()
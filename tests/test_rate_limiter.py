@@ -0,0 +1,145 @@
+import configparser
+import unittest
+from unittest import mock
+
+from tests.tools import tool_load
+
+
+class clock():
+    def __init__(self, now=1000.0):
+        self.now = now
+
+
+    def time(self):
+        return self.now
+
+
+class test_rate_limiter(unittest.TestCase):
+    TOOLS = ("lxmf_distribution_group", "lxmf_cmd")
+
+    @classmethod
+    def setUpClass(cls):
+        cls.modules = {name: tool_load(name) for name in cls.TOOLS}
+
+
+    def setUp(self):
+        self.clock = clock()
+
+
+    def limiter(self, module, size=65536):
+        patcher = mock.patch.object(module, "time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return module.lxmf_rate_limiter(size=size)
+
+
+    def test_burst_then_limited(self):
+        for (name, module) in self.modules.items():
+            with self.subTest(tool=name):
+                limiter = self.limiter(module)
+                for i in range(3):
+                    self.assertEqual(limiter.check("a", 1, 3), limiter.ALLOWED)
+                self.assertEqual(limiter.check("a", 1, 3), limiter.LIMITED)
+                self.assertEqual(limiter.check("a", 1, 3), limiter.REPEATED)
+                self.assertEqual(limiter.check("a", 1, 3), limiter.REPEATED)
+                self.assertEqual(limiter.check("b", 1, 3), limiter.ALLOWED)
+                self.assertEqual(limiter.stat(), {"sources": 2, "allowed": 4, "limited": 3, "global_limited": 0})
+
+
+    def test_refill(self):
+        for (name, module) in self.modules.items():
+            with self.subTest(tool=name):
+                limiter = self.limiter(module)
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.ALLOWED)
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.LIMITED)
+                self.clock.now += 1
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.REPEATED)
+                self.clock.now += 1
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.ALLOWED)
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.LIMITED)
+                # The bucket never holds more than the burst.
+                self.clock.now += 3600
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.ALLOWED)
+                self.assertEqual(limiter.check("a", 0.5, 1), limiter.LIMITED)
+
+
+    def test_no_limit(self):
+        for (name, module) in self.modules.items():
+            with self.subTest(tool=name):
+                limiter = self.limiter(module)
+                for i in range(100):
+                    self.assertEqual(limiter.check("a", 0, 0), limiter.ALLOWED)
+                    self.assertEqual(limiter.check_global(0, 0), limiter.ALLOWED)
+                self.assertEqual(limiter.stat()["sources"], 0)
+
+
+    def test_eviction(self):
+        for (name, module) in self.modules.items():
+            with self.subTest(tool=name):
+                limiter = self.limiter(module, size=2)
+                self.assertEqual(limiter.check("a", 1, 1), limiter.ALLOWED)
+                self.clock.now += 0.1
+                self.assertEqual(limiter.check("b", 1, 1), limiter.ALLOWED)
+                self.assertEqual(limiter.check("b", 1, 1), limiter.LIMITED)
+                self.clock.now += 0.1
+                # "a" is the oldest source and gives its slot to "c".
+                self.assertEqual(limiter.check("c", 1, 1), limiter.ALLOWED)
+                self.assertEqual(sorted(limiter.slots), ["b", "c"])
+                self.assertEqual(len(limiter.keys), 2)
+                self.assertEqual(limiter.check("b", 1, 1), limiter.REPEATED)
+                # An evicted source starts again with a full bucket.
+                self.assertEqual(limiter.check("a", 1, 1), limiter.ALLOWED)
+                self.assertEqual(sorted(limiter.slots), ["a", "c"])
+                for (key, index) in limiter.slots.items():
+                    self.assertEqual(limiter.keys[index], key)
+
+
+    def test_global_not_evicted(self):
+        for (name, module) in self.modules.items():
+            with self.subTest(tool=name):
+                limiter = self.limiter(module, size=1)
+                self.assertEqual(limiter.check_global(1, 2), limiter.ALLOWED)
+                self.assertEqual(limiter.check_global(1, 2), limiter.ALLOWED)
+                for key in ("a", "b", "c", "d"):
+                    self.assertEqual(limiter.check(key, 1, 1), limiter.ALLOWED)
+                    self.clock.now += 0.1
+                self.assertEqual(limiter.check_global(1, 2), limiter.LIMITED)
+                self.assertEqual(limiter.check_global(1, 2), limiter.LIMITED)
+                self.assertEqual(limiter.stat(), {"sources": 1, "allowed": 4, "limited": 0, "global_limited": 2})
+                self.clock.now += 1
+                self.assertEqual(limiter.check_global(1, 2), limiter.ALLOWED)
+
+
+class test_rate_limit_config(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = tool_load("lxmf_cmd")
+
+
+    def setUp(self):
+        self.module.CONFIG = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        self.module.CONFIG.read_string(self.module.DEFAULT_CONFIG)
+
+
+    def test_key(self):
+        source = bytes.fromhex("2858b7a096899116cd529559cc679ffe")
+        self.assertEqual(self.module.rate_limit_key(source), "default")
+        self.module.CONFIG["allowed"]["2858b7a096899116cd529559cc679ffe"] = None
+        self.assertEqual(self.module.rate_limit_key(source), "allowed")
+        self.module.CONFIG["rate_limit"]["<2858b7a096899116cd529559cc679ffe>"] = "60/10"
+        self.assertEqual(self.module.rate_limit_key(source), "<2858b7a096899116cd529559cc679ffe>")
+
+
+    def test_get(self):
+        self.assertEqual(self.module.rate_limit_get("global"), (2, 20))
+        self.assertEqual(self.module.rate_limit_get("default"), (10/60, 5))
+        self.assertEqual(self.module.rate_limit_get("allowed"), (0, 1))
+        self.assertEqual(self.module.rate_limit_get("unknown"), (10/60, 5))
+        self.module.CONFIG["rate_limit"]["allowed"] = "30"
+        self.assertEqual(self.module.rate_limit_get("allowed"), (0.5, 30))
+        self.module.CONFIG["rate_limit"]["allowed"] = "x/y"
+        self.assertEqual(self.module.rate_limit_get("allowed"), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
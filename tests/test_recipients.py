@@ -0,0 +1,94 @@
+import configparser
+import os
+import tempfile
+import unittest
+
+from tests.tools import tool_load
+
+
+class test_recipients(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = tool_load("lxmf_distribution_group")
+
+
+    def setUp(self):
+        self.module.CONFIG = configparser.ConfigParser(allow_no_value=True, inline_comment_prefixes="#")
+        self.module.CONFIG.read_string(self.module.DEFAULT_CONFIG)
+        self.module.rights_compile()
+        self.module.DATA = self.data({"admin": ["aaaa"], "user": ["bbbb", "cccc"], "guest": ["dddd"], "wait": ["eeee"], "block_user": ["ffff"]})
+
+
+    def data(self, members):
+        data = self.module.data_parser(allow_no_value=True, inline_comment_prefixes="#")
+        data.read_string(self.module.DEFAULT_DATA)
+        for (section, keys) in members.items():
+            for key in keys:
+                data[section][key] = "Name"
+        return data
+
+
+    def test_rights(self):
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+        self.assertEqual(self.module.recipients_get("receive_local", exclude="bbbb"), ["aaaa", "cccc", "dddd"])
+        self.assertEqual(self.module.recipients_get("receive_pin_remove"), ["aaaa"])
+        self.assertEqual(self.module.recipients_get(("receive_pin_remove", "join")), ["aaaa", "bbbb", "cccc", "dddd", "eeee"])
+        self.assertEqual(self.module.recipients_get("unknown"), [])
+
+
+    def test_duplicates(self):
+        self.module.DATA["admin"]["bbbb"] = "Name"
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+
+
+    def test_cached(self):
+        recipients = self.module.recipients_get("receive_local")
+        self.assertIn(("receive_local",), self.module.RECIPIENTS)
+        recipients.append("xxxx")
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+
+
+    def test_member_add(self):
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+        self.module.DATA["user"]["gggg"] = "Name"
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "gggg", "dddd"])
+
+
+    def test_member_remove(self):
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+        self.module.DATA.remove_option("user", "bbbb")
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "cccc", "dddd"])
+        self.module.DATA.remove_section("guest")
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "cccc"])
+
+
+    def test_member_move(self):
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+        self.module.DATA["block_user"]["bbbb"] = "Name"
+        self.module.DATA.remove_option("user", "bbbb")
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "cccc", "dddd"])
+        self.assertEqual(self.module.recipients_get("receive_pin_remove"), ["aaaa"])
+
+
+    def test_rights_compile(self):
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+        self.module.CONFIG["rights"]["guest"] = "interface,update,join,leave"
+        self.module.rights_compile()
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc"])
+
+
+    def test_data_read(self):
+        # A new data file starts with the same version (1 after the read) as the old one.
+        self.module.DATA.version = 1
+        self.assertEqual(self.module.recipients_get("receive_local"), ["aaaa", "bbbb", "cccc", "dddd"])
+        data = self.data({"user": ["hhhh"]})
+        with tempfile.TemporaryDirectory() as path:
+            file = os.path.join(path, "data.cfg")
+            with open(file, "w") as fh:
+                data.write(fh)
+            self.assertTrue(self.module.data_read(file))
+        self.assertEqual(self.module.recipients_get("receive_local"), ["hhhh"])
+
+
+if __name__ == "__main__":
+    unittest.main()
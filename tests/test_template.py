@@ -0,0 +1,167 @@
+import os
+import tempfile
+import unittest
+
+from tests.tools import tool_load
+
+
+CONFIG = '''
+[main]
+name = Group
+name-de = Gruppe
+
+[lxmf]
+display_name = Test Group
+display_name-de = Testgruppe
+propagation_node = 0123456789abcdef0123456789abcdef
+
+[cluster]
+display_name = Country/Region/City
+'''
+
+
+class destination():
+    def destination_hash_str(self):
+        return "fedcba9876543210fedcba9876543210"
+
+
+class test_template(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.module = tool_load("lxmf_distribution_group")
+        cls.module.LXMF_CONNECTION = destination()
+        cls.module.STATISTIC = None
+        with tempfile.TemporaryDirectory() as path:
+            with open(os.path.join(path, "config.cfg"), "w") as fh:
+                fh.write(cls.module.DEFAULT_CONFIG)
+            with open(os.path.join(path, "config.cfg.owr"), "w") as fh:
+                fh.write(CONFIG)
+            assert cls.module.config_read(os.path.join(path, "config.cfg"), os.path.join(path, "config.cfg.owr"))
+
+
+    def setUp(self):
+        self.module.DATA = self.module.data_parser(allow_no_value=True, inline_comment_prefixes="#")
+        self.module.DATA.read_string(self.module.DEFAULT_DATA)
+        self.module.DATA["main"]["description"] = "First line!n!Second line"
+        self.module.DATA["main"]["description-de"] = "Erste Zeile!n!Zweite Zeile"
+        self.module.DATA["pin"] = {"1": "Pinned", "2": "Pinned"}
+        for (section, keys) in {"admin": ["aaaa"], "user": ["bbbb", "cccc"], "block_user": ["dddd"]}.items():
+            for key in keys:
+                self.module.DATA[section][key] = "Name"
+
+
+    # replace() before the templates were compiled (sequential str.replace() passes).
+    def replace_reference(self, text, source_hash, source_name, source_right, lng_key):
+        module = self.module
+        config = module.CONFIG_SNAPSHOT.lng(lng_key)
+        delimiter = config.interface.delimiter_output
+
+        text = text.replace(delimiter+"source_address"+delimiter, source_hash)
+        text = text.replace(delimiter+"source_name"+delimiter, source_name)
+        text = text.replace(delimiter+"source_right"+delimiter, source_right)
+
+        text = text.replace(delimiter+"name"+delimiter, config.main.name)
+        text = text.replace(delimiter+"display_name"+delimiter, config.lxmf.display_name)
+        text = text.replace(delimiter+"description"+delimiter, module.config_get(module.DATA, "main", "description", "", lng_key))
+        text = text.replace(delimiter+"rules"+delimiter, module.config_get(module.DATA, "main", "rules", "", lng_key))
+        text = text.replace(delimiter+"destination_address"+delimiter, module.LXMF_CONNECTION.destination_hash_str())
+        text = text.replace(delimiter+"propagation_node"+delimiter, config.lxmf.propagation_node)
+        text = text.replace(delimiter+"cluster_name"+delimiter, config.cluster.display_name.rsplit('/', 1)[-1])
+
+        text = text.replace(delimiter+"n"+delimiter, "\n")
+
+        if delimiter+"count_members"+delimiter in text:
+            count = 0
+            for section in module.RIGHTS:
+                count += len(module.DATA.members(section))
+            text = text.replace(delimiter+"count_members"+delimiter, str(count))
+
+        if delimiter+"count_pin"+delimiter in text:
+            count = 0
+            if module.DATA.has_section("pin"):
+                for (key, val) in module.DATA.items("pin"):
+                    count += 1
+            text = text.replace(delimiter+"count_pin"+delimiter, str(count))
+
+        return text
+
+
+    # All texts of the config in all languages (without the placeholders added with the templates).
+    def texts(self):
+        texts = []
+        for config in self.module.CONFIG_SNAPSHOT.languages():
+            for section in ("interface_messages", "interface_menu", "interface_help", "message"):
+                for (key, val) in getattr(config, section).items():
+                    if isinstance(val, str) and "activity_" not in val:
+                        texts.append(val)
+        texts.extend([
+            "",
+            "Text without placeholders",
+            "!",
+            "!!",
+            "!n",
+            "!unknown!",
+            "!name!!name!",
+            "!!n!!",
+            "!Name!",
+            "a!b!c!n!d",
+            "!count_members!/!count_pin! !description! !rules!",
+            "!source_address! !source_name! !source_right! !destination_address! !propagation_node! !cluster_name!",
+        ])
+        return texts
+
+
+    def assertParity(self, source_name="Source Name", source_right="user"):
+        for lng_key in ("", "-de"):
+            for text in self.texts():
+                with self.subTest(text=text, lng_key=lng_key):
+                    expected = self.replace_reference(text, "0011223344556677", source_name, source_right, lng_key)
+                    self.assertEqual(self.module.replace(text, "0011223344556677", source_name, source_right, lng_key), expected)
+                    context = self.module.template_context("0011223344556677", source_name, source_right, lng_key)
+                    self.assertEqual(self.module.template_render(text, context), expected)
+                    self.assertEqual(self.module.template_render(text, context), expected)
+
+
+    def test_parity(self):
+        self.assertGreater(len(self.texts()), 100)
+        self.assertParity()
+
+
+    def test_parity_empty(self):
+        self.module.DATA.remove_section("pin")
+        self.module.DATA.remove_option("main", "description")
+        self.assertParity(source_name="", source_right="")
+
+
+    def test_counts(self):
+        self.assertEqual(self.module.replace("!count_members!/!count_pin!", "", "", "", ""), "3/2")
+        self.module.DATA["user"]["eeee"] = "Name"
+        self.module.DATA["pin"]["3"] = "Pinned"
+        self.assertEqual(self.module.replace("!count_members!/!count_pin!", "", "", "", ""), "4/3")
+        self.module.DATA.remove_option("admin", "aaaa")
+        self.assertEqual(self.module.replace("!count_members!/!count_pin!", "", "", "", ""), "3/3")
+        self.assertParity()
+
+
+    def test_values(self):
+        text = "!cluster_source! -> !cluster_destination!: !source_name!"
+        self.assertEqual(self.module.replace(text, "", "Source", "", "", {"cluster_source": "a", "cluster_destination": "b"}), "a -> b: Source")
+        self.assertEqual(self.module.replace(text, "", "Source", "", ""), "!cluster_source! -> !cluster_destination!: Source")
+
+
+    def test_context_reuse(self):
+        template = self.module.template_compile("!source_name! (!count_members!)")
+        context = self.module.template_context(lng_key="")
+        lines = [template.render(context.source(key, "Name " + key, "user")) for key in ("aaaa", "bbbb")]
+        self.assertEqual(lines, ["Name aaaa (3)", "Name bbbb (3)"])
+
+
+    def test_compiled(self):
+        text = self.module.CONFIG_SNAPSHOT.interface_messages.auto_add_user
+        self.assertIn(text, self.module.TEMPLATES)
+        self.assertIs(self.module.template_compile(text), self.module.TEMPLATES[text])
+        self.assertTrue(self.module.template_compile("Text without placeholders").static)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,15 @@
+import importlib.util
+import os
+
+
+PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+#### Tool - Load ####
+# Fresh module of a tool (own globals for every test class).
+def tool_load(name):
+    file = os.path.join(PATH, name, name + ".py")
+    spec = importlib.util.spec_from_file_location("lxmf_test_" + name, file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module